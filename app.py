@@ -1,24 +1,22 @@
 import streamlit as st
-from db.connection import get_connection
 from auth import auth
-from dashboard import doctor, patient, nurse, lab_technician, receptionist
-
-conn = get_connection()
+from auth.session import current_principal
+from dashboard.registry import get_dashboard
+# Dashboards (and with them pandas) and the DB driver are imported on first use,
+# so the role-selection page renders without loading either.
 
 # Initialize Session State 
 if "page" not in st.session_state:
     st.session_state["page"] = "role_selection"  # starting page
 if "selected_role" not in st.session_state:
     st.session_state["selected_role"] = None
-if "user" not in st.session_state:
-    st.session_state["user"] = None
 
 
 # Page Functions 
 def role_selection_page():
     st.title("ePIS Hospital Management System")
     st.write("Select your role:")
-    roles = ["Patient", "Doctor", "Nurse", "Lab_Tech", "Receptionist"]
+    roles = ["Patient", "Doctor", "Nurse", "Lab_Tech", "Receptionist", "Pharmacist"]
 
     cols = st.columns(len(roles))
     for i, role in enumerate(roles):
@@ -66,26 +64,34 @@ def signup_page(conn):
         st.session_state["page"] = "login_page"
 
 
-def dashboard_page(conn):
-    user = st.session_state["user"]
-    if user["role"] == "doctor":
-        doctor.doctor_dashboard(conn)
-    elif user["role"] == "patient":
-        patient.patient_dashboard(conn)
-    elif user["role"] == "nurse":
-        nurse.nurse_dashboard(conn)
-    elif user["role"] == "lab_tech":
-        lab_technician.lab_technician_dashboard(conn)  
-    elif user["role"] == "receptionist":
-        receptionist.receptionist_dashboard(conn)
+def dashboard_page(conn, principal):
+    dashboard = get_dashboard(principal.role)
+    if dashboard is None:
+        st.error(f"No dashboard is available for the {principal.role!r} role.")
+        return
+    dashboard.render(conn, principal)
+
+    from dashboard.admin_metrics import admin_metrics_panel
+    admin_metrics_panel(principal)
 
 
 # Page Routing
+# Each rerun borrows its own pooled connection and hands it back when the script finishes.
 if st.session_state["page"] == "role_selection":
     role_selection_page()
-elif st.session_state["page"] == "login_page":
-    login_page(conn)
-elif st.session_state["page"] == "signup_page":
-    signup_page(conn)
-elif st.session_state["user"]:  # logged-in users
-    dashboard_page(conn)
+else:
+    from db.connection import checkout
+
+    with checkout() as conn:
+        if st.session_state["page"] == "login_page":
+            login_page(conn)
+        elif st.session_state["page"] == "signup_page":
+            signup_page(conn)
+        else:
+            principal = current_principal()
+            if principal:  # logged-in users
+                dashboard_page(conn, principal)
+            else:  # session expired or evicted
+                st.session_state["page"] = "login_page"
+                st.warning("Your session has expired. Please log in again.")
+                login_page(conn)
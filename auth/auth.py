@@ -1,17 +1,23 @@
 # auth/auth.py
 import streamlit as st
-from auth.user_model import get_user_by_email, create_user, check_password
+from auth.user_model import get_user_by_email, create_user
+from auth.password_service import authenticate, password_service, PasswordServiceBusy
+from auth.session import login
 
 def login_form(conn, role):
     st.subheader(f"{role.capitalize()} Login")
     email = st.text_input("Email", key=f"{role}_login_email")
     password = st.text_input("Password", type="password", key=f"{role}_login_pwd")
     if st.button("Login", key=f"{role}_login_btn"):
-        user = get_user_by_email(conn, email, role)
-        if user and check_password(password, user['password_hash']):
-            st.session_state['user'] = user
+        try:
+            user = authenticate(conn, email, password, role)
+        except PasswordServiceBusy as e:
+            st.warning(str(e))
+            return
+        if user is not None:
+            principal = login(conn, user)  # resolve identity once; dashboards read it from the session
             st.session_state['page'] = "dashboard"  #  Route to dashboard page
-            st.success(f"Welcome {user['name']}!")
+            st.success(f"Welcome {principal.display_name}!")
             st.rerun()  #  Force reload so it switches immediately
 
         else:
@@ -37,5 +43,10 @@ def signup_form(conn, role):
             if existing:
                 st.error("User already exists for this role.")
             else:
-                create_user(conn, name, email, password, role, linked_cid, linked_emp_id)
+                try:
+                    create_user(conn, name, email, password, role, linked_cid, linked_emp_id,
+                                hasher=password_service.hash)
+                except PasswordServiceBusy as e:
+                    st.warning(str(e))
+                    return
                 st.success("Account created! You can now log in.")
@@ -0,0 +1,195 @@
+# auth/hashers.py
+"""Password hashing backends, identified by the prefix of the stored hash.
+
+=============  ===========================================  ===================
+algorithm      stored format                                cost setting
+=============  ===========================================  ===================
+bcrypt         ``$2b$<rounds>$<salt+hash>``                 EPIS_BCRYPT_ROUNDS
+pbkdf2_sha256  ``pbkdf2_sha256$<iterations>$<salt>$<hash>``  EPIS_PBKDF2_ITERATIONS
+scrypt         ``scrypt$<n>$<r>$<p>$<salt>$<hash>``          EPIS_SCRYPT_N
+=============  ===========================================  ===================
+
+New hashes use ``EPIS_PASSWORD_HASHER`` (default bcrypt). Any registered format
+verifies, and ``needs_rehash`` reports hashes made with another algorithm or an
+outdated cost so login can migrate them. The bare ``<salt>$<hash>`` PBKDF2
+format written by the old top-level ``user_model.py`` is still accepted.
+"""
+
+import binascii
+import hashlib
+import hmac
+import os
+import re
+
+import bcrypt
+
+DEFAULT_ALGORITHM = os.getenv("EPIS_PASSWORD_HASHER", "bcrypt")
+
+
+class UnknownHashFormat(ValueError):
+    """Raised when no registered hasher recognises a stored hash."""
+
+
+def _hex(data):
+    return binascii.hexlify(data).decode()
+
+
+# ----------------- Backends -----------------
+class BcryptHasher:
+    algorithm = "bcrypt"
+    _prefixes = ("$2a$", "$2b$", "$2y$")
+
+    def __init__(self, rounds=None):
+        self.rounds = rounds or int(os.getenv("EPIS_BCRYPT_ROUNDS", "12"))
+
+    def identifies(self, encoded):
+        return encoded.startswith(self._prefixes)
+
+    def hash(self, password):
+        return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=self.rounds)).decode("utf-8")
+
+    def verify(self, password, encoded):
+        return bcrypt.checkpw(password.encode("utf-8"), encoded.encode("utf-8"))
+
+    def cost(self, encoded):
+        return int(encoded.split("$")[2])
+
+    def needs_update(self, encoded):
+        return self.cost(encoded) != self.rounds
+
+
+class Pbkdf2Hasher:
+    algorithm = "pbkdf2_sha256"
+
+    def __init__(self, iterations=None):
+        self.iterations = iterations or int(os.getenv("EPIS_PBKDF2_ITERATIONS", "600000"))
+
+    def identifies(self, encoded):
+        return encoded.startswith(self.algorithm + "$")
+
+    def _derive(self, password, salt, iterations):
+        return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+
+    def hash(self, password):
+        salt = os.urandom(16)
+        return f"{self.algorithm}${self.iterations}${_hex(salt)}${_hex(self._derive(password, salt, self.iterations))}"
+
+    def verify(self, password, encoded):
+        _, iterations, salt_hex, dk_hex = encoded.split("$")
+        dk = self._derive(password, binascii.unhexlify(salt_hex), int(iterations))
+        return hmac.compare_digest(dk, binascii.unhexlify(dk_hex))
+
+    def cost(self, encoded):
+        return int(encoded.split("$")[1])
+
+    def needs_update(self, encoded):
+        return self.cost(encoded) != self.iterations
+
+
+class LegacyPbkdf2Hasher(Pbkdf2Hasher):
+    """Verify-only: ``<salt hex>$<hash hex>`` at 100k iterations, from the old user_model.py."""
+
+    algorithm = "pbkdf2_sha256_legacy"
+    _format = re.compile(r"^[0-9a-f]{32}\$[0-9a-f]{64}$")
+
+    def __init__(self):
+        super().__init__(iterations=100_000)
+
+    def identifies(self, encoded):
+        return bool(self._format.match(encoded))
+
+    def hash(self, password):
+        raise NotImplementedError("The legacy PBKDF2 format is verify-only.")
+
+    def verify(self, password, encoded):
+        salt_hex, dk_hex = encoded.split("$")
+        dk = self._derive(password, binascii.unhexlify(salt_hex), self.iterations)
+        return hmac.compare_digest(dk, binascii.unhexlify(dk_hex))
+
+    def cost(self, encoded):
+        return self.iterations
+
+    def needs_update(self, encoded):
+        return True
+
+
+class ScryptHasher:
+    """Memory-hard: each hash needs about 128 * n * r bytes (16 MiB at the defaults)."""
+
+    algorithm = "scrypt"
+
+    def __init__(self, n=None, r=8, p=1):
+        self.n = n or int(os.getenv("EPIS_SCRYPT_N", str(2 ** 14)))
+        self.r = r
+        self.p = p
+
+    def identifies(self, encoded):
+        return encoded.startswith(self.algorithm + "$")
+
+    @staticmethod
+    def _derive(password, salt, n, r, p):
+        return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+                              maxmem=256 * n * r, dklen=32)
+
+    def hash(self, password):
+        salt = os.urandom(16)
+        dk = self._derive(password, salt, self.n, self.r, self.p)
+        return f"{self.algorithm}${self.n}${self.r}${self.p}${_hex(salt)}${_hex(dk)}"
+
+    def verify(self, password, encoded):
+        _, n, r, p, salt_hex, dk_hex = encoded.split("$")
+        dk = self._derive(password, binascii.unhexlify(salt_hex), int(n), int(r), int(p))
+        return hmac.compare_digest(dk, binascii.unhexlify(dk_hex))
+
+    def cost(self, encoded):
+        return tuple(int(v) for v in encoded.split("$")[1:4])
+
+    def needs_update(self, encoded):
+        return self.cost(encoded) != (self.n, self.r, self.p)
+
+
+# ----------------- Registry -----------------
+HASHERS = {}
+
+
+def register(hasher):
+    HASHERS[hasher.algorithm] = hasher
+    return hasher
+
+
+for _hasher in (BcryptHasher(), Pbkdf2Hasher(), ScryptHasher(), LegacyPbkdf2Hasher()):
+    register(_hasher)
+
+
+def get_hasher(algorithm=None):
+    return HASHERS[algorithm or DEFAULT_ALGORITHM]
+
+
+def identify(encoded):
+    """Return the hasher that produced ``encoded``."""
+    for hasher in HASHERS.values():
+        if encoded and hasher.identifies(encoded):
+            return hasher
+    raise UnknownHashFormat("Unrecognised password hash format.")
+
+
+def hash_password(password, algorithm=None):
+    return get_hasher(algorithm).hash(password)
+
+
+def verify_password(password, encoded):
+    """True if ``password`` matches; unknown or corrupt hashes never match."""
+    try:
+        return identify(encoded).verify(password, encoded)
+    except (ValueError, TypeError):
+        return False
+
+
+def needs_rehash(encoded, algorithm=None):
+    """True if ``encoded`` was made with a different algorithm or cost than new hashes use."""
+    target = get_hasher(algorithm)
+    try:
+        current = identify(encoded)
+        return current is not target or current.needs_update(encoded)
+    except (ValueError, IndexError):
+        return True
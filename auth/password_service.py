@@ -0,0 +1,105 @@
+# auth/password_service.py
+"""Run bcrypt off the Streamlit script thread in a bounded worker pool.
+
+bcrypt releases the GIL, so a small thread pool hashes on several cores while
+the script threads keep serving reruns. At most ``max_pending`` hash/verify
+jobs may be queued or running; beyond that callers get ``PasswordServiceBusy``
+immediately instead of piling up behind a login storm at shift change.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from auth.user_model import (check_password, get_user_by_email, hash_password, needs_rehash,
+                             update_password_hash)
+from db.metrics import LatencyHistogram
+
+WORKERS = int(os.getenv("EPIS_PASSWORD_WORKERS", str(min(4, os.cpu_count() or 1))))
+MAX_PENDING = int(os.getenv("EPIS_PASSWORD_MAX_PENDING", str(WORKERS * 4)))
+TIMEOUT = float(os.getenv("EPIS_PASSWORD_TIMEOUT", "10"))
+
+
+class PasswordServiceBusy(Exception):
+    """Raised when too many password jobs are queued or a job misses its timeout."""
+
+
+class PasswordService:
+    def __init__(self, workers=WORKERS, max_pending=MAX_PENDING, timeout=TIMEOUT):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.rejected = 0
+        self._rejected_lock = threading.Lock()
+        # Measured from submission, so queueing delay under load is included.
+        self.verify_latency = LatencyHistogram()
+        self.hash_latency = LatencyHistogram()
+
+    def _run(self, histogram, fn, *args, timeout=None):
+        if not self._slots.acquire(blocking=False):
+            with self._rejected_lock:
+                self.rejected += 1
+            raise PasswordServiceBusy("Too many logins in progress, please try again in a moment.")
+        submitted = time.perf_counter()
+
+        def job():
+            try:
+                return fn(*args)
+            finally:
+                histogram.observe(time.perf_counter() - submitted)
+                self._slots.release()
+
+        try:
+            future = self._executor.submit(job)
+        except Exception:
+            self._slots.release()
+            raise
+        try:
+            return future.result(timeout=self.timeout if timeout is None else timeout)
+        except FutureTimeout:
+            raise PasswordServiceBusy("Login is taking too long, please try again in a moment.") from None
+
+    def verify(self, password, hashed, timeout=None):
+        """True if ``password`` matches ``hashed``; malformed hashes count as a mismatch."""
+        if not password or not hashed:
+            return False
+        try:
+            return self._run(self.verify_latency, check_password, password, hashed, timeout=timeout)
+        except ValueError:
+            return False
+
+    def hash(self, password, timeout=None):
+        return self._run(self.hash_latency, hash_password, password, timeout=timeout)
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+            "verify_latency": self.verify_latency.snapshot(),
+            "hash_latency": self.hash_latency.snapshot(),
+        }
+
+
+password_service = PasswordService()
+
+
+def authenticate(conn, email, password, role, service=password_service):
+    """The login check: the user's row if ``password`` matches, else None.
+
+    Raises ``PasswordServiceBusy`` if the password cannot be verified. Hashes
+    made with an older cost factor are upgraded; best-effort, a busy pool must
+    not keep a verified user out.
+    """
+    user = get_user_by_email(conn, email, role)
+    if user is None or not service.verify(password, user["password_hash"]):
+        return None
+    if needs_rehash(user["password_hash"]):
+        try:
+            update_password_hash(conn, user["user_id"], service.hash(password))
+        except PasswordServiceBusy:
+            pass
+    return user
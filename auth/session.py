@@ -0,0 +1,138 @@
+# auth/session.py
+"""Authenticated sessions.
+
+At login the ``Users`` row and the staff/patient record it links to are
+resolved once into a compact ``Principal``. Principals live in a process-wide
+LRU keyed by an opaque token; ``st.session_state`` only carries the token, so
+the password hash never sits in session state and dashboards read identity
+without asking the user for their employee ID or CID again.
+"""
+
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+import streamlit as st
+
+IDLE_TIMEOUT = float(os.getenv("EPIS_SESSION_IDLE_TIMEOUT", str(8 * 60 * 60)))  # one shift
+MAX_SESSIONS = int(os.getenv("EPIS_SESSION_MAX", "5000"))
+
+# role -> (query for the linked record, Users column holding its key)
+LINKED_RECORDS = {
+    "patient": ("SELECT CID_no, name, DOB, gender, contact, address FROM Patient WHERE CID_no=%s",
+                "linked_cid"),
+    "doctor": ("SELECT doctor_emp_id, name, specialization FROM Doctor WHERE doctor_emp_id=%s",
+               "linked_emp_id"),
+    "nurse": ("SELECT nurse_emp_id, name FROM Nurse WHERE nurse_emp_id=%s", "linked_emp_id"),
+    "lab_tech": ("SELECT technician_emp_id, name, department FROM Lab_Technician WHERE technician_emp_id=%s",
+                 "linked_emp_id"),
+    "receptionist": ("SELECT receptionist_emp_id, name FROM Receptionist WHERE receptionist_emp_id=%s",
+                     "linked_emp_id"),
+    "pharmacist": ("SELECT pharmacist_emp_id, name, designation FROM Pharmacist WHERE pharmacist_emp_id=%s",
+                   "linked_emp_id"),
+}
+
+
+class Principal:
+    """The logged-in user plus the Patient/staff record their account links to."""
+
+    __slots__ = ("user_id", "name", "email", "role", "linked_cid", "linked_emp_id", "record")
+
+    def __init__(self, user_id, name, email, role, linked_cid=None, linked_emp_id=None, record=None):
+        self.user_id = user_id
+        self.name = name
+        self.email = email
+        self.role = role
+        self.linked_cid = linked_cid
+        self.linked_emp_id = linked_emp_id
+        self.record = record
+
+    @property
+    def display_name(self):
+        return (self.record or {}).get("name") or self.name
+
+    def __repr__(self):
+        return f"Principal(user_id={self.user_id!r}, role={self.role!r}, email={self.email!r})"
+
+
+def resolve_principal(conn, user):
+    """Build a Principal from a ``Users`` row, loading its linked record in one lookup."""
+    record = None
+    query, key_column = LINKED_RECORDS.get(user["role"], (None, None))
+    key = user.get(key_column) if key_column else None
+    if query and key is not None:
+        with conn.cursor(dictionary=True) as cur:
+            cur.execute(query, (key,))
+            record = cur.fetchone()
+    return Principal(
+        user["user_id"], user["name"], user["email"], user["role"],
+        user.get("linked_cid"), user.get("linked_emp_id"), record
+    )
+
+
+class SessionStore:
+    """Thread-safe LRU of token -> Principal with idle expiry."""
+
+    def __init__(self, idle_timeout=IDLE_TIMEOUT, max_sessions=MAX_SESSIONS, clock=time.monotonic):
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self._clock = clock
+        self._sessions = OrderedDict()  # token -> (principal, last_seen)
+        self._lock = threading.Lock()
+
+    def create(self, principal):
+        token = secrets.token_urlsafe(32)
+        with self._lock:
+            self._sessions[token] = (principal, self._clock())
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return token
+
+    def get(self, token):
+        """Return the session's Principal and refresh its idle timer, or None if unknown/expired."""
+        if not token:
+            return None
+        now = self._clock()
+        with self._lock:
+            entry = self._sessions.get(token)
+            if entry is None:
+                return None
+            if now - entry[1] > self.idle_timeout:
+                del self._sessions[token]
+                return None
+            self._sessions[token] = (entry[0], now)
+            self._sessions.move_to_end(token)
+            return entry[0]
+
+    def drop(self, token):
+        with self._lock:
+            self._sessions.pop(token, None)
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+sessions = SessionStore()
+
+
+# ----------------- Streamlit Helpers -----------------
+def login(conn, user):
+    """Start a session for an authenticated ``Users`` row; returns its Principal."""
+    principal = resolve_principal(conn, user)
+    st.session_state["session_token"] = sessions.create(principal)
+    return principal
+
+
+def current_principal():
+    return sessions.get(st.session_state.get("session_token"))
+
+
+def logout(extra_keys=()):
+    """End the session and clear the caller's dashboard state."""
+    sessions.drop(st.session_state.get("session_token"))
+    for key in ["session_token", "page", *extra_keys]:
+        if key in st.session_state:
+            del st.session_state[key]
+    st.session_state["page"] = "login_page"
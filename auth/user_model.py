@@ -1,26 +1,34 @@
 # auth/user_model.py
-import bcrypt
+from auth import hashers
 
-def hash_password(password):
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+def hash_password(password, algorithm=None):
+    return hashers.hash_password(password, algorithm)
 
 def check_password(password, hashed):
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    return hashers.verify_password(password, hashed)
+
+def needs_rehash(hashed):
+    """True if the stored hash should be replaced on the next successful login."""
+    return hashers.needs_rehash(hashed)
+
+USER_BY_EMAIL_SQL = "SELECT * FROM Users WHERE email=%s AND role=%s"
 
 def get_user_by_email(conn, email, role):
     with conn.cursor(dictionary=True) as cur:
-        cur.execute(
-            "SELECT * FROM Users WHERE email=%s AND role=%s",
-            (email, role)
-        )
+        cur.execute(USER_BY_EMAIL_SQL, (email, role))
         return cur.fetchone()
 
-def create_user(conn, name, email, password, role, linked_cid=None, linked_emp_id=None):
-    hashed = hash_password(password)
+def create_user(conn, name, email, password, role, linked_cid=None, linked_emp_id=None, hasher=hash_password):
+    """Insert a user; ``hasher`` lets the login pages hash through the password service."""
+    hashed = hasher(password)
     with conn.cursor() as cur:
         cur.execute("""
             INSERT INTO Users (name, email, password_hash, role, linked_cid, linked_emp_id)
             VALUES (%s,%s,%s,%s,%s,%s)
         """, (name, email, hashed, role, linked_cid, linked_emp_id))
         conn.commit()
- 
\ No newline at end of file
+
+def update_password_hash(conn, user_id, hashed):
+    with conn.cursor() as cur:
+        cur.execute("UPDATE Users SET password_hash=%s WHERE user_id=%s", (hashed, user_id))
+        conn.commit()
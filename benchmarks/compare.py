@@ -0,0 +1,97 @@
+# benchmarks/compare.py
+"""Compare a pytest-benchmark JSON run against the committed baseline.
+
+    pytest tests/benchmarks --benchmark-only --benchmark-json=bench.json
+    python -m benchmarks.compare bench.json              # exit 1 on regressions
+    python -m benchmarks.compare bench.json --update     # accept this run as the baseline
+
+Benchmarks are matched by full name and compared on their median, which shrugs
+off the odd GC pause better than the mean. A benchmark regresses when its
+median exceeds the baseline by more than ``--threshold``. Benchmarks missing
+from either side (e.g. the query benchmarks on a machine without a database)
+are listed but never fail the run.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+BASELINE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        "tests", "benchmarks", "baseline.json")
+THRESHOLD = float(os.getenv("EPIS_BENCH_THRESHOLD", "0.30"))
+
+
+def load_run(path):
+    """``{fullname: {"median": s, "mean": s, "rounds": n}}`` from pytest-benchmark's JSON."""
+    with open(path) as f:
+        data = json.load(f)
+    return {
+        b["fullname"]: {"median": b["stats"]["median"], "mean": b["stats"]["mean"],
+                        "rounds": b["stats"]["rounds"]}
+        for b in data["benchmarks"]
+    }
+
+
+def load_baseline(path=BASELINE):
+    with open(path) as f:
+        return json.load(f)["benchmarks"]
+
+
+def save_baseline(run, path=BASELINE, machine=None):
+    with open(path, "w") as f:
+        json.dump({"machine": machine or {}, "benchmarks": run}, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(run, baseline, threshold=THRESHOLD):
+    """Return ``(regressions, rows)``; rows are ``(name, baseline_s, now_s, ratio)``."""
+    regressions, rows = [], []
+    for name in sorted(set(run) | set(baseline)):
+        before = baseline.get(name, {}).get("median")
+        now = run.get(name, {}).get("median")
+        ratio = now / before if before and now is not None else None
+        rows.append((name, before, now, ratio))
+        if ratio is not None and ratio > 1 + threshold:
+            regressions.append(name)
+    return regressions, rows
+
+
+def _ms(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.3f}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("run", help="JSON written by --benchmark-json")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="allowed median growth, 0.3 = 30%% (env EPIS_BENCH_THRESHOLD)")
+    parser.add_argument("--update", action="store_true", help="overwrite the baseline with this run")
+    args = parser.parse_args(argv)
+
+    run = load_run(args.run)
+    if args.update:
+        with open(args.run) as f:
+            info = json.load(f).get("machine_info", {})
+        cpu = info.get("cpu", {})
+        save_baseline(run, args.baseline, {"python": info.get("python_version"),
+                                           "cpu": cpu.get("brand_raw"), "cores": cpu.get("count")})
+        print(f"Baseline updated with {len(run)} benchmarks: {args.baseline}")
+        return 0
+
+    regressions, rows = compare(run, load_baseline(args.baseline), args.threshold)
+    width = max(len(name) for name, *_ in rows) if rows else 10
+    print(f"{'benchmark':<{width}} {'base ms':>11} {'now ms':>11} {'change':>8}")
+    for name, before, now, ratio in rows:
+        change = "-" if ratio is None else f"{ratio - 1:+.0%}"
+        flag = "  REGRESSION" if name in regressions else ""
+        print(f"{name:<{width}} {_ms(before):>11} {_ms(now):>11} {change:>8}{flag}")
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower than baseline by more than {args.threshold:.0%}.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+# benchmarks/hashers.py
+"""Report password-hash throughput per backend to size login capacity per core.
+
+    python -m benchmarks.hashers [--seconds 2]
+
+Each backend runs at its configured cost (EPIS_BCRYPT_ROUNDS, EPIS_PBKDF2_ITERATIONS,
+EPIS_SCRYPT_N) on a single thread, so "verifies/s" is the sustainable login rate of
+one core. Multiply by EPIS_PASSWORD_WORKERS (capped at the core count) for a process.
+"""
+
+import argparse
+import sys
+import time
+
+from auth.hashers import HASHERS
+
+
+def throughput(fn, seconds):
+    fn()  # warm-up
+    done, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn()
+        done += 1
+    return done / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=2.0, help="time spent per backend")
+    args = parser.parse_args(argv)
+
+    print(f"{'backend':<16} {'cost':<16} {'hashes/s':>10} {'verifies/s':>11} {'ms/login':>9}")
+    for name, hasher in HASHERS.items():
+        try:
+            encoded = hasher.hash("benchmark-password")
+        except NotImplementedError:
+            continue  # verify-only legacy format
+        hashes = throughput(lambda: hasher.hash("benchmark-password"), args.seconds)
+        verifies = throughput(lambda: hasher.verify("benchmark-password", encoded), args.seconds)
+        print(f"{name:<16} {str(hasher.cost(encoded)):<16} {hashes:>10.1f} {verifies:>11.1f} "
+              f"{1000 / verifies:>9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+# benchmarks/patient_import.py
+"""Show that the patient importer reads and validates in constant memory.
+
+    python -m benchmarks.patient_import --rows 1000000
+
+Writes a synthetic CSV of ``--rows`` patients, then streams it through
+``read_chunks`` and ``validate_patient`` (everything the import does except the
+database round trips) and reports rows/sec and peak traced memory. Exits
+non-zero if the peak exceeds MAX_PEAK_MB.
+"""
+
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from services.patient_import import CHUNK_SIZE, read_chunks
+from services.patient_rules import DZONGKHAGS, PATIENT_COLUMNS, validate_patient
+
+MAX_PEAK_MB = 64
+
+
+def write_sample(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(PATIENT_COLUMNS)
+        for i in range(rows):
+            writer.writerow([10000000000 + i, f"Patient {i}", "1990-01-01", "Female",
+                             17000000 + i % 1000000, DZONGKHAGS[i % len(DZONGKHAGS)]])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    try:
+        write_sample(path, args.rows)
+        tracemalloc.start()
+        start = time.perf_counter()
+        valid = 0
+        for chunk in read_chunks(path, args.chunk_size):
+            valid += sum(1 for _, record in chunk if validate_patient(record)[0])
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        os.remove(path)
+
+    peak_mb = peak / 1024 / 1024
+    print(f"{args.rows:>9,} rows  {valid:,} valid  {args.rows / seconds:>9,.0f} rows/s  peak {peak_mb:.1f} MiB")
+    if peak_mb > MAX_PEAK_MB:
+        print(f"FAIL: peak memory above {MAX_PEAK_MB} MiB")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+# benchmarks/schedule_grid.py
+"""Show that build_schedule_grid scales linearly with the number of dose records.
+
+    python -m benchmarks.schedule_grid
+
+Times the grid at 1k, 10k and 100k records and exits non-zero if going from
+10k to 100k costs more than MAX_GROWTH times as much (10x is perfectly linear).
+"""
+
+import random
+import sys
+import time
+
+import pandas as pd
+
+from services.med_schedule import SLOTS
+from services.schedule_grid import build_schedule_grid
+
+SIZES = (1_000, 10_000, 100_000)
+MAX_GROWTH = 20.0
+STATUSES = ("Given", "Pending", "Skipped", None)
+
+
+def make_records(n, rng):
+    """n dose records: each patient gets a few medications, each medication 1-3 slots."""
+    rows = []
+    patient = 0
+    while len(rows) < n:
+        patient += 1
+        for med in range(rng.randint(1, 4)):
+            for slot in rng.sample(SLOTS, rng.randint(1, 3)):
+                rows.append((10000000000 + patient, f"Patient {patient}", f"Med {med}", "500mg",
+                             slot, rng.choice(STATUSES)))
+    return pd.DataFrame(rows[:n], columns=["patient_id", "patient_name", "medication_name",
+                                           "dosage", "frequency", "status"])
+
+
+def best_of(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    rng = random.Random(0)
+    timings = {}
+    for n in SIZES:
+        df = make_records(n, rng)
+        timings[n] = best_of(lambda: build_schedule_grid(df))
+        print(f"{n:>8} records: {timings[n] * 1000:8.1f} ms  ({timings[n] / n * 1e6:.2f} µs/record)")
+
+    growth = timings[SIZES[-1]] / timings[SIZES[-2]]
+    print(f"10x more records -> {growth:.1f}x the time (limit {MAX_GROWTH:.0f}x)")
+    return 0 if growth <= MAX_GROWTH else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+# benchmarks/startup.py
+"""Profile app.py's cold start with ``python -X importtime`` and enforce a budget.
+
+    python -m benchmarks.startup [--repeat 3] [--raw importtime.txt]
+
+Each scenario imports what one page needs in a fresh interpreter:
+
+    role_selection  ``import app`` (Streamlit bare mode renders the first page)
+    login           app plus the DB pool the login form checks out
+
+It prints the heaviest imports of the fastest run, and exits non-zero if a
+scenario takes longer than its budget or loads a module it must not load
+(pandas on either page, mysql.connector before a role is picked). ``--raw``
+keeps the full importtime log, which e.g. ``tuna`` can visualise.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import namedtuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_MS = float(os.getenv("EPIS_STARTUP_BUDGET_MS", "500"))
+TOP = 15
+
+Scenario = namedtuple("Scenario", "name code forbidden")
+Import = namedtuple("Import", "module self_us cumulative_us depth")
+
+SCENARIOS = (
+    Scenario("role_selection", "import app", ("pandas", "numpy", "pyarrow", "mysql.connector")),
+    Scenario("login", "import app, db.connection", ("pandas", "numpy", "pyarrow")),
+)
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_importtime(stderr):
+    """``Import`` records from ``-X importtime`` output; other stderr lines are ignored."""
+    imports = []
+    for line in stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            imports.append(Import(m.group(4), int(m.group(1)), int(m.group(2)), (len(m.group(3)) - 1) // 2))
+    return imports
+
+
+def total_ms(imports):
+    """Wall time of the top-level imports (nested ones are already in their parent's cumulative)."""
+    return sum(i.cumulative_us for i in imports if i.depth == 0) / 1000
+
+
+def profile(code, python=sys.executable):
+    result = subprocess.run([python, "-X", "importtime", "-c", code], cwd=ROOT, capture_output=True,
+                            text=True, env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"))
+    if result.returncode != 0:
+        raise RuntimeError(f"{code!r} failed:\n{result.stderr[-2000:]}")
+    return result.stderr
+
+
+def check(scenario, imports, budget_ms=BUDGET_MS):
+    """Problems with one run as strings (empty if it is within budget)."""
+    problems = []
+    loaded = {i.module for i in imports}
+    for module in scenario.forbidden:
+        if module in loaded:
+            problems.append(f"{scenario.name}: imports {module}")
+    took = total_ms(imports)
+    if took > budget_ms:
+        problems.append(f"{scenario.name}: {took:.0f} ms > budget {budget_ms:.0f} ms")
+    return problems
+
+
+def report(scenario, imports, top=TOP):
+    lines = [f"== {scenario.name}: {total_ms(imports):.0f} ms, {len(imports)} modules"]
+    heaviest = sorted((i for i in imports if i.depth <= 1), key=lambda i: i.cumulative_us, reverse=True)
+    for i in heaviest[:top]:
+        lines.append(f"  {i.cumulative_us / 1000:>8.1f} ms  {'  ' * i.depth}{i.module}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario; the fastest is kept")
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS, help="env EPIS_STARTUP_BUDGET_MS")
+    parser.add_argument("--raw", metavar="FILE", help="write the fastest runs' importtime output here")
+    args = parser.parse_args(argv)
+
+    problems, raw = [], []
+    for scenario in SCENARIOS:
+        runs = [profile(scenario.code) for _ in range(args.repeat)]
+        stderr = min(runs, key=lambda r: total_ms(parse_importtime(r)))
+        imports = parse_importtime(stderr)
+        print(report(scenario, imports))
+        problems += check(scenario, imports, args.budget_ms)
+        raw.append(stderr)
+    if args.raw:
+        with open(args.raw, "w") as f:
+            f.write("\n".join(raw))
+    for problem in problems:
+        print(f"OVER BUDGET {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
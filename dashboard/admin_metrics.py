@@ -0,0 +1,60 @@
+import os
+
+import streamlit as st
+import pandas as pd
+from db.cache import query_cache
+from db.connection import get_pool, metrics_text
+from db.instrument import query_metrics
+from auth.password_service import password_service
+
+# Comma-separated Users.user_id values allowed to see the metrics panel. Set by the operator:
+# unlike an email address, nobody can pick their own user_id at signup.
+ADMIN_USER_IDS = {int(u) for u in os.getenv("EPIS_ADMIN_USER_IDS", "").split(",") if u.strip()}
+
+
+def is_admin(principal):
+    return bool(principal and principal.user_id in ADMIN_USER_IDS)
+
+
+def admin_metrics_panel(principal):
+    """Query timing, slow queries, pool and cache stats; rendered only for EPIS_ADMIN_USER_IDS."""
+    if not is_admin(principal):
+        return
+    with st.expander("⚙️ Performance (admin)"):
+        rerun = query_metrics.current_rerun()
+        if rerun is not None:
+            st.caption(f"This rerun so far: {rerun.statements} statements, "
+                       f"{rerun.seconds * 1000:.1f} ms in the database, {rerun.rows} rows.")
+        per_rerun = query_metrics.rerun_statements
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Reruns", query_metrics.reruns)
+        c2.metric("Statements / rerun (mean)", f"{per_rerun.total / max(per_rerun.count, 1):.1f}")
+        c3.metric("DB time / rerun p95", f"{query_metrics.rerun_db_time.snapshot()['p95_ms']:.0f} ms")
+
+        st.write("Statements by total time")
+        statements = query_metrics.snapshot()
+        if statements:
+            st.dataframe(pd.DataFrame(statements), use_container_width=True)
+        else:
+            st.info("No statements recorded yet.")
+
+        st.write(f"Slow queries (≥ {query_metrics.slow_ms:.0f} ms)")
+        if query_metrics.slow_log:
+            for entry in list(query_metrics.slow_log)[:20]:
+                st.code(f"{entry['at']}  {entry['ms']} ms\n{entry['statement']}", language="sql")
+                if entry["plan"] is not None:
+                    st.json(entry["plan"], expanded=False)
+        else:
+            st.caption("None.")
+
+        col_pool, col_cache = st.columns(2)
+        col_pool.json(get_pool().stats(), expanded=False)
+        col_cache.json(query_cache.stats(), expanded=False)
+        st.json({"password_service": password_service.stats()}, expanded=False)
+
+        col_dl, col_reset = st.columns(2)
+        col_dl.download_button("Download Prometheus metrics", data=metrics_text(),
+                               file_name="epis_metrics.prom", mime="text/plain")
+        if col_reset.button("Reset query metrics"):
+            query_metrics.reset()
+            st.rerun()
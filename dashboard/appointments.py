@@ -0,0 +1,188 @@
+import streamlit as st
+import pandas as pd
+import mysql.connector
+from datetime import date, datetime, time
+from db.cache import invalidate, patient_tag
+from repositories.appointments import AppointmentRepo
+from repositories.patients import PatientRepo
+from services.appointments import COMPLETED, NO_SHOW, SCHEDULED, WEEKDAYS, InvalidSlot, SlotTaken
+
+# Receptionist booking and the doctor's day list / weekly availability.
+SLOT_CHOICES = [5, 10, 20, 50]
+
+
+def _label(slot, names):
+    return f"{slot.start:%a %d %b %H:%M} - {names.get(slot.doctor_emp_id, slot.doctor_emp_id)} ({slot.minutes} min)"
+
+
+# ----------------- Receptionist -----------------
+def booking_view(conn, doctors, book, key):
+    """Find the next free slots across doctors and book one; ``book`` is a fresh AppointmentBook."""
+    names = {d.doctor_emp_id: f"Dr. {d.name}" for d in doctors}
+    specializations = sorted({d.specialization for d in doctors if d.specialization})
+
+    with st.form(f"{key}_search"):
+        col1, col2 = st.columns(2)
+        with col1:
+            specialization = st.selectbox("Specialization", ["Any"] + specializations)
+            after_day = st.date_input("From Date", value=date.today(), min_value=date.today())
+        with col2:
+            doctor = st.selectbox("Doctor", [None] + [d.doctor_emp_id for d in doctors],
+                                  format_func=lambda d: "Any" if d is None else f"{names[d]} ({d})")
+            count = st.selectbox("Slots to show", SLOT_CHOICES)
+        searched = st.form_submit_button("Find Free Slots")
+
+    if searched:
+        if doctor is not None:
+            candidates = [doctor]
+        elif specialization != "Any":
+            candidates = [d.doctor_emp_id for d in doctors if d.specialization == specialization]
+        else:
+            candidates = None
+        after = max(datetime.combine(after_day, time()), datetime.now())
+        st.session_state[f"{key}_slots"] = book.next_free(count, after, candidates)
+
+    slots = st.session_state.get(f"{key}_slots")
+    if slots is None:
+        return
+    if not slots:
+        st.info("No free slots in the booking horizon for this search.")
+        return
+
+    with st.form(f"{key}_book"):
+        choice = st.selectbox("Free Slot", range(len(slots)), format_func=lambda i: _label(slots[i], names))
+        cid_str = st.text_input("Patient CID")
+        booked = st.form_submit_button("Book Appointment")
+
+    if booked:
+        slot = slots[choice]
+        try:
+            cid = int(cid_str)
+        except ValueError:
+            st.error("CID must be numeric.")
+            return
+        try:
+            if not PatientRepo(conn).exists(cid):
+                st.error("Patient with this CID does not exist.")
+                return
+            booking = AppointmentRepo(conn).book(cid, slot.doctor_emp_id, slot.start, book)
+            conn.commit()
+        except SlotTaken as err:
+            conn.rollback()
+            book.refresh_doctor(conn, slot.doctor_emp_id)
+            st.session_state[f"{key}_slots"] = [s for s in slots if s != slot]
+            st.error(f"{err} Search again for another slot.")
+        except InvalidSlot as err:
+            conn.rollback()
+            st.error(str(err))
+        except mysql.connector.Error as err:
+            conn.rollback()
+            st.error(f"Database Error: {err}")
+        else:
+            book.add(booking)
+            invalidate("Appointment", patient_tag(cid))
+            st.session_state[f"{key}_slots"] = [s for s in slots if s != slot]
+            st.success(f"Appointment {booking.appointment_id} booked: {_label(slot, names)}.")
+
+
+def cancel_view(conn, book, key):
+    """Look up a patient's upcoming appointments and cancel one."""
+    cid_str = st.text_input("Patient CID", key=f"{key}_cid")
+    if not cid_str.strip():
+        return
+    try:
+        cid = int(cid_str)
+    except ValueError:
+        st.error("CID must be numeric.")
+        return
+    upcoming = AppointmentRepo(conn).upcoming_for_patient(cid)
+    if not upcoming:
+        st.info("No upcoming appointments for this patient.")
+        return
+    st.dataframe(pd.DataFrame(upcoming), width='stretch', hide_index=True)
+    labels = {a.appointment_id: f"{a.appointment_id}: {a.date} {a.time} - Dr. {a.doctor_name}" for a in upcoming}
+    appointment_id = st.selectbox("Appointment", list(labels), format_func=labels.get, key=f"{key}_pick")
+    if st.button("Cancel Appointment", key=f"{key}_cancel"):
+        try:
+            booking = AppointmentRepo(conn).cancel(appointment_id)
+            conn.commit()
+        except mysql.connector.Error as err:
+            conn.rollback()
+            st.error(f"Database Error: {err}")
+            return
+        if booking is None:
+            st.warning("That appointment is no longer scheduled.")
+        else:
+            book.remove(booking)
+            invalidate("Appointment", patient_tag(cid))
+            st.success(f"Appointment {appointment_id} cancelled.")
+
+
+# ----------------- Doctor -----------------
+def doctor_day_view(conn, doctor_id, key):
+    """The doctor's appointments for a day, with Completed / No Show buttons for scheduled ones."""
+    day = st.date_input("Appointments On", value=date.today(), key=f"{key}_day")
+    listing = AppointmentRepo(conn).for_doctor(doctor_id, day)
+    if not listing:
+        st.info("No appointments on this day.")
+        return
+    for a in listing:
+        col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
+        col1.write(f"{str(a.time)[:5]}  {a.patient_name} ({a.CID_no})")
+        col2.write(a.status)
+        if a.status != SCHEDULED:
+            continue
+        for col, status in ((col3, COMPLETED), (col4, NO_SHOW)):
+            if col.button(status, key=f"{key}_{status}_{a.appointment_id}"):
+                AppointmentRepo(conn).set_status(a.appointment_id, doctor_id, status)
+                conn.commit()
+                invalidate("Appointment", patient_tag(a.CID_no))
+                st.rerun()
+
+
+def availability_view(conn, doctor_id, book, key):
+    """Edit the doctor's weekly sessions; changes apply from today."""
+    current = AppointmentRepo(conn).availability(doctor_id)
+    sessions = pd.DataFrame(
+        [{"day": WEEKDAYS[s.weekday], "start": _as_time(s.start_time), "end": _as_time(s.end_time),
+          "slot_minutes": s.slot_minutes} for s in current],
+        columns=["day", "start", "end", "slot_minutes"],
+    )
+    with st.form(f"{key}_availability"):
+        edited = st.data_editor(
+            sessions,
+            column_config={
+                "day": st.column_config.SelectboxColumn("Day", options=list(WEEKDAYS), required=True),
+                "start": st.column_config.TimeColumn("Start", required=True, step=300),
+                "end": st.column_config.TimeColumn("End", required=True, step=300),
+                "slot_minutes": st.column_config.NumberColumn("Slot (min)", min_value=5, max_value=240,
+                                                              step=5, default=15, required=True),
+            },
+            num_rows="dynamic",
+            hide_index=True,
+            key=f"{key}_sessions",
+        )
+        saved = st.form_submit_button("Save Availability")
+
+    if saved:
+        rows = [(WEEKDAYS.index(r.day), r.start, r.end, int(r.slot_minutes))
+                for r in edited.dropna().itertuples()]
+        try:
+            AppointmentRepo(conn).set_availability(doctor_id, rows)
+            conn.commit()
+        except InvalidSlot as err:
+            conn.rollback()
+            st.error(str(err))
+        except mysql.connector.Error as err:
+            conn.rollback()
+            st.error(f"Database Error: {err}")
+        else:
+            book.refresh_doctor(conn, doctor_id)
+            invalidate("Doctor_Availability")
+            st.success(f"Saved {len(rows)} weekly session(s).")
+
+
+def _as_time(value):
+    """TIME columns arrive as timedelta; the editor wants ``datetime.time``."""
+    seconds = int(value.total_seconds()) if hasattr(value, "total_seconds") else None
+    return value if seconds is None else time(seconds // 3600, seconds % 3600 // 60)
@@ -1,7 +1,20 @@
 import streamlit as st
 import pandas as pd
 import mysql.connector
-from datetime import datetime, date, timedelta
+from datetime import date, timedelta
+from db.cache import invalidate, patient_tag
+from dashboard.appointments import availability_view, doctor_day_view
+from dashboard.patient_registry import patient_registry_view
+from dashboard.ward_census import ward_census_view
+from repositories.adherence import AdherenceRepo
+from repositories.admissions import AdmissionRepo
+from repositories.lab import LabRepo
+from repositories.patients import PatientRepo
+from repositories.prescriptions import PrescriptionRepo
+from services.appointments import appointment_book
+from services.prescriptions import InvalidOrder, NotAdmitted, OrderItem, order_rows
+from services.ward_census import AlreadyAdmitted, InvalidDischarge
+from dashboard.registry import Dashboard, register, view
 
 # ----------------- Helper Functions -----------------
 def validate_cid(cid_str):
@@ -19,46 +32,43 @@ def validate_cid(cid_str):
 
 
 # ----------------- Doctor Dashboard -----------------
-def doctor_dashboard(conn):
-    # ------------------- HEADER + LOGOUT -------------------
-    col1, col2 = st.columns([6, 1])
-    with col1:
-        st.header("Doctor Panel - Manage Patients")
-    with col2:
-        if st.button("Logout"):
-            for key in ["user", "page", "doctor_id", "patient_admitted", "last_admitted_cid"]:
-                if key in st.session_state:
-                    del st.session_state[key]
-            st.session_state["page"] = "login_page"
-            st.success("You have been logged out.")
-            st.rerun()
-
-    # ---------------- SESSION STATE ----------------
-    if "patient_admitted" not in st.session_state:
-        st.session_state.patient_admitted = False
-    if "last_admitted_cid" not in st.session_state:
-        st.session_state.last_admitted_cid = ""
-
+# Identity comes from the login session, not from re-typed employee IDs.
+def registry_section(conn, principal, data):
     # --- Collapsible section to view registered patients ---
     with st.expander("View Registered Patients"):
         try:
-            with conn.cursor(dictionary=True) as cur:
-                cur.execute("SELECT * FROM Patient")
-                patients = cur.fetchall()
-            if patients:
-                df_patients = pd.DataFrame(patients)
-                st.dataframe(df_patients)
-            else:
-                st.info("No patients registered yet.")
+            patient_registry_view(conn, key="doctor_registry")
         except mysql.connector.Error as e:
             st.error(f"Database Error: {e}")
 
+
+def appointments_section(conn, principal, data):
+    # --- Today's appointments and weekly availability ---
+    st.subheader("My Appointments")
+    try:
+        doctor_day_view(conn, principal.linked_emp_id, key="doctor_day")
+        with st.expander("My Weekly Availability"):
+            availability_view(conn, principal.linked_emp_id, appointment_book, key="doctor_avail")
+    except mysql.connector.Error as e:
+        st.error(f"Database Error: {e}")
+
+
+def admit_section(conn, principal, data):
+    doctor_id = principal.linked_emp_id
+    if "patient_admitted" not in st.session_state:
+        st.session_state.patient_admitted = False
+    if "last_admitted_cid" not in st.session_state:
+        st.session_state.last_admitted_cid = ""
+
     # --- Admit Patient Form ---
     st.subheader("Admit Patient to Ward")
+    if st.session_state.patient_admitted:
+        # Shown after the rerun that follows an admit, once the admitted list includes the patient.
+        st.success(f"Patient {st.session_state.last_admitted_cid} admitted to ward successfully.")
+        st.session_state.patient_admitted = False
     with st.form("admit_form"):
         cid_admit_str = st.text_input("Enter Patient CID to Admit")
         ward_no = st.text_input("Ward Number")
-        doctor_id_admit = st.text_input("Your Doctor Employee ID")
         nurse_id = st.text_input("Assign Nurse Employee ID")
         submitted_admit = st.form_submit_button("Admit Patient")
 
@@ -68,109 +78,219 @@ def doctor_dashboard(conn):
             st.error("Provide valid patient CID and ward number.")
         else:
             try:
-                with conn.cursor(dictionary=True) as cur:
-                    cur.execute("SELECT CID_no FROM Patient WHERE CID_no = %s", (cid_admit,))
-                    patient = cur.fetchone()
-                if not patient:
+                if not PatientRepo(conn).exists(cid_admit):
                     st.error("Patient with this CID does not exist.")
                 else:
-                    with conn.cursor() as cur_insert:
-                        cur_insert.execute("""
-                            INSERT INTO Admission_to_Ward 
-                            (admit_date, ward_no, status, CID_no, doctor_emp_id, nurse_emp_id)
-                            VALUES (%s, %s, 'Admitted', %s, %s, %s)
-                        """, (date.today(), ward_no, cid_admit, doctor_id_admit or None, nurse_id or None))
-                        conn.commit()
-                    st.success("Patient admitted to ward successfully.")
+                    AdmissionRepo(conn).admit(cid_admit, ward_no, doctor_id, nurse_id or None)
+                    conn.commit()
+                    invalidate("Admission_to_Ward", "Ward_Occupancy", "Medication_Schedule", patient_tag(cid_admit))
                     st.session_state.patient_admitted = True
                     st.session_state.last_admitted_cid = cid_admit
+                    # The views below were handed the admitted list loaded before this admit.
+                    st.rerun()
+            except AlreadyAdmitted as err:
+                conn.rollback()
+                st.error(str(err))
             except mysql.connector.Error as err:
                 st.error(f"Database Error: {err}")
                 conn.rollback()
 
+
+def prescription_section(conn, principal, data):
+    doctor_id = principal.linked_emp_id
     # --- Prescription Form (simplified) ---
     st.subheader("Upload Prescription for Admitted Patient")
-    with conn.cursor(dictionary=True) as cur:
-        cur.execute("SELECT CID_no, ward_no, nurse_emp_id FROM Admission_to_Ward WHERE status='Admitted'")
-        admitted_patients = cur.fetchall()
+    admitted_patients = data["admitted"]
 
     if admitted_patients:
-        with st.form("prescription_form"):
-            patient_cid_pres = st.selectbox(
-                "Select Admitted Patient",
-                options=[p["CID_no"] for p in admitted_patients],
-                format_func=lambda x: f"{x} - Ward {next(p['ward_no'] for p in admitted_patients if p['CID_no']==x)}"
-            )
+        wards = {p.CID_no: p.ward_no for p in admitted_patients}
+        patient_cid_pres = st.selectbox(
+            "Select Admitted Patient",
+            options=list(wards),
+            format_func=lambda x: f"{x} - Ward {wards[x]}"
+        )
+        # Lines collect here and are written together as one order, for one patient:
+        # picking another patient starts a fresh order rather than carrying lines over.
+        if st.session_state.get("rx_order_cid") != patient_cid_pres:
+            if st.session_state.get("rx_order"):
+                st.info("Patient changed: the order in progress was cleared.")
+            st.session_state.rx_order = []
+            st.session_state.rx_order_cid = patient_cid_pres
+        order = st.session_state.rx_order
+
+        with st.form("prescription_form", clear_on_submit=True):
             prescription_name = st.text_input("Medicine Name")
             dosage = st.text_input("Dosage (e.g., 500mg)")
             frequency = st.multiselect("Select Medication Timing", ["Morning", "Afternoon", "Evening"])
             start_date = st.date_input("Start Date", min_value=date.today())
             end_date = st.date_input("End Date", min_value=start_date)
-            doctor_id = st.text_input("Your Doctor Employee ID")
-            submitted_pres = st.form_submit_button("Upload Prescription")
+            added = st.form_submit_button("Add Medicine to Order")
 
-        if submitted_pres:
-            if not prescription_name.strip() or not doctor_id.strip() or not frequency:
-                st.error("Provide Medicine Name, Doctor ID, and select at least one timing.")
+        if added:
+            item = OrderItem(prescription_name, dosage, start_date, end_date, tuple(frequency))
+            try:
+                order_rows([item])
+            except InvalidOrder as err:
+                st.error(str(err))
             else:
+                order.append(item)
+
+        if order:
+            st.dataframe(pd.DataFrame(
+                [{**i._asdict(), "frequencies": ", ".join(i.frequencies)} for i in order]
+            ), use_container_width=True)
+            col_place, col_clear = st.columns(2)
+            if col_clear.button("Clear Order"):
+                st.session_state.rx_order = []
+                st.rerun()
+            if col_place.button(f"Upload Prescription ({len(order)} medicine(s))"):
+                if st.session_state.rx_order_cid != patient_cid_pres:
+                    st.error("This order was started for another patient. Clear it and start again.")
+                    return
                 try:
-                    with conn.cursor(dictionary=True) as cur:
-                        cur.execute("""
-                            SELECT admission_id, nurse_emp_id 
-                            FROM Admission_to_Ward 
-                            WHERE CID_no=%s AND status='Admitted'
-                        """, (patient_cid_pres,))
-                        admission = cur.fetchone()
-
-                    if not admission:
-                        st.error("Patient not admitted. Admit patient first.")
-                    else:
-                        with conn.cursor() as cur_insert:
-                            for freq in frequency:
-                                normalized_freq = freq.strip().capitalize()
-                                cur_insert.execute("""
-                                    INSERT INTO Prescription
-                                    (name, dosage, start_date, end_date, frequency, doctor_emp_id, CID_no)
-                                    VALUES (%s,%s,%s,%s,%s,%s,%s)
-                                """, (
-                                    prescription_name, dosage, start_date, end_date,
-                                    normalized_freq, doctor_id, patient_cid_pres
-                                ))
-                            conn.commit()
-                        st.success("Prescription uploaded successfully for all selected timings.")
+                    result = PrescriptionRepo(conn).place_order(patient_cid_pres, doctor_id, order)
+                    conn.commit()
+                except NotAdmitted:
+                    conn.rollback()
+                    st.error("Patient not admitted. Admit patient first.")
+                except InvalidOrder as err:
+                    conn.rollback()
+                    st.error(str(err))
                 except mysql.connector.Error as err:
                     st.error(f"Database Error: {err}")
                     conn.rollback()
+                else:
+                    invalidate("Prescription", "Medication_Schedule", patient_tag(patient_cid_pres))
+                    st.session_state.rx_order = []
+                    st.success(f"Prescription uploaded: {len(result.prescription_ids)} entries, "
+                               f"{result.doses} scheduled doses.")
     else:
         st.info("No patients currently admitted to the ward.")
 
+
+def discharge_section(conn, principal, data):
+    # --- Discharge Patient ---
+    st.subheader("Discharge Patient")
+    admitted_patients = data["admitted"]
+    if not admitted_patients:
+        st.info("No patients currently admitted to the ward.")
+        return
+
+    wards = {p.CID_no: p.ward_no for p in admitted_patients}
+    with st.form("discharge_form"):
+        cid_discharge = st.selectbox(
+            "Select Admitted Patient",
+            options=list(wards),
+            format_func=lambda x: f"{x} - Ward {wards[x]}"
+        )
+        discharge_date = st.date_input("Discharge Date", value=date.today(), max_value=date.today())
+        submitted_discharge = st.form_submit_button("Discharge Patient")
+
+    if submitted_discharge:
+        repo = AdmissionRepo(conn)
+        try:
+            admission = repo.active_for_patient(cid_discharge)
+            if admission is None:
+                raise NotAdmitted(f"Patient {cid_discharge} is not admitted.")
+            repo.discharge(admission.admission_id, discharge_date)
+            conn.commit()
+        except (NotAdmitted, InvalidDischarge) as err:
+            conn.rollback()
+            st.error(str(err))
+        except mysql.connector.Error as err:
+            st.error(f"Database Error: {err}")
+            conn.rollback()
+        else:
+            invalidate("Admission_to_Ward", "Ward_Occupancy", "Medication_Schedule", patient_tag(cid_discharge))
+            st.success(f"Patient {cid_discharge} discharged from ward {wards[cid_discharge]}.")
+
+
+def census_section(conn, principal, data):
+    with st.expander("Ward Census"):
+        try:
+            ward_census_view(conn, data["occupancy"], key="doctor_census")
+        except mysql.connector.Error as e:
+            st.error(f"Database Error: {e}")
+
+
+def adherence_section(conn, principal, data):
+    with st.expander("Medication Adherence (last 7 days)"):
+        try:
+            rows = AdherenceRepo(conn).summary(date.today() - timedelta(days=7))
+        except mysql.connector.Error as e:
+            st.error(f"Database Error: {e}")
+            return
+        if not rows:
+            st.info("No adherence data yet. Run `python -m services.adherence run` nightly.")
+            return
+        summary = pd.DataFrame(rows)
+        # SUM() comes back as Decimal; the counts are whole numbers.
+        counts = ["expected", "given", "skipped", "missed"]
+        summary[counts] = summary[counts].astype("int64")
+        expected = summary["expected"].astype("float64")
+        summary["adherence"] = (100 * summary["given"] / expected.where(expected > 0)).round().astype("Int64")
+        st.dataframe(
+            summary.rename(columns={
+                "CID_no": "Patient ID",
+                "patient_name": "Patient Name",
+                "days": "Days",
+                "expected": "Doses Due",
+                "given": "Given",
+                "skipped": "Skipped",
+                "missed": "Missed",
+                "adherence": "Adherence %",
+            }),
+            hide_index=True,
+            width='stretch',
+        )
+
+
+def lab_order_section(conn, principal, data):
+    doctor_id = principal.linked_emp_id
     # --- Lab Test Form ---
     st.subheader("Order Lab Test for Patient")
     with st.form("lab_order_form"):
         cid_lab_str = st.text_input("Enter Patient CID")  
         test_name = st.text_input("Lab Test Name (e.g., Blood Test, X-Ray)")
-        doctor_id_lab = st.text_input("Your Doctor Employee ID")
         submitted_lab = st.form_submit_button("Order Lab Test")
 
     if submitted_lab:
         cid_lab = validate_cid(cid_lab_str)  
-        if not cid_lab or not test_name.strip() or not doctor_id_lab.strip():
-            st.error("Provide valid CID, test name, and doctor ID.")
+        if not cid_lab or not test_name.strip():
+            st.error("Provide valid CID and test name.")
         else:
             try:
-                with conn.cursor(dictionary=True) as cur:
-                    cur.execute("SELECT CID_no FROM Patient WHERE CID_no=%s", (cid_lab,))
-                    patient = cur.fetchone()
-                if not patient:
+                if not PatientRepo(conn).exists(cid_lab):
                     st.error("Patient with this CID does not exist.")
                 else:
-                    with conn.cursor() as cur:
-                        cur.execute("""
-                            INSERT INTO Lab_Test (test_name, date_ordered, CID_no, doctor_emp_id)
-                            VALUES (%s,%s,%s,%s)
-                        """, (test_name, date.today(), cid_lab, doctor_id_lab))
-                        conn.commit()
+                    LabRepo(conn).order(cid_lab, test_name, doctor_id)
+                    conn.commit()
+                    invalidate("Lab_Test", patient_tag(cid_lab))
                     st.success("Lab test ordered successfully.")
             except mysql.connector.Error as err:
                 st.error(f"Database Error: {err}")
                 conn.rollback()
+
+
+register(Dashboard(
+    "doctor",
+    "Doctor Panel - Manage Patients",
+    views=[
+        view(registry_section),
+        view(appointments_section),
+        view(admit_section),
+        view(prescription_section, "admitted"),
+        view(discharge_section, "admitted"),
+        view(lab_order_section),
+        view(census_section, "occupancy"),
+        view(adherence_section),
+    ],
+    loaders={
+        "admitted": lambda conn, principal: AdmissionRepo(conn).admitted(),
+        "occupancy": lambda conn, principal: AdmissionRepo(conn).occupancy(),
+    },
+    identity="linked_emp_id",
+    unlinked="Your account is not linked to a doctor employee ID. Contact the administrator.",
+    caption="Logged in as Dr. {name} (Employee ID {id})",
+    logout_keys=["patient_admitted", "last_admitted_cid", "rx_order", "rx_order_cid"],
+))
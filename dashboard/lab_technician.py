@@ -1,39 +1,64 @@
 import streamlit as st
 import pandas as pd
 import mysql.connector
-import os
-
-
-def lab_technician_dashboard(conn):
-    
-    # ------------------- HEADER + LOGOUT -------------------
-    col1, col2 = st.columns([6, 1])
-    with col1:
-        st.header("Lab Technician Panel")
-    with col2:
-        if st.button("Logout"):
-            for key in ["user", "page", "lab_id"]:
-                if key in st.session_state:
-                    del st.session_state[key]
-            st.session_state["page"] = "login_page"
-            st.success("You have been logged out.")
-            st.rerun()
-
-
-    cur = conn.cursor(dictionary=True)
-    cur.execute("""
-        SELECT lt.test_id, p.name AS patient_name, lt.test_name, lt.date_ordered, d.name AS doctor_name
-        FROM Lab_Test lt
-        JOIN Patient p ON lt.CID_no = p.CID_no
-        LEFT JOIN Doctor d ON lt.doctor_emp_id = d.doctor_emp_id
-        WHERE lt.test_id NOT IN (SELECT test_id FROM Test_Report)
-    """)
-    pending_tests = pd.DataFrame(cur.fetchall())
+from db.cache import invalidate, patient_tag
+from dashboard.registry import Dashboard, register, view
+from repositories.lab import LabRepo
+from services.lab_queue import ClaimError
+
+
+def metrics_section(conn, principal, data):
+    # --- Work Queue ---
+    metrics = data["metrics"]
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Waiting", metrics["ordered"])
+    m2.metric("In progress", metrics["in_progress"])
+    m3.metric("Reported (7 days)", metrics["reported_total"])
+    m4.metric("Turnaround p50", "-" if metrics["turnaround_p50_h"] is None else f"{metrics['turnaround_p50_h']} h")
+
+
+def queue_section(conn, principal, data):
+    technician_id = principal.linked_emp_id
+    lab = LabRepo(conn)
+    pending = pd.DataFrame(data["pending"])
     st.subheader("Pending Lab Tests")
-    st.dataframe(pending_tests)
+    if pending.empty:
+        st.info("No pending lab tests.")
+    else:
+        mine = pending[pending["claimed_by"] == technician_id]
+        if not mine.empty:
+            st.write("Claimed by you:")
+            st.dataframe(mine.drop(columns=["claimed_by"]), use_container_width=True)
+        st.dataframe(pending.drop(columns=["claimed_by"]), use_container_width=True)
+
+    with st.form("claim_form"):
+        claim_id = st.text_input("Test ID to claim or release")
+        c1, c2 = st.columns(2)
+        claim_clicked = c1.form_submit_button("Claim")
+        release_clicked = c2.form_submit_button("Release")
 
+    if (claim_clicked or release_clicked) and claim_id.strip():
+        try:
+            action = lab.claim if claim_clicked else lab.release
+            cid = action(claim_id.strip(), technician_id)
+            conn.commit()
+        except mysql.connector.Error as e:
+            conn.rollback()
+            st.error(f"Database Error: {e}")
+        else:
+            if cid is not None:
+                invalidate("Lab_Test", patient_tag(cid))
+                st.success(f"Test {claim_id} {'claimed' if claim_clicked else 'released'}.")
+                st.rerun()
+            elif claim_clicked:
+                st.warning(f"Test {claim_id} was already claimed or is no longer pending.")
+            else:
+                st.warning(f"Test {claim_id} is not claimed by you.")
+
+
+def upload_section(conn, principal, data):
+    technician_id = principal.linked_emp_id
     # --- Upload Report ---
-    # lab_technician.py snippet
     with st.form("upload_form"):
         test_id = st.text_input("Enter Test ID")
         report_file = st.file_uploader("Upload PDF Report", type=["pdf"])
@@ -45,16 +70,39 @@ def lab_technician_dashboard(conn):
             elif not report_file:
                 st.error("Choose a PDF report file to upload.")
             else:
-                os.makedirs("reports", exist_ok=True)
-                file_path = os.path.join("reports", report_file.name)
-                with open(file_path, "wb") as f:
-                    f.write(report_file.getbuffer())
-
-                cur.execute(
-                    "INSERT INTO Test_Report (file_path, date_uploaded, test_id) VALUES (%s, CURDATE(), %s)",
-                    (file_path, test_id)
-                )
-                conn.commit()
-                st.success("Report uploaded successfully.")
-
-    cur.close()
\ No newline at end of file
+                try:
+                    uploaded = LabRepo(conn).upload_report(test_id.strip(), technician_id, report_file,
+                                                           report_file.name)
+                    conn.commit()
+                except ClaimError as e:
+                    conn.rollback()
+                    st.error(str(e))
+                except mysql.connector.Error as e:
+                    conn.rollback()
+                    st.error(f"Could not save the report: {e}")
+                except OSError as e:
+                    # Report storage failed (disk full, permissions); release the test's row lock.
+                    conn.rollback()
+                    st.error(f"Could not store the report file: {e}")
+                else:
+                    invalidate("Lab_Test", "Test_Report", patient_tag(uploaded.CID_no))
+                    st.success("Report uploaded successfully.")
+
+
+register(Dashboard(
+    "lab_tech",
+    "Lab Technician Panel",
+    views=[
+        view(metrics_section, "metrics"),
+        view(queue_section, "pending"),
+        view(upload_section, "pending"),
+    ],
+    # Independent queries, so they are fetched concurrently before the page renders.
+    loaders={
+        "metrics": lambda conn, principal: LabRepo(conn).metrics(),
+        "pending": lambda conn, principal: LabRepo(conn).pending(),
+    },
+    identity="linked_emp_id",
+    unlinked="Your account is not linked to a lab technician employee ID. Contact the administrator.",
+    caption="Logged in as {name} (Employee ID {id})",
+))
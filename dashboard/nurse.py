@@ -1,46 +1,130 @@
 import streamlit as st
 import pandas as pd
 import mysql.connector
-from datetime import datetime, date
-
-def nurse_dashboard(conn):
-
-    col1, col2 = st.columns([6, 1])
-    with col1:
-        st.header("Nurse Panel - Ward & Medication Management")
-    with col2:
-        if st.button("Logout"):
-            for key in ["user", "page", "nurse_id"]:
-                if key in st.session_state:
-                    del st.session_state[key]
-            st.session_state["page"] = "login_page"
-            st.success("You have been logged out.")
-            st.rerun()
-
-    # NURSE AUTH 
-    nurse_id = st.text_input("Enter Your Nurse Employee ID to View Assigned Patients")
-    if not nurse_id.strip():
-        st.warning("Please enter your Nurse Employee ID to get started.")
-        return
-
+from datetime import date
+from db.cache import invalidate, patient_tag
+from repositories.adherence import AdherenceRepo
+from repositories.admissions import AdmissionRepo
+from repositories.med_admin import MedAdminRepo
+from repositories.prescriptions import PrescriptionRepo
+from services.med_admin import STATUSES, Dose
+from services.med_schedule import SLOTS
+from services.schedule_grid import build_schedule_grid
+from dashboard.registry import Dashboard, register, view
+
+# Identity comes from the login session.
+def ward_section(conn, principal, data):
     # LOAD ASSIGNED PATIENTS 
     st.subheader("Currently Admitted Patients Under Your Care")
-    cur = conn.cursor(dictionary=True)
-    cur.execute("""
-        SELECT a.admission_id, p.CID_no, p.name AS patient_name, 
-               a.ward_no, a.status AS admission_status
-        FROM Admission_to_Ward a
-        JOIN Patient p ON a.CID_no = p.CID_no
-        WHERE a.nurse_emp_id = %s AND a.status = 'Admitted'
-    """, (nurse_id,))
-    admitted_patients = pd.DataFrame(cur.fetchall())
-    cur.close()
+    admitted_patients = pd.DataFrame(data["ward_patients"])
 
     if admitted_patients.empty:
         st.info("No patients currently admitted under your care.")
     else:
         st.dataframe(admitted_patients, width='stretch')
 
+
+def ward_round_section(conn, principal, data):
+    # RECORD A WARD ROUND
+    st.divider()
+    st.subheader("Today's Ward Round")
+    doses = pd.DataFrame(data["todays_doses"])
+
+    if doses.empty:
+        st.info("No doses scheduled on your ward today.")
+        return
+
+    with st.form("ward_round_form"):
+        edited = st.data_editor(
+            doses[["prescription_id", "patient_name", "medication_name", "dosage", "frequency", "status"]],
+            column_config={
+                "prescription_id": None,
+                "patient_name": "Patient Name",
+                "medication_name": "Medication Name",
+                "dosage": "Dosage",
+                "frequency": "Time Slot",
+                "status": st.column_config.SelectboxColumn("Status", options=list(STATUSES), required=True),
+            },
+            disabled=["patient_name", "medication_name", "dosage", "frequency"],
+            hide_index=True,
+            width='stretch',
+        )
+        remarks = st.text_input("Remarks for this round (optional)")
+        submitted_round = st.form_submit_button("Save Ward Round")
+
+    if submitted_round:
+        # Only rows whose status changed are written, all in one transaction.
+        changed = edited[edited["status"] != doses["status"]]
+        if changed.empty:
+            st.info("No status changes to save.")
+            return
+        round_doses = [
+            Dose(int(row.prescription_id), date.today(), row.frequency, row.status, remarks)
+            for row in changed.itertuples()
+        ]
+        try:
+            MedAdminRepo(conn).record_round(principal.linked_emp_id, round_doses)
+            conn.commit()
+        except mysql.connector.Error as e:
+            conn.rollback()
+            st.error(f"Ward round not saved: {e}")
+        else:
+            patients = doses.loc[changed.index, "patient_id"].unique()
+            invalidate("Medicine_Administration", "Medication_Schedule", *map(patient_tag, patients))
+            st.success(f"Saved {len(round_doses)} dose(s) for today's round.")
+
+
+def missed_doses_section(conn, principal, data):
+    # MISSED DOSES FROM THE NIGHTLY ADHERENCE JOB
+    st.divider()
+    st.subheader("Missed Doses")
+    alerts = pd.DataFrame(data["missed_doses"])
+
+    if alerts.empty:
+        st.info("No open missed-dose alerts for your patients.")
+        return
+
+    st.caption("Doses from earlier days with no Given or Skipped record. Record a late dose below, "
+               "or acknowledge the alert once it has been followed up.")
+    with st.form("missed_doses_form"):
+        alerts.insert(0, "acknowledge", False)
+        edited = st.data_editor(
+            alerts[["acknowledge", "alert_id", "dose_date", "slot", "CID_no", "patient_name",
+                    "medication_name", "dosage"]],
+            column_config={
+                "acknowledge": st.column_config.CheckboxColumn("Acknowledge"),
+                "alert_id": None,
+                "dose_date": "Date",
+                "slot": "Time Slot",
+                "CID_no": "Patient ID",
+                "patient_name": "Patient Name",
+                "medication_name": "Medication Name",
+                "dosage": "Dosage",
+            },
+            disabled=["dose_date", "slot", "CID_no", "patient_name", "medication_name", "dosage"],
+            hide_index=True,
+            width='stretch',
+        )
+        submitted = st.form_submit_button("Acknowledge Selected")
+
+    if submitted:
+        chosen = [int(a) for a in edited.loc[edited["acknowledge"], "alert_id"]]
+        if not chosen:
+            st.info("Select the alerts to acknowledge.")
+            return
+        try:
+            closed = AdherenceRepo(conn).acknowledge(chosen, principal.linked_emp_id)
+            conn.commit()
+        except mysql.connector.Error as e:
+            conn.rollback()
+            st.error(f"Alerts not acknowledged: {e}")
+        else:
+            invalidate("Missed_Dose_Alert")
+            st.success(f"Acknowledged {closed} missed dose(s).")
+
+
+def schedule_search_section(conn, principal, data):
+    nurse_id = principal.linked_emp_id
     # SEARCH MEDICATIONS 
     st.divider()
     st.subheader("Search Scheduled Medications")
@@ -50,78 +134,20 @@ def nurse_dashboard(conn):
         with col1:
             search_date = st.date_input("Select Date", value=date.today())
         with col2:
-            patient_name = st.text_input("Search by Patient Name (optional)")
+            patient_name = st.text_input("Patient Name Starts With (optional)")
 
         submitted_search = st.form_submit_button("Search Medications")
 
     if submitted_search:
-        cur = conn.cursor(dictionary=True)
-        query = """
-            SELECT 
-                p.CID_no AS patient_id,
-                p.name AS patient_name,
-                pr.prescription_id,
-                pr.name AS medication_name,
-                pr.dosage,
-                pr.frequency,
-                COALESCE(ma.status, 'Pending') AS status
-            FROM Prescription pr
-            JOIN Patient p ON pr.CID_no = p.CID_no
-            JOIN Admission_to_Ward a ON p.CID_no = a.CID_no
-            LEFT JOIN Medicine_Administration ma 
-                ON ma.prescription_id = pr.prescription_id
-                AND DATE(ma.admin_time) = %s
-            WHERE a.nurse_emp_id = %s
-            AND %s BETWEEN pr.start_date AND pr.end_date
-        """
-
-        params = [search_date, nurse_id, search_date]
-
-        if patient_name.strip():
-            query += " AND p.name LIKE %s"
-            params.append(f"%{patient_name}%")
-
-        query += " ORDER BY p.name ASC, pr.name ASC"
-
-        cur.execute(query, tuple(params))
-        rows = cur.fetchall()
-        cur.close()
+        rows = MedAdminRepo(conn).ward_schedule(nurse_id, search_date, name_prefix=patient_name)
 
         if rows:
             result = pd.DataFrame(rows)
 
             st.success(f"Found {len(result)} medication record(s) for {search_date}.")
 
-            # Create pivot table (one row per prescription)
-            pivoted = (
-                result
-                .pivot_table(
-                    index=["patient_id", "patient_name", "medication_name", "dosage"],
-                    columns="frequency",
-                    values="status",
-                    aggfunc="first"
-                )
-                .reset_index()
-            )
-
-            # Ensure all standard time slots exist as columns
-            for slot in ["Morning", "Afternoon", "Evening"]:
-                if slot not in pivoted.columns:
-                    pivoted[slot] = None  # leave blank if not prescribed
-
-            # Fill 'Pending' only for prescribed frequencies that have no status
-            for _, row in result.iterrows():
-                freq = row["frequency"]
-                mask = (
-                    (pivoted["patient_id"] == row["patient_id"]) &
-                    (pivoted["medication_name"] == row["medication_name"])
-                )
-                pivoted.loc[mask, freq] = (
-                    pivoted.loc[mask, freq].fillna("Pending")
-                )
-
-            # Clean display: replace None/NaN with blank string
-            display_df = pivoted.fillna("")
+            # One row per patient + medication, one column per time slot
+            display_df = build_schedule_grid(result)
 
             st.dataframe(
                 display_df.rename(columns={
@@ -135,7 +161,10 @@ def nurse_dashboard(conn):
         else:
             st.info("No medication records found for the selected filters.")
 
-        # UPDATE MEDICATION STATUS 
+
+def status_update_section(conn, principal, data):
+    nurse_id = principal.linked_emp_id
+    # UPDATE MEDICATION STATUS 
     st.divider()
     st.subheader("Update Medication Status by Time Slot")
 
@@ -148,21 +177,13 @@ def nurse_dashboard(conn):
     if patient_id.strip():
         try:
             cid_val = int(patient_id)
-            cur = conn.cursor(dictionary=True)
-
-            # Fetch all prescriptions for this patient (include frequency to show doctor-prescribed frequency)
-            cur.execute("""
-                SELECT prescription_id, name AS med_name, frequency
-                FROM Prescription
-                WHERE CID_no = %s
-            """, (cid_val,))
-            prescriptions = cur.fetchall()
-            cur.close()
+            # Include frequency to show the doctor-prescribed timing
+            prescriptions = PrescriptionRepo(conn).medications_for_patient(cid_val)
 
             if prescriptions:
                 # Step 3: Selectbox for all medications (include frequency in label to avoid confusion)
                 med_options = {
-                    f"{p['med_name']} ({p['frequency']})": (p['prescription_id'], p['frequency'])
+                    f"{p.med_name} ({p.frequency})": (p.prescription_id, p.frequency)
                     for p in prescriptions
                 }
                 selected_med_label = st.selectbox("Select Medication to Update", list(med_options.keys()))
@@ -176,60 +197,47 @@ def nurse_dashboard(conn):
                     # allow nurse to choose time slot but show the prescribed one in parentheses
                     time_slot = st.selectbox(
                         "Select Time Slot",
-                        ["Morning", "Afternoon", "Evening"],
-                        index=["Morning", "Afternoon", "Evening"].index(prescribed_frequency)
-                        if prescribed_frequency in ["Morning", "Afternoon", "Evening"] else 0
+                        list(SLOTS),
+                        index=SLOTS.index(prescribed_frequency) if prescribed_frequency in SLOTS else 0
                     )
                 with col3:
-                    status = st.selectbox("Status", ["Given", "Pending", "Skipped"])
+                    status = st.selectbox("Status", list(STATUSES))
 
                 # Step 5: Update button
                 if st.button("Update Record"):
                     if selected_prescription_id:
-                        cur = conn.cursor(dictionary=True)
-
-                        # Combine selected date with current time for timestamp to store admin_time
-                        timestamp = datetime.combine(selected_date, datetime.now().time())
-
-                        # Create explicit date bounds (safer than DATE(...) equality)
-                        start_of_day = datetime.combine(selected_date, datetime.min.time())
-                        next_day = start_of_day + pd.Timedelta(days=1)  # using pandas Timedelta for simplicity
-
-                        # Use string formatted date-times for predictable param passing
-                        start_str = start_of_day.strftime("%Y-%m-%d %H:%M:%S")
-                        next_str = next_day.strftime("%Y-%m-%d %H:%M:%S")
-
-                        # Check if record already exists for that prescription + frequency + nurse on that date
-                        cur.execute("""
-                            SELECT admin_id FROM Medicine_Administration
-                            WHERE prescription_id = %s
-                              AND frequency = %s
-                              AND nurse_emp_id = %s
-                              AND admin_time >= %s
-                              AND admin_time < %s
-                        """, (selected_prescription_id, time_slot, nurse_id, start_str, next_str))
-                        existing = cur.fetchone()
-
-                        if existing:
-                            cur.execute("""
-                                UPDATE Medicine_Administration
-                                SET status = %s, remarks = %s, admin_time = %s
-                                WHERE admin_id = %s
-                            """, (status, remarks, timestamp, existing["admin_id"]))
-                            st.success(f" Updated {selected_med_label} for {selected_date} ({time_slot}).")
-                        else:
-                            cur.execute("""
-                                INSERT INTO Medicine_Administration
-                                    (prescription_id, nurse_emp_id, admin_time, status, remarks, frequency)
-                                VALUES (%s, %s, %s, %s, %s, %s)
-                            """, (selected_prescription_id, nurse_id, timestamp, status, remarks, time_slot))
-                            st.success(f" Inserted {selected_med_label} for {selected_date} ({time_slot}).")
-
+                        _, created = MedAdminRepo(conn).record(
+                            selected_prescription_id, nurse_id, selected_date, time_slot, status, remarks
+                        )
                         conn.commit()
-                        cur.close()
+                        invalidate("Medicine_Administration", "Medication_Schedule", patient_tag(cid_val))
+                        verb = "Inserted" if created else "Updated"
+                        st.success(f" {verb} {selected_med_label} for {selected_date} ({time_slot}).")
             else:
                 st.info("No prescriptions found for this patient.")
         except ValueError:
             st.error("Patient ID (CID) should be numeric. Remove spaces/letters.")
         except Exception as e:
             st.error(f"An error occurred: {e}")
+
+
+register(Dashboard(
+    "nurse",
+    "Nurse Panel - Ward & Medication Management",
+    views=[
+        view(ward_section, "ward_patients"),
+        view(ward_round_section, "todays_doses"),
+        view(missed_doses_section, "missed_doses"),
+        view(schedule_search_section),
+        view(status_update_section),
+    ],
+    loaders={
+        "ward_patients": lambda conn, principal: AdmissionRepo(conn).for_nurse(principal.linked_emp_id),
+        "todays_doses": lambda conn, principal: MedAdminRepo(conn).ward_schedule(principal.linked_emp_id,
+                                                                                 date.today()),
+        "missed_doses": lambda conn, principal: AdherenceRepo(conn).open_alerts(principal.linked_emp_id),
+    },
+    identity="linked_emp_id",
+    unlinked="Your account is not linked to a nurse employee ID. Contact the administrator.",
+    caption="Logged in as {name} (Employee ID {id})",
+))
@@ -1,97 +1,74 @@
 import streamlit as st
-import pandas as pd
 import mysql.connector
-import os
+from dashboard.registry import Dashboard, register, view
+from repositories.lab import LabRepo
+from repositories.patients import PatientRepo
+from services.patient_timeline import timeline_frame
+from services.report_storage import download_name, open_report, report_available
 
-def patient_dashboard(conn):
-    # HEADER + LOGOUT 
-    col1, col2 = st.columns([6, 1])
-    with col1:
-        st.header("Patient Panel - View Reports & Prescriptions")
-    with col2:
-        if st.button("Logout"):
-            for key in ["user", "page", "cid", "prescriptions", "reports"]:
-                if key in st.session_state:
-                    del st.session_state[key]
-            st.session_state["page"] = "login_page"  # Redirect to login
-            st.success("You have been logged out.")
-            st.rerun()  #  Refresh to apply logout immediately
 
-    # Preserve CID in session state 
-    if 'cid' not in st.session_state:
-        st.session_state.cid = ""
-    cid_input = st.text_input("Enter your CID to view your records", value=st.session_state.cid)
-    
+# CID comes from the login session
+def records_section(conn, principal, data):
+    cid = principal.linked_cid
     if st.button("Fetch My Data"):
-        st.session_state.cid = cid_input  # Save CID to session state
+        # One round trip for the newest page of every record kind.
+        page = PatientRepo(conn).timeline(cid)
+        st.session_state.timeline = list(page.events)
+        st.session_state.timeline_cursor = page.next_cursor
 
-        cur = conn.cursor(dictionary=True)
+    if 'timeline' not in st.session_state:
+        return
+    events = st.session_state.timeline
+    if not events:
+        st.info("No records found for this CID.")
+        return
 
-        # PRESCRIPTIONS 
-        cur.execute("""
-            SELECT 
-                prescription_id, 
-                name AS medicine, 
-                dosage, 
-                start_date, 
-                end_date, 
-                frequency, 
-                doctor_emp_id
-            FROM Prescription 
-            WHERE CID_no = %s
-        """, (st.session_state.cid,))
-        prescriptions = pd.DataFrame(cur.fetchall())
-        st.session_state.prescriptions = prescriptions  # Save to session state
+    # Display HEALTH RECORD
+    st.subheader("My Health Record")
+    st.dataframe(timeline_frame(events), width='stretch', hide_index=True)
+    if st.session_state.timeline_cursor is not None and st.button("Load Older Records"):
+        page = PatientRepo(conn).timeline(cid, st.session_state.timeline_cursor)
+        st.session_state.timeline = events + list(page.events)
+        st.session_state.timeline_cursor = page.next_cursor
+        st.rerun()
 
-        # LAB REPORTS 
-        cur.execute("""
-            SELECT 
-                tr.report_id, 
-                tr.file_path, 
-                tr.date_uploaded, 
-                lt.test_name
-            FROM Test_Report tr
-            JOIN Lab_Test lt ON tr.test_id = lt.test_id
-            WHERE lt.CID_no = %s
-            ORDER BY tr.date_uploaded DESC
-        """, (st.session_state.cid,))
-        reports = pd.DataFrame(cur.fetchall())
-        st.session_state.reports = reports  # Save to session state
-
-        cur.close()
-
-    # Display PRESCRIPTIONS 
-    if 'prescriptions' in st.session_state and not st.session_state.prescriptions.empty:
-        st.subheader("Prescriptions")
-        prescriptions_grouped = (
-            st.session_state.prescriptions.groupby(
-                ["medicine", "dosage", "start_date", "end_date", "doctor_emp_id"],
-                as_index=False
-            )
-            .agg({"frequency": lambda x: ", ".join(sorted(set(x)))})
-        )
-        st.dataframe(prescriptions_grouped, use_container_width=True)
-    elif 'prescriptions' in st.session_state:
-        st.info("No prescriptions found for this CID.")
-
-    # Display LAB REPORTS 
-    if 'reports' in st.session_state and not st.session_state.reports.empty:
+    # Display LAB REPORTS
+    reported = [e for e in events if e.report_id is not None]
+    if reported:
         st.subheader("Test Reports")
-        st.write("All available reports:")
-        for idx, row in st.session_state.reports.iterrows():
+        # Files are only read for the report the patient asks for, not on every rerun.
+        for event in reported:
             col1, col2, col3 = st.columns([3, 2, 2])
-            col1.write(row['test_name'])
-            col2.write(str(row['date_uploaded']))
-            
-            file_path = row['file_path']
-            if os.path.exists(file_path):
-                with open(file_path, "rb") as f:
+            col1.write(event.title)
+            col2.write(str(event.until or event.at))
+
+            ready_key = f"report_ready_{event.report_id}"
+            if not st.session_state.get(ready_key):
+                if col3.button("Prepare download", key=f"prepare_{event.report_id}"):
+                    st.session_state[ready_key] = True
+                    st.rerun()
+                continue
+            row = LabRepo(conn).report(event.report_id, cid)
+            report = None if row is None else row._asdict()
+            if report is not None and report_available(report):
+                with open_report(report) as f:
                     col3.download_button(
                         label="Download",
                         data=f,
-                        file_name=os.path.basename(file_path)
+                        file_name=download_name(report),
+                        mime="application/pdf",
+                        key=f"download_{event.report_id}",
                     )
             else:
                 col3.write("File missing")
-    elif 'reports' in st.session_state:
-        st.info("No reports found for this CID.")
+
+
+register(Dashboard(
+    "patient",
+    "Patient Panel - View Reports & Prescriptions",
+    views=[view(records_section)],
+    identity="linked_cid",
+    unlinked="Your account is not linked to a patient CID. Contact the reception desk.",
+    caption="Logged in as {name} (CID {id})",
+    logout_keys=["timeline", "timeline_cursor"],
+))
@@ -0,0 +1,121 @@
+import streamlit as st
+import pandas as pd
+from db.cache import cached_query
+from db.sql import escape_like
+from services.patient_rules import CID_DIGITS, DZONGKHAGS, GENDERS, PATIENT_COLUMNS
+
+# Shared by the doctor and receptionist "View Registered Patients" expanders.
+PAGE_SIZE = 25
+COUNT_CAP = 10000  # filtered counts stop here and are shown as "10000+"
+
+
+# ----------------- Query Helpers -----------------
+def cid_prefix_range(prefix):
+    """Turn a CID prefix into an inclusive (low, high) range so the PK index can be used."""
+    prefix = prefix.strip()
+    if not prefix.isdigit() or len(prefix) > CID_DIGITS:
+        raise ValueError("CID prefix must be 1 to 11 digits.")
+    scale = 10 ** (CID_DIGITS - len(prefix))
+    low = int(prefix) * scale
+    return low, low + scale - 1
+
+
+def build_filters(name="", cid_prefix="", dzongkhag=None, gender=None):
+    """Return (where_clauses, params) for the registry search; every predicate is sargable."""
+    clauses, params = [], []
+    if cid_prefix.strip():
+        low, high = cid_prefix_range(cid_prefix)
+        clauses.append("CID_no BETWEEN %s AND %s")
+        params += [low, high]
+    if name.strip():
+        clauses.append("name LIKE %s")
+        params.append(escape_like(name.strip()) + "%")
+    if dzongkhag:
+        clauses.append("address = %s")
+        params.append(dzongkhag)
+    if gender:
+        clauses.append("gender = %s")
+        params.append(gender)
+    return clauses, params
+
+
+def page_query(filters, after_cid=None, limit=PAGE_SIZE, columns=PATIENT_COLUMNS):
+    """``(sql, params)`` for one keyset page, fetching one extra row to tell if there is a next page."""
+    clauses, params = list(filters[0]), list(filters[1])
+    if after_cid is not None:
+        clauses.append("CID_no > %s")
+        params.append(after_cid)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    return f"SELECT {', '.join(columns)} FROM Patient{where} ORDER BY CID_no LIMIT %s", params + [limit + 1]
+
+
+def fetch_patient_page(conn, filters, after_cid=None, limit=PAGE_SIZE, columns=PATIENT_COLUMNS):
+    """Keyset page ordered by CID_no; returns (rows, has_next)."""
+    sql, params = page_query(filters, after_cid, limit, columns)
+    rows = cached_query(conn, sql, params, tables=("Patient",))
+    return rows[:limit], len(rows) > limit
+
+
+def estimate_patient_count(conn, filters):
+    """Return (count, exact). Unfiltered counts come from table statistics, filtered ones are capped."""
+    clauses, params = filters
+    if not clauses:
+        rows = cached_query(conn, """
+            SELECT TABLE_ROWS AS n FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'Patient'
+        """, tables=("Patient",))
+        return (int(rows[0]["n"] or 0) if rows else 0), False
+    rows = cached_query(
+        conn,
+        f"SELECT COUNT(*) AS n FROM (SELECT 1 FROM Patient WHERE {' AND '.join(clauses)} LIMIT %s) t",
+        list(params) + [COUNT_CAP + 1],
+        tables=("Patient",)
+    )
+    n = int(rows[0]["n"])
+    return min(n, COUNT_CAP), n <= COUNT_CAP
+
+
+# ----------------- Streamlit Component -----------------
+def patient_registry_view(conn, key, columns=PATIENT_COLUMNS):
+    """Searchable, paginated patient list. ``key`` namespaces the widget state per dashboard."""
+    col1, col2, col3, col4 = st.columns(4)
+    name = col1.text_input("Name starts with", key=f"{key}_name")
+    cid_prefix = col2.text_input("CID starts with", key=f"{key}_cid_prefix")
+    dzongkhag = col3.selectbox("Dzongkhag", ["All"] + DZONGKHAGS, key=f"{key}_dzongkhag")
+    gender = col4.selectbox("Gender", ["All"] + GENDERS, key=f"{key}_gender")
+
+    try:
+        filters = build_filters(
+            name, cid_prefix,
+            None if dzongkhag == "All" else dzongkhag,
+            None if gender == "All" else gender
+        )
+    except ValueError as e:
+        st.error(str(e))
+        return
+
+    # Page cursors: the CID each visited page started after. Reset whenever the search changes.
+    signature = (name, cid_prefix, dzongkhag, gender)
+    if st.session_state.get(f"{key}_signature") != signature:
+        st.session_state[f"{key}_signature"] = signature
+        st.session_state[f"{key}_cursors"] = [None]
+    cursors = st.session_state[f"{key}_cursors"]
+
+    rows, has_next = fetch_patient_page(conn, filters, cursors[-1], columns=columns)
+    if not rows:
+        st.info("No patients registered yet." if not filters[0] else "No patients match this search.")
+        return
+
+    total, exact = estimate_patient_count(conn, filters)
+    st.dataframe(pd.DataFrame(rows))
+    shown_to = (len(cursors) - 1) * PAGE_SIZE + len(rows)
+    total_label = f"{total}" if exact else (f"{COUNT_CAP}+" if filters[0] else f"~{total}")
+    st.caption(f"Page {len(cursors)} · patients {shown_to - len(rows) + 1}–{shown_to} of {total_label}")
+
+    prev_col, next_col = st.columns(2)
+    if prev_col.button("◀ Previous", key=f"{key}_prev", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    if next_col.button("Next ▶", key=f"{key}_next", disabled=not has_next):
+        cursors.append(rows[-1]["CID_no"])
+        st.rerun()
@@ -0,0 +1,212 @@
+import streamlit as st
+import pandas as pd
+import mysql.connector
+from datetime import date, timedelta
+from db.cache import invalidate
+from repositories.patients import PatientRepo
+from repositories.pharmacy import PharmacyRepo
+from services.pharmacy import (
+    EXPIRY_WARNING_DAYS, FORECAST_DAYS, DispenseItem, InsufficientStock, InvalidStockMovement
+)
+from dashboard.registry import Dashboard, register, view
+
+
+# Identity comes from the login session.
+def watchlist_section(conn, principal, data):
+    # --- Low stock and expiry watchlist ---
+    low, expiring = pd.DataFrame(data["low_stock"]), pd.DataFrame(data["expiring"])
+    expired = expiring[expiring["expiry_date"] < date.today()] if not expiring.empty else expiring
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Medicines at reorder level", len(low))
+    m2.metric(f"Batches expiring in {EXPIRY_WARNING_DAYS} days", len(expiring) - len(expired))
+    m3.metric("Expired batches in stock", len(expired))
+
+    st.subheader("Low Stock")
+    if low.empty:
+        st.info("No medicine is at or below its reorder level.")
+    else:
+        st.dataframe(low.rename(columns={
+            "medicine_name": "Medicine", "on_hand": "On Hand", "reorder_level": "Reorder Level",
+        }), hide_index=True, width='stretch')
+
+    st.subheader("Expiring Batches")
+    if expiring.empty:
+        st.info(f"No batch in stock expires within {EXPIRY_WARNING_DAYS} days.")
+        return
+    st.dataframe(expiring.drop(columns=["batch_id"]).rename(columns={
+        "medicine_name": "Medicine", "batch_no": "Batch", "expiry_date": "Expires", "on_hand": "On Hand",
+    }), hide_index=True, width='stretch')
+
+    if not expired.empty and st.button("Write Off Expired Batches"):
+        try:
+            units = PharmacyRepo(conn).write_off_expired(principal.linked_emp_id)
+            conn.commit()
+        except mysql.connector.Error as e:
+            conn.rollback()
+            st.error(f"Database Error: {e}")
+        else:
+            invalidate("Medicine_Stock", "Stock_Batch")
+            st.success(f"Wrote off {units} expired unit(s).")
+            st.rerun()
+
+
+def dispense_section(conn, principal, data):
+    # --- Dispense prescriptions ---
+    st.divider()
+    st.subheader("Dispense Prescriptions")
+    with st.form("pharmacy_lookup"):
+        cid_str = st.text_input("Patient CID")
+        looked_up = st.form_submit_button("Show Prescriptions")
+
+    if looked_up:
+        try:
+            cid = int(cid_str)
+        except ValueError:
+            st.error("CID must be numeric.")
+            return
+        if not PatientRepo(conn).exists(cid):
+            st.error("Patient with this CID does not exist.")
+            return
+        st.session_state["pharmacy_cid"] = cid
+
+    cid = st.session_state.get("pharmacy_cid")
+    if cid is None:
+        return
+    rows = pd.DataFrame(PharmacyRepo(conn).outstanding(cid))
+    if rows.empty:
+        st.info(f"Patient {cid} has no running prescriptions.")
+        return
+
+    rows["left"] = (rows["prescribed"] - rows["dispensed"]).clip(lower=0)
+    rows["quantity"] = rows["left"]
+    with st.form("pharmacy_dispense"):
+        edited = st.data_editor(
+            rows[["prescription_id", "name", "dosage", "frequency", "end_date", "dispensed", "left", "quantity"]],
+            column_config={
+                "prescription_id": None,
+                "name": "Medicine",
+                "dosage": "Dosage",
+                "frequency": "Time Slot",
+                "end_date": "Until",
+                "dispensed": "Dispensed",
+                "left": "Left",
+                "quantity": st.column_config.NumberColumn("Dispense Now", min_value=0, step=1),
+            },
+            disabled=["name", "dosage", "frequency", "end_date", "dispensed", "left"],
+            hide_index=True,
+            width='stretch',
+        )
+        dispensed = st.form_submit_button("Dispense")
+
+    if dispensed:
+        items = [DispenseItem(int(pid), int(qty)) for pid, qty in edited[["prescription_id", "quantity"]]
+                 .itertuples(index=False) if qty and qty > 0]
+        if not items:
+            st.info("Enter a quantity for at least one prescription.")
+            return
+        try:
+            allocations = PharmacyRepo(conn).dispense(principal.linked_emp_id, items)
+            conn.commit()
+        except (InvalidStockMovement, InsufficientStock) as e:
+            conn.rollback()
+            st.error(str(e))
+        except mysql.connector.Error as e:
+            conn.rollback()
+            st.error(f"Database Error: {e}")
+        else:
+            invalidate("Medicine_Stock", "Stock_Batch")
+            st.success(f"Dispensed {sum(a.quantity for a in allocations)} unit(s) "
+                       f"for {len(items)} prescription(s) of patient {cid}.")
+
+
+def receive_section(conn, principal, data):
+    # --- Receive stock ---
+    st.divider()
+    st.subheader("Receive Stock")
+    with st.form("pharmacy_receive"):
+        col1, col2 = st.columns(2)
+        with col1:
+            medicine = st.text_input("Medicine Name")
+            batch_no = st.text_input("Batch Number")
+        with col2:
+            expiry = st.date_input("Expiry Date", value=date.today() + timedelta(days=365),
+                                   min_value=date.today())
+            quantity = st.number_input("Quantity (units)", min_value=1, step=1)
+        reorder = st.number_input("Reorder Level (optional, 0 keeps the current level)", min_value=0, step=1)
+        received = st.form_submit_button("Receive")
+
+    if received:
+        repo = PharmacyRepo(conn)
+        try:
+            balance = repo.receive(principal.linked_emp_id, medicine, batch_no, expiry, int(quantity))
+            if reorder:
+                repo.set_reorder_level(medicine, int(reorder))
+            conn.commit()
+        except InvalidStockMovement as e:
+            conn.rollback()
+            st.error(str(e))
+        except mysql.connector.Error as e:
+            conn.rollback()
+            st.error(f"Database Error: {e}")
+        else:
+            invalidate("Medicine_Stock", "Stock_Batch")
+            st.success(f"Received {int(quantity)} unit(s) of {medicine.strip()}; {balance} now on hand.")
+
+
+def _forecast_table(conn, days):
+    try:
+        frame = PharmacyRepo(conn).forecast(days)
+    except mysql.connector.Error as e:
+        st.error(f"Database Error: {e}")
+        return
+    if frame.empty:
+        st.info("No running prescriptions and no stock to forecast.")
+        return
+    st.caption("Units the running prescriptions call for, one per timing per day.")
+    st.dataframe(frame.reset_index().rename(columns={
+        "medicine_name": "Medicine", "on_hand": "On Hand", "due": "Units Due", "per_day": "Per Day",
+        "days_of_cover": "Days of Cover", "stockout_date": "Runs Out", "shortfall": "Shortfall",
+    }), hide_index=True, width='stretch')
+
+
+def forecast_section(conn, principal, data):
+    # --- Demand forecast and stock history ---
+    with st.expander("Demand Forecast"):
+        with st.form("pharmacy_forecast"):
+            days = st.number_input("Days ahead", min_value=7, max_value=180, value=FORECAST_DAYS, step=7)
+            forecasted = st.form_submit_button("Forecast")
+        if forecasted:
+            _forecast_table(conn, int(days))
+
+    with st.expander("Stock Ledger"):
+        names = [s.medicine_name for s in data["stock"]]
+        if not names:
+            st.info("No stock received yet.")
+            return
+        medicine = st.selectbox("Medicine", names, key="pharmacy_ledger_medicine")
+        entries = PharmacyRepo(conn).ledger(medicine)
+        if entries:
+            st.dataframe(pd.DataFrame(entries).drop(columns=["entry_id"]), hide_index=True, width='stretch')
+        else:
+            st.info(f"No stock movements for {medicine}.")
+
+
+register(Dashboard(
+    "pharmacist",
+    "Pharmacist Panel - Dispensing & Stock",
+    views=[
+        view(watchlist_section, "low_stock", "expiring"),
+        view(dispense_section),
+        view(receive_section),
+        view(forecast_section, "stock"),
+    ],
+    loaders={
+        "low_stock": lambda conn, principal: PharmacyRepo(conn).low_stock(),
+        "expiring": lambda conn, principal: PharmacyRepo(conn).expiring(),
+        "stock": lambda conn, principal: PharmacyRepo(conn).stock(),
+    },
+    identity="linked_emp_id",
+    unlinked="Your account is not linked to a pharmacist employee ID. Contact the administrator.",
+    caption="Logged in as {name} (Employee ID {id})",
+    logout_keys=["pharmacy_cid"],
+))
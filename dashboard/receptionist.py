@@ -2,42 +2,29 @@ import streamlit as st
 import pandas as pd
 import mysql.connector
 import datetime
+import os
+import tempfile
+from db.cache import invalidate
+from dashboard.appointments import booking_view, cancel_view
+from dashboard.patient_registry import patient_registry_view
+from repositories.appointments import AppointmentRepo
+from repositories.patients import PatientRepo
+from services.patient_import import Reject, checkpoint_path, export_patients, import_patients
+from services.patient_rules import DZONGKHAGS, GENDERS, PATIENT_COLUMNS, validate_patient
+from services.appointments import appointment_book
+from services.report_storage import iter_chunks
+from dashboard.registry import Dashboard, register, view
 
-def receptionist_dashboard(conn):
-
-    col1, col2 = st.columns([6, 1])
-    with col1:
-        st.header("Receptionist Panel - Register New Patient")
-    with col2:
-        if st.button("Logout"):
-            for key in ["user", "page", "refresh"]:
-                if key in st.session_state:
-                    del st.session_state[key]
-            st.session_state["page"] = "login_page"
-            st.success("You have been logged out.")
-            st.rerun()
-
-    dzongkhags = [
-        "Thimphu", "Paro", "Punakha", "Wangdue Phodrang", "Bumthang", "Trongsa",
-        "Zhemgang", "Sarpang", "Tsirang", "Dagana", "Chhukha", "Samtse",
-        "Haa", "Mongar", "Trashigang", "Trashiyangtse", "Pemagatshel",
-        "Samdrup Jongkhar", "Lhuentse", "Gasa"
-    ]
-
+def registry_section(conn, principal, data):
     # Collapsible section for viewing registered patients 
     with st.expander("View Registered Patients"):
         try:
-            with conn.cursor(dictionary=True) as cur:
-                cur.execute("SELECT CID_no, name, DOB, gender, contact, address FROM Patient")
-                patients = cur.fetchall()
-            if patients:
-                df_patients = pd.DataFrame(patients)
-                st.dataframe(df_patients)
-            else:
-                st.info("No patients registered yet.")
+            patient_registry_view(conn, key="reception_registry")
         except mysql.connector.Error as e:
             st.error(f"Database Error: {e}")
 
+
+def registration_section(conn, principal, data):
     # --- Registration Form ---
     st.subheader("Register New Patient")
     
@@ -48,11 +35,11 @@ def receptionist_dashboard(conn):
         cid = st.text_input("CID No (11 digits only)")
         name = st.text_input("Full Name")
         dob = st.date_input("Date of Birth", min_value=datetime.date(1900, 1, 1), max_value=datetime.date.today())
-        gender = st.selectbox("Gender", ["Male", "Female", "Other"])
-        contact = st.text_input("Contact Number")
+        gender = st.selectbox("Gender", GENDERS)
+        contact = st.text_input("Contact Number (8 digits)")
 
         # Dzongkhag selection only
-        dzongkhag = st.selectbox("Dzongkhag", ["Select Dzongkhag"] + dzongkhags)
+        dzongkhag = st.selectbox("Dzongkhag", ["Select Dzongkhag"] + DZONGKHAGS)
 
         # Address is just Dzongkhag
         address = ""
@@ -63,33 +50,97 @@ def receptionist_dashboard(conn):
         submitted = st.form_submit_button("💾 Register Patient")
 
         if submitted:
-            # --- Validation ---
-            if not cid.isdigit():
-                st.error("CID must be numeric.")
-            elif len(cid) != 11:
-                st.error(" CID must be exactly 11 digits.")
-            elif not name.strip():
-                st.error(" Name cannot be empty.")
-            elif not contact.isdigit():
-                st.error(" Contact must be numeric.")
-            elif dzongkhag == "-- Select Dzongkhag --":
-                st.error(" Please select a Dzongkhag.")
+            row, errors = validate_patient({
+                "CID_no": cid, "name": name, "DOB": dob, "gender": gender,
+                "contact": contact, "address": address,
+            })
+            if errors:
+                st.error(errors[0])
             else:
                 try:
-                    cur = conn.cursor()
-                    cur.execute(
-                        """
-                        INSERT INTO Patient (CID_no, name, DOB, gender, contact, address)
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                        """,
-                        (cid, name, dob, gender, contact, address)
-                    )
+                    PatientRepo(conn).register(row)
                     conn.commit()
-                    st.success(f"Patient '{name}' from {address} registered successfully.")
+                    invalidate("Patient")
+                    st.success(f"Patient '{row[1]}' from {row[5]} registered successfully.")
                     st.session_state.refresh += 1
                 except mysql.connector.IntegrityError:
+                    conn.rollback()
                     st.error("A patient with this CID already exists.")
                 except Exception as e:
+                    conn.rollback()
                     st.error(f"Database error: {e}")
-                finally:
-                    cur.close()
+
+
+def bulk_section(conn, principal, data):
+    # --- Bulk Import / Export ---
+    with st.expander("Bulk Import / Export"):
+        st.caption("CSV or Parquet with columns " + ", ".join(PATIENT_COLUMNS) +
+                   ". Rows are checked with the same rules as the form above.")
+        upload = st.file_uploader("Patient file", type=["csv", "parquet"], key="bulk_import_file")
+        if upload and st.button("Import Patients"):
+            suffix = os.path.splitext(upload.name)[1].lower()
+            # Stage to disk in chunks; the importer then streams the file back in bounded chunks.
+            with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+                for chunk in iter_chunks(upload):
+                    tmp.write(chunk)
+            progress = st.empty()
+            try:
+                stats = import_patients(conn, tmp.name, resume=False, log=progress.write)
+            except (mysql.connector.Error, ValueError) as e:
+                conn.rollback()
+                st.error(f"Import stopped: {e}")
+            else:
+                st.success(f"Imported {stats.inserted} of {stats.read} rows "
+                           f"({stats.rows_per_sec:,.0f} rows/s).")
+                if stats.rejects:
+                    st.warning(f"{stats.duplicates} duplicate CID(s), {stats.invalid} invalid row(s). "
+                               f"First {len(stats.rejects)} shown.")
+                    st.dataframe(pd.DataFrame(stats.rejects, columns=Reject._fields),
+                                 use_container_width=True)
+            finally:
+                invalidate("Patient")
+                for leftover in (tmp.name, checkpoint_path(tmp.name)):
+                    if os.path.exists(leftover):
+                        os.remove(leftover)
+
+        if st.button("Prepare CSV Export"):
+            with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as tmp:
+                export_path = tmp.name
+            try:
+                stats = export_patients(conn, export_path, log=lambda msg: None)
+                with open(export_path, "rb") as f:
+                    st.download_button("Download patients.csv", data=f, file_name="patients.csv",
+                                       mime="text/csv")
+                st.caption(f"{stats.read} patients ({stats.rows_per_sec:,.0f} rows/s).")
+            except mysql.connector.Error as e:
+                st.error(f"Database Error: {e}")
+            finally:
+                os.remove(export_path)
+
+
+def appointment_section(conn, principal, data):
+    # --- Appointments ---
+    st.subheader("Book Appointment")
+    try:
+        booking_view(conn, data["doctors"], data["appointment_book"], key="reception_appt")
+    except mysql.connector.Error as e:
+        st.error(f"Database Error: {e}")
+    with st.expander("Cancel Appointment"):
+        cancel_view(conn, data["appointment_book"], key="reception_cancel")
+
+
+register(Dashboard(
+    "receptionist",
+    "Receptionist Panel - Register New Patient",
+    views=[
+        view(registry_section),
+        view(registration_section),
+        view(appointment_section, "doctors", "appointment_book"),
+        view(bulk_section),
+    ],
+    loaders={
+        "doctors": lambda conn, principal: AppointmentRepo(conn).doctors(),
+        "appointment_book": lambda conn, principal: appointment_book.ensure_fresh(conn),
+    },
+    logout_keys=["refresh", "reception_appt_slots"],
+))
@@ -0,0 +1,205 @@
+# dashboard/registry.py
+"""Role -> dashboard registry with per-view data dependencies.
+
+A dashboard module builds a ``Dashboard`` from ``View``s and ``register``s it
+when it is imported. ``MODULES`` says which module registers which role, so a
+dashboard (and with it pandas, the repositories and mysql.connector) is only
+imported the first time its role renders.
+
+Each view names the data it needs; ``loaders`` maps those names to
+``loader(conn, principal)`` functions. Before any view renders, ``prefetch``
+runs every needed loader at once: one on the rerun's own connection, the rest
+on a small thread pool, each with a connection borrowed from the pool. When
+the pool has nothing free the remaining loaders run on the rerun's connection
+instead, so prefetching never waits for a connection. Loaders only query;
+all ``st.*`` calls stay in the views, on the script thread.
+"""
+
+import importlib
+import os
+import threading
+from collections import namedtuple
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from db.instrument import RerunStats, query_metrics
+
+PREFETCH_WORKERS = int(os.getenv("EPIS_PREFETCH_WORKERS", "4"))
+
+# role -> module that registers its dashboard
+MODULES = {
+    "doctor": "dashboard.doctor",
+    "patient": "dashboard.patient",
+    "nurse": "dashboard.nurse",
+    "lab_tech": "dashboard.lab_technician",
+    "receptionist": "dashboard.receptionist",
+    "pharmacist": "dashboard.pharmacist",
+}
+
+View = namedtuple("View", "render needs")  # render(conn, principal, data); needs: tuple of loader names
+
+
+def view(render, *needs):
+    return View(render, tuple(needs))
+
+
+class Dashboard:
+    """Header, identity check and views for one role.
+
+    ``identity`` is the Principal attribute the dashboard is keyed by (e.g.
+    ``linked_emp_id``); without it the dashboard shows ``unlinked`` and stops.
+    ``caption`` is formatted with ``name`` and ``id``. ``logout_keys`` are the
+    session_state keys cleared on logout.
+    """
+
+    def __init__(self, role, title, views, loaders=None, identity=None, unlinked="", caption="",
+                 logout_keys=()):
+        self.role = role
+        self.title = title
+        self.views = list(views)
+        self.loaders = dict(loaders or {})
+        self.identity = identity
+        self.unlinked = unlinked
+        self.caption = caption
+        self.logout_keys = list(logout_keys)
+        missing = {n for v in self.views for n in v.needs} - set(self.loaders)
+        if missing:
+            raise ValueError(f"{role} views need unknown data: {', '.join(sorted(missing))}")
+
+    def needs(self):
+        """Loader names used by any view, in first-use order."""
+        return list(dict.fromkeys(n for v in self.views for n in v.needs))
+
+    def render(self, conn, principal):
+        from auth.session import logout
+
+        col1, col2 = st.columns([6, 1])
+        with col1:
+            st.header(self.title)
+        with col2:
+            if st.button("Logout"):
+                logout(self.logout_keys)
+                st.success("You have been logged out.")
+                st.rerun()
+
+        if self.identity:
+            key = getattr(principal, self.identity)
+            if not key:
+                st.error(self.unlinked)
+                return
+            if self.caption:
+                st.caption(self.caption.format(name=principal.display_name, id=key))
+
+        data = prefetch(conn, principal, {n: self.loaders[n] for n in self.needs()})
+        for v in self.views:
+            v.render(conn, principal, data)
+
+
+_DASHBOARDS = {}
+_lock = threading.Lock()
+
+
+def register(dashboard):
+    _DASHBOARDS[dashboard.role] = dashboard
+    return dashboard
+
+
+def get_dashboard(role):
+    """The registered Dashboard for ``role``, importing its module on first use; None if unknown."""
+    if role not in _DASHBOARDS and role in MODULES:
+        importlib.import_module(MODULES[role])
+    return _DASHBOARDS.get(role)
+
+
+# ----------------- Prefetch -----------------
+class Prefetched(Mapping):
+    """Loader results by name; a loader's exception is raised when its result is read."""
+
+    def __init__(self):
+        self._values = {}
+        self._errors = {}
+
+    def set(self, name, value=None, error=None):
+        if error is not None:
+            self._errors[name] = error
+        else:
+            self._values[name] = value
+
+    def __getitem__(self, name):
+        if name in self._errors:
+            raise self._errors[name]
+        return self._values[name]
+
+    def __iter__(self):
+        return iter(list(self._values) + list(self._errors))
+
+    def __len__(self):
+        return len(self._values) + len(self._errors)
+
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(PREFETCH_WORKERS, thread_name_prefix="prefetch")
+    return _executor
+
+
+def _run(data, name, loader, conn, principal):
+    try:
+        data.set(name, loader(conn, principal))
+    except Exception as e:
+        data.set(name, error=e)
+
+
+def _run_borrowed(pool, conn, loader, principal):
+    """Worker: run one loader on a borrowed connection, counting its statements separately."""
+    try:
+        with query_metrics.count_into(RerunStats()) as counted:
+            return loader(conn, principal), counted
+    finally:
+        pool.release(conn)
+
+
+def prefetch(conn, principal, loaders, pool=None, executor=None):
+    """Run ``{name: loader(conn, principal)}`` concurrently; returns ``Prefetched``."""
+    data = Prefetched()
+    names = list(loaders)
+    if len(names) > 1:
+        if pool is None:
+            from db.connection import get_pool
+            pool = get_pool()
+        executor = executor or _get_executor()
+
+    futures, inline = {}, names[:1]
+    for name in names[1:]:
+        borrowed = pool.try_acquire()
+        if borrowed is None:
+            inline.append(name)
+            continue
+        try:
+            futures[name] = executor.submit(_run_borrowed, pool, borrowed, loaders[name], principal)
+        except Exception:
+            pool.release(borrowed)
+            inline.append(name)
+
+    for name in inline:
+        _run(data, name, loaders[name], conn, principal)
+
+    rerun = query_metrics.current_rerun() if futures else None
+    for name, future in futures.items():
+        try:
+            value, counted = future.result()
+        except Exception as e:
+            data.set(name, error=e)
+        else:
+            data.set(name, value)
+            if rerun is not None:
+                rerun.add(counted)
+    return data
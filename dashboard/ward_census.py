@@ -0,0 +1,56 @@
+import streamlit as st
+import pandas as pd
+from datetime import date, timedelta
+from services.ward_census import census, length_of_stay, load_stays, los_histogram, occupancy_series
+
+# Ward occupancy now, the stored daily census, and stay analytics for a chosen range.
+HISTORY_DAYS = 30
+LOS_MAX_DAYS = 30
+
+
+def ward_census_view(conn, occupancy, key):
+    """Render the census; ``occupancy`` is ``AdmissionRepo.occupancy()`` and ``key`` prefixes widget keys."""
+    # --- Current occupancy (live counters) ---
+    if occupancy:
+        current = pd.DataFrame(occupancy).set_index("ward_no")
+        st.metric("Patients currently admitted", int(current["occupied"].sum()))
+        st.bar_chart(current["occupied"])
+    else:
+        st.info("No ward occupancy recorded yet.")
+
+    # --- Daily census snapshots ---
+    today = date.today()
+    history = census(conn, today - timedelta(days=HISTORY_DAYS), today)
+    if history.empty:
+        st.caption("No daily census snapshots yet. Run `python -m services.ward_census snapshot` nightly.")
+    else:
+        st.write(f"End-of-day census, last {HISTORY_DAYS} days")
+        st.line_chart(history.pivot(index="census_date", columns="ward_no", values="occupied"))
+
+    # --- Stay analytics for a date range ---
+    with st.form(f"{key}_range"):
+        col1, col2 = st.columns(2)
+        with col1:
+            start = st.date_input("From", value=today - timedelta(days=365), key=f"{key}_from")
+        with col2:
+            end = st.date_input("To", value=today, max_value=today, key=f"{key}_to")
+        analysed = st.form_submit_button("Analyse Stays")
+
+    if analysed:
+        if end < start:
+            st.error("'To' must not be before 'From'.")
+            return
+        stays = load_stays(conn, start, end)
+        if stays.empty:
+            st.info("No stays in the selected range.")
+            return
+        series = occupancy_series(stays, start, end)
+        st.write("Daily occupancy (all wards)")
+        st.area_chart(series.sum(axis=1).rename("occupied"))
+
+        st.write("Length of stay (days) of patients discharged in the range")
+        st.dataframe(length_of_stay(stays, start, end).round(1), width='stretch')
+        in_range = stays[stays["discharge_date"].between(pd.Timestamp(start), pd.Timestamp(end))]
+        counts = los_histogram(in_range, LOS_MAX_DAYS)
+        st.bar_chart(pd.Series(counts, index=pd.RangeIndex(len(counts), name="days"), name="stays"))
+        st.caption(f"The last bar counts stays of {LOS_MAX_DAYS} days or more.")
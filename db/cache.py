@@ -0,0 +1,126 @@
+# db/cache.py
+"""Process-wide cache for dashboard read queries.
+
+Entries expire after a TTL and are evicted early whenever a write touches one of
+the tables the query read from (see ``invalidate``). The cache is shared by all
+Streamlit sessions in the process, so a write by one user is visible to the next
+rerun of every other user.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_TTL = float(os.getenv("EPIS_QUERY_CACHE_TTL", "60"))
+MAX_ENTRIES = int(os.getenv("EPIS_QUERY_CACHE_MAX_ENTRIES", "512"))
+
+
+class QueryCache:
+    """TTL + LRU cache whose entries are tagged with the tables they depend on."""
+
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=MAX_ENTRIES, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, value, tables)
+        self._by_table = {}            # table -> set(keys)
+        self._generation = {}          # table -> write counter, guards against stale fills
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_or_load(self, key, tables, loader, ttl=None):
+        """Return the cached value for ``key`` or call ``loader()`` and cache its result."""
+        tables = tuple(t.lower() for t in tables)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                self._drop(key)
+            self.misses += 1
+            generations = [self._generation.get(t, 0) for t in tables]
+
+        value = loader()
+
+        with self._lock:
+            # A write landed while we were loading: serve the result but don't keep it.
+            if generations != [self._generation.get(t, 0) for t in tables]:
+                return value
+            self._entries[key] = (now + (self.ttl if ttl is None else ttl), value, tables)
+            self._entries.move_to_end(key)
+            for t in tables:
+                self._by_table.setdefault(t, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        return value
+
+    def invalidate(self, *tables):
+        """Evict every entry that read from any of ``tables``."""
+        with self._lock:
+            for t in tables:
+                t = t.lower()
+                self._generation[t] = self._generation.get(t, 0) + 1
+                for key in self._by_table.pop(t, set()):
+                    if key in self._entries:
+                        self._drop(key)
+                        self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_table.clear()
+
+    def _drop(self, key):
+        _, _, tables = self._entries.pop(key)
+        for t in tables:
+            keys = self._by_table.get(t)
+            if keys is not None:
+                keys.discard(key)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+# ----------------- Shared Instance -----------------
+query_cache = QueryCache()
+
+
+def cached_query(conn, sql, params=(), tables=(), ttl=None):
+    """Run a read query through the shared cache; returns a list of dict rows.
+
+    ``tables`` must list every table the query reads so writes can evict it.
+    Callers must treat the returned rows as read-only.
+    """
+    def load():
+        with conn.cursor(dictionary=True) as cur:
+            cur.execute(sql, params)
+            return cur.fetchall()
+
+    return query_cache.get_or_load((sql, tuple(params)), tables, load, ttl)
+
+
+def invalidate(*tables):
+    """Call after committing a write to any of ``tables``."""
+    query_cache.invalidate(*tables)
+
+
+def patient_tag(cid):
+    """Tag for entries about one patient; writers pass it to ``invalidate`` with the tables."""
+    return f"patient:{cid}"
@@ -1,16 +1,247 @@
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
 import mysql.connector
 import streamlit as st
 
+from db.instrument import MetricsExporter, instrument, prometheus_text, query_metrics
+from db.metrics import LatencyHistogram
+
+# ----------------- Configuration -----------------
+DB_CONFIG = {
+    "host": os.getenv("EPIS_DB_HOST", "localhost"),
+    "port": int(os.getenv("EPIS_DB_PORT", "3306")),
+    "user": os.getenv("EPIS_DB_USER", "root"),
+    "password": os.getenv("EPIS_DB_PASSWORD", "user@123"),
+    "database": os.getenv("EPIS_DB_NAME", "final_epis_db"),
+    "connection_timeout": int(os.getenv("EPIS_DB_CONNECT_TIMEOUT", "5")),
+}
+POOL_SIZE = int(os.getenv("EPIS_DB_POOL_SIZE", "8"))
+CHECKOUT_TIMEOUT = float(os.getenv("EPIS_DB_CHECKOUT_TIMEOUT", "5"))
+# Idle connections older than this are pinged before being handed out again.
+HEALTH_CHECK_INTERVAL = float(os.getenv("EPIS_DB_HEALTH_CHECK_INTERVAL", "30"))
+
+
 def get_connection():
     """Connect to MySQL Database"""
     try:
-        conn = mysql.connector.connect(
-            host="localhost",
-            user="root",
-            password="user@123",
-            database="final_epis_db"
-        )
+        conn = mysql.connector.connect(**DB_CONFIG)
         return conn
     except mysql.connector.Error as e:
         st.error(f"❌ Database connection failed: {e}")
         return None
+
+
+# ----------------- Connection Pool -----------------
+class PoolExhausted(Exception):
+    """Raised when no pooled connection frees up within the checkout timeout."""
+
+
+class ConnectionPool:
+    """Bounded pool of DB connections shared by every Streamlit session in the process.
+
+    ``connect`` is any zero-argument callable returning a DB-API connection, so the
+    pool can be exercised without a MySQL server.
+    """
+
+    def __init__(self, connect, size=POOL_SIZE, checkout_timeout=CHECKOUT_TIMEOUT,
+                 health_check_interval=HEALTH_CHECK_INTERVAL):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1.")
+        self._connect = connect
+        self.size = size
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+
+        self._idle = queue.LifoQueue()  # (conn, last_checkin) - LIFO keeps warm sockets busy
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.in_use = 0
+        self.waiting = 0
+        self.created = 0
+        self.reconnects = 0
+        self.timeouts = 0
+        self.checkout_latency = LatencyHistogram()
+
+    # --- checkout / checkin ---
+    def acquire(self, timeout=None):
+        if self._closed:
+            raise PoolExhausted("Connection pool is closed.")
+        timeout = self.checkout_timeout if timeout is None else timeout
+        start = time.perf_counter()
+
+        with self._lock:
+            self.waiting += 1
+        try:
+            got_slot = self._slots.acquire(timeout=timeout)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        if not got_slot:
+            with self._lock:
+                self.timeouts += 1
+            raise PoolExhausted(f"No database connection available within {timeout:.1f}s.")
+
+        conn = self._hand_out()
+        self.checkout_latency.observe(time.perf_counter() - start)
+        return conn
+
+    def try_acquire(self):
+        """A connection if one is free right now, else None; never waits and is not a timeout."""
+        if self._closed or not self._slots.acquire(blocking=False):
+            return None
+        return self._hand_out()
+
+    def _hand_out(self):
+        try:
+            conn = self._take_healthy()
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.in_use += 1
+        return conn
+
+    def release(self, conn):
+        try:
+            if self._closed or not self._reset(conn):
+                self._close_quietly(conn)
+            else:
+                self._idle.put((conn, time.monotonic()))
+        finally:
+            with self._lock:
+                self.in_use -= 1
+            self._slots.release()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Borrow a connection for the duration of the ``with`` block."""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    # --- health ---
+    def _take_healthy(self):
+        try:
+            conn, last_checkin = self._idle.get_nowait()
+        except queue.Empty:
+            return self._new_connection()
+
+        if time.monotonic() - last_checkin < self.health_check_interval or self._is_alive(conn):
+            return conn
+
+        # Stale socket (server restart, wait_timeout, ...): swap in a fresh one.
+        self._close_quietly(conn)
+        with self._lock:
+            self.reconnects += 1
+        return self._new_connection()
+
+    def _new_connection(self):
+        conn = self._connect()
+        with self._lock:
+            self.created += 1
+        return conn
+
+    @staticmethod
+    def _is_alive(conn):
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _reset(conn):
+        """Roll back anything a rerun left uncommitted; False means drop the connection."""
+        try:
+            if getattr(conn, "in_transaction", True):
+                conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    # --- lifecycle / metrics ---
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close_quietly(conn)
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                "size": self.size,
+                "in_use": self.in_use,
+                "idle": self._idle.qsize(),
+                "waiting": self.waiting,
+                "created": self.created,
+                "reconnects": self.reconnects,
+                "timeouts": self.timeouts,
+            }
+        stats["checkout_latency"] = self.checkout_latency.snapshot()
+        return stats
+
+
+# ----------------- Process-wide Pool -----------------
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(lambda: instrument(mysql.connector.connect(**DB_CONFIG)))
+                exporter.start()
+    return _pool
+
+
+def metrics_text():
+    """Prometheus text: per-statement metrics plus pool and query-cache gauges."""
+    from db.cache import query_cache
+
+    pool, cache = get_pool().stats(), query_cache.stats()
+    extra = {f"epis_db_pool_{k}": pool[k] for k in ("size", "in_use", "idle", "waiting", "created",
+                                                     "reconnects", "timeouts")}
+    extra.update({f"epis_query_cache_{k}": cache[k] for k in ("entries", "hits", "misses", "evictions",
+                                                               "invalidations")})
+    return prometheus_text(query_metrics, extra)
+
+
+exporter = MetricsExporter(metrics_text)
+
+
+@contextmanager
+def checkout(timeout=None):
+    """Borrow a pooled connection for one Streamlit rerun; stops the page if none is available."""
+    pool = get_pool()
+    try:
+        conn = pool.acquire(timeout)
+    except (PoolExhausted, mysql.connector.Error) as e:
+        st.error(f"❌ Database connection failed: {e}")
+        st.stop()
+    try:
+        with query_metrics.rerun():
+            yield conn
+    finally:
+        pool.release(conn)
+        exporter.maybe_dump()
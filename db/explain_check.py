@@ -0,0 +1,147 @@
+# db/explain_check.py
+"""EXPLAIN every query the dashboards run and fail on full table scans.
+
+    python -m db.explain_check            # against an already seeded database
+    python -m db.explain_check --seed 50000
+
+Run it after ``python -m db.migrate up`` on a database seeded with ``db.seed``;
+on a near-empty schema the optimizer prefers scans regardless of indexes.
+"""
+
+import argparse
+import sys
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+from auth.user_model import USER_BY_EMAIL_SQL
+from dashboard.patient_registry import build_filters, page_query
+from repositories import adherence as adherence_repo
+from repositories import admissions, appointments as appointment_repo, lab, pharmacy as pharmacy_repo
+from repositories.patients import PATIENT_EXISTS_SQL
+from repositories.prescriptions import PATIENT_MEDICATIONS_SQL
+from services import adherence, appointments, lab_queue, med_admin, med_schedule, pharmacy, ward_census
+from services.patient_timeline import Cursor, timeline_query
+
+PlanProblem = namedtuple("PlanProblem", "query table key rows")
+
+_CID = 10000000007
+_NURSE = 2001
+_DOCTOR = 1001
+_TODAY = date.today()
+_WEEK_AGO = _TODAY - timedelta(days=7)
+_NINE_AM = datetime.combine(_TODAY, datetime.min.time()) + timedelta(hours=9)
+
+# (label, sql, params) for the reads the dashboards and auth/ issue, and the
+# writes that find their rows by a key. The SQL is the constant or query
+# builder the code itself runs, so the list cannot drift from it; only the
+# sample parameters live here.
+DASHBOARD_QUERIES = [
+    ("login_user", USER_BY_EMAIL_SQL, ("nurse.2001@epis.test", "nurse")),
+    ("registry_first_page", *page_query(build_filters())),
+    ("registry_name_search", *page_query(build_filters(name="Pema"), after_cid=0)),
+    ("registry_dzongkhag_page", *page_query(build_filters(dzongkhag="Paro"), after_cid=_CID)),
+    ("registry_cid_prefix", *page_query(build_filters(cid_prefix="1000"))),
+    ("patient_by_cid", PATIENT_EXISTS_SQL, (_CID,)),
+    ("doctor_admitted_patients", admissions.ADMITTED_SQL, ()),
+    ("doctor_admission_for_cid", admissions.ACTIVE_ADMISSION_SQL, (_CID,)),
+    ("doctor_admit_active_lock", ward_census.ACTIVE_ADMISSION_LOCK_SQL, (_CID,)),
+    ("census_stays_in_range", ward_census.STAYS_SQL, (_TODAY - timedelta(days=90), _TODAY, _TODAY)),
+    ("census_admissions_on_day", *ward_census.counts_on_query("admit_date", _TODAY)),
+    ("census_discharges_on_day", *ward_census.counts_on_query("discharge_date", _TODAY)),
+    ("census_ward_occupancy", admissions.OCCUPANCY_SQL, ()),
+    ("census_daily_range", ward_census.CENSUS_RANGE_SQL, (_TODAY - timedelta(days=30), _TODAY)),
+    ("appointment_bookings_in_horizon", *appointments.bookings_query(_TODAY, _TODAY + timedelta(days=90))),
+    ("appointment_sessions_in_horizon", *appointments.sessions_query(_TODAY, _TODAY + timedelta(days=90))),
+    ("appointment_doctor_overlap", *appointments.overlap_query("doctor_emp_id", _DOCTOR, _NINE_AM, 15)),
+    ("appointment_patient_overlap", *appointments.overlap_query("CID_no", _CID, _NINE_AM, 15)),
+    ("doctor_appointments_on_day", appointment_repo.DOCTOR_DAY_SQL, (_DOCTOR, _TODAY, appointments.CANCELLED)),
+    ("doctor_availability", appointment_repo.AVAILABILITY_SQL, (_DOCTOR, _TODAY, _TODAY)),
+    ("patient_upcoming_appointments", appointment_repo.PATIENT_UPCOMING_SQL,
+     (_CID, _TODAY, appointments.SCHEDULED)),
+    ("nurse_assigned_patients", admissions.NURSE_PATIENTS_SQL, (_NURSE,)),
+    ("nurse_ward_schedule", *med_schedule.ward_schedule_query(_NURSE, _TODAY)),
+    ("nurse_ward_schedule_by_name", *med_schedule.ward_schedule_query(_NURSE, _TODAY, name_prefix="Pe")),
+    ("nurse_prescriptions_for_cid", PATIENT_MEDICATIONS_SQL, (_CID,)),
+    ("nurse_round_admin_ids", *med_admin.round_ids_query([(1, _TODAY, "Morning"), (2, _TODAY, "Evening")])),
+    ("nurse_round_mirror_schedule", *med_admin.mirror_round_query([1, 2])),
+    ("nurse_dose_mirror_schedule", med_schedule.RECORD_STATUS_SQL, ("Given", 1, 1, _TODAY, "Morning")),
+    ("nurse_dose_history", med_admin.HISTORY_SQL, (1, "Morning", _TODAY)),
+    ("nurse_missed_doses", adherence_repo.OPEN_ALERTS_SQL, (_NURSE, adherence.OPEN)),
+    ("doctor_adherence_summary", adherence_repo.SUMMARY_SQL, (_WEEK_AGO,)),
+    ("adherence_scheduled_doses", adherence.SCHEDULED_SQL, (_WEEK_AGO, _TODAY)),
+    ("adherence_records", adherence.RECORDS_SQL, (_WEEK_AGO, _TODAY)),
+    ("patient_timeline_first_page", *timeline_query(_CID)),
+    ("patient_timeline_next_page", *timeline_query(_CID, Cursor(_TODAY - timedelta(days=365), "Lab Test", 1))),
+    ("patient_report", lab.PATIENT_REPORT_SQL, (1, _CID)),
+    ("pharmacy_low_stock", pharmacy_repo.LOW_STOCK_SQL, ()),
+    ("pharmacy_expiring_batches", pharmacy_repo.EXPIRING_SQL,
+     (_TODAY + timedelta(days=pharmacy.EXPIRY_WARNING_DAYS),)),
+    ("pharmacy_outstanding", pharmacy_repo.OUTSTANDING_SQL, (_CID, _TODAY)),
+    ("pharmacy_ledger", pharmacy_repo.LEDGER_SQL, ("Paracetamol", 50)),
+    ("pharmacy_dispense_fefo_batches", *pharmacy.fefo_batches_query(["Amoxicillin", "Paracetamol"], _TODAY)),
+    ("pharmacy_forecast_demand", pharmacy.DEMAND_SQL,
+     (_TODAY, _TODAY + timedelta(days=pharmacy.FORECAST_DAYS - 1))),
+    ("lab_pending_tests", lab_queue.PENDING_TESTS_SQL,
+     (lab_queue.ORDERED, lab_queue.IN_PROGRESS, lab_queue.QUEUE_LIMIT)),
+    ("lab_backlog", lab_queue.BACKLOG_SQL, (lab_queue.ORDERED, lab_queue.IN_PROGRESS)),
+    ("lab_reported_since", lab_queue.REPORTED_SINCE_SQL, (_TODAY,)),
+]
+
+# Scans that are reported but tolerated until the query itself is redesigned.
+KNOWN_FULL_SCANS = set()
+
+# Lookup tables that only ever hold a handful of rows.
+SMALL_TABLES = {"doctor", "nurse", "lab_technician", "pharmacist", "receptionist", "ward_occupancy",
+                "doctor_availability", "batch_checkpoint", "medicine_stock"}
+
+
+def explain(conn, sql, params):
+    with conn.cursor(dictionary=True) as cur:
+        cur.execute("EXPLAIN " + sql, params)
+        return cur.fetchall()
+
+
+def find_full_scans(conn, queries=DASHBOARD_QUERIES):
+    """Return a PlanProblem for every plan row with access type ALL on a real table."""
+    problems = []
+    for label, sql, params in queries:
+        for row in explain(conn, sql, params):
+            table = (row.get("table") or "").lower()
+            if row.get("type") != "ALL" or table.startswith("<") or table in SMALL_TABLES:
+                continue
+            problems.append(PlanProblem(label, row.get("table"), row.get("key"), row.get("rows")))
+    return problems
+
+
+def check(conn, log=print):
+    """Print the offending plans; return True when no unexpected full scan was found."""
+    ok = True
+    for p in find_full_scans(conn):
+        known = p.query in KNOWN_FULL_SCANS
+        ok = ok and known
+        log(f"{'KNOWN' if known else 'FAIL '} {p.query}: full scan of {p.table} (~{p.rows} rows)")
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fail if a dashboard query does a full table scan.")
+    parser.add_argument("--seed", type=int, metavar="PATIENTS", help="seed synthetic data first")
+    args = parser.parse_args(argv)
+
+    import mysql.connector
+    from db.connection import DB_CONFIG
+    from db.seed import seed
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    try:
+        if args.seed:
+            seed(conn, patients=args.seed)
+        ok = check(conn)
+    finally:
+        conn.close()
+    print("OK: no unexpected full scans." if ok else "Full table scans found.")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,460 @@
+# db/instrument.py
+"""Per-statement query metrics for every pooled connection.
+
+``instrument(conn)`` wraps a DB-API connection so each cursor it hands out
+times its statements. Statements are grouped by normalized SQL (literals and
+placeholders become ``?``, IN lists and multi-row VALUES collapse) and each
+group keeps a latency histogram, call count, rows and approximate bytes
+fetched. ``checkout()`` in ``db.connection`` opens a rerun scope so the number
+of statements and DB time per Streamlit rerun are tracked too.
+
+Statements slower than EPIS_SLOW_QUERY_MS are logged to the ``epis.slow_query``
+logger with their EXPLAIN plan (run once the statement's results are consumed)
+and kept in a short in-memory log for the admin panel.
+
+A statement is recorded as soon as its result is known: at ``execute`` for
+statements without a result set, otherwise at the first fetch. Rows fetched
+after that are added to its counters, so a cursor that is never closed is
+still counted and the time the caller spends between statements is not.
+
+Metrics are available as Prometheus text via ``prometheus_text()``, over HTTP
+when EPIS_METRICS_PORT is set (bound to EPIS_METRICS_HOST, loopback by
+default, since the output includes statement text), and dumped to
+EPIS_METRICS_FILE at most every EPIS_METRICS_DUMP_INTERVAL seconds.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache
+
+from db.metrics import LatencyHistogram
+
+ENABLED = os.getenv("EPIS_QUERY_METRICS", "1") != "0"
+SLOW_QUERY_MS = float(os.getenv("EPIS_SLOW_QUERY_MS", "200"))
+SLOW_LOG_SIZE = int(os.getenv("EPIS_SLOW_LOG_SIZE", "100"))
+MAX_STATEMENTS = int(os.getenv("EPIS_QUERY_METRICS_MAX_STATEMENTS", "500"))
+METRICS_PORT = int(os.getenv("EPIS_METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("EPIS_METRICS_HOST", "127.0.0.1")
+METRICS_FILE = os.getenv("EPIS_METRICS_FILE", "")
+DUMP_INTERVAL = float(os.getenv("EPIS_METRICS_DUMP_INTERVAL", "15"))
+
+# Statement counts per rerun, not seconds; LatencyHistogram is a plain bucket histogram.
+STATEMENT_COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+log = logging.getLogger("epis.slow_query")
+
+
+# ----------------- SQL Normalization -----------------
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRINGS = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBERS = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDERS = re.compile(r"%s|%\(\w+\)s")
+_IN_LISTS = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.I)
+_VALUES_ROWS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))+")
+_SPACES = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(sql):
+    """Collapse a statement to its shape so calls with different parameters group together."""
+    text = _COMMENTS.sub(" ", sql)
+    text = _STRINGS.sub("?", text)
+    text = _PLACEHOLDERS.sub("?", text)
+    text = _NUMBERS.sub("?", text)
+    text = _IN_LISTS.sub("IN (...)", text)
+    text = _VALUES_ROWS.sub("(...)", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def _row_bytes(row):
+    """Cheap estimate of a row's payload: text/bytes by length, everything else 8 bytes."""
+    values = row.values() if isinstance(row, dict) else row
+    return sum(len(v) if isinstance(v, (str, bytes, bytearray)) else 8 for v in values if v is not None)
+
+
+# ----------------- Metrics Registry -----------------
+class StatementStats:
+    __slots__ = ("latency", "calls", "rows", "bytes", "errors")
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.calls = 0
+        self.rows = 0
+        self.bytes = 0
+        self.errors = 0
+
+
+class RerunStats:
+    __slots__ = ("statements", "seconds", "rows")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+        self.rows = 0
+
+    def add(self, other):
+        self.statements += other.statements
+        self.seconds += other.seconds
+        self.rows += other.rows
+
+
+class QueryMetrics:
+    def __init__(self, slow_ms=SLOW_QUERY_MS, slow_log_size=SLOW_LOG_SIZE, max_statements=MAX_STATEMENTS):
+        self.slow_ms = slow_ms
+        self.max_statements = max_statements
+        self.slow_log = deque(maxlen=slow_log_size)
+        self.reruns = 0
+        self.rerun_statements = LatencyHistogram(STATEMENT_COUNT_BUCKETS)
+        self.rerun_db_time = LatencyHistogram()
+        self._statements = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def record(self, sql, seconds, rows=0, nbytes=0, error=False):
+        key = normalize_sql(sql)
+        with self._lock:
+            stats = self._statements.get(key)
+            if stats is None:
+                if len(self._statements) >= self.max_statements:
+                    key = "<other>"  # bound label cardinality
+                    stats = self._statements.setdefault(key, StatementStats())
+                else:
+                    stats = self._statements[key] = StatementStats()
+            stats.calls += 1
+            stats.rows += rows
+            stats.bytes += nbytes
+            stats.errors += error
+        stats.latency.observe(seconds)
+        rerun = getattr(self._local, "rerun", None)
+        if rerun is not None:
+            rerun.statements += 1
+            rerun.seconds += seconds
+            rerun.rows += rows
+        return key
+
+    def add_rows(self, key, rows, nbytes):
+        """Count rows fetched after the statement ``key`` was recorded."""
+        with self._lock:
+            stats = self._statements.get(key)
+            if stats is not None:
+                stats.rows += rows
+                stats.bytes += nbytes
+        rerun = getattr(self._local, "rerun", None)
+        if rerun is not None:
+            rerun.rows += rows
+
+    def is_slow(self, seconds):
+        return seconds * 1000 >= self.slow_ms
+
+    def log_slow(self, sql, seconds, plan):
+        entry = {
+            "at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "ms": round(seconds * 1000, 1),
+            "statement": normalize_sql(sql),
+            "plan": plan,
+        }
+        self.slow_log.appendleft(entry)
+        log.warning("slow query %.1f ms: %s\nEXPLAIN: %s", entry["ms"], entry["statement"],
+                    json.dumps(plan, default=str))
+
+    # --- per-rerun scope ---
+    @contextmanager
+    def rerun(self):
+        """Count statements issued by the current thread until the block exits."""
+        outer = getattr(self._local, "rerun", None)
+        stats = self._local.rerun = RerunStats()
+        try:
+            yield stats
+        finally:
+            self._local.rerun = outer
+            with self._lock:
+                self.reruns += 1
+            self.rerun_statements.observe(stats.statements)
+            self.rerun_db_time.observe(stats.seconds)
+
+    def current_rerun(self):
+        return getattr(self._local, "rerun", None)
+
+    @contextmanager
+    def count_into(self, stats):
+        """Count this thread's statements into ``stats`` without closing a rerun (worker threads)."""
+        outer = getattr(self._local, "rerun", None)
+        self._local.rerun = stats
+        try:
+            yield stats
+        finally:
+            self._local.rerun = outer
+
+    # --- export ---
+    def snapshot(self):
+        """One dict per statement, slowest total time first."""
+        with self._lock:
+            items = list(self._statements.items())
+        out = []
+        for sql, s in items:
+            snap = s.latency.snapshot()
+            out.append({
+                "statement": sql, "calls": s.calls, "errors": s.errors, "rows": s.rows, "bytes": s.bytes,
+                "total_ms": round(s.latency.total * 1000, 1), "mean_ms": round(snap["mean_ms"], 2),
+                "p95_ms": snap["p95_ms"], "max_ms": round(snap["max_ms"], 1),
+            })
+        return sorted(out, key=lambda r: r["total_ms"], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+            self.slow_log.clear()
+            self.reruns = 0
+            self.rerun_statements = LatencyHistogram(STATEMENT_COUNT_BUCKETS)
+            self.rerun_db_time = LatencyHistogram()
+
+
+query_metrics = QueryMetrics()
+
+
+# ----------------- Wrappers -----------------
+class InstrumentedCursor:
+    """Delegating cursor that times execute + first fetch as one statement."""
+
+    def __init__(self, cursor, connection, metrics):
+        self._cursor = cursor
+        self._conn = connection
+        self._metrics = metrics
+        self._sql = None
+        self._params = None
+        self._key = None
+        self._seconds = 0.0
+        self._rows = 0
+        self._bytes = 0
+        self._error = False
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def _start(self, sql, params):
+        self._finish()
+        self._sql, self._params, self._key = sql, params, None
+        self._seconds, self._rows, self._bytes, self._error = 0.0, 0, 0, False
+
+    def _finish(self):
+        if self._sql is None:
+            return
+        sql, params, seconds = self._sql, self._params, self._seconds
+        rows = self._rows
+        if not rows and self._cursor.description is None:
+            rows = max(getattr(self._cursor, "rowcount", 0) or 0, 0)  # affected rows for writes
+        self._sql = None
+        self._key = self._metrics.record(sql, seconds, rows, self._bytes, self._error)
+        if self._metrics.is_slow(seconds) and not self._error:
+            self._conn._slow.append((sql, params, seconds))
+
+    def _fetched(self, rows):
+        """Count fetched rows; the first fetch records the statement, later ones add to it."""
+        nbytes = sum(_row_bytes(r) for r in rows)
+        if self._sql is None:
+            if self._key is not None and rows:
+                self._metrics.add_rows(self._key, len(rows), nbytes)
+            return
+        self._rows += len(rows)
+        self._bytes += nbytes
+        self._finish()
+
+    def _run(self, fn):
+        """Execute; statements without a result set are recorded at once."""
+        try:
+            result = self._timed(fn)
+        except Exception:
+            self._finish()
+            raise
+        if self._cursor.description is None:
+            self._finish()
+        return result
+
+    def _timed(self, fn):
+        start = time.perf_counter()
+        try:
+            return fn()
+        except Exception:
+            self._error = True
+            raise
+        finally:
+            self._seconds += time.perf_counter() - start
+
+    def execute(self, sql, params=None, *args, **kwargs):
+        self._start(sql, params)
+        return self._run(lambda: self._cursor.execute(sql, params, *args, **kwargs))
+
+    def executemany(self, sql, seq_params, *args, **kwargs):
+        self._start(sql, None)
+        return self._run(lambda: self._cursor.executemany(sql, seq_params, *args, **kwargs))
+
+    def fetchone(self):
+        row = self._timed(self._cursor.fetchone)
+        self._fetched([] if row is None else [row])
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed(lambda: self._cursor.fetchmany(size) if size else self._cursor.fetchmany())
+        self._fetched(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(self._cursor.fetchall)
+        self._fetched(rows)
+        return rows
+
+    def close(self):
+        self._finish()
+        result = self._cursor.close()
+        self._conn._explain_pending()
+        return result
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class InstrumentedConnection:
+    """Delegating connection whose cursors report to ``metrics``."""
+
+    def __init__(self, conn, metrics=None):
+        self._conn = conn
+        self._metrics = metrics or query_metrics
+        self._slow = []
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._conn.cursor(*args, **kwargs), self, self._metrics)
+
+    def _explain_pending(self):
+        """EXPLAIN slow SELECTs once their result set is consumed and the connection is free."""
+        while self._slow:
+            sql, params, seconds = self._slow.pop()
+            plan = None
+            if sql.lstrip().upper().startswith(("SELECT", "WITH")):
+                try:
+                    with self._conn.cursor(dictionary=True) as cur:
+                        cur.execute("EXPLAIN " + sql, params)
+                        plan = cur.fetchall()
+                except Exception as e:  # never let diagnostics break the page
+                    plan = f"EXPLAIN failed: {e}"
+            self._metrics.log_slow(sql, seconds, plan)
+
+
+def instrument(conn, metrics=None):
+    """Wrap ``conn`` unless instrumentation is disabled with EPIS_QUERY_METRICS=0."""
+    return InstrumentedConnection(conn, metrics) if ENABLED else conn
+
+
+# ----------------- Prometheus Text -----------------
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", " ")
+
+
+def _histogram(lines, name, hist, labels=""):
+    sep = "," if labels else ""
+    for bound, count in hist.cumulative():
+        lines.append(f'{name}_bucket{{{labels}{sep}le="{bound}"}} {count}')
+    wrapped = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{wrapped} {hist.total}")
+    lines.append(f"{name}_count{wrapped} {hist.count}")
+
+
+def prometheus_text(metrics=None, extra=None):
+    """Prometheus exposition text for statement and rerun metrics.
+
+    ``extra`` maps gauge names to numbers (e.g. pool and cache stats).
+    """
+    metrics = metrics or query_metrics
+    lines = ["# TYPE epis_db_statement_seconds histogram"]
+    with metrics._lock:
+        items = list(metrics._statements.items())
+    for sql, s in items:
+        _histogram(lines, "epis_db_statement_seconds", s.latency, f'statement="{_label(sql)}"')
+    for field in ("calls", "rows", "bytes", "errors"):
+        lines.append(f"# TYPE epis_db_statement_{field}_total counter")
+        for sql, s in items:
+            lines.append(f'epis_db_statement_{field}_total{{statement="{_label(sql)}"}} {getattr(s, field)}')
+    lines.append("# TYPE epis_reruns_total counter")
+    lines.append(f"epis_reruns_total {metrics.reruns}")
+    lines.append("# TYPE epis_rerun_statements histogram")
+    _histogram(lines, "epis_rerun_statements", metrics.rerun_statements)
+    lines.append("# TYPE epis_rerun_db_seconds histogram")
+    _histogram(lines, "epis_rerun_db_seconds", metrics.rerun_db_time)
+    for name, value in (extra or {}).items():
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def dump(path, text):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+class MetricsExporter:
+    """Serves ``render()`` over HTTP and/or writes it to a file, both optional."""
+
+    def __init__(self, render, port=METRICS_PORT, path=METRICS_FILE, interval=DUMP_INTERVAL,
+                 clock=time.monotonic, host=METRICS_HOST):
+        self.render = render
+        self.host = host
+        self.port = port
+        self.path = path
+        self.interval = interval
+        self._clock = clock
+        self._last_dump = None
+        self._server = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the HTTP endpoint once per process (no-op without a port)."""
+        with self._lock:
+            if self._server is not None or not self.port:
+                return
+            from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+            render = self.render
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    body = render().encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, *args):
+                    pass
+
+            self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+            threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+
+    def maybe_dump(self):
+        """Write the metrics file if one is configured and the interval has passed."""
+        if not self.path:
+            return False
+        now = self._clock()
+        with self._lock:
+            if self._last_dump is not None and now - self._last_dump < self.interval:
+                return False
+            self._last_dump = now
+        dump(self.path, self.render())
+        return True
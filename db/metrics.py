@@ -0,0 +1,65 @@
+# db/metrics.py
+"""Small, dependency-free latency histograms shared by the db and auth layers."""
+
+import bisect
+import threading
+
+# Upper bounds (seconds) of the histogram buckets; the last bucket is open-ended.
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class LatencyHistogram:
+    """Thread-safe fixed-bucket histogram of durations in seconds."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        idx = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[idx] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, pct):
+        """Approximate percentile (0-100) as the upper bound of the matching bucket."""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = pct / 100.0 * self.count
+            seen = 0
+            for idx, n in enumerate(self._counts):
+                seen += n
+                if n and seen >= rank:
+                    return self.buckets[idx] if idx < len(self.buckets) else self.max
+            return self.max
+
+    def cumulative(self):
+        """Return [(upper_bound, cumulative_count), ...] ending with ("+Inf", count)."""
+        with self._lock:
+            out, running = [], 0
+            for bound, n in zip(self.buckets, self._counts):
+                running += n
+                out.append((bound, running))
+            out.append(("+Inf", self.count))
+            return out
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "mean_ms": (self.total / self.count * 1000) if self.count else 0.0,
+            "p50_ms": self.percentile(50) * 1000,
+            "p95_ms": self.percentile(95) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": self.max * 1000,
+        }
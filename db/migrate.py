@@ -0,0 +1,147 @@
+# db/migrate.py
+"""Versioned schema migrations applied on top of final_epis_db.sql.
+
+Each migration is a pair of files in ``db/migrations``::
+
+    NNNN_short_name.up.sql
+    NNNN_short_name.down.sql
+
+Applied versions are recorded in ``schema_migrations``. Usage::
+
+    python -m db.migrate status
+    python -m db.migrate up [--to VERSION]
+    python -m db.migrate down --to VERSION     # roll back everything above VERSION
+"""
+
+import argparse
+import os
+import re
+import sys
+from collections import namedtuple
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+_FILE_RE = re.compile(r"^(\d{4})_([a-z0-9_]+)\.(up|down)\.sql$")
+
+Migration = namedtuple("Migration", "version name up_sql down_sql")
+
+
+class MigrationError(Exception):
+    """Raised when the migration files or the applied history are inconsistent."""
+
+
+def discover(directory=MIGRATIONS_DIR):
+    """Return all migrations in version order."""
+    found = {}
+    for filename in sorted(os.listdir(directory)):
+        match = _FILE_RE.match(filename)
+        if not match:
+            continue
+        version, name, direction = int(match.group(1)), match.group(2), match.group(3)
+        with open(os.path.join(directory, filename), encoding="utf-8") as f:
+            found.setdefault(version, {"name": name})[direction] = f.read()
+    migrations = []
+    for version in sorted(found):
+        entry = found[version]
+        if "up" not in entry or "down" not in entry:
+            raise MigrationError(f"Migration {version:04d} needs both .up.sql and .down.sql files.")
+        migrations.append(Migration(version, entry["name"], entry["up"], entry["down"]))
+    return migrations
+
+
+def split_statements(sql):
+    """Split a migration file into statements (no procedures/triggers, so ';' is a safe delimiter)."""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    return [stmt.strip() for stmt in "\n".join(lines).split(";") if stmt.strip()]
+
+
+# ----------------- History -----------------
+def ensure_history_table(conn):
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INT PRIMARY KEY,
+                name VARCHAR(100) NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """)
+    conn.commit()
+
+
+def applied_versions(conn):
+    ensure_history_table(conn)
+    with conn.cursor() as cur:
+        cur.execute("SELECT version FROM schema_migrations ORDER BY version")
+        return [row[0] for row in cur.fetchall()]
+
+
+# ----------------- Runner -----------------
+def _run(conn, sql):
+    # MySQL commits DDL implicitly, so a failing migration stops here and must be fixed forward.
+    with conn.cursor() as cur:
+        for stmt in split_statements(sql):
+            cur.execute(stmt)
+
+
+def migrate_up(conn, target=None, migrations=None, log=print):
+    """Apply pending migrations up to and including ``target`` (default: latest)."""
+    migrations = discover() if migrations is None else migrations
+    done = set(applied_versions(conn))
+    applied = []
+    for m in migrations:
+        if m.version in done or (target is not None and m.version > target):
+            continue
+        log(f"Applying {m.version:04d}_{m.name} ...")
+        _run(conn, m.up_sql)
+        with conn.cursor() as cur:
+            cur.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (m.version, m.name))
+        conn.commit()
+        applied.append(m.version)
+    return applied
+
+
+def migrate_down(conn, target, migrations=None, log=print):
+    """Roll back every applied migration with a version greater than ``target``."""
+    migrations = {m.version: m for m in (discover() if migrations is None else migrations)}
+    reverted = []
+    for version in sorted(applied_versions(conn), reverse=True):
+        if version <= target:
+            break
+        if version not in migrations:
+            raise MigrationError(f"Applied migration {version:04d} has no files to roll it back.")
+        m = migrations[version]
+        log(f"Reverting {m.version:04d}_{m.name} ...")
+        _run(conn, m.down_sql)
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM schema_migrations WHERE version = %s", (version,))
+        conn.commit()
+        reverted.append(version)
+    return reverted
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply or roll back ePIS schema migrations.")
+    parser.add_argument("command", choices=["status", "up", "down"])
+    parser.add_argument("--to", type=int, default=None, help="target version")
+    args = parser.parse_args(argv)
+    if args.command == "down" and args.to is None:
+        parser.error("down requires --to VERSION (use 0 to roll back everything)")
+
+    import mysql.connector
+    from db.connection import DB_CONFIG
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    try:
+        if args.command == "up":
+            migrate_up(conn, args.to)
+        elif args.command == "down":
+            migrate_down(conn, args.to)
+        done = set(applied_versions(conn))
+        for m in discover():
+            print(f"[{'x' if m.version in done else ' '}] {m.version:04d}_{m.name}")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,14 @@
+-- The composite indexes may have replaced the implicit foreign-key indexes,
+-- so put single-column ones back before dropping them.
+CREATE INDEX idx_admission_nurse ON Admission_to_Ward (nurse_emp_id);
+CREATE INDEX idx_admission_cid ON Admission_to_Ward (CID_no);
+CREATE INDEX idx_prescription_cid ON Prescription (CID_no);
+CREATE INDEX idx_medadmin_rx ON Medicine_Administration (prescription_id);
+
+DROP INDEX idx_admission_nurse_status ON Admission_to_Ward;
+DROP INDEX idx_admission_cid_status ON Admission_to_Ward;
+DROP INDEX idx_admission_status ON Admission_to_Ward;
+DROP INDEX idx_prescription_cid_dates ON Prescription;
+DROP INDEX idx_medadmin_rx_freq_nurse_time ON Medicine_Administration;
+DROP INDEX idx_patient_name ON Patient;
+DROP INDEX idx_patient_address ON Patient;
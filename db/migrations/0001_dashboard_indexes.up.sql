@@ -0,0 +1,16 @@
+-- Composite indexes for the predicates the dashboards filter on every rerun.
+
+-- Nurse panel: patients currently admitted under a nurse.
+CREATE INDEX idx_admission_nurse_status ON Admission_to_Ward (nurse_emp_id, status);
+-- Doctor panel: "is this CID currently admitted?" before prescribing.
+CREATE INDEX idx_admission_cid_status ON Admission_to_Ward (CID_no, status);
+-- Doctor panel: list of all currently admitted patients.
+CREATE INDEX idx_admission_status ON Admission_to_Ward (status);
+-- Nurse / patient panels: prescriptions of a patient active on a given date.
+CREATE INDEX idx_prescription_cid_dates ON Prescription (CID_no, start_date, end_date);
+-- Nurse panel: existing administration record for a prescription, slot and day.
+CREATE INDEX idx_medadmin_rx_freq_nurse_time
+    ON Medicine_Administration (prescription_id, frequency, nurse_emp_id, admin_time);
+-- Patient registry: name-prefix and dzongkhag search.
+CREATE INDEX idx_patient_name ON Patient (name);
+CREATE INDEX idx_patient_address ON Patient (address);
@@ -0,0 +1,3 @@
+ALTER TABLE Users
+    DROP INDEX uq_users_email_role,
+    ADD UNIQUE INDEX email (email);
@@ -0,0 +1,5 @@
+-- Sign-up allows the same email under different roles ("User already exists for this role"),
+-- and login looks users up by (email, role); make that pair the unique key.
+ALTER TABLE Users
+    DROP INDEX email,
+    ADD UNIQUE INDEX uq_users_email_role (email, role);
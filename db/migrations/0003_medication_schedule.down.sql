@@ -0,0 +1 @@
+DROP TABLE IF EXISTS Medication_Schedule;
@@ -0,0 +1,20 @@
+-- One row per prescribed dose (prescription x day x slot), generated when the
+-- prescription is written and updated when a nurse records the administration.
+CREATE TABLE Medication_Schedule (
+    schedule_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    prescription_id INT NOT NULL,
+    dose_date DATE NOT NULL,
+    slot ENUM('Morning','Afternoon','Evening') NOT NULL,
+    CID_no BIGINT NOT NULL,
+    admission_id INT DEFAULT NULL,
+    nurse_emp_id INT DEFAULT NULL,
+    status ENUM('Given','Pending','Skipped') NOT NULL DEFAULT 'Pending',
+    admin_id INT DEFAULT NULL,
+    UNIQUE KEY uq_schedule_dose (prescription_id, dose_date, slot),
+    KEY idx_schedule_nurse_date (nurse_emp_id, dose_date, slot),
+    FOREIGN KEY (prescription_id) REFERENCES Prescription(prescription_id) ON DELETE CASCADE,
+    FOREIGN KEY (CID_no) REFERENCES Patient(CID_no) ON DELETE CASCADE,
+    FOREIGN KEY (admission_id) REFERENCES Admission_to_Ward(admission_id) ON DELETE SET NULL,
+    FOREIGN KEY (nurse_emp_id) REFERENCES Nurse(nurse_emp_id) ON DELETE SET NULL,
+    FOREIGN KEY (admin_id) REFERENCES Medicine_Administration(admin_id) ON DELETE SET NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -0,0 +1,5 @@
+ALTER TABLE Test_Report
+    DROP KEY idx_test_report_sha256,
+    DROP COLUMN original_name,
+    DROP COLUMN size_bytes,
+    DROP COLUMN content_sha256;
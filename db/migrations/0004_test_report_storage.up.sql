@@ -0,0 +1,8 @@
+-- Content-addressed report storage: file_path now holds the storage key
+-- ("ab/cd/<sha256>.pdf"); rows with a NULL checksum predate it and keep their
+-- plain reports/<name> path.
+ALTER TABLE Test_Report
+    ADD COLUMN content_sha256 CHAR(64) DEFAULT NULL,
+    ADD COLUMN size_bytes BIGINT DEFAULT NULL,
+    ADD COLUMN original_name VARCHAR(255) DEFAULT NULL,
+    ADD KEY idx_test_report_sha256 (content_sha256);
@@ -0,0 +1,8 @@
+ALTER TABLE Lab_Test
+    DROP FOREIGN KEY fk_lab_test_claimed_by,
+    DROP KEY idx_lab_test_reported_at,
+    DROP KEY idx_lab_test_status_ordered,
+    DROP COLUMN reported_at,
+    DROP COLUMN claimed_at,
+    DROP COLUMN claimed_by,
+    DROP COLUMN status;
@@ -0,0 +1,18 @@
+-- Explicit lab work-queue lifecycle: Ordered -> In Progress (claimed by a
+-- technician) -> Reported (report uploaded). The pending queue becomes an index
+-- range on (status, date_ordered) instead of a NOT IN anti-join on Test_Report.
+ALTER TABLE Lab_Test
+    ADD COLUMN status ENUM('Ordered','In Progress','Reported') NOT NULL DEFAULT 'Ordered',
+    ADD COLUMN claimed_by INT DEFAULT NULL,
+    ADD COLUMN claimed_at DATETIME DEFAULT NULL,
+    ADD COLUMN reported_at DATETIME DEFAULT NULL,
+    ADD KEY idx_lab_test_status_ordered (status, date_ordered),
+    ADD KEY idx_lab_test_reported_at (reported_at),
+    ADD CONSTRAINT fk_lab_test_claimed_by FOREIGN KEY (claimed_by)
+        REFERENCES Lab_Technician(technician_emp_id) ON DELETE SET NULL;
+
+-- Tests that already have a report are done.
+UPDATE Lab_Test lt
+JOIN (SELECT test_id, MIN(date_uploaded) AS uploaded FROM Test_Report GROUP BY test_id) tr
+    ON tr.test_id = lt.test_id
+SET lt.status = 'Reported', lt.reported_at = tr.uploaded;
@@ -0,0 +1,7 @@
+DROP TABLE IF EXISTS Medicine_Administration_Audit;
+
+-- Removed duplicates are not restored.
+ALTER TABLE Medicine_Administration
+    ADD INDEX idx_medadmin_rx_freq_nurse_time (prescription_id, frequency, nurse_emp_id, admin_time),
+    DROP INDEX uq_med_admin_dose,
+    DROP COLUMN admin_date;
@@ -0,0 +1,56 @@
+-- One administration record per dose: (prescription, slot, day) becomes a unique
+-- key, so recording a dose is a single INSERT ... ON DUPLICATE KEY UPDATE and two
+-- nurses (or a double-clicked button) can no longer create duplicates.
+ALTER TABLE Medicine_Administration
+    ADD COLUMN admin_date DATE DEFAULT NULL AFTER admin_time;
+
+UPDATE Medicine_Administration SET admin_date = DATE(admin_time);
+
+-- Keep the newest record of each dose. Point the schedule at it first, because
+-- deleting the older rows would otherwise null their Medication_Schedule.admin_id.
+UPDATE Medication_Schedule s
+JOIN Medicine_Administration a ON a.admin_id = s.admin_id
+JOIN (
+    SELECT prescription_id, frequency, admin_date, MAX(admin_id) AS keep_id
+    FROM Medicine_Administration
+    GROUP BY prescription_id, frequency, admin_date
+    HAVING COUNT(*) > 1
+) k ON k.prescription_id = a.prescription_id AND k.frequency = a.frequency AND k.admin_date = a.admin_date
+SET s.admin_id = k.keep_id
+WHERE a.admin_id <> k.keep_id;
+
+DELETE a FROM Medicine_Administration a
+JOIN (
+    SELECT prescription_id, frequency, admin_date, MAX(admin_id) AS keep_id
+    FROM Medicine_Administration
+    GROUP BY prescription_id, frequency, admin_date
+    HAVING COUNT(*) > 1
+) k ON k.prescription_id = a.prescription_id AND k.frequency = a.frequency AND k.admin_date = a.admin_date
+WHERE a.admin_id < k.keep_id;
+
+-- The unique key also serves the old per-nurse lookup index's queries.
+ALTER TABLE Medicine_Administration
+    MODIFY admin_date DATE NOT NULL,
+    ADD UNIQUE KEY uq_med_admin_dose (prescription_id, frequency, admin_date),
+    DROP INDEX idx_medadmin_rx_freq_nurse_time;
+
+-- Append-only: one row per recorded status, never updated or deleted by the app.
+CREATE TABLE Medicine_Administration_Audit (
+    audit_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    admin_id INT NOT NULL,
+    prescription_id INT NOT NULL,
+    admin_date DATE NOT NULL,
+    frequency ENUM('Morning','Afternoon','Evening') NOT NULL,
+    status ENUM('Given','Pending','Skipped') NOT NULL,
+    nurse_emp_id INT NOT NULL,
+    remarks VARCHAR(255),
+    recorded_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    KEY idx_med_admin_audit_admin (admin_id, audit_id),
+    KEY idx_med_admin_audit_recorded (recorded_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- Start the trail from the surviving records.
+INSERT INTO Medicine_Administration_Audit
+    (admin_id, prescription_id, admin_date, frequency, status, nurse_emp_id, remarks, recorded_at)
+SELECT admin_id, prescription_id, admin_date, frequency, status, nurse_emp_id, remarks, admin_time
+FROM Medicine_Administration;
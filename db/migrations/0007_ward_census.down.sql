@@ -0,0 +1,4 @@
+DROP TABLE IF EXISTS Ward_Census_Daily;
+DROP TABLE IF EXISTS Ward_Occupancy;
+DROP INDEX idx_admission_discharge_date ON Admission_to_Ward;
+DROP INDEX idx_admission_admit_date ON Admission_to_Ward;
@@ -0,0 +1,29 @@
+-- Ward census: live per-ward occupancy counters, daily census snapshots and
+-- the indexes that keep census and length-of-stay queries to a date range.
+
+-- Stays admitted, or discharged, within a date range (and the per-day counts).
+CREATE INDEX idx_admission_admit_date ON Admission_to_Ward (admit_date, ward_no);
+CREATE INDEX idx_admission_discharge_date ON Admission_to_Ward (discharge_date, admit_date, ward_no);
+
+-- Patients currently in each ward, adjusted in the admitting or discharging transaction.
+CREATE TABLE Ward_Occupancy (
+    ward_no INT PRIMARY KEY,
+    occupied INT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+INSERT INTO Ward_Occupancy (ward_no, occupied)
+SELECT ward_no, COUNT(*) FROM Admission_to_Ward
+WHERE status = 'Admitted' AND ward_no IS NOT NULL
+GROUP BY ward_no;
+
+-- One row per ward and day: patients in the ward at the end of the day, and
+-- the admissions and discharges that day.
+CREATE TABLE Ward_Census_Daily (
+    census_date DATE NOT NULL,
+    ward_no INT NOT NULL,
+    occupied INT NOT NULL,
+    admissions INT NOT NULL DEFAULT 0,
+    discharges INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (census_date, ward_no)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
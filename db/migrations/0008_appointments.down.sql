@@ -0,0 +1,12 @@
+DROP TABLE IF EXISTS Appointment_Slot;
+-- The composite indexes may have replaced the implicit foreign-key indexes,
+-- so put single-column ones back before dropping them.
+CREATE INDEX idx_appointment_doctor ON Appointment (doctor_emp_id);
+CREATE INDEX idx_appointment_cid ON Appointment (CID_no);
+ALTER TABLE Appointment
+    DROP INDEX idx_appointment_date_status,
+    DROP INDEX idx_appointment_cid_date,
+    DROP INDEX idx_appointment_doctor_date,
+    DROP COLUMN booked_at,
+    DROP COLUMN duration_minutes;
+DROP TABLE IF EXISTS Doctor_Availability;
@@ -0,0 +1,42 @@
+-- Appointment scheduling: weekly doctor availability, one claim row per booked
+-- slot, and the indexes the booking and day-list queries use.
+
+-- Weekly clinic sessions, cut into slot_minutes appointments.
+-- weekday follows Python's date.weekday(): 0 = Monday ... 6 = Sunday.
+CREATE TABLE Doctor_Availability (
+    availability_id INT AUTO_INCREMENT PRIMARY KEY,
+    doctor_emp_id INT NOT NULL,
+    weekday TINYINT NOT NULL,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    slot_minutes SMALLINT NOT NULL DEFAULT 15,
+    valid_from DATE NOT NULL,
+    valid_to DATE DEFAULT NULL,
+    KEY idx_availability_doctor (doctor_emp_id, weekday),
+    FOREIGN KEY (doctor_emp_id) REFERENCES Doctor(doctor_emp_id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+ALTER TABLE Appointment
+    ADD COLUMN duration_minutes SMALLINT NOT NULL DEFAULT 15 AFTER time,
+    ADD COLUMN booked_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    ADD KEY idx_appointment_doctor_date (doctor_emp_id, date, time),
+    ADD KEY idx_appointment_cid_date (CID_no, date),
+    ADD KEY idx_appointment_date_status (date, status);
+
+-- A scheduled appointment holds its doctor's slot here. The primary key is what
+-- stops two concurrent bookings of the same slot. Cancelling deletes the claim.
+CREATE TABLE Appointment_Slot (
+    doctor_emp_id INT NOT NULL,
+    slot_date DATE NOT NULL,
+    slot_time TIME NOT NULL,
+    appointment_id INT NOT NULL,
+    PRIMARY KEY (doctor_emp_id, slot_date, slot_time),
+    UNIQUE KEY uq_appointment_slot_appointment (appointment_id),
+    FOREIGN KEY (appointment_id) REFERENCES Appointment(appointment_id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- Existing double bookings keep only their earliest appointment's claim.
+INSERT IGNORE INTO Appointment_Slot (doctor_emp_id, slot_date, slot_time, appointment_id)
+SELECT doctor_emp_id, date, time, appointment_id FROM Appointment
+WHERE status = 'Scheduled' AND doctor_emp_id IS NOT NULL AND date IS NOT NULL AND time IS NOT NULL
+ORDER BY appointment_id;
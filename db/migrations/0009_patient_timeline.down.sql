@@ -0,0 +1,7 @@
+-- The composite indexes may have replaced the implicit foreign-key indexes,
+-- so put single-column ones back before dropping them.
+CREATE INDEX idx_diagnosis_cid ON Diagnosis (CID_no);
+CREATE INDEX idx_lab_test_cid ON Lab_Test (CID_no);
+DROP INDEX idx_lab_test_cid_ordered ON Lab_Test;
+DROP INDEX idx_admission_cid_admit ON Admission_to_Ward;
+DROP INDEX idx_diagnosis_cid_date ON Diagnosis;
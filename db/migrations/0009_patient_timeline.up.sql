@@ -0,0 +1,5 @@
+-- Patient timeline: every record kind is read newest first for one patient,
+-- so each table gets a (CID_no, date) index the keyset pages can walk.
+CREATE INDEX idx_diagnosis_cid_date ON Diagnosis (CID_no, date);
+CREATE INDEX idx_admission_cid_admit ON Admission_to_Ward (CID_no, admit_date);
+CREATE INDEX idx_lab_test_cid_ordered ON Lab_Test (CID_no, date_ordered);
@@ -0,0 +1,4 @@
+DROP TABLE IF EXISTS Missed_Dose_Alert;
+DROP TABLE IF EXISTS Adherence_Daily;
+DROP TABLE IF EXISTS Batch_Checkpoint;
+DROP INDEX idx_med_admin_date ON Medicine_Administration;
@@ -0,0 +1,50 @@
+-- Medication adherence: a nightly job compares prescribed doses with recorded
+-- administrations and keeps its progress in Batch_Checkpoint.
+
+-- The job reads a day range of administrations across all prescriptions.
+CREATE INDEX idx_med_admin_date ON Medicine_Administration (admin_date, prescription_id);
+
+-- Last day each batch job has fully processed.
+CREATE TABLE Batch_Checkpoint (
+    job_name VARCHAR(64) PRIMARY KEY,
+    processed_through DATE NOT NULL,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- One row per ward stay per day: doses expected and what became of them.
+CREATE TABLE Adherence_Daily (
+    dose_date DATE NOT NULL,
+    admission_id INT NOT NULL,
+    CID_no BIGINT NOT NULL,
+    nurse_emp_id INT DEFAULT NULL,
+    expected SMALLINT NOT NULL,
+    given SMALLINT NOT NULL,
+    skipped SMALLINT NOT NULL,
+    missed SMALLINT NOT NULL,
+    PRIMARY KEY (dose_date, admission_id),
+    KEY idx_adherence_cid_date (CID_no, dose_date),
+    KEY idx_adherence_nurse_date (nurse_emp_id, dose_date),
+    FOREIGN KEY (admission_id) REFERENCES Admission_to_Ward(admission_id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- Missed doses waiting for a nurse. Open alerts are resolved by the next run
+-- once the dose has been recorded late, or acknowledged by a nurse.
+CREATE TABLE Missed_Dose_Alert (
+    alert_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    prescription_id INT NOT NULL,
+    dose_date DATE NOT NULL,
+    slot ENUM('Morning','Afternoon','Evening') NOT NULL,
+    CID_no BIGINT NOT NULL,
+    admission_id INT NOT NULL,
+    nurse_emp_id INT DEFAULT NULL,
+    status ENUM('Open','Acknowledged','Resolved') NOT NULL DEFAULT 'Open',
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    closed_at DATETIME DEFAULT NULL,
+    closed_by INT DEFAULT NULL,
+    UNIQUE KEY uq_missed_dose (prescription_id, dose_date, slot),
+    KEY idx_missed_dose_nurse (nurse_emp_id, status, dose_date),
+    KEY idx_missed_dose_status (status, dose_date),
+    FOREIGN KEY (prescription_id) REFERENCES Prescription(prescription_id) ON DELETE CASCADE,
+    FOREIGN KEY (admission_id) REFERENCES Admission_to_Ward(admission_id) ON DELETE CASCADE,
+    FOREIGN KEY (closed_by) REFERENCES Nurse(nurse_emp_id) ON DELETE SET NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
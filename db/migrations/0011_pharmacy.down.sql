@@ -0,0 +1,11 @@
+DROP INDEX idx_prescription_end_date ON Prescription;
+ALTER TABLE Medicine_Dispense
+    DROP FOREIGN KEY fk_dispense_batch,
+    DROP KEY idx_dispense_date,
+    DROP COLUMN batch_id;
+DROP TABLE IF EXISTS Stock_Ledger;
+DROP TABLE IF EXISTS Stock_Batch;
+DROP TABLE IF EXISTS Medicine_Stock;
+DELETE FROM Users WHERE role = 'pharmacist';
+ALTER TABLE Users
+    MODIFY role ENUM('patient','doctor','nurse','lab_tech','receptionist') NOT NULL;
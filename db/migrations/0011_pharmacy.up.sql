@@ -0,0 +1,55 @@
+-- Pharmacy: pharmacist logins, per-batch stock with expiry, running balances
+-- per medicine, an append-only stock ledger, and dispenses tied to a batch.
+
+ALTER TABLE Users
+    MODIFY role ENUM('patient','doctor','nurse','lab_tech','receptionist','pharmacist') NOT NULL;
+
+-- Stock on hand per medicine, kept current by every ledger write.
+-- below_reorder is stored so the low-stock watchlist is an index range.
+CREATE TABLE Medicine_Stock (
+    medicine_name VARCHAR(100) PRIMARY KEY,
+    on_hand INT NOT NULL DEFAULT 0,
+    reorder_level INT NOT NULL DEFAULT 0,
+    below_reorder TINYINT AS (on_hand <= reorder_level) STORED,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    KEY idx_medicine_stock_low (below_reorder, on_hand)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- One row per received batch. Dispensing takes the earliest expiry first.
+CREATE TABLE Stock_Batch (
+    batch_id INT AUTO_INCREMENT PRIMARY KEY,
+    medicine_name VARCHAR(100) NOT NULL,
+    batch_no VARCHAR(50) NOT NULL,
+    expiry_date DATE NOT NULL,
+    on_hand INT NOT NULL DEFAULT 0,
+    received_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_stock_batch (medicine_name, batch_no),
+    KEY idx_stock_batch_fefo (medicine_name, expiry_date),
+    KEY idx_stock_batch_expiry (expiry_date, on_hand),
+    FOREIGN KEY (medicine_name) REFERENCES Medicine_Stock(medicine_name) ON UPDATE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- Every stock movement with the medicine's balance after it. Rows are only
+-- ever inserted.
+CREATE TABLE Stock_Ledger (
+    entry_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    medicine_name VARCHAR(100) NOT NULL,
+    batch_id INT NOT NULL,
+    change_qty INT NOT NULL,
+    balance_after INT NOT NULL,
+    reason ENUM('Receipt','Dispense','Expired') NOT NULL,
+    dispense_id INT DEFAULT NULL,
+    pharmacist_emp_id INT DEFAULT NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    KEY idx_stock_ledger_medicine (medicine_name, entry_id),
+    FOREIGN KEY (batch_id) REFERENCES Stock_Batch(batch_id),
+    FOREIGN KEY (pharmacist_emp_id) REFERENCES Pharmacist(pharmacist_emp_id) ON DELETE SET NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+ALTER TABLE Medicine_Dispense
+    ADD COLUMN batch_id INT DEFAULT NULL,
+    ADD KEY idx_dispense_date (dispense_date),
+    ADD CONSTRAINT fk_dispense_batch FOREIGN KEY (batch_id) REFERENCES Stock_Batch(batch_id);
+
+-- Prescriptions running in a date range, for the consumption forecast.
+CREATE INDEX idx_prescription_end_date ON Prescription (end_date, start_date, name);
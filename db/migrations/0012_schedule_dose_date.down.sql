@@ -0,0 +1 @@
+DROP INDEX idx_schedule_date ON Medication_Schedule;
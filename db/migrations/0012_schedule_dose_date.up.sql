@@ -0,0 +1,2 @@
+-- The adherence job reads a day range of scheduled doses across all nurses.
+CREATE INDEX idx_schedule_date ON Medication_Schedule (dose_date);
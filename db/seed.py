@@ -0,0 +1,267 @@
+# db/seed.py
+"""Deterministic synthetic data for query-plan checks and load tests.
+
+    python -m db.seed --patients 50000
+
+Inserts staff, patients, user accounts, admissions (mostly discharged history
+plus a current census, with ward occupancy and daily census rows), prescriptions,
+medication administrations with a week of adherence rows and missed-dose
+alerts, lab tests and reports, weekday clinic sessions for
+every doctor, upcoming appointments with their slot claims, and pharmacy stock
+received in batches through the stock ledger.
+Rows are written with multi-row ``executemany`` batches.
+"""
+
+import argparse
+import random
+import sys
+from datetime import date, datetime, time, timedelta
+
+from auth.hashers import hash_password
+from services import adherence, pharmacy
+from services.appointments import SCHEDULED
+from services.med_schedule import refresh as refresh_schedule
+from services.ward_census import backfill as backfill_census, rebuild_occupancy
+
+BATCH = 5000
+FIRST_CID = 10000000000
+SLOTS = ("Morning", "Afternoon", "Evening")
+SLOT_TIMES = {"Morning": time(8), "Afternoon": time(13), "Evening": time(19)}
+NAMES = [
+    "Dorji", "Pema", "Karma", "Sonam", "Tashi", "Kinley", "Tshering", "Dawa",
+    "Ugyen", "Jigme", "Choki", "Yeshi", "Namgay", "Phuntsho", "Deki", "Wangmo",
+]
+MEDICINES = ["Paracetamol", "Amoxicillin", "Metformin", "Omeprazole", "Amlodipine", "Ibuprofen"]
+TESTS = ["Blood Test", "X-Ray", "Urine Test", "MRI", "ECG"]
+DZONGKHAGS = ["Thimphu", "Paro", "Punakha", "Bumthang", "Trongsa", "Mongar", "Trashigang", "Samtse"]
+LOADTEST_PASSWORD = "epis-loadtest"
+CLINIC_SESSIONS = ((time(9), time(13)), (time(14), time(17)))
+CLINIC_SLOT_MINUTES = 15
+
+
+def user_email(role, key):
+    """Login e-mail of a seeded account: ``<role>.<emp id or CID>@epis.test``."""
+    return f"{role}.{key}@epis.test"
+
+
+def _batched(conn, sql, rows):
+    with conn.cursor() as cur:
+        for i in range(0, len(rows), BATCH):
+            cur.executemany(sql, rows[i:i + BATCH])
+    conn.commit()
+
+
+def seed(conn, patients=50000, doctors=50, nurses=100, admissions_per_patient=1.2,
+         prescriptions_per_admission=3, lab_tests_per_patient=1.0, today=None, rng_seed=42,
+         lab_techs=10, patient_users=1000, password=LOADTEST_PASSWORD, appointments_per_doctor=200,
+         pharmacists=5):
+    """Populate an empty schema; returns a dict of row counts per table.
+
+    Every staff member and the first ``patient_users`` patients get a login
+    (see ``user_email``) sharing ``password``, hashed once with the default hasher.
+    """
+    rng = random.Random(rng_seed)
+    today = today or date.today()
+    counts = {}
+
+    doctor_ids = list(range(1001, 1001 + doctors))
+    nurse_ids = list(range(2001, 2001 + nurses))
+    _batched(conn, "INSERT INTO Doctor (doctor_emp_id, name, specialization, contact) VALUES (%s,%s,%s,%s)",
+             [(d, f"Dr {rng.choice(NAMES)}", "General", 17000000 + d) for d in doctor_ids])
+    _batched(conn, "INSERT INTO Nurse (nurse_emp_id, name, contact) VALUES (%s,%s,%s)",
+             [(n, f"Nurse {rng.choice(NAMES)}", 17000000 + n) for n in nurse_ids])
+    lab_tech_ids = list(range(3001, 3001 + lab_techs))
+    _batched(conn, "INSERT INTO Lab_Technician (technician_emp_id, name, department) VALUES (%s,%s,%s)",
+             [(t, f"Tech {rng.choice(NAMES)}", "Pathology") for t in lab_tech_ids])
+    pharmacist_ids = list(range(4001, 4001 + pharmacists))
+    _batched(conn, "INSERT INTO Pharmacist (pharmacist_emp_id, name, designation, contact) VALUES (%s,%s,%s,%s)",
+             [(p, f"Pharmacist {rng.choice(NAMES)}", "Pharmacist", 17000000 + p) for p in pharmacist_ids])
+    counts["Doctor"], counts["Nurse"], counts["Lab_Technician"] = doctors, nurses, lab_techs
+    counts["Pharmacist"] = pharmacists
+
+    cids = [FIRST_CID + i * 7 for i in range(patients)]
+    _batched(conn, """
+        INSERT INTO Patient (CID_no, name, DOB, gender, contact, address)
+        VALUES (%s,%s,%s,%s,%s,%s)
+    """, [(
+        cid,
+        f"{rng.choice(NAMES)} {rng.choice(NAMES)} {i}",
+        date(1940, 1, 1) + timedelta(days=rng.randrange(30000)),
+        rng.choice(("Male", "Female", "Other")),
+        rng.randrange(17000000, 17999999),
+        rng.choice(DZONGKHAGS),
+    ) for i, cid in enumerate(cids)])
+    counts["Patient"] = patients
+
+    password_hash = hash_password(password)
+    users = (
+        [(f"Dr {d}", user_email("doctor", d), password_hash, "doctor", None, d) for d in doctor_ids]
+        + [(f"Nurse {n}", user_email("nurse", n), password_hash, "nurse", None, n) for n in nurse_ids]
+        + [(f"Tech {t}", user_email("lab_tech", t), password_hash, "lab_tech", None, t) for t in lab_tech_ids]
+        + [(f"Pharmacist {p}", user_email("pharmacist", p), password_hash, "pharmacist", None, p)
+           for p in pharmacist_ids]
+        + [(f"Patient {c}", user_email("patient", c), password_hash, "patient", c, None)
+           for c in cids[:patient_users]]
+    )
+    _batched(conn, """
+        INSERT INTO Users (name, email, password_hash, role, linked_cid, linked_emp_id)
+        VALUES (%s,%s,%s,%s,%s,%s)
+    """, users)
+    counts["Users"] = len(users)
+
+    # Admissions: two years of history; roughly 5% still admitted.
+    admissions = []
+    for _ in range(int(patients * admissions_per_patient)):
+        admit = today - timedelta(days=rng.randrange(730))
+        current = rng.random() < 0.05
+        discharge = None if current else min(today, admit + timedelta(days=rng.randrange(1, 15)))
+        admissions.append((
+            admit, discharge, rng.randrange(1, 40), "Admitted" if current else "Discharged",
+            rng.choice(cids), rng.choice(doctor_ids), rng.choice(nurse_ids),
+        ))
+    _batched(conn, """
+        INSERT INTO Admission_to_Ward
+            (admit_date, discharge_date, ward_no, status, CID_no, doctor_emp_id, nurse_emp_id)
+        VALUES (%s,%s,%s,%s,%s,%s,%s)
+    """, admissions)
+    counts["Admission_to_Ward"] = len(admissions)
+    counts["Ward_Occupancy"] = rebuild_occupancy(conn)
+    counts["Ward_Census_Daily"] = backfill_census(conn, today - timedelta(days=730))
+
+    # Prescriptions: one row per timing, as the doctor dashboard writes them.
+    prescriptions = []
+    for admit, discharge, _, _, cid, doctor, nurse in admissions:
+        for _ in range(prescriptions_per_admission):
+            end = discharge or today + timedelta(days=rng.randrange(1, 10))
+            prescriptions.append((
+                rng.choice(MEDICINES), f"{rng.choice((250, 500, 1000))}mg", admit, end,
+                rng.choice(SLOTS), doctor, cid, nurse,
+            ))
+    _batched(conn, """
+        INSERT INTO Prescription (name, dosage, start_date, end_date, frequency, doctor_emp_id, CID_no)
+        VALUES (%s,%s,%s,%s,%s,%s,%s)
+    """, [row[:-1] for row in prescriptions])
+    counts["Prescription"] = len(prescriptions)
+
+    with conn.cursor() as cur:
+        cur.execute("SELECT MIN(prescription_id) FROM Prescription")
+        first_rx = cur.fetchone()[0]
+
+    # Administrations: roughly every other dose of the prescription's first few days.
+    administrations = []
+    for offset, (_, _, start, end, slot, _, _, nurse) in enumerate(prescriptions):
+        day = start
+        while day <= min(end, start + timedelta(days=3)):
+            if rng.random() < 0.5:
+                administrations.append((
+                    first_rx + offset, nurse, datetime.combine(day, SLOT_TIMES[slot]), day,
+                    rng.choice(("Given", "Given", "Given", "Skipped")), slot,
+                ))
+            day += timedelta(days=1)
+    _batched(conn, """
+        INSERT INTO Medicine_Administration (prescription_id, nurse_emp_id, admin_time, admin_date, status, frequency)
+        VALUES (%s,%s,%s,%s,%s,%s)
+    """, administrations)
+    counts["Medicine_Administration"] = len(administrations)
+
+    # Materialize the schedule for prescriptions still running in the last 30 days.
+    counts["Medication_Schedule"] = refresh_schedule(conn, since=today - timedelta(days=30))
+    conn.commit()
+
+    # The adherence job over the last week, as its nightly runs would have left it.
+    stats = adherence.run(conn, since=today - timedelta(days=7), through=today - timedelta(days=1))
+    counts["Adherence_Daily"], counts["Missed_Dose_Alert"] = stats["daily_rows"], stats["missed"]
+
+    lab_tests = [
+        (rng.choice(TESTS), today - timedelta(days=rng.randrange(730)), rng.choice(cids), rng.choice(doctor_ids))
+        for _ in range(int(patients * lab_tests_per_patient))
+    ]
+    _batched(conn, "INSERT INTO Lab_Test (test_name, date_ordered, CID_no, doctor_emp_id) VALUES (%s,%s,%s,%s)",
+             lab_tests)
+    counts["Lab_Test"] = len(lab_tests)
+
+    with conn.cursor() as cur:
+        cur.execute("SELECT MIN(test_id) FROM Lab_Test")
+        first_test = cur.fetchone()[0]
+    # All but the most recent ~2% of tests have a report.
+    reports = [
+        (f"reports/seed_{first_test + i}.pdf", ordered + timedelta(days=1), first_test + i)
+        for i, (_, ordered, _, _) in enumerate(lab_tests)
+        if rng.random() < 0.98
+    ]
+    _batched(conn, "INSERT INTO Test_Report (file_path, date_uploaded, test_id) VALUES (%s,%s,%s)", reports)
+    counts["Test_Report"] = len(reports)
+    with conn.cursor() as cur:
+        cur.execute("""
+            UPDATE Lab_Test lt JOIN Test_Report tr ON tr.test_id = lt.test_id
+            SET lt.status = 'Reported', lt.reported_at = tr.date_uploaded
+        """)
+    conn.commit()
+
+    # Clinics: Monday-Friday sessions for every doctor, and upcoming bookings on distinct slots.
+    _batched(conn, """
+        INSERT INTO Doctor_Availability (doctor_emp_id, weekday, start_time, end_time, slot_minutes, valid_from)
+        VALUES (%s,%s,%s,%s,%s,%s)
+    """, [(d, weekday, start, end, CLINIC_SLOT_MINUTES, today - timedelta(days=365))
+          for d in doctor_ids for weekday in range(5) for start, end in CLINIC_SESSIONS])
+    counts["Doctor_Availability"] = doctors * 5 * len(CLINIC_SESSIONS)
+    clinic_days = [today + timedelta(days=i) for i in range(1, 61) if (today + timedelta(days=i)).weekday() < 5]
+    grid = [datetime.combine(day, start) + timedelta(minutes=m)
+            for day in clinic_days for start, end in CLINIC_SESSIONS
+            for m in range(0, (end.hour - start.hour) * 60, CLINIC_SLOT_MINUTES)]
+    appointments = [
+        (start.date(), start.time(), CLINIC_SLOT_MINUTES, SCHEDULED, rng.choice(cids), d)
+        for d in doctor_ids for start in rng.sample(grid, min(appointments_per_doctor, len(grid)))
+    ]
+    _batched(conn, """
+        INSERT INTO Appointment (date, time, duration_minutes, status, CID_no, doctor_emp_id)
+        VALUES (%s,%s,%s,%s,%s,%s)
+    """, appointments)
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO Appointment_Slot (doctor_emp_id, slot_date, slot_time, appointment_id)
+            SELECT doctor_emp_id, date, time, appointment_id FROM Appointment WHERE status = %s
+        """, (SCHEDULED,))
+    conn.commit()
+    counts["Appointment"] = counts["Appointment_Slot"] = len(appointments)
+
+    # Pharmacy: three batches of every medicine, the first close to expiry.
+    for name in MEDICINES:
+        for n, months in enumerate((1, 12, 24)):
+            pharmacy.receive(conn, rng.choice(pharmacist_ids), name, f"{name[:3].upper()}-{n + 1:03d}",
+                             today + timedelta(days=30 * months), rng.randrange(5000, 50000))
+        pharmacy.set_reorder_level(conn, name, rng.randrange(10000, 40000))
+    conn.commit()
+    counts["Medicine_Stock"] = len(MEDICINES)
+    counts["Stock_Batch"] = counts["Stock_Ledger"] = 3 * len(MEDICINES)
+
+    with conn.cursor() as cur:
+        for table in counts:
+            cur.execute(f"ANALYZE TABLE {table}")
+            cur.fetchall()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed the ePIS database with synthetic data.")
+    parser.add_argument("--patients", type=int, default=50000)
+    parser.add_argument("--doctors", type=int, default=50)
+    parser.add_argument("--nurses", type=int, default=100)
+    parser.add_argument("--patient-users", type=int, default=1000, help="patients that get a login")
+    args = parser.parse_args(argv)
+
+    import mysql.connector
+    from db.connection import DB_CONFIG
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    try:
+        for table, n in seed(conn, args.patients, args.doctors, args.nurses,
+                              patient_users=args.patient_users).items():
+            print(f"{table:<25} {n:>10}")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,7 @@
+# db/sql.py
+"""Small helpers for building parameterized SQL."""
+
+
+def escape_like(text):
+    """Escape LIKE wildcards so user input only ever matches literally."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
@@ -0,0 +1,226 @@
+# loadtest/runner.py
+"""Drive the dashboard workflows with concurrent virtual users.
+
+    python -m db.seed --patients 50000              # once, on an empty schema
+    python -m loadtest.runner --users 20 --duration 60 --save-baseline baseline.json
+    python -m loadtest.runner --users 20 --duration 60 --baseline baseline.json
+
+Each virtual user is a thread that picks a workflow from the weighted mix,
+borrows a pooled connection for it (as a Streamlit rerun does) and records how
+long it took. At the end the runner prints p50/p95/p99 latency, throughput and
+errors per workflow. With ``--baseline`` it compares against a saved run and
+exits 1 if any workflow's p95 grew by more than ``--tolerance`` or its error
+rate rose.
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+
+from loadtest.workflows import DEFAULT_MIX, WORKFLOWS, LoadContext
+
+TOLERANCE = 0.20
+ERROR_RATE_SLACK = 0.01
+ERROR_SAMPLE = 5
+
+
+def percentile(sorted_samples, p):
+    """Nearest-rank percentile of an ascending list; 0.0 when empty."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+
+class WorkflowStats:
+    """Every latency sample of one workflow; runs are short enough to keep them all."""
+
+    def __init__(self, name):
+        self.name = name
+        self.samples = []
+        self.errors = 0
+        self.error_samples = []
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, error=None):
+        with self._lock:
+            self.samples.append(seconds)
+            if error is not None:
+                self.errors += 1
+                if len(self.error_samples) < ERROR_SAMPLE:
+                    self.error_samples.append(f"{type(error).__name__}: {error}")
+
+    def summary(self, elapsed):
+        with self._lock:
+            samples = sorted(self.samples)
+            errors = self.errors
+        count = len(samples)
+        return {
+            "count": count,
+            "errors": errors,
+            "error_rate": round(errors / count, 4) if count else 0.0,
+            "ops_per_sec": round(count / elapsed, 2) if elapsed > 0 else 0.0,
+            "mean_ms": round(1000 * sum(samples) / count, 2) if count else 0.0,
+            "p50_ms": round(1000 * percentile(samples, 50), 2),
+            "p95_ms": round(1000 * percentile(samples, 95), 2),
+            "p99_ms": round(1000 * percentile(samples, 99), 2),
+        }
+
+
+def weighted_picker(mix, workflows=WORKFLOWS):
+    unknown = set(mix) - set(workflows)
+    if unknown:
+        raise ValueError(f"Unknown workflow(s): {', '.join(sorted(unknown))}")
+    names = [name for name, weight in mix.items() if weight > 0]
+    if not names:
+        raise ValueError("The workflow mix has no positive weights.")
+    weights = [mix[name] for name in names]
+    return lambda rng: rng.choices(names, weights)[0]
+
+
+def run(connection, ctx, mix=DEFAULT_MIX, users=10, duration=None, iterations=None,
+        workflows=WORKFLOWS, seed=1, clock=time.perf_counter):
+    """Run the mix and return ``(stats_by_workflow, elapsed_seconds)``.
+
+    ``connection`` is a zero-argument callable returning a context manager that
+    yields a DB connection (e.g. ``pool.connection``). Each user stops after
+    ``iterations`` workflows or once ``duration`` seconds have passed.
+    """
+    if duration is None and iterations is None:
+        raise ValueError("Give a duration, a number of iterations, or both.")
+    pick = weighted_picker(mix, workflows)
+    stats = {name: WorkflowStats(name) for name in mix}
+    started = clock()
+    deadline = started + duration if duration is not None else None
+
+    def user(index):
+        rng = random.Random(seed * 1000 + index)
+        done = 0
+        while (iterations is None or done < iterations) and (deadline is None or clock() < deadline):
+            name = pick(rng)
+            t0 = clock()
+            error = None
+            try:
+                with connection() as conn:
+                    try:
+                        workflows[name](conn, ctx, rng)
+                    except Exception:
+                        conn.rollback()
+                        raise
+            except Exception as e:
+                error = e
+            stats[name].observe(clock() - t0, error)
+            done += 1
+
+    threads = [threading.Thread(target=user, args=(i,), name=f"vu-{i}", daemon=True) for i in range(users)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return stats, clock() - started
+
+
+def summarize(stats, elapsed):
+    return {name: s.summary(elapsed) for name, s in stats.items() if s.samples}
+
+
+# ----------------- Baselines -----------------
+def save_baseline(path, summary, **meta):
+    with open(path, "w") as f:
+        json.dump({"meta": meta, "workflows": summary}, f, indent=2, sort_keys=True)
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)["workflows"]
+
+
+def compare(summary, baseline, tolerance=TOLERANCE):
+    """Regressions against ``baseline`` as human-readable strings (empty if none)."""
+    regressions = []
+    for name, now in sorted(summary.items()):
+        before = baseline.get(name)
+        if not before:
+            continue
+        limit = before["p95_ms"] * (1 + tolerance)
+        if now["p95_ms"] > limit:
+            regressions.append(f"{name}: p95 {now['p95_ms']:.1f} ms > {limit:.1f} ms "
+                               f"(baseline {before['p95_ms']:.1f} ms + {tolerance:.0%})")
+        if now["error_rate"] > before["error_rate"] + ERROR_RATE_SLACK:
+            regressions.append(f"{name}: error rate {now['error_rate']:.1%} "
+                               f"(baseline {before['error_rate']:.1%})")
+    return regressions
+
+
+def format_table(summary, baseline=None):
+    baseline = baseline or {}
+    lines = [f"{'workflow':<24} {'ops':>7} {'ops/s':>8} {'err':>5} {'p50 ms':>8} {'p95 ms':>8} "
+             f"{'p99 ms':>8} {'p95 vs base':>12}"]
+    for name, s in sorted(summary.items()):
+        before = baseline.get(name)
+        delta = f"{(s['p95_ms'] / before['p95_ms'] - 1):+.0%}" if before and before["p95_ms"] else "-"
+        lines.append(f"{name:<24} {s['count']:>7} {s['ops_per_sec']:>8.1f} {s['errors']:>5} "
+                     f"{s['p50_ms']:>8.1f} {s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f} {delta:>12}")
+    return "\n".join(lines)
+
+
+def parse_mix(text):
+    """``login=15,nurse_schedule=35`` -> dict; an empty string means DEFAULT_MIX."""
+    if not text:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight) if weight else 1.0
+    return mix
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the ePIS dashboard workflows.")
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, help="seconds to run")
+    parser.add_argument("--iterations", type=int, help="workflows per user")
+    parser.add_argument("--mix", default="", help="name=weight,... (default: %s)"
+                        % ",".join(f"{k}={v}" for k, v in DEFAULT_MIX.items()))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--baseline", metavar="JSON", help="compare against this saved run")
+    parser.add_argument("--save-baseline", metavar="JSON", help="save this run as a baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="allowed p95 growth (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+    if args.duration is None and args.iterations is None:
+        args.duration = 60.0
+    mix = parse_mix(args.mix)
+
+    from db.connection import get_pool
+
+    pool = get_pool()
+    with pool.connection() as conn:
+        ctx = LoadContext.load(conn)
+    print(f"{args.users} users, mix {mix}, pool size {pool.size}")
+
+    stats, elapsed = run(pool.connection, ctx, mix, args.users, args.duration, args.iterations,
+                         seed=args.seed)
+    summary = summarize(stats, elapsed)
+    baseline = load_baseline(args.baseline) if args.baseline else None
+    print(format_table(summary, baseline))
+    for s in stats.values():
+        for message in s.error_samples:
+            print(f"  {s.name}: {message}")
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, summary, users=args.users, mix=mix,
+                      seconds=round(elapsed, 1), recorded=time.strftime("%Y-%m-%dT%H:%M:%S"))
+    if baseline is not None:
+        regressions = compare(summary, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
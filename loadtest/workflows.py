@@ -0,0 +1,222 @@
+# loadtest/workflows.py
+"""The dashboard workflows the load test drives, called through the same
+repositories and services the Streamlit pages use.
+
+Each workflow is ``fn(conn, ctx, rng)``: one user action, committed the way the
+dashboard commits it. A workflow that raises counts as an error; the runner
+rolls its connection back. ``ctx`` is a ``LoadContext`` of seeded accounts (see
+``db.seed``), so the test needs nothing but a seeded database.
+"""
+
+import io
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+from auth.password_service import authenticate
+from auth.session import resolve_principal
+from db.cache import invalidate, patient_tag
+from db.seed import LOADTEST_PASSWORD
+from repositories.admissions import AdmissionRepo
+from repositories.appointments import AppointmentRepo
+from repositories.lab import LabRepo
+from repositories.med_admin import MedAdminRepo
+from repositories.patients import PatientRepo
+from repositories.pharmacy import PharmacyRepo
+from repositories.prescriptions import PrescriptionRepo
+from services.appointments import SlotTaken, appointment_book
+from services.lab_queue import ORDERED
+from services.med_schedule import SLOTS
+from services.pharmacy import DispenseItem, InsufficientStock
+from services.prescriptions import NotAdmitted, OrderItem
+from services.schedule_grid import build_schedule_grid
+from services.ward_census import AlreadyAdmitted
+
+MEDICINES = ["Paracetamol", "Amoxicillin", "Metformin", "Omeprazole", "Amlodipine", "Ibuprofen"]
+TESTS = ["Blood Test", "X-Ray", "Urine Test", "MRI", "ECG"]
+REPORT_BYTES = 200 * 1024  # roughly a scanned one-page PDF
+CLAIM_ATTEMPTS = 3
+
+Account = namedtuple("Account", "email role key")
+
+
+class LoadContext:
+    """Seeded accounts grouped by role, plus the password they share."""
+
+    def __init__(self, accounts, password=LOADTEST_PASSWORD, storage=None):
+        self.password = password
+        self.storage = storage
+        self.by_role = {}
+        for account in accounts:
+            self.by_role.setdefault(account.role, []).append(account)
+
+    @classmethod
+    def load(cls, conn, password=LOADTEST_PASSWORD, storage=None):
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT email, role, COALESCE(linked_emp_id, linked_cid) FROM Users
+                WHERE email LIKE %s
+            """, ("%@epis.test",))
+            accounts = [Account(*row) for row in cur.fetchall()]
+        if not accounts:
+            raise RuntimeError("No seeded accounts found; run `python -m db.seed` first.")
+        return cls(accounts, password, storage)
+
+    def pick(self, rng, role):
+        accounts = self.by_role.get(role)
+        if not accounts:
+            raise RuntimeError(f"No seeded {role} accounts.")
+        return rng.choice(accounts)
+
+
+def login(conn, ctx, rng, role=None):
+    """The login form's path: ``authenticate`` (lookup, pooled bcrypt verify, rehash) and resolve the principal."""
+    account = ctx.pick(rng, role or rng.choice(sorted(ctx.by_role)))
+    user = authenticate(conn, account.email, ctx.password, account.role)
+    if user is None:
+        raise RuntimeError(f"Login failed for {account.email}")
+    return resolve_principal(conn, user)
+
+
+def nurse_schedule(conn, ctx, rng):
+    """The nurse's ward list and today's medication grid."""
+    nurse_id = ctx.pick(rng, "nurse").key
+    AdmissionRepo(conn).for_nurse(nurse_id)
+    rows = MedAdminRepo(conn).ward_schedule(nurse_id, date.today())
+    if rows:
+        build_schedule_grid(rows)
+
+
+def doctor_admit_prescribe(conn, ctx, rng):
+    """Admit a patient (unless already admitted), then order two or three medicines for the admission."""
+    doctor_id = ctx.pick(rng, "doctor").key
+    cid = ctx.pick(rng, "patient").key
+    nurse_id = ctx.pick(rng, "nurse").key
+    start = date.today()
+    items = [
+        OrderItem(name, "500mg", start, start + timedelta(days=rng.randint(3, 10)),
+                  tuple(rng.sample(SLOTS, rng.randint(1, len(SLOTS)))))
+        for name in rng.sample(MEDICINES, rng.randint(2, 3))
+    ]
+    try:
+        AdmissionRepo(conn).admit(cid, str(rng.randint(1, 20)), doctor_id, nurse_id)
+    except AlreadyAdmitted:
+        pass  # nothing written; order for the stay already open
+    PrescriptionRepo(conn).place_order(cid, doctor_id, items)
+    conn.commit()
+    invalidate("Admission_to_Ward", "Ward_Occupancy", "Prescription", "Medication_Schedule", patient_tag(cid))
+
+
+def doctor_discharge(conn, ctx, rng):
+    """Discharge one of the currently admitted patients.
+
+    Another user may discharge the same patient first, so a few candidates are
+    tried before giving up quietly.
+    """
+    repo = AdmissionRepo(conn)
+    admitted = repo.admitted()
+    for patient in rng.sample(admitted, min(CLAIM_ATTEMPTS, len(admitted))):
+        admission = repo.active_for_patient(patient.CID_no)
+        if admission is None:
+            continue
+        try:
+            repo.discharge(admission.admission_id)
+        except NotAdmitted:
+            continue
+        conn.commit()
+        invalidate("Admission_to_Ward", "Ward_Occupancy", "Medication_Schedule", patient_tag(patient.CID_no))
+        return
+
+
+def reception_book(conn, ctx, rng):
+    """Find the next free slots across all doctors and book one for a patient.
+
+    Other users race for the same early slots, so a taken slot refreshes that
+    doctor and the next candidate is tried.
+    """
+    book = appointment_book.ensure_fresh(conn)
+    after = datetime.now() + timedelta(days=rng.randrange(30))
+    for slot in book.next_free(CLAIM_ATTEMPTS, after):
+        try:
+            booking = AppointmentRepo(conn).book(ctx.pick(rng, "patient").key, slot.doctor_emp_id, slot.start, book)
+        except SlotTaken:
+            conn.rollback()
+            book.refresh_doctor(conn, slot.doctor_emp_id)
+            continue
+        conn.commit()
+        book.add(booking)
+        invalidate("Appointment", patient_tag(booking.CID_no))
+        return
+
+
+def pharmacy_dispense(conn, ctx, rng):
+    """Dispense a few days of every running prescription of an admitted patient.
+
+    Stock running out is an outcome the pharmacist sees, not an error, so the
+    dispense is rolled back quietly.
+    """
+    admitted = AdmissionRepo(conn).admitted()
+    if not admitted:
+        return
+    pharmacy = PharmacyRepo(conn)
+    items = [DispenseItem(p.prescription_id, min(p.prescribed - p.dispensed, rng.randint(1, 3)))
+             for p in pharmacy.outstanding(rng.choice(admitted).CID_no) if p.prescribed > p.dispensed]
+    if not items:
+        return
+    try:
+        pharmacy.dispense(ctx.pick(rng, "pharmacist").key, items)
+    except InsufficientStock:
+        conn.rollback()
+        return
+    conn.commit()
+    invalidate("Medicine_Stock", "Stock_Batch")
+
+
+def lab_upload(conn, ctx, rng):
+    """Claim an Ordered test from the queue and upload its report.
+
+    When every queued test is taken, a doctor orders a fresh one first, so the
+    workflow does not depend on how much of the seeded queue is left.
+    """
+    technician_id = ctx.pick(rng, "lab_tech").key
+    lab = LabRepo(conn)
+    candidates = [t.test_id for t in lab.pending() if t.status == ORDERED]
+    test_id = next((t for t in rng.sample(candidates, min(CLAIM_ATTEMPTS, len(candidates)))
+                    if lab.claim(t, technician_id) is not None), None)
+    if test_id is None:
+        test_id = lab.order(ctx.pick(rng, "patient").key, rng.choice(TESTS), ctx.pick(rng, "doctor").key)
+        lab.claim(test_id, technician_id)
+    conn.commit()
+
+    report = io.BytesIO(rng.randbytes(REPORT_BYTES))
+    uploaded = lab.upload_report(test_id, technician_id, report, f"report-{test_id}.pdf", ctx.storage)
+    conn.commit()
+    invalidate("Lab_Test", "Test_Report", patient_tag(uploaded.CID_no))
+
+
+def patient_fetch(conn, ctx, rng):
+    """What the patient dashboard loads: the first page of their record."""
+    PatientRepo(conn).timeline(ctx.pick(rng, "patient").key)
+
+
+WORKFLOWS = {
+    "login": login,
+    "nurse_schedule": nurse_schedule,
+    "doctor_admit_prescribe": doctor_admit_prescribe,
+    "doctor_discharge": doctor_discharge,
+    "reception_book": reception_book,
+    "pharmacy_dispense": pharmacy_dispense,
+    "lab_upload": lab_upload,
+    "patient_fetch": patient_fetch,
+}
+
+# Rough shift-time mix: mostly reads, logins at handover, a trickle of writes.
+DEFAULT_MIX = {
+    "login": 15,
+    "nurse_schedule": 35,
+    "doctor_admit_prescribe": 10,
+    "doctor_discharge": 5,
+    "reception_book": 5,
+    "pharmacy_dispense": 5,
+    "lab_upload": 5,
+    "patient_fetch": 30,
+}
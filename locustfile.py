@@ -1,14 +1,89 @@
-from locust import HttpUser, task, between
+import random
+import time
+
+from locust import HttpUser, User, between, events, task
+
+from loadtest.workflows import DEFAULT_MIX, WORKFLOWS, LoadContext
 
 class StreamlitUser(HttpUser):
+    """Loads the static Streamlit shell; the database work is in WorkflowUser."""
     wait_time = between(1, 3)  # wait between each task
+    weight = 1
 
     @task
     def load_main_page(self):
         # Visits the main Streamlit page
         self.client.get("/")
 
-    @task
-    def refresh_page(self):
-        # Simulates refreshing the page or reloading data
-        self.client.get("/")
+
+_ctx = None
+
+
+@events.test_start.add_listener
+def load_accounts(environment, **kwargs):
+    # Seeded accounts are read once per Locust process (see db/seed.py).
+    global _ctx
+    from db.connection import get_pool
+
+    with get_pool().connection() as conn:
+        _ctx = LoadContext.load(conn)
+
+
+class WorkflowUser(User):
+    """Runs the dashboard workflows against the database, reported to Locust per workflow."""
+    wait_time = between(1, 3)
+    weight = 9
+
+    def on_start(self):
+        self.rng = random.Random()
+
+    def _run(self, name):
+        from db.connection import get_pool
+
+        start = time.perf_counter()
+        error = None
+        try:
+            with get_pool().connection() as conn:
+                try:
+                    WORKFLOWS[name](conn, _ctx, self.rng)
+                except Exception:
+                    conn.rollback()
+                    raise
+        except Exception as e:
+            error = e
+        self.environment.events.request.fire(
+            request_type="workflow", name=name, response_time=(time.perf_counter() - start) * 1000,
+            response_length=0, exception=error, context={},
+        )
+
+    @task(DEFAULT_MIX["login"])
+    def login(self):
+        self._run("login")
+
+    @task(DEFAULT_MIX["nurse_schedule"])
+    def nurse_schedule(self):
+        self._run("nurse_schedule")
+
+    @task(DEFAULT_MIX["doctor_admit_prescribe"])
+    def doctor_admit_prescribe(self):
+        self._run("doctor_admit_prescribe")
+
+    @task(DEFAULT_MIX["doctor_discharge"])
+    def doctor_discharge(self):
+        self._run("doctor_discharge")
+
+    @task(DEFAULT_MIX["reception_book"])
+    def reception_book(self):
+        self._run("reception_book")
+
+    @task(DEFAULT_MIX["pharmacy_dispense"])
+    def pharmacy_dispense(self):
+        self._run("pharmacy_dispense")
+
+    @task(DEFAULT_MIX["lab_upload"])
+    def lab_upload(self):
+        self._run("lab_upload")
+
+    @task(DEFAULT_MIX["patient_fetch"])
+    def patient_fetch(self):
+        self._run("patient_fetch")
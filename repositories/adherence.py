@@ -0,0 +1,68 @@
+# repositories/adherence.py
+from collections import namedtuple
+from datetime import datetime
+
+from repositories.base import Repository
+from services.adherence import ACKNOWLEDGED, OPEN
+
+MissedDose = namedtuple(
+    "MissedDose", "alert_id dose_date slot CID_no patient_name medication_name dosage created_at"
+)
+PatientAdherence = namedtuple(
+    "PatientAdherence", "CID_no patient_name days expected given skipped missed"
+)
+
+
+OPEN_ALERTS_SQL = """
+    SELECT m.alert_id, m.dose_date, m.slot, m.CID_no, p.name AS patient_name,
+           pr.name AS medication_name, pr.dosage, m.created_at
+    FROM Missed_Dose_Alert m
+    JOIN Patient p ON p.CID_no = m.CID_no
+    JOIN Prescription pr ON pr.prescription_id = m.prescription_id
+    LEFT JOIN Medicine_Administration ma
+      ON ma.prescription_id = m.prescription_id AND ma.admin_date = m.dose_date
+     AND ma.frequency = m.slot AND ma.status IN ('Given', 'Skipped')
+    WHERE m.nurse_emp_id = %s AND m.status = %s AND ma.admin_id IS NULL
+    ORDER BY m.dose_date, m.slot, m.alert_id
+"""
+SUMMARY_SQL = """
+    SELECT s.CID_no, p.name AS patient_name, s.days, s.expected, s.given, s.skipped, s.missed
+    FROM (
+        SELECT CID_no, COUNT(DISTINCT dose_date) AS days, SUM(expected) AS expected,
+               SUM(given) AS given, SUM(skipped) AS skipped, SUM(missed) AS missed
+        FROM Adherence_Daily
+        WHERE dose_date >= %s
+        GROUP BY CID_no
+    ) s
+    JOIN Patient p ON p.CID_no = s.CID_no
+    ORDER BY s.missed / s.expected DESC, s.missed DESC, s.CID_no
+"""
+
+
+class AdherenceRepo(Repository):
+    def open_alerts(self, nurse_id):
+        """The nurse's open missed-dose alerts, oldest first (cached).
+
+        Doses recorded since the last run are left out, so a late recording
+        clears its alert at once rather than at the next run.
+        """
+        return self._cached(MissedDose, OPEN_ALERTS_SQL, (nurse_id, OPEN),
+                            tables=("Missed_Dose_Alert", "Medicine_Administration"))
+
+    def acknowledge(self, alert_ids, nurse_id, at=None):
+        """Close the given open alerts as acknowledged by the nurse; returns how many changed."""
+        if not alert_ids:
+            return 0
+        placeholders = ", ".join(["%s"] * len(alert_ids))
+        return self._update(f"""
+            UPDATE Missed_Dose_Alert SET status = %s, closed_at = %s, closed_by = %s
+            WHERE alert_id IN ({placeholders}) AND status = %s
+        """, (ACKNOWLEDGED, at or datetime.now(), nurse_id, *alert_ids, OPEN))
+
+    def summary(self, since):
+        """Per patient from ``since``: days on a ward and doses expected, given, skipped and missed (cached).
+
+        Worst adherence first. Reads the rows the nightly job wrote, so it
+        covers days up to its last run.
+        """
+        return self._cached(PatientAdherence, SUMMARY_SQL, (since,), tables=("Adherence_Daily",))
@@ -0,0 +1,49 @@
+# repositories/admissions.py
+from collections import namedtuple
+
+from repositories.base import Repository
+from services import ward_census
+
+Admission = namedtuple("Admission", "admission_id nurse_emp_id")
+AdmittedPatient = namedtuple("AdmittedPatient", "CID_no ward_no nurse_emp_id")
+WardPatient = namedtuple("WardPatient", "admission_id CID_no patient_name ward_no admission_status")
+WardOccupancy = namedtuple("WardOccupancy", "ward_no occupied")
+
+ACTIVE_ADMISSION_SQL = """
+    SELECT admission_id, nurse_emp_id FROM Admission_to_Ward
+    WHERE CID_no = %s AND status = 'Admitted'
+    ORDER BY admission_id DESC LIMIT 1
+"""
+ADMITTED_SQL = "SELECT CID_no, ward_no, nurse_emp_id FROM Admission_to_Ward WHERE status='Admitted'"
+NURSE_PATIENTS_SQL = """
+    SELECT a.admission_id, p.CID_no, p.name AS patient_name,
+           a.ward_no, a.status AS admission_status
+    FROM Admission_to_Ward a
+    JOIN Patient p ON a.CID_no = p.CID_no
+    WHERE a.nurse_emp_id = %s AND a.status = 'Admitted'
+"""
+OCCUPANCY_SQL = "SELECT ward_no, occupied FROM Ward_Occupancy ORDER BY ward_no"
+
+
+class AdmissionRepo(Repository):
+    def admit(self, cid, ward_no, doctor_id, nurse_id=None, admit_date=None):
+        """See ``services.ward_census.admit``."""
+        return ward_census.admit(self.conn, cid, ward_no, doctor_id, nurse_id, admit_date)
+
+    def discharge(self, admission_id, day=None):
+        """See ``services.ward_census.discharge``."""
+        return ward_census.discharge(self.conn, admission_id, day)
+
+    def active_for_patient(self, cid):
+        return self._one(Admission, ACTIVE_ADMISSION_SQL, (cid,))
+
+    def admitted(self):
+        """Every currently admitted patient (cached)."""
+        return self._cached(AdmittedPatient, ADMITTED_SQL, tables=("Admission_to_Ward",))
+
+    def for_nurse(self, nurse_id):
+        return self._all(WardPatient, NURSE_PATIENTS_SQL, (nurse_id,))
+
+    def occupancy(self):
+        """Patients currently in each ward, from the live counters (cached)."""
+        return self._cached(WardOccupancy, OCCUPANCY_SQL, tables=("Ward_Occupancy",))
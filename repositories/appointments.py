@@ -0,0 +1,74 @@
+# repositories/appointments.py
+from collections import namedtuple
+from datetime import date
+
+from repositories.base import Repository
+from services import appointments
+from services.appointments import SCHEDULED
+
+DoctorListing = namedtuple("DoctorListing", "doctor_emp_id name specialization")
+Availability = namedtuple("Availability", "weekday start_time end_time slot_minutes valid_from valid_to")
+DoctorAppointment = namedtuple(
+    "DoctorAppointment", "appointment_id time duration_minutes status CID_no patient_name"
+)
+PatientAppointment = namedtuple(
+    "PatientAppointment", "appointment_id date time status doctor_emp_id doctor_name specialization"
+)
+
+AVAILABILITY_SQL = """
+    SELECT weekday, start_time, end_time, slot_minutes, valid_from, valid_to
+    FROM Doctor_Availability
+    WHERE doctor_emp_id = %s AND valid_from <= %s AND (valid_to IS NULL OR valid_to >= %s)
+    ORDER BY weekday, start_time
+"""
+DOCTOR_DAY_SQL = """
+    SELECT a.appointment_id, a.time, a.duration_minutes, a.status, a.CID_no, p.name AS patient_name
+    FROM Appointment a
+    JOIN Patient p ON p.CID_no = a.CID_no
+    WHERE a.doctor_emp_id = %s AND a.date = %s AND a.status <> %s
+    ORDER BY a.time
+"""
+PATIENT_UPCOMING_SQL = """
+    SELECT a.appointment_id, a.date, a.time, a.status, a.doctor_emp_id,
+           d.name AS doctor_name, d.specialization
+    FROM Appointment a
+    LEFT JOIN Doctor d ON d.doctor_emp_id = a.doctor_emp_id
+    WHERE a.CID_no = %s AND a.date >= %s AND a.status = %s
+    ORDER BY a.date, a.time
+"""
+
+
+class AppointmentRepo(Repository):
+    def doctors(self):
+        """Every doctor with their specialization (cached)."""
+        return self._cached(
+            DoctorListing,
+            "SELECT doctor_emp_id, name, specialization FROM Doctor ORDER BY name, doctor_emp_id",
+            tables=("Doctor",)
+        )
+
+    def availability(self, doctor_id, on=None):
+        """The doctor's weekly sessions in force on ``on`` (default today)."""
+        on = on or date.today()
+        return self._all(Availability, AVAILABILITY_SQL, (doctor_id, on, on))
+
+    def set_availability(self, doctor_id, sessions, valid_from=None):
+        return appointments.set_availability(self.conn, doctor_id, sessions, valid_from)
+
+    def for_doctor(self, doctor_id, day):
+        """The doctor's appointments on ``day`` in time order, cancelled ones excluded."""
+        return self._all(DoctorAppointment, DOCTOR_DAY_SQL, (doctor_id, day, appointments.CANCELLED))
+
+    def upcoming_for_patient(self, cid, since=None):
+        """The patient's scheduled appointments from ``since`` (default today) on."""
+        return self._all(PatientAppointment, PATIENT_UPCOMING_SQL, (cid, since or date.today(), SCHEDULED))
+
+    def book(self, cid, doctor_id, start, slots=None):
+        """See ``services.appointments.book``."""
+        return appointments.book(self.conn, cid, doctor_id, start, slots)
+
+    def cancel(self, appointment_id):
+        return appointments.cancel(self.conn, appointment_id)
+
+    def set_status(self, appointment_id, doctor_id, status):
+        return appointments.set_status(self.conn, appointment_id, doctor_id, status)
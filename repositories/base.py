@@ -0,0 +1,46 @@
+# repositories/base.py
+"""Base class for the data-access repositories.
+
+A repository wraps one connection and returns rows as namedtuples whose fields
+match the selected columns. Every statement goes through the helpers below, so
+caching and timing can be added in one place and the same paths can be driven
+from tests, benchmarks and load tests without Streamlit. Repositories never
+commit; the caller owns the transaction.
+"""
+
+from db.cache import query_cache
+
+
+class Repository:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def _all(self, row_type, sql, params=()):
+        with self.conn.cursor() as cur:
+            cur.execute(sql, tuple(params))
+            return [row_type._make(row) for row in cur.fetchall()]
+
+    def _one(self, row_type, sql, params=()):
+        with self.conn.cursor() as cur:
+            cur.execute(sql, tuple(params))
+            row = cur.fetchone()
+        return None if row is None else row_type._make(row)
+
+    def _cached(self, row_type, sql, params=(), tables=(), ttl=None):
+        """``_all`` through the shared query cache; namedtuple rows are safe to share."""
+        return query_cache.get_or_load(
+            (row_type.__name__, sql, tuple(params)), tables,
+            lambda: self._all(row_type, sql, params), ttl
+        )
+
+    def _insert(self, sql, params=()):
+        """Run an INSERT; returns the new row's id."""
+        with self.conn.cursor() as cur:
+            cur.execute(sql, tuple(params))
+            return cur.lastrowid
+
+    def _update(self, sql, params=()):
+        """Run an UPDATE/DELETE; returns the number of affected rows."""
+        with self.conn.cursor() as cur:
+            cur.execute(sql, tuple(params))
+            return cur.rowcount
@@ -0,0 +1,57 @@
+# repositories/lab.py
+from collections import namedtuple
+
+from repositories.base import Repository
+from services import lab_queue
+from services.report_storage import store_report
+
+PendingTest = namedtuple(
+    "PendingTest",
+    "test_id CID_no patient_name test_name date_ordered doctor_name status claimed_by claimed_by_name claimed_at"
+)
+UploadedReport = namedtuple("UploadedReport", "report_id CID_no")
+Report = namedtuple("Report", "report_id file_path date_uploaded content_sha256 size_bytes original_name test_name")
+
+PATIENT_REPORT_SQL = """
+    SELECT tr.report_id, tr.file_path, tr.date_uploaded, tr.content_sha256, tr.size_bytes,
+           tr.original_name, lt.test_name
+    FROM Test_Report tr
+    JOIN Lab_Test lt ON tr.test_id = lt.test_id
+    WHERE tr.report_id = %s AND lt.CID_no = %s
+"""
+
+
+class LabRepo(Repository):
+    def order(self, cid, test_name, doctor_id, ordered_on=None):
+        return lab_queue.order_test(self.conn, cid, test_name, doctor_id, ordered_on)
+
+    def pending(self, limit=lab_queue.QUEUE_LIMIT):
+        return [PendingTest(**row) for row in lab_queue.pending_tests(self.conn, limit)]
+
+    def claim(self, test_id, technician_id):
+        return lab_queue.claim(self.conn, test_id, technician_id)
+
+    def release(self, test_id, technician_id):
+        return lab_queue.release(self.conn, test_id, technician_id)
+
+    def metrics(self, days=7):
+        return lab_queue.queue_metrics(self.conn, days)
+
+    def upload_report(self, test_id, technician_id, fileobj, original_name, storage=None):
+        """Mark the test Reported and store its file; returns an UploadedReport. Raises lab_queue.ClaimError."""
+        cid = lab_queue.mark_reported(self.conn, test_id, technician_id)
+        return UploadedReport(store_report(self.conn, test_id, technician_id, fileobj, original_name, storage), cid)
+
+    def report(self, report_id, cid):
+        """One of the patient's reports, or None if it is not theirs."""
+        return self._one(Report, PATIENT_REPORT_SQL, (report_id, cid))
+
+    def reports_for_patient(self, cid):
+        return self._all(Report, """
+            SELECT tr.report_id, tr.file_path, tr.date_uploaded, tr.content_sha256, tr.size_bytes,
+                   tr.original_name, lt.test_name
+            FROM Test_Report tr
+            JOIN Lab_Test lt ON tr.test_id = lt.test_id
+            WHERE lt.CID_no = %s
+            ORDER BY tr.date_uploaded DESC
+        """, (cid,))
@@ -0,0 +1,25 @@
+# repositories/med_admin.py
+from repositories.base import Repository
+from services import med_admin
+from services.med_admin import Dose
+from services.med_schedule import ward_schedule
+
+
+class MedAdminRepo(Repository):
+    def record(self, prescription_id, nurse_id, day, slot, status, remarks="", at=None):
+        """Insert or update the administration for one dose and mirror it onto the schedule.
+
+        Returns ``(admin_id, created)``.
+        """
+        return med_admin.record(self.conn, nurse_id, Dose(prescription_id, day, slot, status, remarks), at)
+
+    def record_round(self, nurse_id, doses, at=None):
+        """See ``services.med_admin.record_round``."""
+        return med_admin.record_round(self.conn, nurse_id, doses, at)
+
+    def history(self, prescription_id, day, slot):
+        return med_admin.history(self.conn, prescription_id, day, slot)
+
+    def ward_schedule(self, nurse_id, start, end=None, name_prefix=""):
+        """See ``services.med_schedule.ward_schedule``; dict rows feed the schedule grid."""
+        return ward_schedule(self.conn, nurse_id, start, end, name_prefix)
@@ -0,0 +1,32 @@
+# repositories/patients.py
+from collections import namedtuple
+
+from repositories.base import Repository
+from services import patient_timeline
+from services.patient_rules import PATIENT_COLUMNS
+
+Patient = namedtuple("Patient", PATIENT_COLUMNS)
+
+PATIENT_EXISTS_SQL = "SELECT 1 FROM Patient WHERE CID_no = %s"
+
+
+class PatientRepo(Repository):
+    def get(self, cid):
+        return self._one(Patient, f"SELECT {', '.join(PATIENT_COLUMNS)} FROM Patient WHERE CID_no = %s", (cid,))
+
+    def exists(self, cid):
+        with self.conn.cursor() as cur:
+            cur.execute(PATIENT_EXISTS_SQL, (cid,))
+            return cur.fetchone() is not None
+
+    def timeline(self, cid, cursor=None, limit=patient_timeline.PAGE_SIZE):
+        """A page of the patient's record, newest first (cached per patient); see ``services.patient_timeline``."""
+        return patient_timeline.page(self.conn, cid, cursor, limit)
+
+    def register(self, row):
+        """Insert a validated ``(CID_no, name, DOB, gender, contact, address)`` tuple."""
+        self._insert("""
+            INSERT INTO Patient (CID_no, name, DOB, gender, contact, address)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, row)
+        return row[0]
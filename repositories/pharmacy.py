@@ -0,0 +1,88 @@
+# repositories/pharmacy.py
+from collections import namedtuple
+from datetime import date, timedelta
+
+from repositories.base import Repository
+from services import pharmacy
+from services.pharmacy import EXPIRY_WARNING_DAYS, FORECAST_DAYS
+
+StockLevel = namedtuple("StockLevel", "medicine_name on_hand reorder_level")
+ExpiringBatch = namedtuple("ExpiringBatch", "batch_id medicine_name batch_no expiry_date on_hand")
+OutstandingPrescription = namedtuple(
+    "OutstandingPrescription", "prescription_id name dosage frequency start_date end_date prescribed dispensed"
+)
+LedgerEntry = namedtuple("LedgerEntry", "entry_id created_at reason change_qty balance_after batch_no dispense_id")
+
+LOW_STOCK_SQL = """
+    SELECT medicine_name, on_hand, reorder_level FROM Medicine_Stock
+    WHERE below_reorder = 1
+    ORDER BY on_hand, medicine_name
+"""
+EXPIRING_SQL = """
+    SELECT batch_id, medicine_name, batch_no, expiry_date, on_hand FROM Stock_Batch
+    WHERE expiry_date <= %s AND on_hand > 0
+    ORDER BY expiry_date, medicine_name
+"""
+OUTSTANDING_SQL = """
+    SELECT pr.prescription_id, pr.name, pr.dosage, pr.frequency, pr.start_date, pr.end_date,
+           DATEDIFF(pr.end_date, pr.start_date) + 1 AS prescribed,
+           CAST(COALESCE((SELECT SUM(md.quantity) FROM Medicine_Dispense md
+                          WHERE md.prescription_id = pr.prescription_id), 0) AS SIGNED) AS dispensed
+    FROM Prescription pr
+    WHERE pr.CID_no = %s AND pr.end_date >= %s
+    ORDER BY pr.start_date, pr.prescription_id
+"""
+LEDGER_SQL = """
+    SELECT l.entry_id, l.created_at, l.reason, l.change_qty, l.balance_after, b.batch_no, l.dispense_id
+    FROM Stock_Ledger l
+    JOIN Stock_Batch b ON b.batch_id = l.batch_id
+    WHERE l.medicine_name = %s
+    ORDER BY l.entry_id DESC
+    LIMIT %s
+"""
+
+
+class PharmacyRepo(Repository):
+    def stock(self):
+        """Units on hand and reorder level of every stocked medicine (cached)."""
+        return self._cached(
+            StockLevel,
+            "SELECT medicine_name, on_hand, reorder_level FROM Medicine_Stock ORDER BY medicine_name",
+            tables=("Medicine_Stock",)
+        )
+
+    def low_stock(self):
+        """Medicines at or below their reorder level, emptiest first (cached)."""
+        return self._cached(StockLevel, LOW_STOCK_SQL, tables=("Medicine_Stock",))
+
+    def expiring(self, within_days=EXPIRY_WARNING_DAYS, today=None):
+        """Batches with stock left that expire within ``within_days``, including expired ones (cached)."""
+        until = (today or date.today()) + timedelta(days=within_days)
+        return self._cached(ExpiringBatch, EXPIRING_SQL, (until,), tables=("Stock_Batch",))
+
+    def outstanding(self, cid, today=None):
+        """The patient's prescriptions running from ``today`` on, with units prescribed and dispensed so far."""
+        return self._all(OutstandingPrescription, OUTSTANDING_SQL, (cid, today or date.today()))
+
+    def ledger(self, medicine_name, limit=50):
+        """The medicine's latest stock movements, newest first."""
+        return self._all(LedgerEntry, LEDGER_SQL, (medicine_name, limit))
+
+    def receive(self, pharmacist_id, medicine_name, batch_no, expiry_date, quantity):
+        """See ``services.pharmacy.receive``."""
+        return pharmacy.receive(self.conn, pharmacist_id, medicine_name, batch_no, expiry_date, quantity)
+
+    def set_reorder_level(self, medicine_name, level):
+        return pharmacy.set_reorder_level(self.conn, medicine_name, level)
+
+    def dispense(self, pharmacist_id, items):
+        """See ``services.pharmacy.dispense``."""
+        return pharmacy.dispense(self.conn, pharmacist_id, items)
+
+    def write_off_expired(self, pharmacist_id):
+        return pharmacy.write_off_expired(self.conn, pharmacist_id)
+
+    def forecast(self, days=FORECAST_DAYS):
+        """See ``services.pharmacy.stock_forecast``; measured against the cached stock levels."""
+        stock = {s.medicine_name: s.on_hand for s in self.stock()}
+        return pharmacy.stock_forecast(self.conn, stock, days=days)
@@ -0,0 +1,29 @@
+# repositories/prescriptions.py
+from collections import namedtuple
+
+from repositories.base import Repository
+from services.prescriptions import place_order
+
+Prescription = namedtuple("Prescription", "prescription_id medicine dosage start_date end_date frequency doctor_emp_id")
+PrescribedMed = namedtuple("PrescribedMed", "prescription_id med_name frequency")
+
+PATIENT_MEDICATIONS_SQL = """
+    SELECT prescription_id, name AS med_name, frequency
+    FROM Prescription WHERE CID_no = %s
+"""
+
+
+class PrescriptionRepo(Repository):
+    def for_patient(self, cid):
+        return self._all(Prescription, """
+            SELECT prescription_id, name AS medicine, dosage, start_date, end_date, frequency, doctor_emp_id
+            FROM Prescription WHERE CID_no = %s
+        """, (cid,))
+
+    def medications_for_patient(self, cid):
+        """Just what the nurse needs to pick a medication to record."""
+        return self._all(PrescribedMed, PATIENT_MEDICATIONS_SQL, (cid,))
+
+    def place_order(self, cid, doctor_id, items):
+        """See ``services.prescriptions.place_order``."""
+        return place_order(self.conn, cid, doctor_id, items)
@@ -0,0 +1,219 @@
+# services/adherence.py
+"""Medication adherence and missed-dose detection.
+
+A nightly job compares the doses on the nurses' rounds with what they
+recorded in ``Medicine_Administration``. The expected doses are the
+``Medication_Schedule`` rows that belong to a ward stay, so adherence and the
+round agree on every boundary: a stay's doses run from the admission day
+through the discharge day, whose pending doses discharge leaves on the round.
+Once the day is over, an expected dose is missed if it has no record or its
+record is still Pending. Skipped is a recorded decision and is not missed.
+
+Each run processes the days after its ``Batch_Checkpoint`` up to yesterday,
+``CHUNK_DAYS`` at a time. A chunk costs two range reads: the scheduled doses
+and the administrations of those days. Doses are matched with pandas, and the
+results are written in ``executemany`` batches. Each chunk commits together with the checkpoint, so
+an interrupted run resumes where it stopped.
+
+- ``Adherence_Daily`` gets one row per stay per day.
+- ``Missed_Dose_Alert`` gets one row per missed dose. An alert stays Open
+  until a nurse acknowledges it, or a later run finds the dose recorded late.
+
+    python -m services.adherence run                     # nightly, through yesterday
+    python -m services.adherence run --since 2025-01-01  # first run or a re-run
+"""
+
+import argparse
+import sys
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+JOB = "medication_adherence"
+CHUNK_DAYS = 7
+OPEN, ACKNOWLEDGED, RESOLVED = "Open", "Acknowledged", "Resolved"
+
+DOSE_COLUMNS = ["prescription_id", "dose_date", "slot", "CID_no", "admission_id", "nurse_emp_id"]
+
+SCHEDULED_SQL = """
+    SELECT prescription_id, dose_date, slot, CID_no, admission_id, nurse_emp_id
+    FROM Medication_Schedule
+    WHERE dose_date BETWEEN %s AND %s AND admission_id IS NOT NULL
+"""
+
+RECORDS_SQL = """
+    SELECT prescription_id, admin_date, frequency, status FROM Medicine_Administration
+    WHERE admin_date BETWEEN %s AND %s
+"""
+
+_UPSERT_DAILY = """
+    INSERT INTO Adherence_Daily
+        (dose_date, admission_id, CID_no, nurse_emp_id, expected, given, skipped, missed)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        CID_no = VALUES(CID_no), nurse_emp_id = VALUES(nurse_emp_id), expected = VALUES(expected),
+        given = VALUES(given), skipped = VALUES(skipped), missed = VALUES(missed)
+"""
+
+# Re-running a day keeps the alert's status, so acknowledged alerts do not reopen.
+_INSERT_ALERTS = """
+    INSERT IGNORE INTO Missed_Dose_Alert
+        (prescription_id, dose_date, slot, CID_no, admission_id, nurse_emp_id)
+    VALUES (%s, %s, %s, %s, %s, %s)
+"""
+
+
+# ----------------- Loading -----------------
+def load_doses(conn, first, last):
+    """Doses due on a ward stay in ``[first, last]``, read from ``Medication_Schedule``.
+
+    Rows without an admission (scheduled while the patient was off the ward)
+    are not expected. Prescriptions written before the schedule existed need
+    ``python -m services.med_schedule refresh --since`` before their days are run.
+    """
+    with conn.cursor() as cur:
+        cur.execute(SCHEDULED_SQL, (first, last))
+        return doses_frame(cur.fetchall())
+
+
+def doses_frame(rows):
+    df = pd.DataFrame(rows, columns=DOSE_COLUMNS).astype(
+        {"prescription_id": "int64", "CID_no": "int64", "admission_id": "int64"}
+    )
+    df["dose_date"] = pd.to_datetime(df["dose_date"])
+    return df
+
+
+def load_records(conn, first, last):
+    """Recorded administrations of ``[first, last]`` as (prescription_id, dose_date, slot, status)."""
+    with conn.cursor() as cur:
+        cur.execute(RECORDS_SQL, (first, last))
+        df = pd.DataFrame(cur.fetchall(), columns=["prescription_id", "dose_date", "slot", "status"])
+    df = df.astype({"prescription_id": "int64"})
+    df["dose_date"] = pd.to_datetime(df["dose_date"])
+    return df
+
+
+# ----------------- Analytics -----------------
+def classify(doses, records):
+    """``doses`` with given / skipped / missed flags from the matching administration record."""
+    status = doses.merge(records, on=["prescription_id", "dose_date", "slot"], how="left")["status"]
+    out = doses.copy()
+    out["given"] = (status == "Given").to_numpy()
+    out["skipped"] = (status == "Skipped").to_numpy()
+    out["missed"] = ~(out["given"] | out["skipped"])
+    return out
+
+
+def daily_summary(classified):
+    """Per stay per day: doses expected, given, skipped and missed."""
+    return (
+        classified.groupby(["dose_date", "admission_id"], as_index=False)
+        .agg(CID_no=("CID_no", "first"), nurse_emp_id=("nurse_emp_id", "first"),
+             expected=("given", "size"), given=("given", "sum"),
+             skipped=("skipped", "sum"), missed=("missed", "sum"))
+    )
+
+
+# ----------------- Writing -----------------
+def _nullable(value):
+    return None if pd.isna(value) else int(value)
+
+
+def write_chunk(conn, classified):
+    """Upsert the chunk's daily rows and queue its missed doses; returns (daily rows, missed doses)."""
+    summary = daily_summary(classified)
+    daily = [
+        (d.date(), int(a), int(c), _nullable(n), int(e), int(g), int(s), int(m))
+        for d, a, c, n, e, g, s, m in summary[["dose_date", "admission_id", "CID_no", "nurse_emp_id",
+                                                 "expected", "given", "skipped", "missed"]].itertuples(index=False)
+    ]
+    alerts = [
+        (int(p), d.date(), s, int(c), int(a), _nullable(n))
+        for p, d, s, c, a, n in classified.loc[classified["missed"], DOSE_COLUMNS].itertuples(index=False)
+    ]
+    with conn.cursor() as cur:
+        if daily:
+            cur.executemany(_UPSERT_DAILY, daily)
+        if alerts:
+            cur.executemany(_INSERT_ALERTS, alerts)
+    return len(daily), len(alerts)
+
+
+def resolve_recorded(conn):
+    """Resolve open alerts whose dose has since been recorded Given or Skipped; returns how many."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            UPDATE Missed_Dose_Alert m
+            JOIN Medicine_Administration ma
+              ON ma.prescription_id = m.prescription_id AND ma.frequency = m.slot AND ma.admin_date = m.dose_date
+            SET m.status = %s, m.closed_at = %s
+            WHERE m.status = %s AND ma.status IN ('Given', 'Skipped')
+        """, (RESOLVED, datetime.now(), OPEN))
+        return cur.rowcount
+
+
+def checkpoint(conn, job=JOB):
+    """Last day ``job`` has fully processed, or None before its first run."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT processed_through FROM Batch_Checkpoint WHERE job_name = %s", (job,))
+        row = cur.fetchone()
+    return None if row is None else row[0]
+
+
+def save_checkpoint(conn, day, job=JOB):
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO Batch_Checkpoint (job_name, processed_through) VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE processed_through = VALUES(processed_through)
+        """, (job, day))
+
+
+# ----------------- Job -----------------
+def run(conn, since=None, through=None, chunk_days=CHUNK_DAYS):
+    """Process the days after the checkpoint (or from ``since``) through ``through`` (default yesterday).
+
+    Commits after each chunk with its checkpoint; returns counts of days,
+    daily rows, missed doses and resolved alerts.
+    """
+    through = through or date.today() - timedelta(days=1)
+    done = checkpoint(conn)
+    first = since or (done + timedelta(days=1) if done else through)
+    stats = {"days": 0, "daily_rows": 0, "missed": 0, "resolved": resolve_recorded(conn)}
+    conn.commit()
+    while first <= through:
+        last = min(first + timedelta(days=chunk_days - 1), through)
+        doses = load_doses(conn, first, last)
+        daily, missed = write_chunk(conn, classify(doses, load_records(conn, first, last)))
+        save_checkpoint(conn, max(last, done or last))
+        conn.commit()
+        stats["days"] += (last - first).days + 1
+        stats["daily_rows"] += daily
+        stats["missed"] += missed
+        first = last + timedelta(days=1)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute medication adherence and queue missed doses.")
+    parser.add_argument("command", choices=["run"])
+    parser.add_argument("--since", type=date.fromisoformat, default=None,
+                        help="first day to (re)process (default the day after the checkpoint)")
+    parser.add_argument("--through", type=date.fromisoformat, default=None, help="last day (default yesterday)")
+    args = parser.parse_args(argv)
+
+    import mysql.connector
+    from db.connection import DB_CONFIG
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    try:
+        stats = run(conn, args.since, args.through)
+    finally:
+        conn.close()
+    print(f"Processed {stats['days']} day(s): {stats['daily_rows']} daily row(s), "
+          f"{stats['missed']} missed dose(s), {stats['resolved']} alert(s) resolved.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,394 @@
+# services/appointments.py
+"""Outpatient appointment scheduling.
+
+Each doctor has weekly sessions in ``Doctor_Availability`` (e.g. Monday
+09:00-13:00 in 15-minute slots). A booking is an ``Appointment`` row plus a
+claim row in ``Appointment_Slot`` keyed by (doctor, date, time). Two receptionists
+booking the same slot both reach the claim INSERT, and the primary key lets
+exactly one of them commit. The other gets SlotTaken.
+
+Searching runs in memory. ``AppointmentBook`` keeps each doctor's sessions and an
+``IntervalIndex`` of their booked appointments within ``HORIZON_DAYS``.
+``next_free`` walks every doctor's slots lazily in time order and merges them
+with ``heapq.merge``, so the first N free slots across hundreds of doctors cost
+a few bisects per slot looked at. Callers update the book after committing
+(``add`` / ``remove``). Bookings made by other processes are picked up when the
+book expires after ``BOOK_TTL`` seconds, or when a booking for that doctor
+fails with SlotTaken. A stale book can offer a taken slot, but it can never
+cause a double booking.
+
+Functions that write never commit; the caller commits or rolls back.
+"""
+
+import bisect
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+import mysql.connector
+from mysql.connector import errorcode
+
+SCHEDULED, COMPLETED, CANCELLED, NO_SHOW = "Scheduled", "Completed", "Cancelled", "No Show"
+STATUSES = (SCHEDULED, COMPLETED, CANCELLED, NO_SHOW)
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+HORIZON_DAYS = int(os.getenv("EPIS_APPOINTMENT_HORIZON_DAYS", "90"))
+BOOK_TTL = float(os.getenv("EPIS_APPOINTMENT_BOOK_TTL", "300"))
+
+Session = namedtuple("Session", "doctor_emp_id weekday start_time end_time slot_minutes valid_from valid_to")
+Slot = namedtuple("Slot", "start doctor_emp_id minutes")
+Booking = namedtuple("Booking", "appointment_id CID_no doctor_emp_id start minutes")
+
+_EPOCH = datetime(2000, 1, 1)
+
+
+class InvalidSlot(ValueError):
+    """Raised when a time is not one of the doctor's slots, or a session is malformed."""
+
+
+class SlotTaken(Exception):
+    """Raised when the doctor or the patient is already booked at that time."""
+
+
+def _minutes(dt):
+    return int((dt - _EPOCH).total_seconds()) // 60
+
+
+def _datetime(minutes):
+    return _EPOCH + timedelta(minutes=minutes)
+
+
+def _time_minutes(value):
+    """Minutes past midnight of a TIME column (mysql.connector returns timedelta) or a ``time``."""
+    if isinstance(value, timedelta):
+        return int(value.total_seconds()) // 60
+    return value.hour * 60 + value.minute
+
+
+# ----------------- Interval index -----------------
+class IntervalIndex:
+    """One doctor's booked ``[start, end)`` minute intervals, sorted by start.
+
+    Bookings for one doctor never overlap, so the ends are sorted too and
+    an overlap test only needs the last interval that starts before ``end``.
+    """
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, intervals=()):
+        pairs = sorted(intervals)
+        self.starts = [s for s, _ in pairs]
+        self.ends = [e for _, e in pairs]
+
+    def __len__(self):
+        return len(self.starts)
+
+    def overlaps(self, start, end):
+        i = bisect.bisect_left(self.starts, end)
+        return i > 0 and self.ends[i - 1] > start
+
+    def add(self, start, end):
+        i = bisect.bisect_left(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+
+    def remove(self, start, end):
+        i = bisect.bisect_left(self.starts, start)
+        while i < len(self.starts) and self.starts[i] == start:
+            if self.ends[i] == end:
+                del self.starts[i], self.ends[i]
+                return True
+            i += 1
+        return False
+
+
+# ----------------- Appointment book -----------------
+class AppointmentBook:
+    """Availability and bookings of every doctor within a rolling horizon, for slot searches."""
+
+    def __init__(self, horizon_days=HORIZON_DAYS, ttl=BOOK_TTL, clock=time.monotonic):
+        self.horizon_days = horizon_days
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._sessions = {}   # doctor -> {weekday: [Session, ...] by start_time}
+        self._booked = {}     # doctor -> IntervalIndex
+        self.first_day = None
+        self.loaded_at = None
+
+    # --- loading ---
+    def replace(self, sessions, bookings, first_day):
+        """Swap in new contents: ``Session``s and ``(doctor, start, minutes)`` bookings."""
+        by_doctor = {}
+        for s in sorted(sessions, key=lambda s: (s.doctor_emp_id, s.weekday, _time_minutes(s.start_time))):
+            by_doctor.setdefault(s.doctor_emp_id, {}).setdefault(s.weekday, []).append(s)
+        intervals = {}
+        for doctor, start, minutes in bookings:
+            m = _minutes(start)
+            intervals.setdefault(doctor, []).append((m, m + minutes))
+        booked = {doctor: IntervalIndex(pairs) for doctor, pairs in intervals.items()}
+        with self._lock:
+            self._sessions, self._booked = by_doctor, booked
+            self.first_day, self.loaded_at = first_day, self._clock()
+
+    def load(self, conn, today=None):
+        today = today or date.today()
+        last = today + timedelta(days=self.horizon_days)
+        self.replace(load_sessions(conn, today, last), load_bookings(conn, today, last), today)
+
+    def is_stale(self, today=None):
+        return (self.loaded_at is None or self._clock() - self.loaded_at > self.ttl
+                or self.first_day != (today or date.today()))
+
+    def ensure_fresh(self, conn, today=None):
+        if self.is_stale(today):
+            self.load(conn, today)
+        return self
+
+    def refresh_doctor(self, conn, doctor_id):
+        """Reload one doctor's sessions and bookings (e.g. after SlotTaken or an availability change)."""
+        first = self.first_day or date.today()
+        last = first + timedelta(days=self.horizon_days)
+        sessions = load_sessions(conn, first, last, doctor_id)
+        bookings = load_bookings(conn, first, last, doctor_id)
+        weekly = {}
+        for s in sorted(sessions, key=lambda s: (s.weekday, _time_minutes(s.start_time))):
+            weekly.setdefault(s.weekday, []).append(s)
+        index = IntervalIndex((_minutes(start), _minutes(start) + minutes) for _, start, minutes in bookings)
+        with self._lock:
+            self._sessions[doctor_id] = weekly
+            self._booked[doctor_id] = index
+
+    # --- updates after commit ---
+    def add(self, booking):
+        start = _minutes(booking.start)
+        with self._lock:
+            self._booked.setdefault(booking.doctor_emp_id, IntervalIndex()).add(start, start + booking.minutes)
+
+    def remove(self, booking):
+        start = _minutes(booking.start)
+        with self._lock:
+            index = self._booked.get(booking.doctor_emp_id)
+            if index is not None:
+                index.remove(start, start + booking.minutes)
+
+    # --- queries ---
+    def doctors(self):
+        with self._lock:
+            return sorted(self._sessions)
+
+    def slot_minutes(self, doctor_id, start):
+        """Length of the doctor's slot starting at ``start``, or None if no slot starts then."""
+        weekly = self._sessions.get(doctor_id, {})
+        minute = start.hour * 60 + start.minute
+        if start.second or start.microsecond:
+            return None
+        for s in weekly.get(start.weekday(), ()):
+            if not _valid_on(s, start.date()):
+                continue
+            first, end = _time_minutes(s.start_time), _time_minutes(s.end_time)
+            if first <= minute and minute + s.slot_minutes <= end and (minute - first) % s.slot_minutes == 0:
+                return s.slot_minutes
+        return None
+
+    def is_free(self, doctor_id, start, minutes):
+        m = _minutes(start)
+        with self._lock:
+            index = self._booked.get(doctor_id)
+            return index is None or not index.overlaps(m, m + minutes)
+
+    def next_free(self, n, after=None, doctors=None):
+        """The first ``n`` free ``Slot``s starting at or after ``after``, across ``doctors`` (default all)."""
+        after = after or datetime.now()
+        first = max(after.date(), self.first_day or after.date())
+        last = (self.first_day or first) + timedelta(days=self.horizon_days)
+        with self._lock:
+            ids = self._sessions if doctors is None else [d for d in doctors if d in self._sessions]
+            streams = [self._free_slots(d, first, last, _minutes(after)) for d in ids]
+            found = list(itertools.islice(heapq.merge(*streams), n))
+        return [Slot(_datetime(m), doctor, minutes) for m, doctor, minutes in found]
+
+    def _free_slots(self, doctor_id, first, last, not_before):
+        """``(start_minute, doctor, minutes)`` of the doctor's free slots in time order."""
+        weekly = self._sessions[doctor_id]
+        index = self._booked.get(doctor_id)
+        day = first
+        while day <= last:
+            midnight = _minutes(datetime.combine(day, datetime.min.time()))
+            for s in weekly.get(day.weekday(), ()):
+                if not _valid_on(s, day):
+                    continue
+                step = s.slot_minutes
+                end = midnight + _time_minutes(s.end_time)
+                start = midnight + _time_minutes(s.start_time)
+                if start < not_before:  # jump to the first slot on the grid not before ``not_before``
+                    start += -(-(not_before - start) // step) * step
+                while start + step <= end:
+                    if index is None or not index.overlaps(start, start + step):
+                        yield start, doctor_id, step
+                    start += step
+            day += timedelta(days=1)
+
+
+def _valid_on(session, day):
+    return session.valid_from <= day and (session.valid_to is None or day <= session.valid_to)
+
+
+# ----------------- Database -----------------
+def sessions_query(first, last, doctor_id=None):
+    """``(sql, params)`` for the availability sessions that apply to any day in ``[first, last]``."""
+    sql = """
+        SELECT doctor_emp_id, weekday, start_time, end_time, slot_minutes, valid_from, valid_to
+        FROM Doctor_Availability
+        WHERE valid_from <= %s AND (valid_to IS NULL OR valid_to >= %s)
+    """
+    params = [last, first]
+    if doctor_id is not None:
+        sql += " AND doctor_emp_id = %s"
+        params.append(doctor_id)
+    return sql, tuple(params)
+
+
+def load_sessions(conn, first, last, doctor_id=None):
+    """Availability sessions that apply to any day in ``[first, last]``."""
+    with conn.cursor() as cur:
+        cur.execute(*sessions_query(first, last, doctor_id))
+        return [Session._make(row) for row in cur.fetchall()]
+
+
+def bookings_query(first, last, doctor_id=None):
+    """``(sql, params)`` for the scheduled appointments in ``[first, last]``."""
+    sql = """
+        SELECT doctor_emp_id, date, time, duration_minutes FROM Appointment
+        WHERE status = %s AND date BETWEEN %s AND %s
+    """
+    params = [SCHEDULED, first, last]
+    if doctor_id is not None:
+        sql += " AND doctor_emp_id = %s"
+        params.append(doctor_id)
+    else:
+        sql += " AND doctor_emp_id IS NOT NULL"
+    return sql, tuple(params)
+
+
+def load_bookings(conn, first, last, doctor_id=None):
+    """``(doctor, start, minutes)`` of scheduled appointments in ``[first, last]``."""
+    with conn.cursor() as cur:
+        cur.execute(*bookings_query(first, last, doctor_id))
+        return [(doctor, datetime.combine(day, datetime.min.time()) + at, minutes)
+                for doctor, day, at, minutes in cur.fetchall()]
+
+
+def set_availability(conn, doctor_id, sessions, valid_from=None):
+    """Replace the doctor's weekly sessions from ``valid_from`` (default today) on.
+
+    ``sessions`` are ``(weekday, start_time, end_time, slot_minutes)`` tuples.
+    Earlier sessions end the day before; appointments already booked are kept.
+    """
+    valid_from = valid_from or date.today()
+    rows = []
+    for weekday, start, end, slot in sessions:
+        if weekday not in range(7):
+            raise InvalidSlot(f"Unknown weekday {weekday!r}.")
+        if slot <= 0 or _time_minutes(start) + slot > _time_minutes(end):
+            raise InvalidSlot(f"{WEEKDAYS[weekday]} {start}-{end} does not fit one {slot}-minute slot.")
+        rows.append((doctor_id, weekday, start, end, slot, valid_from))
+    with conn.cursor() as cur:
+        cur.execute("""
+            DELETE FROM Doctor_Availability WHERE doctor_emp_id = %s AND valid_from >= %s
+        """, (doctor_id, valid_from))
+        cur.execute("""
+            UPDATE Doctor_Availability SET valid_to = %s
+            WHERE doctor_emp_id = %s AND (valid_to IS NULL OR valid_to >= %s)
+        """, (valid_from - timedelta(days=1), doctor_id, valid_from))
+        if rows:
+            cur.executemany("""
+                INSERT INTO Doctor_Availability
+                    (doctor_emp_id, weekday, start_time, end_time, slot_minutes, valid_from)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """, rows)
+    return len(rows)
+
+
+def overlap_query(column, key, start, minutes):
+    """``(sql, params)`` finding a scheduled appointment of ``column = key`` that overlaps the slot."""
+    return f"""
+        SELECT 1 FROM Appointment
+        WHERE {column} = %s AND date = %s AND status = %s
+          AND time < %s AND ADDTIME(time, SEC_TO_TIME(duration_minutes * 60)) > %s
+        LIMIT 1
+    """, (key, start.date(), SCHEDULED, (start + timedelta(minutes=minutes)).time(), start.time())
+
+
+def _overlap_exists(cur, column, key, start, minutes):
+    cur.execute(*overlap_query(column, key, start, minutes))
+    return cur.fetchone() is not None
+
+
+def book(conn, cid, doctor_id, start, slots=None):
+    """Book ``start`` with the doctor for patient ``cid``; returns a Booking.
+
+    ``slots`` (default the shared ``appointment_book``) decides which times are
+    slots. Raises InvalidSlot, or SlotTaken if the doctor or the patient is
+    already booked then.
+    """
+    slots = slots or appointment_book
+    minutes = slots.slot_minutes(doctor_id, start)
+    if minutes is None:
+        raise InvalidSlot(f"{start:%Y-%m-%d %H:%M} is not one of doctor {doctor_id}'s slots.")
+    with conn.cursor() as cur:
+        # Catches appointments booked under an older slot length; same-slot races hit the claim key.
+        if _overlap_exists(cur, "doctor_emp_id", doctor_id, start, minutes):
+            raise SlotTaken(f"Doctor {doctor_id} is already booked at {start:%Y-%m-%d %H:%M}.")
+        if _overlap_exists(cur, "CID_no", cid, start, minutes):
+            raise SlotTaken(f"Patient {cid} already has an appointment at {start:%Y-%m-%d %H:%M}.")
+        cur.execute("""
+            INSERT INTO Appointment (date, time, duration_minutes, status, CID_no, doctor_emp_id)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, (start.date(), start.time(), minutes, SCHEDULED, cid, doctor_id))
+        appointment_id = cur.lastrowid
+        try:
+            cur.execute("""
+                INSERT INTO Appointment_Slot (doctor_emp_id, slot_date, slot_time, appointment_id)
+                VALUES (%s, %s, %s, %s)
+            """, (doctor_id, start.date(), start.time(), appointment_id))
+        except mysql.connector.IntegrityError as e:
+            if e.errno == errorcode.ER_DUP_ENTRY:
+                raise SlotTaken(f"Doctor {doctor_id} is already booked at {start:%Y-%m-%d %H:%M}.") from e
+            raise
+    return Booking(appointment_id, cid, doctor_id, start, minutes)
+
+
+def cancel(conn, appointment_id):
+    """Cancel a scheduled appointment and free its slot; returns its Booking, or None if not scheduled."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT CID_no, doctor_emp_id, date, time, duration_minutes FROM Appointment
+            WHERE appointment_id = %s AND status = %s FOR UPDATE
+        """, (appointment_id, SCHEDULED))
+        row = cur.fetchone()
+        if row is None:
+            return None
+        cid, doctor_id, day, at, minutes = row
+        cur.execute("UPDATE Appointment SET status = %s WHERE appointment_id = %s", (CANCELLED, appointment_id))
+        cur.execute("DELETE FROM Appointment_Slot WHERE appointment_id = %s", (appointment_id,))
+    return Booking(appointment_id, cid, doctor_id, datetime.combine(day, datetime.min.time()) + at, minutes)
+
+
+def set_status(conn, appointment_id, doctor_id, status):
+    """Mark one of the doctor's scheduled appointments Completed or No Show; returns True if it changed."""
+    if status not in (COMPLETED, NO_SHOW):
+        raise ValueError(f"Cannot set status {status!r}.")
+    with conn.cursor() as cur:
+        cur.execute("""
+            UPDATE Appointment SET status = %s
+            WHERE appointment_id = %s AND doctor_emp_id = %s AND status = %s
+        """, (status, appointment_id, doctor_id, SCHEDULED))
+        return cur.rowcount == 1
+
+
+# ----------------- Shared Instance -----------------
+appointment_book = AppointmentBook()
@@ -0,0 +1,156 @@
+# services/lab_queue.py
+"""Lab work queue.
+
+Every ``Lab_Test`` moves through ``Ordered -> In Progress -> Reported``. The
+doctor's order inserts it as Ordered, a technician claims it (In Progress) and
+uploading the report marks it Reported. The pending queue is then an index
+range on ``(status, date_ordered)`` rather than an anti-join against the whole
+report history, and a claim is a single conditional UPDATE, so two technicians
+can never both win the same sample.
+
+Functions here never commit; they run inside the caller's transaction.
+"""
+
+from datetime import date, datetime, timedelta
+
+from db.cache import cached_query
+
+ORDERED, IN_PROGRESS, REPORTED = "Ordered", "In Progress", "Reported"
+STATUSES = (ORDERED, IN_PROGRESS, REPORTED)
+QUEUE_LIMIT = 500
+
+_QUEUE_TABLES = ("Lab_Test", "Patient", "Doctor", "Lab_Technician")
+
+PENDING_TESTS_SQL = """
+    SELECT lt.test_id, lt.CID_no, p.name AS patient_name, lt.test_name, lt.date_ordered,
+           d.name AS doctor_name, lt.status, lt.claimed_by, t.name AS claimed_by_name, lt.claimed_at
+    FROM Lab_Test lt
+    JOIN Patient p ON lt.CID_no = p.CID_no
+    LEFT JOIN Doctor d ON lt.doctor_emp_id = d.doctor_emp_id
+    LEFT JOIN Lab_Technician t ON lt.claimed_by = t.technician_emp_id
+    WHERE lt.status IN (%s, %s)
+    ORDER BY lt.date_ordered, lt.test_id
+    LIMIT %s
+"""
+BACKLOG_SQL = """
+    SELECT status, COUNT(*) AS tests, MIN(date_ordered) AS oldest
+    FROM Lab_Test WHERE status IN (%s, %s) GROUP BY status
+"""
+REPORTED_SINCE_SQL = """
+    SELECT date_ordered, reported_at FROM Lab_Test
+    WHERE reported_at >= %s
+"""
+
+
+class ClaimError(Exception):
+    """Raised when a test is not in a state the technician may act on."""
+
+
+def order_test(conn, cid, test_name, doctor_id, ordered_on=None):
+    """Insert a new test as Ordered; returns its test_id."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO Lab_Test (test_name, date_ordered, CID_no, doctor_emp_id, status)
+            VALUES (%s, %s, %s, %s, %s)
+        """, (test_name, ordered_on or date.today(), cid, doctor_id, ORDERED))
+        return cur.lastrowid
+
+
+def pending_tests(conn, limit=QUEUE_LIMIT):
+    """Ordered and In Progress tests, oldest first, as dict rows."""
+    return cached_query(conn, PENDING_TESTS_SQL, (ORDERED, IN_PROGRESS, limit), tables=_QUEUE_TABLES)
+
+
+def _patient_of(cur, test_id):
+    cur.execute("SELECT CID_no FROM Lab_Test WHERE test_id = %s", (test_id,))
+    row = cur.fetchone()
+    return None if row is None else row[0]
+
+
+def claim(conn, test_id, technician_id):
+    """Atomically move an Ordered test to In Progress for ``technician_id``.
+
+    Returns the test's CID_no, so the caller can invalidate that patient's
+    pages, or None if another technician claimed it first or it is no longer
+    pending.
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+            UPDATE Lab_Test SET status = %s, claimed_by = %s, claimed_at = %s
+            WHERE test_id = %s AND status = %s
+        """, (IN_PROGRESS, technician_id, datetime.now(), test_id, ORDERED))
+        return _patient_of(cur, test_id) if cur.rowcount == 1 else None
+
+
+def release(conn, test_id, technician_id):
+    """Hand a claimed test back to the queue; only its claimant may release it.
+
+    Returns the test's CID_no, or None if it was not claimed by ``technician_id``.
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+            UPDATE Lab_Test SET status = %s, claimed_by = NULL, claimed_at = NULL
+            WHERE test_id = %s AND status = %s AND claimed_by = %s
+        """, (ORDERED, test_id, IN_PROGRESS, technician_id))
+        return _patient_of(cur, test_id) if cur.rowcount == 1 else None
+
+
+def mark_reported(conn, test_id, technician_id):
+    """Mark a test Reported when its report is uploaded.
+
+    The test must be unclaimed or claimed by ``technician_id``; raises ClaimError
+    otherwise. Returns the test's CID_no.
+    """
+    now = datetime.now()
+    with conn.cursor() as cur:
+        cur.execute("""
+            UPDATE Lab_Test
+            SET status = %s, reported_at = %s,
+                claimed_by = COALESCE(claimed_by, %s), claimed_at = COALESCE(claimed_at, %s)
+            WHERE test_id = %s
+              AND (status = %s OR (status = %s AND claimed_by = %s))
+        """, (REPORTED, now, technician_id, now, test_id, ORDERED, IN_PROGRESS, technician_id))
+        if cur.rowcount != 1:
+            raise ClaimError(f"Test {test_id} is not pending or is claimed by another technician.")
+        return _patient_of(cur, test_id)
+
+
+def queue_metrics(conn, days=7, today=None):
+    """Backlog, daily throughput and turnaround over the last ``days`` days.
+
+    Turnaround is measured from the order date to the report upload, in hours.
+    """
+    today = today or date.today()
+    since = datetime.combine(today - timedelta(days=days - 1), datetime.min.time())
+    with conn.cursor(dictionary=True) as cur:
+        cur.execute(BACKLOG_SQL, (ORDERED, IN_PROGRESS))
+        backlog = {row["status"]: row for row in cur.fetchall()}
+        cur.execute(REPORTED_SINCE_SQL, (since,))
+        reported = cur.fetchall()
+
+    per_day = {today - timedelta(days=i): 0 for i in range(days - 1, -1, -1)}
+    turnaround = []
+    for row in reported:
+        reported_at = row["reported_at"]
+        if reported_at.date() in per_day:
+            per_day[reported_at.date()] += 1
+        if row["date_ordered"]:
+            ordered = datetime.combine(row["date_ordered"], datetime.min.time())
+            turnaround.append((reported_at - ordered).total_seconds() / 3600)
+    turnaround.sort()
+
+    def pct(p):
+        if not turnaround:
+            return None
+        return round(turnaround[min(len(turnaround) - 1, int(p / 100 * len(turnaround)))], 1)
+
+    oldest = [row["oldest"] for row in backlog.values() if row["oldest"]]
+    return {
+        "ordered": backlog.get(ORDERED, {}).get("tests", 0),
+        "in_progress": backlog.get(IN_PROGRESS, {}).get("tests", 0),
+        "oldest_pending": min(oldest) if oldest else None,
+        "reported_per_day": per_day,
+        "reported_total": len(reported),
+        "turnaround_p50_h": pct(50),
+        "turnaround_p95_h": pct(95),
+    }
@@ -0,0 +1,140 @@
+# services/med_admin.py
+"""Recording medication administrations.
+
+A dose is identified by (prescription, slot, day), the ``uq_med_admin_dose``
+key, so recording one is a single ``INSERT ... ON DUPLICATE KEY UPDATE``. Two
+nurses or a double-clicked button land on the same row and the last write
+wins. Every write also appends a row to ``Medicine_Administration_Audit`` and
+mirrors the status onto ``Medication_Schedule``.
+
+``record_round`` writes a whole ward round with a fixed number of statements:
+one multi-row upsert, one id lookup, one multi-row audit insert and one
+schedule update. Doses are written in key order, so two overlapping rounds
+lock rows in the same order instead of deadlocking.
+
+Functions here never commit; the caller commits or rolls back.
+"""
+
+from collections import namedtuple
+from datetime import datetime
+
+from services.med_schedule import SLOTS, record_status
+
+STATUSES = ("Given", "Pending", "Skipped")
+
+Dose = namedtuple("Dose", "prescription_id day slot status remarks")
+Dose.__new__.__defaults__ = ("",)
+
+_UPSERT = """
+    INSERT INTO Medicine_Administration
+        (prescription_id, nurse_emp_id, admin_time, admin_date, status, remarks, frequency)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        admin_id = LAST_INSERT_ID(admin_id),
+        nurse_emp_id = VALUES(nurse_emp_id),
+        admin_time = VALUES(admin_time),
+        status = VALUES(status),
+        remarks = VALUES(remarks)
+"""
+
+_AUDIT = """
+    INSERT INTO Medicine_Administration_Audit
+        (admin_id, prescription_id, admin_date, frequency, status, nurse_emp_id, remarks, recorded_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+MIRROR_ROUND_SQL = """
+    UPDATE Medication_Schedule s
+    JOIN Medicine_Administration a
+      ON a.prescription_id = s.prescription_id AND a.frequency = s.slot AND a.admin_date = s.dose_date
+    SET s.status = a.status, s.admin_id = a.admin_id
+    WHERE a.admin_id IN ({})
+"""
+
+HISTORY_SQL = """
+    SELECT au.status, au.nurse_emp_id, au.remarks, au.recorded_at
+    FROM Medicine_Administration a
+    JOIN Medicine_Administration_Audit au ON au.admin_id = a.admin_id
+    WHERE a.prescription_id = %s AND a.frequency = %s AND a.admin_date = %s
+    ORDER BY au.audit_id
+"""
+
+
+class InvalidDose(ValueError):
+    """Raised for an unknown slot or status."""
+
+
+def _check(dose):
+    if dose.slot not in SLOTS:
+        raise InvalidDose(f"Unknown time slot {dose.slot!r}.")
+    if dose.status not in STATUSES:
+        raise InvalidDose(f"Unknown status {dose.status!r}.")
+
+
+def _row(nurse_id, dose, timestamp):
+    return (dose.prescription_id, nurse_id, timestamp, dose.day, dose.status, dose.remarks or "", dose.slot)
+
+
+def _audit_row(admin_id, nurse_id, dose, timestamp):
+    return (admin_id, dose.prescription_id, dose.day, dose.slot, dose.status, nurse_id, dose.remarks or "",
+            timestamp)
+
+
+def record(conn, nurse_id, dose, at=None):
+    """Insert or update one dose's administration; returns ``(admin_id, created)``."""
+    _check(dose)
+    timestamp = at or datetime.combine(dose.day, datetime.now().time())
+    with conn.cursor() as cur:
+        cur.execute(_UPSERT, _row(nurse_id, dose, timestamp))
+        admin_id, created = cur.lastrowid, cur.rowcount == 1  # 1 = inserted, 2 = updated
+        cur.execute(_AUDIT, _audit_row(admin_id, nurse_id, dose, timestamp))
+    record_status(conn, dose.prescription_id, dose.day, dose.slot, dose.status, admin_id)
+    return admin_id, created
+
+
+def round_ids_query(keys):
+    """``(sql, params)`` looking up the admin ids of ``(prescription_id, day, slot)`` keys."""
+    placeholders = ", ".join(["(%s, %s, %s)"] * len(keys))
+    return f"""
+        SELECT prescription_id, admin_date, frequency, admin_id FROM Medicine_Administration
+        WHERE (prescription_id, frequency, admin_date) IN ({placeholders})
+    """, tuple(v for pid, day, slot in keys for v in (pid, slot, day))
+
+
+def mirror_round_query(admin_ids):
+    """``(sql, params)`` copying the recorded statuses onto their scheduled doses."""
+    return MIRROR_ROUND_SQL.format(", ".join(["%s"] * len(admin_ids))), tuple(admin_ids)
+
+
+def record_round(conn, nurse_id, doses, at=None):
+    """Record many doses at once; returns ``{(prescription_id, day, slot): admin_id}``.
+
+    If a dose appears more than once, the last entry wins.
+    """
+    latest = {}
+    for dose in doses:
+        _check(dose)
+        latest[(dose.prescription_id, dose.day, dose.slot)] = dose
+    if not latest:
+        return {}
+    keys = sorted(latest, key=lambda k: (k[0], SLOTS.index(k[2]), k[1]))  # uq_med_admin_dose order
+    timestamp = at or datetime.now()
+
+    with conn.cursor() as cur:
+        cur.executemany(_UPSERT, [_row(nurse_id, latest[k], timestamp) for k in keys])
+
+        cur.execute(*round_ids_query(keys))
+        ids = {(pid, day, slot): admin_id for pid, day, slot, admin_id in cur.fetchall()}
+
+        cur.executemany(_AUDIT, [_audit_row(ids[k], nurse_id, latest[k], timestamp) for k in keys])
+
+        cur.execute(*mirror_round_query(list(ids.values())))
+    return ids
+
+
+def history(conn, prescription_id, day, slot):
+    """Every status recorded for one dose, oldest first, as dict rows."""
+    with conn.cursor(dictionary=True) as cur:
+        cur.execute(HISTORY_SQL, (prescription_id, slot, day))
+        return cur.fetchall()
@@ -0,0 +1,195 @@
+# services/med_schedule.py
+"""Materialized daily medication schedule.
+
+``Medication_Schedule`` holds one row per prescribed dose (prescription, day,
+slot). Rows are generated in the same transaction that writes the prescription,
+their status is updated when a nurse records an administration, and
+``refresh`` backfills anything missing (e.g. prescriptions written before the
+table existed). A dose belongs to the patient's active admission and its nurse:
+``attach_admission`` re-points pending doses when the patient is admitted, and
+``refresh`` also re-points any whose admission or nurse has since changed.
+The nurse ward view then reads a single index range on ``(nurse_emp_id,
+dose_date)`` instead of joining every admission and administration on
+``DATE(admin_time)``.
+
+Functions here never commit; they run inside the caller's transaction.
+
+    python -m services.med_schedule refresh --since 2025-01-01
+"""
+
+import argparse
+import sys
+from datetime import date, timedelta
+
+from db.sql import escape_like
+
+SLOTS = ("Morning", "Afternoon", "Evening")
+
+_INSERT_DOSES = """
+    INSERT IGNORE INTO Medication_Schedule
+        (prescription_id, dose_date, slot, CID_no, admission_id, nurse_emp_id)
+    VALUES (%s, %s, %s, %s, %s, %s)
+"""
+
+
+RECORD_STATUS_SQL = """
+    UPDATE Medication_Schedule
+    SET status = %s, admin_id = COALESCE(%s, admin_id)
+    WHERE prescription_id = %s AND dose_date = %s AND slot = %s
+"""
+
+
+def expand_doses(prescription_id, cid, slot, start, end, admission_id=None, nurse_id=None, since=None):
+    """Return one schedule tuple per day of the prescription, optionally clipped to ``since``."""
+    if since is not None and since > start:
+        start = since
+    days = (end - start).days + 1
+    return [
+        (prescription_id, start + timedelta(days=i), slot, cid, admission_id, nurse_id)
+        for i in range(max(days, 0))
+    ]
+
+
+def _load_prescriptions(cur, where, params):
+    # The active admission decides which nurse's ward round the doses belong to.
+    cur.execute(f"""
+        SELECT pr.prescription_id, pr.CID_no, pr.frequency, pr.start_date, pr.end_date,
+               a.admission_id, a.nurse_emp_id
+        FROM Prescription pr
+        LEFT JOIN Admission_to_Ward a
+            ON a.CID_no = pr.CID_no AND a.status = 'Admitted'
+        WHERE {where}
+    """, params)
+    return cur.fetchall()
+
+
+def schedule_doses(conn, rows, since=None):
+    """Insert schedule rows for ``(prescription_id, CID_no, slot, start, end, admission_id, nurse_id)``
+    tuples in one batch; returns the number of doses."""
+    doses = []
+    for rx_id, cid, slot, start, end, admission_id, nurse_id in rows:
+        doses += expand_doses(rx_id, cid, slot, start, end, admission_id, nurse_id, since)
+    if doses:
+        with conn.cursor() as cur:
+            cur.executemany(_INSERT_DOSES, doses)
+    return len(doses)
+
+
+def generate_for_prescriptions(conn, prescription_ids):
+    """Create schedule rows for freshly written prescriptions; returns the number of doses."""
+    if not prescription_ids:
+        return 0
+    placeholders = ", ".join(["%s"] * len(prescription_ids))
+    with conn.cursor() as cur:
+        rows = _load_prescriptions(cur, f"pr.prescription_id IN ({placeholders})", tuple(prescription_ids))
+    return schedule_doses(conn, rows)
+
+
+def attach_admission(conn, cid, admission_id, nurse_id, since):
+    """Move the patient's pending doses from ``since`` onto a new admission and its nurse.
+
+    Doses a previous discharge removed are scheduled again; returns the number
+    of doses re-pointed.
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+            UPDATE Medication_Schedule SET admission_id = %s, nurse_emp_id = %s
+            WHERE CID_no = %s AND dose_date >= %s AND status = 'Pending'
+        """, (admission_id, nurse_id, cid, since))
+        moved = cur.rowcount
+        rows = _load_prescriptions(cur, "pr.CID_no = %s AND pr.end_date >= %s", (cid, since))
+    schedule_doses(conn, rows, since)
+    return moved
+
+
+def repoint_pending(conn, since=None):
+    """Re-point pending doses from ``since`` whose admission or nurse no longer matches the active admission."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            UPDATE Medication_Schedule s
+            JOIN Admission_to_Ward a ON a.CID_no = s.CID_no AND a.status = 'Admitted'
+            SET s.admission_id = a.admission_id, s.nurse_emp_id = a.nurse_emp_id
+            WHERE s.dose_date >= %s AND s.status = 'Pending'
+              AND NOT (s.admission_id <=> a.admission_id AND s.nurse_emp_id <=> a.nurse_emp_id)
+        """, (since or date.today(),))
+        return cur.rowcount
+
+
+def refresh(conn, since=None):
+    """Backfill schedule rows from ``since`` (default today) for prescriptions that have none yet.
+
+    Pending doses are re-pointed at the active admission's nurse first.
+    """
+    since = since or date.today()
+    repoint_pending(conn, since)
+    with conn.cursor() as cur:
+        rows = _load_prescriptions(cur, """
+            pr.end_date >= %s
+            AND NOT EXISTS (
+                SELECT 1 FROM Medication_Schedule s
+                WHERE s.prescription_id = pr.prescription_id AND s.dose_date >= %s
+            )
+        """, (since, since))
+    return schedule_doses(conn, rows, since)
+
+
+def record_status(conn, prescription_id, dose_date, slot, status, admin_id=None):
+    """Mirror an administration record onto its scheduled dose."""
+    with conn.cursor() as cur:
+        cur.execute(RECORD_STATUS_SQL, (status, admin_id, prescription_id, dose_date, slot))
+        return cur.rowcount
+
+
+def ward_schedule_query(nurse_id, start, end=None, name_prefix=""):
+    """``(sql, params)`` for the doses due on a nurse's ward between ``start`` and ``end``."""
+    sql = """
+        SELECT s.CID_no AS patient_id,
+               p.name AS patient_name,
+               s.prescription_id,
+               pr.name AS medication_name,
+               pr.dosage,
+               s.dose_date,
+               s.slot AS frequency,
+               s.status
+        FROM Medication_Schedule s
+        JOIN Patient p ON p.CID_no = s.CID_no
+        JOIN Prescription pr ON pr.prescription_id = s.prescription_id
+        WHERE s.nurse_emp_id = %s
+          AND s.dose_date BETWEEN %s AND %s
+    """
+    params = [nurse_id, start, end or start]
+    if name_prefix.strip():
+        sql += " AND p.name LIKE %s"
+        params.append(escape_like(name_prefix.strip()) + "%")
+    sql += " ORDER BY p.name ASC, pr.name ASC"
+    return sql, tuple(params)
+
+
+def ward_schedule(conn, nurse_id, start, end=None, name_prefix=""):
+    """Doses due on a nurse's ward between ``start`` and ``end`` (inclusive) as dict rows."""
+    with conn.cursor(dictionary=True) as cur:
+        cur.execute(*ward_schedule_query(nurse_id, start, end, name_prefix))
+        return cur.fetchall()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backfill the daily medication schedule.")
+    parser.add_argument("command", choices=["refresh"])
+    parser.add_argument("--since", type=date.fromisoformat, default=None, help="YYYY-MM-DD (default today)")
+    args = parser.parse_args(argv)
+
+    import mysql.connector
+    from db.connection import DB_CONFIG
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    try:
+        created = refresh(conn, args.since)
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"Scheduled {created} dose(s).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
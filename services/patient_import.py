@@ -0,0 +1,349 @@
+# services/patient_import.py
+"""Streaming bulk import and export of Patient records.
+
+    python -m services.patient_import import patients.csv --rejects rejects.csv
+    python -m services.patient_import export patients.parquet
+
+Files are read and written ``chunk_size`` rows at a time, so memory stays flat
+however large the file is. Every row goes through the same rules as the
+register form (``services.patient_rules``). Each chunk costs one primary-key
+lookup for CIDs that are already registered, one multi-row INSERT and one
+commit. After each commit a checkpoint next to the source file records how many
+rows are done, and rerunning the same import resumes from there.
+
+Rejected rows (invalid, duplicate CID or refused by the server) are written to
+``rejects_path`` as they are found; the first REJECT_SAMPLE are also kept on
+the returned stats.
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+
+import mysql.connector
+from mysql.connector import errorcode
+
+from services.patient_rules import PATIENT_COLUMNS, validate_patient
+
+CHUNK_SIZE = 5000
+REJECT_SAMPLE = 100
+FORMATS = ("csv", "parquet")
+
+_INSERT = """
+    INSERT INTO Patient (CID_no, name, DOB, gender, contact, address)
+    VALUES (%s, %s, %s, %s, %s, %s)
+"""
+
+Reject = namedtuple("Reject", "row cid reason")
+
+
+class ImportStats:
+    """Running counters for one import or export."""
+
+    def __init__(self, clock=time.perf_counter):
+        self.read = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.resumed_from = 0
+        self.rejects = []
+        self._clock = clock
+        self._started = clock()
+        self.seconds = 0.0
+
+    def reject(self, reject, duplicate=False):
+        if duplicate:
+            self.duplicates += 1
+        else:
+            self.invalid += 1
+        if len(self.rejects) < REJECT_SAMPLE:
+            self.rejects.append(reject)
+
+    def tick(self):
+        self.seconds = self._clock() - self._started
+
+    @property
+    def rows_per_sec(self):
+        return self.read / self.seconds if self.seconds > 0 else 0.0
+
+    def as_dict(self):
+        return {
+            "read": self.read, "inserted": self.inserted, "duplicates": self.duplicates,
+            "invalid": self.invalid, "resumed_from": self.resumed_from,
+            "seconds": round(self.seconds, 2), "rows_per_sec": round(self.rows_per_sec),
+        }
+
+
+def file_format(path):
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    if ext not in FORMATS:
+        raise ValueError(f"Unsupported file type {ext!r}; use .csv or .parquet.")
+    return ext
+
+
+# ----------------- Readers -----------------
+def _csv_records(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from csv.DictReader(f)
+
+
+def _parquet_records(path, chunk_size):
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(path)
+    columns = [c for c in PATIENT_COLUMNS if c in parquet.schema_arrow.names]
+    for batch in parquet.iter_batches(batch_size=chunk_size, columns=columns):
+        yield from batch.to_pylist()
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE, skip=0):
+    """Yield lists of ``(row_number, record)`` with at most ``chunk_size`` entries.
+
+    Row numbers count data rows from 1; the first ``skip`` rows are not yielded.
+    """
+    if file_format(path) == "csv":
+        records = _csv_records(path)
+    else:
+        records = _parquet_records(path, chunk_size)
+    numbered = itertools.islice(enumerate(records, start=1), skip, None)
+    while True:
+        chunk = list(itertools.islice(numbered, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# ----------------- Checkpoints -----------------
+def checkpoint_path(path):
+    return path + ".checkpoint.json"
+
+
+def _fingerprint(path):
+    st = os.stat(path)
+    return {"source": os.path.abspath(path), "size": st.st_size, "mtime": int(st.st_mtime)}
+
+
+def load_checkpoint(path):
+    """Rows already imported from ``path``; 0 if there is no checkpoint or the file changed."""
+    try:
+        with open(checkpoint_path(path)) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    if {k: state.get(k) for k in ("source", "size", "mtime")} != _fingerprint(path):
+        return 0
+    return int(state.get("rows_done", 0))
+
+
+def save_checkpoint(path, rows_done, stats):
+    state = dict(_fingerprint(path), rows_done=rows_done, **stats.as_dict())
+    tmp = checkpoint_path(path) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, checkpoint_path(path))
+
+
+# ----------------- Import -----------------
+def _existing_cids(conn, cids):
+    if not cids:
+        return set()
+    placeholders = ", ".join(["%s"] * len(cids))
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT CID_no FROM Patient WHERE CID_no IN ({placeholders})", tuple(cids))
+        return {row[0] for row in cur.fetchall()}
+
+
+def _row_refused(err):
+    """True when the server refused the row itself (constraint or bad value), not the connection."""
+    return (isinstance(err, (mysql.connector.IntegrityError, mysql.connector.DataError))
+            or err.errno == errorcode.ER_CHECK_CONSTRAINT_VIOLATED)
+
+
+def _insert_one_by_one(conn, pending, rejects):
+    """Fallback when the batch hit a constraint (e.g. a CID registered concurrently).
+
+    Any row the server refuses is rejected on its own, so one bad row cannot
+    abort the chunk and block every resume at the same place. Any other error
+    (lost connection, deadlock, lock wait timeout) propagates; returns the
+    number of rows inserted.
+    """
+    inserted = 0
+    with conn.cursor() as cur:
+        for number, row in pending:
+            try:
+                cur.execute(_INSERT, row)
+                inserted += 1
+            except mysql.connector.DatabaseError as e:
+                if not _row_refused(e):
+                    raise
+                duplicate = e.errno == errorcode.ER_DUP_ENTRY
+                rejects.append((Reject(number, row[0], "CID already registered" if duplicate else e.msg),
+                                duplicate))
+    return inserted
+
+
+def import_chunk(conn, chunk, stats, on_reject, today=None):
+    """Validate, de-duplicate and insert one chunk; commits it.
+
+    Stats and rejects are reported only once the chunk is committed. If the
+    chunk fails for any reason other than a refused row, it is rolled back and
+    the error re-raised so the checkpoint does not move past it.
+    """
+    rejects = []
+    valid = {}
+    for number, record in chunk:
+        row, errors = validate_patient(record, today)
+        if errors:
+            rejects.append((Reject(number, record.get("CID_no"), "; ".join(errors)), False))
+        elif row[0] in valid:
+            rejects.append((Reject(number, row[0], "Duplicate CID in file"), True))
+        else:
+            valid[row[0]] = (number, row)
+
+    try:
+        for cid in _existing_cids(conn, list(valid)):
+            number, _ = valid.pop(cid)
+            rejects.append((Reject(number, cid, "CID already registered"), True))
+
+        pending = list(valid.values())
+        inserted = 0
+        if pending:
+            try:
+                with conn.cursor() as cur:
+                    cur.executemany(_INSERT, [row for _, row in pending])
+                inserted = len(pending)
+            except mysql.connector.DatabaseError as e:
+                if not _row_refused(e):
+                    raise
+                conn.rollback()
+                inserted = _insert_one_by_one(conn, pending, rejects)
+        conn.commit()
+    except mysql.connector.Error:
+        conn.rollback()
+        raise
+
+    stats.read += len(chunk)
+    stats.inserted += inserted
+    for reject, duplicate in sorted(rejects, key=lambda r: r[0].row):
+        on_reject(reject, duplicate)
+
+
+def import_patients(conn, path, chunk_size=CHUNK_SIZE, rejects_path=None, resume=True,
+                    log=print, today=None):
+    """Import a CSV or Parquet file of patients; returns ImportStats."""
+    stats = ImportStats()
+    done = load_checkpoint(path) if resume else 0
+    stats.resumed_from = done
+    if done:
+        log(f"Resuming after row {done}.")
+
+    rejects_file = writer = None
+    if rejects_path:
+        rejects_file = open(rejects_path, "a" if done else "w", newline="")
+        writer = csv.writer(rejects_file)
+        if not done:
+            writer.writerow(Reject._fields)
+
+    def on_reject(reject, duplicate):
+        stats.reject(reject, duplicate)
+        if writer:
+            writer.writerow(reject)
+
+    try:
+        for chunk in read_chunks(path, chunk_size, skip=done):
+            import_chunk(conn, chunk, stats, on_reject, today)
+            done = chunk[-1][0]
+            save_checkpoint(path, done, stats)
+            stats.tick()
+            log(f"{done} rows: {stats.inserted} inserted, {stats.duplicates} duplicate, "
+                f"{stats.invalid} invalid ({stats.rows_per_sec:,.0f} rows/s)")
+    finally:
+        if rejects_file:
+            rejects_file.close()
+    stats.tick()
+    return stats
+
+
+# ----------------- Export -----------------
+def iter_patient_chunks(conn, chunk_size=CHUNK_SIZE):
+    """Yield every Patient row as tuples, ``chunk_size`` at a time, in CID order (keyset paging)."""
+    sql = f"SELECT {', '.join(PATIENT_COLUMNS)} FROM Patient WHERE CID_no > %s ORDER BY CID_no LIMIT %s"
+    after = 0
+    while True:
+        with conn.cursor() as cur:
+            cur.execute(sql, (after, chunk_size))
+            rows = cur.fetchall()
+        if not rows:
+            return
+        yield rows
+        if len(rows) < chunk_size:
+            return
+        after = rows[-1][0]
+
+
+def _write_csv(path, chunks, stats):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(PATIENT_COLUMNS)
+        for rows in chunks:
+            writer.writerows(rows)
+            stats.read += len(rows)
+
+
+def _write_parquet(path, chunks, stats):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("CID_no", pa.int64()), ("name", pa.string()), ("DOB", pa.date32()),
+        ("gender", pa.string()), ("contact", pa.int64()), ("address", pa.string()),
+    ])
+    with pq.ParquetWriter(path, schema) as writer:
+        for rows in chunks:
+            columns = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(col, type=field.type) for col, field in zip(columns, schema)], schema=schema
+            ))
+            stats.read += len(rows)
+
+
+def export_patients(conn, path, chunk_size=CHUNK_SIZE, log=print):
+    """Stream every patient to a CSV or Parquet file; returns ImportStats (``read`` = rows written)."""
+    stats = ImportStats()
+    writer = _write_csv if file_format(path) == "csv" else _write_parquet
+    writer(path, iter_patient_chunks(conn, chunk_size), stats)
+    stats.tick()
+    log(f"Exported {stats.read} patients ({stats.rows_per_sec:,.0f} rows/s).")
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import or export Patient records.")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("path", help=".csv or .parquet file")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--rejects", metavar="CSV", help="write rejected rows here (import)")
+    parser.add_argument("--restart", action="store_true", help="ignore any checkpoint (import)")
+    args = parser.parse_args(argv)
+
+    from db.connection import DB_CONFIG
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    try:
+        if args.command == "import":
+            stats = import_patients(conn, args.path, args.chunk_size, args.rejects, resume=not args.restart)
+        else:
+            stats = export_patients(conn, args.path, args.chunk_size)
+    finally:
+        conn.close()
+    print(json.dumps(stats.as_dict()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+# services/patient_rules.py
+"""Validation rules for Patient records.
+
+The receptionist's register form and the bulk importer both go through
+``validate_patient`` so a record accepted by one is accepted by the other. The
+ranges mirror the ``chk_cid_length`` and ``chk_contact_length`` constraints on
+the Patient table.
+"""
+
+from datetime import date, datetime
+
+CID_DIGITS = 11
+CONTACT_DIGITS = 8
+NAME_MAX = 100
+EARLIEST_DOB = date(1900, 1, 1)
+
+DZONGKHAGS = [
+    "Thimphu", "Paro", "Punakha", "Wangdue Phodrang", "Bumthang", "Trongsa",
+    "Zhemgang", "Sarpang", "Tsirang", "Dagana", "Chhukha", "Samtse",
+    "Haa", "Mongar", "Trashigang", "Trashiyangtse", "Pemagatshel",
+    "Samdrup Jongkhar", "Lhuentse", "Gasa"
+]
+GENDERS = ["Male", "Female", "Other"]
+PATIENT_COLUMNS = ("CID_no", "name", "DOB", "gender", "contact", "address")
+
+_DZONGKHAG_LOOKUP = {d.lower(): d for d in DZONGKHAGS}
+_GENDER_LOOKUP = {g.lower(): g for g in GENDERS}
+
+
+def _digits(value, count, label):
+    text = str(value if value is not None else "").strip()
+    if text.endswith(".0"):  # numeric columns read back from CSV/Parquet as floats
+        text = text[:-2]
+    if not text.isdigit():
+        return None, f"{label} must be numeric."
+    if len(text) != count:
+        return None, f"{label} must be exactly {count} digits."
+    if int(text) < 10 ** (count - 1):  # the CHECK constraints are numeric ranges
+        return None, f"{label} cannot start with 0."
+    return int(text), None
+
+
+def _parse_dob(value, today):
+    if isinstance(value, datetime):
+        value = value.date()
+    if not isinstance(value, date):
+        try:
+            value = date.fromisoformat(str(value or "").strip()[:10])
+        except ValueError:
+            return None, "Date of birth must be YYYY-MM-DD."
+    if not EARLIEST_DOB <= value <= today:
+        return None, "Date of birth must be between 1900-01-01 and today."
+    return value, None
+
+
+def validate_patient(record, today=None):
+    """Check one patient record (a mapping keyed by PATIENT_COLUMNS).
+
+    Returns ``(row, errors)``: ``row`` is the cleaned ``(CID_no, name, DOB,
+    gender, contact, address)`` tuple ready for INSERT, or None if ``errors``
+    is non-empty.
+    """
+    errors = []
+    cid, err = _digits(record.get("CID_no"), CID_DIGITS, "CID")
+    errors += [err] if err else []
+    name = str(record.get("name") or "").strip()
+    if not name:
+        errors.append("Name cannot be empty.")
+    elif len(name) > NAME_MAX:
+        errors.append(f"Name must be at most {NAME_MAX} characters.")
+    dob, err = _parse_dob(record.get("DOB"), today or date.today())
+    errors += [err] if err else []
+    gender = _GENDER_LOOKUP.get(str(record.get("gender") or "").strip().lower())
+    if gender is None:
+        errors.append(f"Gender must be one of {', '.join(GENDERS)}.")
+    contact, err = _digits(record.get("contact"), CONTACT_DIGITS, "Contact")
+    errors += [err] if err else []
+    address = _DZONGKHAG_LOOKUP.get(str(record.get("address") or "").strip().lower())
+    if address is None:
+        errors.append("Please select a Dzongkhag.")
+    if errors:
+        return None, errors
+    return (cid, name, dob, gender, contact, address), []
@@ -0,0 +1,126 @@
+# services/patient_timeline.py
+"""A patient's longitudinal record, newest first.
+
+The record covers diagnoses, admissions, prescriptions with dose adherence,
+lab tests with their reports, and appointments. A page is one statement: a
+UNION ALL with one branch per record kind. Each branch reads at most the next
+``limit + 1`` rows of its kind from a (CID_no, date) index. A page therefore
+costs the same for a patient with ten years of records as for a new patient.
+
+Pages continue from a ``Cursor`` rather than an offset. The cursor holds the
+(date, kind, id) of the last event shown.
+
+Pages are cached per patient under ``db.cache.patient_tag(cid)``. Every
+dashboard write to a patient's records invalidates that tag, so other patients'
+cached timelines survive the write. Records without a date are not shown.
+"""
+
+import os
+from collections import namedtuple
+
+import pandas as pd
+
+from db.cache import patient_tag, query_cache
+
+PAGE_SIZE = int(os.getenv("EPIS_TIMELINE_PAGE_SIZE", "50"))
+
+# Kinds sort alphabetically among events on the same day.
+ADMISSION, APPOINTMENT, DIAGNOSIS, LAB_TEST, PRESCRIPTION = (
+    "Admission", "Appointment", "Diagnosis", "Lab Test", "Prescription"
+)
+
+TimelineEvent = namedtuple(
+    "TimelineEvent", "kind at ref_id title detail status until doctor_name given due report_id"
+)
+Cursor = namedtuple("Cursor", "at kind ref_id")
+TimelinePage = namedtuple("TimelinePage", "events next_cursor")
+
+# (kind, table, date column, id column, expressions for title .. report_id over ``x`` and Doctor ``d``)
+_BRANCHES = (
+    (ADMISSION, "Admission_to_Ward", "admit_date", "admission_id",
+     ("CONCAT('Ward ', x.ward_no)", "NULL", "x.status", "x.discharge_date", "d.name", "NULL", "NULL", "NULL")),
+    (APPOINTMENT, "Appointment", "date", "appointment_id",
+     ("'Outpatient Visit'", "LEFT(CAST(x.time AS CHAR), 5)", "x.status", "NULL", "d.name",
+      "NULL", "NULL", "NULL")),
+    (DIAGNOSIS, "Diagnosis", "date", "diagnosis_id",
+     ("x.description", "NULL", "NULL", "NULL", "d.name", "NULL", "NULL", "NULL")),
+    (LAB_TEST, "Lab_Test", "date_ordered", "test_id",
+     ("x.test_name", "NULL", "x.status", "DATE(x.reported_at)", "d.name", "NULL", "NULL",
+      "(SELECT MAX(tr.report_id) FROM Test_Report tr WHERE tr.test_id = x.test_id)")),
+    (PRESCRIPTION, "Prescription", "start_date", "prescription_id",
+     ("x.name", "CONCAT_WS(' ', x.dosage, x.frequency)", "NULL", "x.end_date", "d.name",
+      "(SELECT COUNT(*) FROM Medicine_Administration ma"
+      " WHERE ma.prescription_id = x.prescription_id AND ma.status = 'Given')",
+      "GREATEST(0, DATEDIFF(LEAST(x.end_date, CURDATE()), x.start_date) + 1)",
+      "NULL")),
+)
+
+
+def _after(kind, at, key, cursor):
+    """Predicate (and params) for this kind's rows that sort after ``cursor``."""
+    if cursor is None:
+        return "", []
+    if kind > cursor.kind:
+        return f" AND {at} <= %s", [cursor.at]
+    if kind == cursor.kind:
+        return f" AND ({at} < %s OR ({at} = %s AND {key} < %s))", [cursor.at, cursor.at, cursor.ref_id]
+    return f" AND {at} < %s", [cursor.at]
+
+
+def timeline_query(cid, cursor=None, limit=PAGE_SIZE):
+    """The page statement and its params: up to ``limit`` events sorting after ``cursor``.
+
+    Each branch takes its newest ``limit`` rows in a derived table first, so the
+    adherence and report subqueries only run for rows that can reach the page.
+    """
+    branches, params = [], []
+    for kind, table, at, key, columns in _BRANCHES:
+        after, after_params = _after(kind, at, key, cursor)
+        exprs = (f"'{kind}'", f"x.{at}", f"x.{key}") + columns
+        select = ", ".join(f"{e} AS {name}" for e, name in zip(exprs, TimelineEvent._fields))
+        branches.append(f"""
+            SELECT {select}
+            FROM (SELECT * FROM {table}
+                  WHERE CID_no = %s AND {at} IS NOT NULL{after}
+                  ORDER BY {at} DESC, {key} DESC LIMIT %s) x
+            LEFT JOIN Doctor d ON d.doctor_emp_id = x.doctor_emp_id""")
+        params += [cid, *after_params, limit]
+    sql = ("SELECT * FROM (" + "\n            UNION ALL".join(branches)
+           + "\n        ) t ORDER BY at DESC, kind, ref_id DESC LIMIT %s")
+    return sql, tuple(params + [limit])
+
+
+def load_page(conn, cid, cursor=None, limit=PAGE_SIZE):
+    """One round trip: the next ``limit`` events after ``cursor`` and the cursor for the page after."""
+    sql, params = timeline_query(cid, cursor, limit + 1)
+    with conn.cursor() as cur:
+        cur.execute(sql, params)
+        rows = [TimelineEvent._make(row) for row in cur.fetchall()]
+    events = rows[:limit]
+    more = len(rows) > limit
+    return TimelinePage(events, Cursor(events[-1].at, events[-1].kind, events[-1].ref_id) if more else None)
+
+
+def page(conn, cid, cursor=None, limit=PAGE_SIZE):
+    """``load_page`` through the shared query cache, tagged with the patient only."""
+    return query_cache.get_or_load(
+        ("TimelinePage", cid, cursor, limit), (patient_tag(cid),),
+        lambda: load_page(conn, cid, cursor, limit)
+    )
+
+
+def timeline_frame(events):
+    """Display table: one row per event, with adherence as a percentage of doses due so far."""
+    df = pd.DataFrame(events, columns=TimelineEvent._fields)
+    due = df["due"].astype("float64")
+    adherence = (100 * df["given"].astype("float64") / due.where(due > 0)).round()
+    return pd.DataFrame({
+        "Date": df["at"],
+        "Record": df["kind"],
+        "Title": df["title"],
+        "Details": df["detail"],
+        "Status": df["status"],
+        "Until": df["until"],
+        "Doctor": df["doctor_name"],
+        "Doses Given": adherence.astype("Int64").astype("string") + "%",
+    })
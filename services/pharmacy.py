@@ -0,0 +1,361 @@
+# services/pharmacy.py
+"""Pharmacy stock: receipts, dispensing, expiry write-offs and a demand forecast.
+
+Stock is held per batch in ``Stock_Batch`` and per medicine in
+``Medicine_Stock``. Every movement appends a ``Stock_Ledger`` row carrying the
+medicine's balance after it, and adjusts both counters in the same
+transaction. The current stock is therefore a primary-key read, and the
+ledger is history that is never summed on a read path. Ledger rows are only
+ever inserted.
+
+``dispense`` fills several prescriptions at once in a fixed number of
+statements. It takes the earliest-expiring batches first and refuses the whole
+batch of lines if any medicine is short. Rows are locked in one order
+everywhere: prescriptions by id, then ``Medicine_Stock`` by name, then the
+batches. Concurrent dispenses and receipts therefore wait for each other
+rather than deadlock.
+
+A prescription row is one timing, so it calls for one unit on each day of its
+course. ``dosage`` is the strength, and stock is counted in units of a
+medicine name. The forecast counts the units that running prescriptions call
+for each day, using the same difference arrays as the ward census.
+
+Functions here never commit; the caller commits or rolls back.
+"""
+
+import os
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+FORECAST_DAYS = int(os.getenv("EPIS_PHARMACY_FORECAST_DAYS", "28"))
+EXPIRY_WARNING_DAYS = int(os.getenv("EPIS_PHARMACY_EXPIRY_DAYS", "60"))
+
+RECEIPT, DISPENSE, EXPIRED = "Receipt", "Dispense", "Expired"
+
+DispenseItem = namedtuple("DispenseItem", "prescription_id quantity")
+# One batch's share of a dispense line, with the medicine's balance after it.
+Allocation = namedtuple("Allocation", "prescription_id medicine_name batch_id quantity balance_after")
+
+_INSERT_DISPENSE = """
+    INSERT INTO Medicine_Dispense
+        (medicine_name, quantity, dispense_date, prescription_id, pharmacist_emp_id, batch_id)
+    VALUES (%s, %s, %s, %s, %s, %s)
+"""
+
+_INSERT_LEDGER = """
+    INSERT INTO Stock_Ledger
+        (medicine_name, batch_id, change_qty, balance_after, reason, dispense_id, pharmacist_emp_id, created_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+DEMAND_SQL = """
+    SELECT name, start_date, end_date FROM Prescription
+    WHERE end_date >= %s AND start_date <= %s
+"""
+
+
+class InvalidStockMovement(ValueError):
+    """Raised for a receipt or dispense line that cannot be applied, before anything is written."""
+
+
+class InsufficientStock(Exception):
+    """Raised when unexpired stock cannot cover a dispense; ``short`` maps medicine -> units missing."""
+
+    def __init__(self, short):
+        self.short = short
+        super().__init__("Not enough stock: " + ", ".join(f"{name} (short {qty})" for name, qty in short.items()))
+
+
+def _placeholders(values):
+    return ", ".join(["%s"] * len(values))
+
+
+def _lock_stock(cur, names):
+    """Lock the medicines' stock rows in name order; returns ``{name: on_hand}``."""
+    names = sorted(names)
+    cur.execute(f"""
+        SELECT medicine_name, on_hand FROM Medicine_Stock
+        WHERE medicine_name IN ({_placeholders(names)})
+        ORDER BY medicine_name FOR UPDATE
+    """, tuple(names))
+    return dict(cur.fetchall())
+
+
+def _take_down(cur, table, key, quantities):
+    """Subtract ``{key value: quantity}`` from ``table.on_hand`` in one UPDATE."""
+    keys = list(quantities)
+    cases = " ".join(["WHEN %s THEN %s"] * len(keys))
+    cur.execute(f"""
+        UPDATE {table} SET on_hand = on_hand - CASE {key} {cases} END
+        WHERE {key} IN ({_placeholders(keys)})
+    """, (*(v for k in keys for v in (k, quantities[k])), *keys))
+
+
+def fefo_batches_query(names, day):
+    """``(sql, params)`` locking the medicines' unexpired batches with stock, earliest expiry first."""
+    return f"""
+        SELECT batch_id, medicine_name, on_hand FROM Stock_Batch
+        WHERE medicine_name IN ({_placeholders(names)}) AND expiry_date >= %s AND on_hand > 0
+        ORDER BY medicine_name, expiry_date, batch_id FOR UPDATE
+    """, (*names, day)
+
+
+# ----------------- Receipts -----------------
+def receive(conn, pharmacist_id, medicine_name, batch_no, expiry_date, quantity, at=None):
+    """Add ``quantity`` units of a batch to stock; returns the medicine's new balance.
+
+    Receiving more of a known batch tops it up and keeps its expiry date.
+    """
+    name, batch_no = (medicine_name or "").strip(), (batch_no or "").strip()
+    if not name or not batch_no:
+        raise InvalidStockMovement("A receipt needs a medicine name and a batch number.")
+    if quantity <= 0:
+        raise InvalidStockMovement("Received quantity must be positive.")
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO Medicine_Stock (medicine_name, on_hand) VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE on_hand = on_hand + VALUES(on_hand)
+        """, (name, quantity))
+        cur.execute("SELECT on_hand FROM Medicine_Stock WHERE medicine_name = %s", (name,))
+        balance = cur.fetchone()[0]
+        cur.execute("""
+            INSERT INTO Stock_Batch (medicine_name, batch_no, expiry_date, on_hand) VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE batch_id = LAST_INSERT_ID(batch_id), on_hand = on_hand + VALUES(on_hand)
+        """, (name, batch_no, expiry_date, quantity))
+        batch_id = cur.lastrowid
+        cur.execute(_INSERT_LEDGER, (name, batch_id, quantity, balance, RECEIPT, None, pharmacist_id,
+                                     at or datetime.now()))
+    return balance
+
+
+def set_reorder_level(conn, medicine_name, level):
+    """Set the level at or below which a medicine is on the low-stock watchlist."""
+    if level < 0:
+        raise InvalidStockMovement("Reorder level cannot be negative.")
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO Medicine_Stock (medicine_name, reorder_level) VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE reorder_level = VALUES(reorder_level)
+        """, (medicine_name.strip(), level))
+
+
+# ----------------- Dispensing -----------------
+def allocate(lines, stock, batches):
+    """Split dispense lines across batches, earliest expiry first.
+
+    ``lines`` are ``(prescription_id, medicine_name, quantity)``; ``stock`` maps
+    medicine -> units on hand; ``batches`` are ``(batch_id, medicine_name,
+    on_hand)`` in expiry order. Returns Allocations, or raises InsufficientStock
+    naming every short medicine.
+    """
+    queues = {}
+    for batch_id, name, on_hand in batches:
+        queues.setdefault(name, []).append([batch_id, on_hand])
+    needed = {}
+    for _, name, quantity in lines:
+        needed[name] = needed.get(name, 0) + quantity
+    available = {name: sum(q for _, q in queues.get(name, [])) for name in needed}
+    short = {name: qty - available[name] for name, qty in needed.items() if qty > available[name]}
+    if short:
+        raise InsufficientStock(short)
+
+    balances = {name: stock.get(name, 0) for name in needed}
+    allocations = []
+    for prescription_id, name, quantity in lines:
+        queue = queues[name]
+        while quantity:
+            batch = queue[0]
+            take = min(quantity, batch[1])
+            batch[1] -= take
+            quantity -= take
+            balances[name] -= take
+            allocations.append(Allocation(prescription_id, name, batch[0], take, balances[name]))
+            if not batch[1]:
+                queue.pop(0)
+    return allocations
+
+
+def dispense(conn, pharmacist_id, items, day=None, at=None):
+    """Dispense several prescriptions in the caller's transaction; returns the Allocations.
+
+    Each line may not exceed what its prescription still calls for. Raises
+    InvalidStockMovement or InsufficientStock before anything is written. Eight
+    statements however many lines there are.
+    """
+    day = day or date.today()
+    quantities = {}
+    for item in items:
+        if item.quantity <= 0:
+            raise InvalidStockMovement(f"Quantity for prescription {item.prescription_id} must be positive.")
+        quantities[item.prescription_id] = quantities.get(item.prescription_id, 0) + item.quantity
+    if not quantities:
+        raise InvalidStockMovement("Nothing to dispense.")
+    ids = sorted(quantities)
+
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            SELECT pr.prescription_id, pr.name, DATEDIFF(pr.end_date, pr.start_date) + 1
+                   - COALESCE((SELECT SUM(md.quantity) FROM Medicine_Dispense md
+                               WHERE md.prescription_id = pr.prescription_id), 0)
+            FROM Prescription pr
+            WHERE pr.prescription_id IN ({_placeholders(ids)})
+            ORDER BY pr.prescription_id FOR UPDATE
+        """, tuple(ids))
+        outstanding = {pid: (name, int(left)) for pid, name, left in cur.fetchall()}
+        lines = []
+        for pid in ids:
+            if pid not in outstanding:
+                raise InvalidStockMovement(f"Prescription {pid} does not exist.")
+            name, left = outstanding[pid]
+            if quantities[pid] > left:
+                raise InvalidStockMovement(f"Prescription {pid} ({name}) has {max(left, 0)} unit(s) left to dispense.")
+            lines.append((pid, name, quantities[pid]))
+
+        names = sorted({name for _, name, _ in lines})
+        stock = _lock_stock(cur, names)
+        cur.execute(*fefo_batches_query(names, day))
+        allocations = allocate(lines, stock, cur.fetchall())
+
+        cur.executemany(_INSERT_DISPENSE, [
+            (a.medicine_name, a.quantity, day, a.prescription_id, pharmacist_id, a.batch_id) for a in allocations
+        ])
+        # Counters are taken down by the allocated quantities, never by an id
+        # range: with auto_increment_increment > 1 the new ids are not
+        # consecutive and a range could take in other sessions' dispenses.
+        by_batch, by_medicine = {}, {}
+        for a in allocations:
+            by_batch[a.batch_id] = by_batch.get(a.batch_id, 0) + a.quantity
+            by_medicine[a.medicine_name] = by_medicine.get(a.medicine_name, 0) + a.quantity
+        _take_down(cur, "Stock_Batch", "batch_id", by_batch)
+        _take_down(cur, "Medicine_Stock", "medicine_name", by_medicine)
+
+        # Each (prescription, batch) appears once per call, and the prescriptions
+        # are locked, so the newest row per pair from this insert on is ours.
+        cur.execute(f"""
+            SELECT prescription_id, batch_id, MAX(dispense_id) FROM Medicine_Dispense
+            WHERE prescription_id IN ({_placeholders(ids)}) AND dispense_date = %s AND dispense_id >= %s
+            GROUP BY prescription_id, batch_id
+        """, (*ids, day, cur.lastrowid))
+        dispense_ids = {(pid, batch_id): dispense_id for pid, batch_id, dispense_id in cur.fetchall()}
+        timestamp = at or datetime.now()
+        cur.executemany(_INSERT_LEDGER, [
+            (a.medicine_name, a.batch_id, -a.quantity, a.balance_after, DISPENSE,
+             dispense_ids.get((a.prescription_id, a.batch_id)), pharmacist_id, timestamp)
+            for a in allocations
+        ])
+    return allocations
+
+
+# ----------------- Expiry -----------------
+def write_off_expired(conn, pharmacist_id, day=None, at=None):
+    """Take every batch that expired before ``day`` (default today) out of stock; returns units written off."""
+    day = day or date.today()
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT DISTINCT medicine_name FROM Stock_Batch WHERE expiry_date < %s AND on_hand > 0
+        """, (day,))
+        names = [row[0] for row in cur.fetchall()]
+        if not names:
+            return 0
+        stock = _lock_stock(cur, names)
+        cur.execute(f"""
+            SELECT batch_id, medicine_name, on_hand FROM Stock_Batch
+            WHERE medicine_name IN ({_placeholders(names)}) AND expiry_date < %s AND on_hand > 0
+            ORDER BY medicine_name, expiry_date, batch_id FOR UPDATE
+        """, (*sorted(names), day))
+        batches = cur.fetchall()
+        if not batches:
+            return 0
+        ledger, timestamp = [], at or datetime.now()
+        for batch_id, name, on_hand in batches:
+            stock[name] -= on_hand
+            ledger.append((name, batch_id, -on_hand, stock[name], EXPIRED, None, pharmacist_id, timestamp))
+
+        batch_ids = [b[0] for b in batches]
+        cur.execute(f"""
+            UPDATE Medicine_Stock s
+            JOIN (SELECT medicine_name, SUM(on_hand) AS qty FROM Stock_Batch
+                  WHERE batch_id IN ({_placeholders(batch_ids)}) GROUP BY medicine_name) b
+              ON b.medicine_name = s.medicine_name
+            SET s.on_hand = s.on_hand - b.qty
+        """, tuple(batch_ids))
+        cur.execute(f"UPDATE Stock_Batch SET on_hand = 0 WHERE batch_id IN ({_placeholders(batch_ids)})",
+                    tuple(batch_ids))
+        cur.executemany(_INSERT_LEDGER, ledger)
+    return sum(b[2] for b in batches)
+
+
+# ----------------- Forecast -----------------
+def load_demand(conn, start, end):
+    """Prescriptions running at some point in ``[start, end]`` as ``(name, start_date, end_date)``."""
+    with conn.cursor() as cur:
+        cur.execute(DEMAND_SQL, (start, end))
+        rows = cur.fetchall()
+    return demand_frame(rows)
+
+
+def demand_frame(rows):
+    df = pd.DataFrame(rows, columns=["name", "start_date", "end_date"])
+    df["start_date"] = pd.to_datetime(df["start_date"])
+    df["end_date"] = pd.to_datetime(df["end_date"])
+    return df
+
+
+def daily_demand(prescriptions, start, end):
+    """Units due per medicine for each day in ``[start, end]``, as a date-indexed DataFrame."""
+    days = (end - start).days + 1
+    index = pd.date_range(start, end, freq="D")
+    if prescriptions.empty or days <= 0:
+        return pd.DataFrame(index=index, dtype="int64")
+    names, name_idx = np.unique(prescriptions["name"].to_numpy(), return_inverse=True)
+    origin = np.datetime64(start, "D")
+    first = (prescriptions["start_date"].to_numpy("datetime64[D]") - origin).astype("int64")
+    last = (prescriptions["end_date"].to_numpy("datetime64[D]") - origin).astype("int64") + 1
+    first, last = np.clip(first, 0, days), np.clip(last, 0, days)
+    valid = last > first
+
+    diff = np.zeros((len(names), days + 1), dtype="int64")
+    np.add.at(diff, (name_idx[valid], first[valid]), 1)
+    np.add.at(diff, (name_idx[valid], last[valid]), -1)
+    return pd.DataFrame(diff.cumsum(axis=1)[:, :days].T, index=index, columns=names)
+
+
+def forecast(demand, stock):
+    """Per medicine: units on hand, units due over the horizon, days of cover and the shortfall.
+
+    ``stock`` maps medicine -> units on hand. ``days_of_cover`` is how many
+    whole days the stock lasts (NaN if it outlasts the horizon), and
+    ``stockout_date`` the first day it does not cover.
+    """
+    names = sorted(set(demand.columns) | set(stock))
+    demand = demand.reindex(columns=names, fill_value=0)
+    on_hand = pd.Series({name: stock.get(name, 0) for name in names}, dtype="int64")
+    cumulative = demand.cumsum().to_numpy()
+    runs_out = cumulative > on_hand.to_numpy()
+    covered = np.where(runs_out.any(axis=0), runs_out.argmax(axis=0), -1)
+    due = demand.sum().astype("int64")
+    out = pd.DataFrame({
+        "on_hand": on_hand,
+        "due": due,
+        "per_day": (due / max(len(demand), 1)).round(1),
+        "days_of_cover": pd.Series(covered, index=names, dtype="float64"),
+        "stockout_date": pd.Series(demand.index.take(covered.clip(0), allow_fill=False)
+                                   if len(demand) else pd.NaT, index=names),
+        "shortfall": (due - on_hand).clip(lower=0),
+    })
+    gone = covered < 0
+    out.loc[gone, "days_of_cover"] = np.nan
+    out.loc[gone, "stockout_date"] = pd.NaT
+    out.index.name = "medicine_name"
+    return out.sort_values(["days_of_cover", "medicine_name"], na_position="last")
+
+
+def stock_forecast(conn, stock, start=None, days=FORECAST_DAYS):
+    """``forecast`` for the ``days`` from ``start`` (default today) against ``stock``."""
+    start = start or date.today()
+    end = start + timedelta(days=days - 1)
+    return forecast(daily_demand(load_demand(conn, start, end), start, end), stock)
@@ -0,0 +1,95 @@
+# services/prescriptions.py
+"""Prescription orders.
+
+An order is everything a doctor prescribes for one admitted patient at once:
+several medicines, each with one or more timings. ``place_order`` checks the
+admission, writes one ``Prescription`` row per medicine and timing as a single
+multi-row INSERT, and schedules the doses, all in the caller's transaction. A
+ten-medicine discharge regimen therefore costs three statements, not dozens.
+
+Functions here never commit; the caller commits or rolls back the whole order.
+"""
+
+from collections import namedtuple
+
+from services.med_schedule import SLOTS, schedule_doses
+
+OrderItem = namedtuple("OrderItem", "name dosage start_date end_date frequencies")
+OrderResult = namedtuple("OrderResult", "prescription_ids admission_id doses")
+
+_INSERT_PRESCRIPTION = """
+    INSERT INTO Prescription (name, dosage, start_date, end_date, frequency, doctor_emp_id, CID_no)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+class InvalidOrder(ValueError):
+    """Raised when an order line is incomplete or inconsistent."""
+
+
+class NotAdmitted(Exception):
+    """Raised when the patient has no active admission."""
+
+
+def order_rows(items):
+    """Validate ``items`` and return one ``(name, dosage, start, end, slot)`` tuple per timing."""
+    rows, seen = [], set()
+    for item in items:
+        name = (item.name or "").strip()
+        if not name:
+            raise InvalidOrder("Every medicine needs a name.")
+        if not item.frequencies:
+            raise InvalidOrder(f"Select at least one timing for {name}.")
+        if item.end_date < item.start_date:
+            raise InvalidOrder(f"End date is before start date for {name}.")
+        for freq in item.frequencies:
+            slot = freq.strip().capitalize()
+            if slot not in SLOTS:
+                raise InvalidOrder(f"Unknown timing {freq!r} for {name}.")
+            row = (name, (item.dosage or "").strip(), item.start_date, item.end_date, slot)
+            if row not in seen:
+                seen.add(row)
+                rows.append(row)
+    if not rows:
+        raise InvalidOrder("The order has no medicines.")
+    return rows
+
+
+def place_order(conn, cid, doctor_id, items):
+    """Write a whole prescription order for an admitted patient; returns an OrderResult.
+
+    The admission row is read with a shared lock so a concurrent discharge waits
+    for the order to commit. Raises NotAdmitted or InvalidOrder before anything
+    is written.
+    """
+    rows = order_rows(items)
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT admission_id, nurse_emp_id, @@auto_increment_increment FROM Admission_to_Ward
+            WHERE CID_no = %s AND status = 'Admitted'
+            ORDER BY admission_id DESC LIMIT 1
+            LOCK IN SHARE MODE
+        """, (cid,))
+        admission = cur.fetchone()
+        if admission is None:
+            raise NotAdmitted(f"Patient {cid} is not admitted.")
+        admission_id, nurse_id, increment = admission
+
+        params = [row + (doctor_id, cid) for row in rows]
+        if increment == 1:
+            # mysql.connector turns this into one multi-row INSERT; InnoDB hands a
+            # simple multi-row insert consecutive ids starting at lastrowid.
+            cur.executemany(_INSERT_PRESCRIPTION, params)
+            ids = list(range(cur.lastrowid, cur.lastrowid + len(rows)))
+        else:
+            # Multi-primary setups step ids by more than one; take each id as it comes.
+            ids = []
+            for row in params:
+                cur.execute(_INSERT_PRESCRIPTION, row)
+                ids.append(cur.lastrowid)
+
+    doses = schedule_doses(conn, [
+        (rx_id, cid, slot, start, end, admission_id, nurse_id)
+        for rx_id, (_, _, start, end, slot) in zip(ids, rows)
+    ])
+    return OrderResult(ids, admission_id, doses)
@@ -0,0 +1,169 @@
+# services/report_storage.py
+"""Content-addressed storage for lab report files.
+
+Files are stored under the SHA-256 of their content, so two uploads of the same
+PDF share one object and two different PDFs with the same name never overwrite
+each other. Uploads are streamed through the hash in fixed-size chunks and
+only become visible once complete. ``Test_Report.file_path`` holds the storage
+key; rows uploaded before this module existed keep their plain ``reports/<name>``
+path and are served from disk as before.
+
+Backends implement ``ReportStorage``. ``LocalFileStorage`` is the default;
+``InMemoryStorage`` stands in for an object store in tests.
+"""
+
+import hashlib
+import io
+import os
+import tempfile
+from collections import namedtuple
+
+CHUNK_SIZE = 1024 * 1024
+REPORT_DIR = os.getenv("EPIS_REPORT_DIR", "reports")
+BACKEND = os.getenv("EPIS_REPORT_STORAGE", "local")
+
+StoredObject = namedtuple("StoredObject", "key size sha256 created")
+
+
+def iter_chunks(fileobj, chunk_size=CHUNK_SIZE):
+    """Yield ``fileobj`` in chunks without reading it whole."""
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def object_key(sha256, suffix=""):
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}{suffix}"
+
+
+class ReportStorage:
+    """Interface for report backends."""
+
+    def put(self, chunks, suffix=""):
+        """Store an iterable of byte chunks; returns a StoredObject."""
+        raise NotImplementedError
+
+    def open(self, key):
+        """Return a readable binary file object for ``key``."""
+        raise NotImplementedError
+
+    def exists(self, key):
+        raise NotImplementedError
+
+    def read_chunks(self, key, chunk_size=CHUNK_SIZE):
+        with self.open(key) as f:
+            yield from iter_chunks(f, chunk_size)
+
+
+class LocalFileStorage(ReportStorage):
+    def __init__(self, root=REPORT_DIR):
+        self.root = root
+
+    def _path(self, key):
+        path = os.path.normpath(os.path.join(self.root, key))
+        if not path.startswith(os.path.normpath(self.root) + os.sep):
+            raise ValueError(f"Invalid storage key: {key!r}")
+        return path
+
+    def put(self, chunks, suffix=""):
+        os.makedirs(self.root, exist_ok=True)
+        digest, size = hashlib.sha256(), 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    tmp.write(chunk)
+                    size += len(chunk)
+            sha = digest.hexdigest()
+            key = object_key(sha, suffix)
+            final = self._path(key)
+            if os.path.exists(final):
+                os.remove(tmp_path)  # identical content already stored
+                return StoredObject(key, size, sha, False)
+            os.makedirs(os.path.dirname(final), exist_ok=True)
+            os.replace(tmp_path, final)
+            return StoredObject(key, size, sha, True)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def open(self, key):
+        return open(self._path(key), "rb")
+
+    def exists(self, key):
+        return os.path.exists(self._path(key))
+
+
+class InMemoryStorage(ReportStorage):
+    """Object-store stand-in: keeps objects in a dict."""
+
+    def __init__(self):
+        self.objects = {}
+
+    def put(self, chunks, suffix=""):
+        digest, buf = hashlib.sha256(), io.BytesIO()
+        for chunk in chunks:
+            digest.update(chunk)
+            buf.write(chunk)
+        sha = digest.hexdigest()
+        key = object_key(sha, suffix)
+        created = key not in self.objects
+        if created:
+            self.objects[key] = buf.getvalue()
+        return StoredObject(key, buf.tell(), sha, created)
+
+    def open(self, key):
+        return io.BytesIO(self.objects[key])
+
+    def exists(self, key):
+        return key in self.objects
+
+
+BACKENDS = {"local": LocalFileStorage, "memory": InMemoryStorage}
+_storage = None
+
+
+def get_storage():
+    """Process-wide backend selected by EPIS_REPORT_STORAGE."""
+    global _storage
+    if _storage is None:
+        _storage = BACKENDS[BACKEND]()
+    return _storage
+
+
+def open_report(report, storage=None):
+    """Open a Test_Report row's file: by storage key, or by legacy path for old rows."""
+    if report.get("content_sha256"):
+        return (storage or get_storage()).open(report["file_path"])
+    return open(report["file_path"], "rb")
+
+
+def report_available(report, storage=None):
+    if report.get("content_sha256"):
+        return (storage or get_storage()).exists(report["file_path"])
+    return os.path.exists(report["file_path"])
+
+
+def store_report(conn, test_id, technician_id, fileobj, original_name, storage=None):
+    """Stream an uploaded file into storage and insert its Test_Report row; returns report_id.
+
+    Does not commit. Re-uploading identical content reuses the stored object.
+    """
+    suffix = os.path.splitext(original_name or "")[1].lower()
+    stored = (storage or get_storage()).put(iter_chunks(fileobj), suffix=suffix)
+    with conn.cursor() as cur:
+        cur.execute(
+            "INSERT INTO Test_Report (file_path, date_uploaded, test_id, technician_emp_id, "
+            "content_sha256, size_bytes, original_name) VALUES (%s, CURDATE(), %s, %s, %s, %s, %s)",
+            (stored.key, test_id, technician_id, stored.sha256, stored.size, original_name)
+        )
+        return cur.lastrowid
+
+
+def download_name(report):
+    """File name offered to the browser for a Test_Report row."""
+    return report.get("original_name") or os.path.basename(report["file_path"])
@@ -0,0 +1,33 @@
+# services/schedule_grid.py
+"""Reshape scheduled-dose records into the nurse's patient x medication x slot grid."""
+
+import pandas as pd
+
+from services.med_schedule import SLOTS
+
+GRID_INDEX = ["patient_id", "patient_name", "medication_name", "dosage"]
+
+
+def build_schedule_grid(records):
+    """Return one row per (patient, medication) with a Morning/Afternoon/Evening status column.
+
+    ``records`` is a DataFrame (or list of dicts) with the ``GRID_INDEX`` columns plus
+    ``frequency`` (the slot) and ``status``. Prescribed slots without a status show
+    "Pending"; slots that were never prescribed are left blank. The reshape is a
+    single ``unstack`` so cost grows with the number of records, not its square.
+    """
+    df = records if isinstance(records, pd.DataFrame) else pd.DataFrame(records)
+    if df.empty:
+        return pd.DataFrame(columns=GRID_INDEX + list(SLOTS))
+
+    keyed = df.drop_duplicates(GRID_INDEX + ["frequency"]).set_index(GRID_INDEX + ["frequency"])
+    grid = (
+        keyed["status"]
+        .fillna("Pending")
+        .unstack("frequency")
+        .reindex(columns=list(SLOTS))
+        .fillna("")
+        .reset_index()
+    )
+    grid.columns.name = None
+    return grid
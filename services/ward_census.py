@@ -0,0 +1,342 @@
+# services/ward_census.py
+"""Ward census: discharges, live occupancy, daily snapshots and stay analytics.
+
+``Ward_Occupancy`` holds one counter per ward. Admitting and discharging adjust
+it in the same transaction, and a patient has at most one active admission, so
+the current census is a primary-key read.
+``snapshot`` writes a day's ``Ward_Census_Daily`` rows from the previous day's
+snapshot plus that day's admissions and discharges. Both counts are index
+ranges on one date, so the nightly job never scans ``Admission_to_Ward``.
+
+The analytics work on the stays that overlap a date range (``load_stays``),
+never on the whole table. ``occupancy_series`` and ``daily_flows`` turn them
+into per-day, per-ward arrays with NumPy difference arrays, and
+``length_of_stay`` summarises completed stays with pandas group-bys. A patient
+counts towards a day's census if admitted on or before it and not yet
+discharged by the end of it, i.e. on days ``[admit_date, discharge_date)``.
+
+Functions that write never commit; the caller commits or rolls back.
+
+    python -m services.ward_census snapshot [--date 2025-01-31]
+    python -m services.ward_census backfill --since 2023-01-01
+"""
+
+import argparse
+import sys
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from services import med_schedule
+from services.prescriptions import NotAdmitted
+
+LOS_PERCENTILES = (0.5, 0.9)
+
+STAYS_SQL = """
+    SELECT admission_id, ward_no, admit_date, discharge_date FROM Admission_to_Ward
+    WHERE discharge_date >= %s AND admit_date <= %s AND ward_no IS NOT NULL
+    UNION ALL
+    SELECT admission_id, ward_no, admit_date, discharge_date FROM Admission_to_Ward
+    WHERE discharge_date IS NULL AND admit_date <= %s AND ward_no IS NOT NULL
+"""
+
+ACTIVE_ADMISSION_LOCK_SQL = """
+    SELECT admission_id, ward_no FROM Admission_to_Ward
+    WHERE CID_no = %s AND status = 'Admitted' FOR UPDATE
+"""
+
+CENSUS_RANGE_SQL = """
+    SELECT census_date, ward_no, occupied, admissions, discharges FROM Ward_Census_Daily
+    WHERE census_date BETWEEN %s AND %s ORDER BY census_date, ward_no
+"""
+
+_UPSERT_CENSUS = """
+    INSERT INTO Ward_Census_Daily (census_date, ward_no, occupied, admissions, discharges)
+    VALUES (%s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        occupied = VALUES(occupied), admissions = VALUES(admissions), discharges = VALUES(discharges)
+"""
+
+
+class InvalidDischarge(ValueError):
+    """Raised when the discharge date is before the admission date."""
+
+
+class AlreadyAdmitted(Exception):
+    """Raised when admitting a patient who already has an active admission."""
+
+
+# ----------------- Occupancy counters -----------------
+def adjust_occupancy(conn, ward_no, delta):
+    """Add ``delta`` patients to a ward's live counter (creating it on first use)."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO Ward_Occupancy (ward_no, occupied) VALUES (%s, GREATEST(%s, 0))
+            ON DUPLICATE KEY UPDATE occupied = GREATEST(occupied + %s, 0)
+        """, (ward_no, delta, delta))
+
+
+def rebuild_occupancy(conn):
+    """Recount every ward's counter from the admissions table (repair tool; scans it once)."""
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM Ward_Occupancy")
+        cur.execute("""
+            INSERT INTO Ward_Occupancy (ward_no, occupied)
+            SELECT ward_no, COUNT(*) FROM Admission_to_Ward
+            WHERE status = 'Admitted' AND ward_no IS NOT NULL
+            GROUP BY ward_no
+        """)
+        return cur.rowcount
+
+
+def admit(conn, cid, ward_no, doctor_id, nurse_id=None, admit_date=None):
+    """Admit a patient to a ward; returns the new admission id.
+
+    The patient's active admission is looked up with a locking read first (a
+    gap lock on ``idx_admission_cid_status`` when there is none), so submitting
+    the admit form twice cannot open two stays or count the patient twice in
+    ``Ward_Occupancy``. Raises AlreadyAdmitted before anything is written.
+    """
+    with conn.cursor() as cur:
+        cur.execute(ACTIVE_ADMISSION_LOCK_SQL, (cid,))
+        active = cur.fetchall()
+        if active:
+            raise AlreadyAdmitted(f"Patient {cid} is already admitted to ward {active[0][1]}.")
+        cur.execute("""
+            INSERT INTO Admission_to_Ward
+            (admit_date, ward_no, status, CID_no, doctor_emp_id, nurse_emp_id)
+            VALUES (%s, %s, 'Admitted', %s, %s, %s)
+        """, (admit_date or date.today(), ward_no, cid, doctor_id, nurse_id or None))
+        admission_id = cur.lastrowid
+    adjust_occupancy(conn, ward_no, 1)
+    # Doses already scheduled for the patient move to this stay's nurse round.
+    med_schedule.attach_admission(conn, cid, admission_id, nurse_id or None, admit_date or date.today())
+    return admission_id
+
+
+def discharge(conn, admission_id, day=None):
+    """Discharge an admission on ``day`` (default today); returns its ward number.
+
+    The admission row is locked first, so a concurrent prescription order (which
+    reads it in share mode) either commits before the discharge or sees it.
+    Pending doses scheduled after the discharge day are removed from the ward
+    round. Raises NotAdmitted or InvalidDischarge before anything is written.
+    """
+    day = day or date.today()
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT ward_no, admit_date, status FROM Admission_to_Ward
+            WHERE admission_id = %s FOR UPDATE
+        """, (admission_id,))
+        row = cur.fetchone()
+        if row is None or row[2] != "Admitted":
+            raise NotAdmitted(f"Admission {admission_id} is not active.")
+        ward_no, admit_date, _ = row
+        if admit_date is not None and day < admit_date:
+            raise InvalidDischarge(f"Discharge date {day} is before the admission on {admit_date}.")
+
+        cur.execute("""
+            UPDATE Admission_to_Ward SET status = 'Discharged', discharge_date = %s
+            WHERE admission_id = %s
+        """, (day, admission_id))
+        cur.execute("""
+            DELETE FROM Medication_Schedule
+            WHERE admission_id = %s AND dose_date > %s AND status = 'Pending'
+        """, (admission_id, day))
+    if ward_no is not None:
+        adjust_occupancy(conn, ward_no, -1)
+    return ward_no
+
+
+# ----------------- Daily snapshots -----------------
+def counts_on_query(column, day):
+    """``(sql, params)`` counting the admissions whose ``column`` date is ``day``, per ward."""
+    return (f"SELECT ward_no, COUNT(*) FROM Admission_to_Ward WHERE {column} = %s "
+            f"AND ward_no IS NOT NULL GROUP BY ward_no", (day,))
+
+
+def _counts_on(cur, column, day):
+    cur.execute(*counts_on_query(column, day))
+    return dict(cur.fetchall())
+
+
+def snapshot(conn, day=None):
+    """Write ``Ward_Census_Daily`` for ``day`` (default yesterday); returns the number of wards.
+
+    Rolls the previous day's snapshot forward with the day's admissions and
+    discharges. Without a previous snapshot the day is backfilled instead.
+    """
+    day = day or date.today() - timedelta(days=1)
+    with conn.cursor() as cur:
+        cur.execute("SELECT ward_no, occupied FROM Ward_Census_Daily WHERE census_date = %s",
+                    (day - timedelta(days=1),))
+        previous = dict(cur.fetchall())
+        if not previous:
+            return backfill(conn, day, day)
+        admissions = _counts_on(cur, "admit_date", day)
+        discharges = _counts_on(cur, "discharge_date", day)
+        rows = [
+            (day, ward, previous.get(ward, 0) + admissions.get(ward, 0) - discharges.get(ward, 0),
+             admissions.get(ward, 0), discharges.get(ward, 0))
+            for ward in sorted(set(previous) | set(admissions) | set(discharges))
+        ]
+        cur.executemany(_UPSERT_CENSUS, rows)
+    return len(rows)
+
+
+def backfill(conn, start, end=None):
+    """Recompute ``Ward_Census_Daily`` for every day in ``[start, end]``; returns the rows written."""
+    end = end or date.today() - timedelta(days=1)
+    frame = census_frame(load_stays(conn, start, end), start, end)
+    rows = [(d.date(), int(w), int(o), int(a), int(x)) for d, w, o, a, x in frame.itertuples(index=False)]
+    if rows:
+        with conn.cursor() as cur:
+            cur.executemany(_UPSERT_CENSUS, rows)
+    return len(rows)
+
+
+def census(conn, start, end):
+    """Stored daily census rows in ``[start, end]`` as a DataFrame."""
+    with conn.cursor() as cur:
+        cur.execute(CENSUS_RANGE_SQL, (start, end))
+        rows = cur.fetchall()
+    return pd.DataFrame(rows, columns=["census_date", "ward_no", "occupied", "admissions", "discharges"])
+
+
+# ----------------- Analytics -----------------
+def load_stays(conn, start, end):
+    """Stays that overlap ``[start, end]`` as a DataFrame (``discharge_date`` NaT while admitted)."""
+    with conn.cursor() as cur:
+        cur.execute(STAYS_SQL, (start, end, end))
+        rows = cur.fetchall()
+    return stays_frame(rows)
+
+
+def stays_frame(rows):
+    """DataFrame from ``(admission_id, ward_no, admit_date, discharge_date)`` tuples."""
+    stays = pd.DataFrame(rows, columns=["admission_id", "ward_no", "admit_date", "discharge_date"])
+    stays["ward_no"] = stays["ward_no"].astype("int64")
+    stays["admit_date"] = pd.to_datetime(stays["admit_date"])
+    stays["discharge_date"] = pd.to_datetime(stays["discharge_date"])
+    return stays
+
+
+def _day_offsets(dates, start, fill):
+    """Days from ``start`` for a datetime column; missing dates become ``fill``."""
+    offsets = (dates.to_numpy("datetime64[D]") - np.datetime64(start, "D")).astype("int64")
+    return np.where(dates.isna().to_numpy(), fill, offsets)
+
+
+def occupancy_series(stays, start, end):
+    """End-of-day patients per ward for each day in ``[start, end]``.
+
+    Returns a DataFrame indexed by date with one column per ward.
+    """
+    days = (end - start).days + 1
+    index = pd.date_range(start, end, freq="D")
+    if stays.empty or days <= 0:
+        return pd.DataFrame(index=index, dtype="int64")
+    wards, ward_idx = np.unique(stays["ward_no"].to_numpy(), return_inverse=True)
+    first = np.clip(_day_offsets(stays["admit_date"], start, 0), 0, days)
+    last = np.clip(_day_offsets(stays["discharge_date"], start, days), 0, days)
+    valid = last > first
+
+    diff = np.zeros((len(wards), days + 1), dtype="int64")
+    np.add.at(diff, (ward_idx[valid], first[valid]), 1)
+    np.add.at(diff, (ward_idx[valid], last[valid]), -1)
+    return pd.DataFrame(diff.cumsum(axis=1)[:, :days].T, index=index, columns=wards)
+
+
+def daily_flows(stays, start, end):
+    """``(admissions, discharges)`` per ward for each day in ``[start, end]``, shaped like ``occupancy_series``."""
+    days = (end - start).days + 1
+    index = pd.date_range(start, end, freq="D")
+    if stays.empty or days <= 0:
+        empty = pd.DataFrame(index=index, dtype="int64")
+        return empty, empty.copy()
+    wards, ward_idx = np.unique(stays["ward_no"].to_numpy(), return_inverse=True)
+    frames = []
+    for column in ("admit_date", "discharge_date"):
+        offsets = _day_offsets(stays[column], start, -1)
+        inside = (offsets >= 0) & (offsets < days)
+        counts = np.zeros((len(wards), days), dtype="int64")
+        np.add.at(counts, (ward_idx[inside], offsets[inside]), 1)
+        frames.append(pd.DataFrame(counts.T, index=index, columns=wards))
+    return frames[0], frames[1]
+
+
+def census_frame(stays, start, end):
+    """Long-form census rows ``census_date, ward_no, occupied, admissions, discharges`` for ``[start, end]``."""
+    occupied = occupancy_series(stays, start, end)
+    admissions, discharges = daily_flows(stays, start, end)
+    frame = pd.concat(
+        {"occupied": occupied.stack(), "admissions": admissions.stack(), "discharges": discharges.stack()},
+        axis=1,
+    )
+    frame.index.names = ["census_date", "ward_no"]
+    return frame.reset_index()[["census_date", "ward_no", "occupied", "admissions", "discharges"]]
+
+
+def length_of_stay(stays, start=None, end=None):
+    """Length of stay in days of stays discharged in ``[start, end]``, per ward and overall.
+
+    Returns a DataFrame indexed by ward (plus ``"All"``) with ``stays``,
+    ``mean``, ``p50``, ``p90`` and ``max`` columns.
+    """
+    done = stays.dropna(subset=["discharge_date"])
+    if start is not None:
+        done = done[done["discharge_date"] >= pd.Timestamp(start)]
+    if end is not None:
+        done = done[done["discharge_date"] <= pd.Timestamp(end)]
+    los = (done["discharge_date"] - done["admit_date"]).dt.days.rename("los")
+    columns = ["stays", "mean"] + [f"p{int(q * 100)}" for q in LOS_PERCENTILES] + ["max"]
+    if los.empty:
+        return pd.DataFrame(columns=columns)
+
+    def summarise(grouped):
+        out = grouped.agg(["count", "mean", "max"]).rename(columns={"count": "stays"})
+        quantiles = grouped.quantile(list(LOS_PERCENTILES)).unstack()
+        quantiles.columns = [f"p{int(q * 100)}" for q in quantiles.columns]
+        return out.join(quantiles)
+
+    per_ward = summarise(los.groupby(done["ward_no"]))
+    overall = summarise(los.groupby(lambda _: "All"))
+    return pd.concat([per_ward, overall])[columns]
+
+
+def los_histogram(stays, max_days=30):
+    """Completed stays by length in days; the last bucket counts ``max_days`` or longer."""
+
+    done = stays.dropna(subset=["discharge_date"])
+    los = (done["discharge_date"] - done["admit_date"]).dt.days.to_numpy()
+    return np.bincount(np.clip(los, 0, max_days), minlength=max_days + 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write daily ward census snapshots.")
+    parser.add_argument("command", choices=["snapshot", "backfill"])
+    parser.add_argument("--date", type=date.fromisoformat, default=None, help="snapshot day (default yesterday)")
+    parser.add_argument("--since", type=date.fromisoformat, default=None, help="first backfill day")
+    args = parser.parse_args(argv)
+    if args.command == "backfill" and args.since is None:
+        parser.error("backfill needs --since")
+
+    import mysql.connector
+    from db.connection import DB_CONFIG
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    try:
+        if args.command == "snapshot":
+            written = snapshot(conn, args.date)
+        else:
+            written = backfill(conn, args.since, args.date)
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"Wrote {written} ward census row(s).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
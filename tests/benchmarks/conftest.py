@@ -0,0 +1,23 @@
+# tests/benchmarks/conftest.py
+"""Micro-benchmarks, collected only when asked for:
+
+    pytest tests/benchmarks --benchmark-only --benchmark-json=bench.json
+    python -m benchmarks.compare bench.json
+
+Plain ``pytest`` runs (and CI's unit job) skip this directory, so slow
+bcrypt rounds never land in the correctness suite.
+"""
+
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def pytest_ignore_collect(collection_path, config):
+    try:
+        return not config.getoption("benchmark_only")
+    except ValueError:  # pytest-benchmark is not installed
+        return True
@@ -0,0 +1,35 @@
+# tests/benchmarks/test_auth_bench.py
+import binascii
+import hashlib
+import os
+
+import pytest
+
+from auth import hashers
+from auth.user_model import check_password, hash_password
+
+PASSWORD = "benchmark-password"
+# Password hashing is deliberately slow; a few rounds give a stable median.
+ROUNDS = 5
+
+
+def legacy_hash(password):
+    """The bare ``<salt>$<hash>`` format written by the old top-level user_model.py."""
+    salt = os.urandom(16)
+    dk = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, 100_000)
+    return f"{binascii.hexlify(salt).decode()}${binascii.hexlify(dk).decode()}"
+
+
+HASHING = [name for name in hashers.HASHERS if name != "pbkdf2_sha256_legacy"]
+
+
+@pytest.mark.parametrize("algorithm", HASHING)
+def test_hash_password(benchmark, algorithm):
+    encoded = benchmark.pedantic(hash_password, args=(PASSWORD, algorithm), rounds=ROUNDS, iterations=1)
+    assert hashers.identify(encoded).algorithm == algorithm
+
+
+@pytest.mark.parametrize("algorithm", HASHING + ["pbkdf2_sha256_legacy"])
+def test_check_password(benchmark, algorithm):
+    encoded = legacy_hash(PASSWORD) if algorithm == "pbkdf2_sha256_legacy" else hash_password(PASSWORD, algorithm)
+    assert benchmark.pedantic(check_password, args=(PASSWORD, encoded), rounds=ROUNDS, iterations=1)
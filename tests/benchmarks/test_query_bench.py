@@ -0,0 +1,84 @@
+# tests/benchmarks/test_query_bench.py
+"""Dashboard query paths against a seeded database (``python -m db.seed``).
+
+Uses the ``conn`` fixture, so these skip unless TEST_DB_HOST is set.
+"""
+
+from datetime import date
+
+import pytest
+
+from db.cache import query_cache
+from auth.user_model import get_user_by_email
+from repositories.admissions import AdmissionRepo
+from repositories.lab import LabRepo
+from repositories.med_admin import MedAdminRepo
+from repositories.patients import PatientRepo
+from services.patient_timeline import load_page
+
+
+def first(conn, sql):
+    with conn.cursor() as cur:
+        cur.execute(sql)
+        row = cur.fetchone()
+    if row is None:
+        pytest.skip("database is not seeded")
+    return row
+
+
+@pytest.fixture(scope="module")
+def ids(conn):
+    cid, = first(conn, """
+        SELECT CID_no FROM Prescription GROUP BY CID_no ORDER BY COUNT(*) DESC LIMIT 1
+    """)
+    nurse_id, = first(conn, """
+        SELECT nurse_emp_id FROM Admission_to_Ward WHERE status = 'Admitted'
+        GROUP BY nurse_emp_id ORDER BY COUNT(*) DESC LIMIT 1
+    """)
+    email, role = first(conn, "SELECT email, role FROM Users ORDER BY user_id LIMIT 1")
+    return {"cid": cid, "nurse_id": nurse_id, "email": email, "role": role}
+
+
+@pytest.fixture(autouse=True)
+def uncached():
+    # Measure the database, not the query cache.
+    query_cache.clear()
+    yield
+    query_cache.clear()
+
+
+def test_user_by_email(benchmark, conn, ids):
+    assert benchmark(get_user_by_email, conn, ids["email"], ids["role"]) is not None
+
+
+def test_patient_get(benchmark, conn, ids):
+    assert benchmark(PatientRepo(conn).get, ids["cid"]) is not None
+
+
+def test_nurse_ward_list(benchmark, conn, ids):
+    benchmark(AdmissionRepo(conn).for_nurse, ids["nurse_id"])
+
+
+def test_nurse_ward_schedule(benchmark, conn, ids):
+    benchmark(MedAdminRepo(conn).ward_schedule, ids["nurse_id"], date.today())
+
+
+def test_patient_timeline_first_page(benchmark, conn, ids):
+    assert benchmark(load_page, conn, ids["cid"]).events
+
+
+def test_patient_timeline_next_page(benchmark, conn, ids):
+    cursor = load_page(conn, ids["cid"], limit=10).next_cursor
+    if cursor is None:
+        pytest.skip("patient has a single page of records")
+    benchmark(load_page, conn, ids["cid"], cursor)
+
+
+def test_lab_pending_queue(benchmark, conn):
+    lab = LabRepo(conn)
+
+    def pending():
+        query_cache.clear()
+        return lab.pending()
+
+    benchmark(pending)
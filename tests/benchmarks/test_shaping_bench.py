@@ -0,0 +1,147 @@
+# tests/benchmarks/test_shaping_bench.py
+import random
+from datetime import date, datetime, time, timedelta
+
+import pandas as pd
+import pytest
+
+from benchmarks.schedule_grid import make_records
+from dashboard.doctor import validate_cid
+from db.seed import MEDICINES
+from services import adherence, pharmacy
+from services.appointments import AppointmentBook, Session
+from services.med_schedule import SLOTS
+from services.patient_rules import validate_patient
+from services.patient_timeline import LAB_TEST, PRESCRIPTION, TimelineEvent, timeline_frame
+from services.schedule_grid import build_schedule_grid
+from services.ward_census import census_frame, length_of_stay, stays_frame
+
+
+@pytest.mark.parametrize("records", [1_000, 10_000])
+def test_nurse_schedule_grid(benchmark, records):
+    df = make_records(records, random.Random(1))
+    grid = benchmark(build_schedule_grid, df)
+    assert len(grid) > 0
+
+
+def timeline(count, rng):
+    """A chronic patient's record: mostly prescription timings, with lab tests between them."""
+    start = date(2025, 1, 1)
+    events = []
+    for i in range(count):
+        at = start - timedelta(days=i // 3)
+        if rng.random() < 0.2:
+            events.append(TimelineEvent(LAB_TEST, at, i, "Blood Test", None, "Reported", at, "Dr Pema",
+                                        None, None, i))
+        else:
+            events.append(TimelineEvent(PRESCRIPTION, at, i, f"Med {i % 40}", f"500mg {rng.choice(SLOTS)}",
+                                        None, at + timedelta(days=7), "Dr Pema", rng.randint(0, 8), 8, None))
+    return events
+
+
+@pytest.mark.parametrize("count", [50, 1_000])
+def test_patient_timeline_frame(benchmark, count):
+    frame = benchmark(timeline_frame, timeline(count, random.Random(1)))
+    assert len(frame) == count
+
+
+def stays(count, rng, end=date(2025, 12, 31)):
+    """Two years of admissions over 40 wards; about 5% still admitted."""
+    rows = []
+    for i in range(count):
+        admit = end - timedelta(days=rng.randrange(730))
+        discharge = None if rng.random() < 0.05 else min(end, admit + timedelta(days=rng.randrange(1, 15)))
+        rows.append((i, rng.randrange(1, 41), admit, discharge))
+    return stays_frame(rows)
+
+
+@pytest.mark.parametrize("count", [10_000, 100_000])
+def test_ward_census_two_years(benchmark, count):
+    df = stays(count, random.Random(1))
+    frame = benchmark(census_frame, df, date(2024, 1, 1), date(2025, 12, 31))
+    assert frame["admissions"].sum() > 0
+
+
+def test_length_of_stay_summary(benchmark):
+    df = stays(100_000, random.Random(1))
+    assert benchmark(length_of_stay, df).loc["All", "stays"] > 0
+
+
+def adherence_chunk(stays_count, rng, first=date(2025, 1, 1), days=7):
+    """A week of a ``stays_count``-bed census, three timings each, with about 90% of doses recorded."""
+    scheduled, recorded = [], []
+    for stay in range(stays_count):
+        end = first + timedelta(days=rng.randrange(3, 20) - rng.randrange(10))
+        for k, slot in enumerate(SLOTS):
+            rx = stay * 3 + k
+            doses = [first + timedelta(days=day) for day in range(days) if first + timedelta(days=day) <= end]
+            scheduled += [(rx, day, slot, stay, stay, stay % 100) for day in doses]
+            recorded += [(rx, day, slot, rng.choice(("Given", "Given", "Skipped")))
+                         for day in doses if rng.random() < 0.9]
+    records = pd.DataFrame(recorded, columns=["prescription_id", "dose_date", "slot", "status"])
+    records["dose_date"] = pd.to_datetime(records["dose_date"])
+    return adherence.doses_frame(scheduled), records
+
+
+@pytest.mark.parametrize("stays_count", [300, 3000])
+def test_adherence_week(benchmark, stays_count):
+    doses, records = adherence_chunk(stays_count, random.Random(1))
+
+    def week():
+        return adherence.daily_summary(adherence.classify(doses, records))
+
+    summary = benchmark(week)
+    assert summary["missed"].sum() > 0
+
+
+@pytest.mark.parametrize("count", [10_000, 100_000])
+def test_pharmacy_forecast(benchmark, count):
+    rng = random.Random(1)
+    first = date(2025, 1, 1)
+    rows = []
+    for _ in range(count):
+        start = first + timedelta(days=rng.randrange(-30, 28))
+        rows.append((rng.choice(MEDICINES), start, start + timedelta(days=rng.randrange(3, 30))))
+    prescriptions = pharmacy.demand_frame(rows)
+    stock = {name: rng.randrange(1000, 50000) for name in MEDICINES}
+
+    def forecast():
+        return pharmacy.forecast(pharmacy.daily_demand(prescriptions, first, first + timedelta(days=27)), stock)
+
+    assert len(benchmark(forecast)) == len(MEDICINES)
+
+
+@pytest.fixture(scope="module")
+def appointment_book():
+    """300 doctors, weekday 09:00-13:00 and 14:00-17:00 in 15-minute slots, 90% booked for 90 days."""
+    rng = random.Random(1)
+    first = date(2025, 1, 6)
+    sessions = [Session(d, w, time(start), time(end), 15, first, None)
+                for d in range(300) for w in range(5) for start, end in ((9, 13), (14, 17))]
+    bookings = [(d, datetime.combine(first + timedelta(days=day), time(hour, minute)), 15)
+                for d in range(300) for day in range(91) if (first + timedelta(days=day)).weekday() < 5
+                for hour in (9, 10, 11, 12, 14, 15, 16) for minute in (0, 15, 30, 45) if rng.random() < 0.9]
+    book = AppointmentBook(horizon_days=90)
+    book.replace(sessions, bookings, first)
+    return book
+
+
+@pytest.mark.parametrize("doctors", [1, 300])
+def test_appointment_next_free(benchmark, appointment_book, doctors):
+    ids = list(range(doctors))
+    slots = benchmark(appointment_book.next_free, 10, datetime(2025, 1, 6, 8), ids)
+    assert len(slots) == 10
+
+
+def test_validate_cid(benchmark):
+    cids = [str(10000000000 + i * 7919) for i in range(1_000)]
+    assert benchmark(lambda: [validate_cid(c) for c in cids])[0] == 10000000000
+
+
+def test_validate_patient(benchmark):
+    today = date(2026, 1, 1)
+    records = [{"CID_no": str(10000000000 + i), "name": f"Patient {i}", "DOB": "1990-01-01",
+                "gender": "female", "contact": str(17000000 + i), "address": "Thimphu"}
+               for i in range(1_000)]
+    results = benchmark(lambda: [validate_patient(r, today) for r in records])
+    assert all(not errors for _, errors in results)
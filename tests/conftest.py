@@ -0,0 +1,54 @@
+# tests/conftest.py
+import os
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope="module")
+def conn():
+    """Live MySQL connection for integration_test_*.py, configured via TEST_DB_* variables."""
+    if not os.getenv("TEST_DB_HOST"):
+        pytest.skip("TEST_DB_HOST not set; skipping integration test")
+    mysql_connector = pytest.importorskip("mysql.connector")
+    connection = mysql_connector.connect(
+        host=os.getenv("TEST_DB_HOST"),
+        port=int(os.getenv("TEST_DB_PORT", "3306")),
+        user=os.getenv("TEST_DB_USER", "root"),
+        password=os.getenv("TEST_DB_PASSWORD", ""),
+        database=os.getenv("TEST_DB_NAME", "final_epis_db_test"),
+    )
+    yield connection
+    connection.close()
+
+
+def _mock_conn(fetchall=(), fetchone=None, lastrowid=None, rowcount=1, results=None):
+    """Mock connection whose ``cursor()`` context manager yields one MagicMock cursor.
+
+    ``results`` is a sequence of ``fetchall()`` results returned in turn; otherwise
+    every ``fetchall()`` returns ``fetchall``.
+    """
+    cur = MagicMock()
+    cur.fetchall.return_value = list(fetchall)
+    if results is not None:
+        cur.fetchall.side_effect = list(results)
+    cur.fetchone.return_value = fetchone
+    cur.lastrowid = lastrowid
+    cur.rowcount = rowcount
+    cm = MagicMock()
+    cm.__enter__.return_value = cur
+    cm.__exit__.return_value = False
+    conn = MagicMock()
+    conn.cursor.return_value = cm
+    return conn, cur
+
+
+@pytest.fixture
+def make_conn():
+    """``make_conn(fetchall=..., fetchone=..., lastrowid=..., rowcount=..., results=...)`` -> ``(conn, cur)``."""
+    return _mock_conn
@@ -0,0 +1,28 @@
+# tests/integration_test_explain.py
+import os
+
+from db import migrate
+from db.explain_check import KNOWN_FULL_SCANS, find_full_scans
+from db.seed import seed
+
+SEED_PATIENTS = int(os.getenv("EPIS_EXPLAIN_PATIENTS", "20000"))
+
+
+def test_dashboard_queries_use_indexes(conn):
+    migrate.migrate_up(conn)
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM Patient")
+        existing = cur.fetchone()[0]
+    if existing < SEED_PATIENTS:
+        seed(conn, patients=SEED_PATIENTS)
+
+    unexpected = [p for p in find_full_scans(conn) if p.query not in KNOWN_FULL_SCANS]
+    assert unexpected == [], f"Full table scans: {unexpected}"
+
+
+def test_migrations_roll_back_and_reapply(conn):
+    migrate.migrate_up(conn)
+    latest = max(m.version for m in migrate.discover())
+    assert migrate.migrate_down(conn, target=0)[0] == latest
+    assert migrate.applied_versions(conn) == []
+    assert migrate.migrate_up(conn)[-1] == latest
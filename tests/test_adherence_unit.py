@@ -0,0 +1,87 @@
+# tests/test_adherence_unit.py
+from datetime import date
+
+import pandas as pd
+
+from services import adherence as ad
+
+
+def d(day):
+    return date(2025, 1, day)
+
+
+# (prescription, day, slot, CID, admission, nurse): stay 100 is discharged on the 3rd.
+SCHEDULED = [
+    (1, d(2), "Morning", 11, 100, 2001), (1, d(3), "Morning", 11, 100, 2001),
+    (2, d(3), "Evening", 11, 100, 2001),
+    (3, d(2), "Morning", 12, 101, None), (3, d(3), "Morning", 12, 101, None),
+]
+DOSES = ad.doses_frame(SCHEDULED)
+
+
+def on(*days):
+    return DOSES[DOSES["dose_date"].isin([pd.Timestamp(day) for day in days])].reset_index(drop=True)
+
+
+def records(*rows):
+    df = pd.DataFrame(rows, columns=["prescription_id", "dose_date", "slot", "status"])
+    df["dose_date"] = pd.to_datetime(df["dose_date"])
+    return df
+
+
+def test_expected_doses_are_the_scheduled_doses_of_ward_stays(make_conn):
+    conn, cur = make_conn(fetchall=SCHEDULED)
+    doses = ad.load_doses(conn, d(1), d(5))
+    sql, params = cur.execute.call_args[0]
+    assert "FROM Medication_Schedule" in sql and "admission_id IS NOT NULL" in sql
+    assert params == (d(1), d(5))
+    assert list(doses.columns) == ad.DOSE_COLUMNS and len(doses) == len(SCHEDULED)
+    # The discharge day's dose stays on the round, so missing it is a missed dose.
+    out = ad.classify(doses, records((1, d(2), "Morning", "Given")))
+    assert out.loc[(out["prescription_id"] == 1) & (out["dose_date"] == pd.Timestamp(d(3))), "missed"].all()
+
+
+def test_classify_counts_pending_and_unrecorded_as_missed():
+    out = ad.classify(DOSES, records(
+        (1, d(2), "Morning", "Given"), (1, d(3), "Morning", "Skipped"),
+        (3, d(2), "Morning", "Pending"), (3, d(3), "Evening", "Given"),  # wrong slot
+    ))
+    missed = out.loc[out["missed"], ["prescription_id", "dose_date"]]
+    assert sorted(map(tuple, missed.to_numpy().tolist())) == [
+        (2, pd.Timestamp(d(3))), (3, pd.Timestamp(d(2))), (3, pd.Timestamp(d(3))),
+    ]
+    assert out["given"].sum() == 1 and out["skipped"].sum() == 1
+
+    summary = ad.daily_summary(out).set_index(["dose_date", "admission_id"])
+    assert summary.loc[(pd.Timestamp(d(3)), 100), ["expected", "given", "skipped", "missed"]].tolist() == [2, 0, 1, 1]
+    assert summary.loc[(pd.Timestamp(d(2)), 101), "missed"] == 1
+
+
+def test_write_chunk_batches_daily_rows_and_alerts(make_conn):
+    conn, cur = make_conn()
+    classified = ad.classify(on(d(2)), records((1, d(2), "Morning", "Given")))
+    assert ad.write_chunk(conn, classified) == (2, 1)
+    (daily_sql, daily), (alert_sql, alerts) = [c[0] for c in cur.executemany.call_args_list]
+    assert "ON DUPLICATE KEY UPDATE" in daily_sql and "INSERT IGNORE" in alert_sql
+    assert (d(2), 100, 11, 2001, 1, 1, 0, 0) in daily and (d(2), 101, 12, None, 1, 0, 0, 1) in daily
+    assert alerts == [(3, d(2), "Morning", 12, 101, None)]
+
+
+def test_run_commits_each_chunk_with_its_checkpoint(make_conn):
+    conn, cur = make_conn(fetchone=(d(3),))
+    stats = ad.run(conn, through=d(20), chunk_days=7)
+    assert stats["days"] == 17
+    saved = [c[0][1] for c in cur.execute.call_args_list if "Batch_Checkpoint (" in c[0][0]]
+    assert saved == [(ad.JOB, d(10)), (ad.JOB, d(17)), (ad.JOB, d(20))]
+    assert conn.commit.call_count == 4              # the resolve pass, then once per chunk
+
+
+def test_run_is_a_no_op_when_up_to_date_but_reruns_never_move_checkpoint_back(make_conn):
+    conn, cur = make_conn(fetchone=(d(20),))
+    assert ad.run(conn, through=d(20))["days"] == 0
+    assert not any("Batch_Checkpoint (" in c[0][0] for c in cur.execute.call_args_list)
+
+    conn, cur = make_conn(fetchone=(d(20),))
+    ad.run(conn, since=d(1), through=d(5))
+    saved = [c[0][1] for c in cur.execute.call_args_list if "Batch_Checkpoint (" in c[0][0]]
+    assert saved == [(ad.JOB, d(20))]
@@ -0,0 +1,11 @@
+# tests/test_admin_metrics_unit.py
+from auth.session import Principal
+from dashboard import admin_metrics
+
+
+def test_admin_is_chosen_by_user_id_not_email(monkeypatch):
+    monkeypatch.setattr(admin_metrics, "ADMIN_USER_IDS", {1})
+    assert admin_metrics.is_admin(Principal(1, "Ops", "ops@epis.test", "doctor"))
+    # Same address, different account: emails are only unique per role.
+    assert not admin_metrics.is_admin(Principal(2, "Ops", "ops@epis.test", "patient"))
+    assert not admin_metrics.is_admin(None)
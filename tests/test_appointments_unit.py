@@ -0,0 +1,124 @@
+# tests/test_appointments_unit.py
+from datetime import date, datetime, time, timedelta
+
+import mysql.connector
+import pytest
+from mysql.connector import errorcode
+
+from services import appointments as ap
+
+MONDAY = date(2025, 1, 6)
+SESSIONS = [
+    ap.Session(1, 0, timedelta(hours=9), timedelta(hours=10), 15, date(2024, 1, 1), None),
+    ap.Session(2, 0, time(9, 10), time(10), 20, date(2024, 1, 1), None),
+    ap.Session(2, 1, time(9), time(10), 30, date(2024, 1, 1), MONDAY),  # ended before Tuesday
+]
+
+
+def make_book(bookings=()):
+    book = ap.AppointmentBook(horizon_days=7, ttl=60, clock=lambda: 0.0)
+    book.replace(SESSIONS, bookings, MONDAY)
+    return book
+
+
+def test_interval_index_overlap_add_remove():
+    index = ap.IntervalIndex([(30, 45), (0, 15)])
+    assert index.starts == [0, 30]
+    assert index.overlaps(10, 20) and index.overlaps(40, 50)
+    assert not index.overlaps(15, 30)
+    index.add(15, 30)
+    assert index.overlaps(15, 30)
+    assert index.remove(15, 30) and not index.remove(15, 30)
+    assert len(index) == 2
+
+
+def test_next_free_merges_doctors_in_time_order_and_skips_bookings():
+    book = make_book([(1, datetime(2025, 1, 6, 9, 15), 15)])
+    slots = book.next_free(5, datetime(2025, 1, 6, 8))
+    assert [(s.start.strftime("%H:%M"), s.doctor_emp_id) for s in slots] == [
+        ("09:00", 1), ("09:10", 2), ("09:30", 1), ("09:30", 2), ("09:45", 1),
+    ]
+    assert book.next_free(2, datetime(2025, 1, 6, 9, 35), doctors=[2]) == [
+        ap.Slot(datetime(2025, 1, 13, 9, 10), 2, 20), ap.Slot(datetime(2025, 1, 13, 9, 30), 2, 20),
+    ]
+    assert book.next_free(1, datetime(2025, 1, 6, 9, 1), doctors=[1])[0].start == datetime(2025, 1, 6, 9, 30)
+
+
+def test_add_and_remove_update_free_slots():
+    book = make_book()
+    booking = ap.Booking(5, 100, 1, datetime(2025, 1, 6, 9), 15)
+    book.add(booking)
+    assert not book.is_free(1, datetime(2025, 1, 6, 9), 15)
+    assert book.next_free(1, datetime(2025, 1, 6, 8), [1])[0].start == datetime(2025, 1, 6, 9, 15)
+    book.remove(booking)
+    assert book.is_free(1, datetime(2025, 1, 6, 9), 15)
+
+
+def test_slot_minutes_follows_each_session_grid():
+    book = make_book()
+    assert book.slot_minutes(1, datetime(2025, 1, 6, 9, 45)) == 15
+    assert book.slot_minutes(1, datetime(2025, 1, 6, 9, 50)) is None
+    assert book.slot_minutes(2, datetime(2025, 1, 6, 9, 30)) == 20
+    assert book.slot_minutes(2, datetime(2025, 1, 6, 9, 50)) is None   # would run past 10:00
+    assert book.slot_minutes(2, datetime(2025, 1, 7, 9)) is None       # session no longer valid
+
+
+def test_book_claims_slot_and_returns_booking(make_conn):
+    conn, cur = make_conn(lastrowid=77)
+    booking = ap.book(conn, 100, 1, datetime(2025, 1, 6, 9, 15), make_book())
+    assert booking == ap.Booking(77, 100, 1, datetime(2025, 1, 6, 9, 15), 15)
+    statements = [c[0][0] for c in cur.execute.call_args_list]
+    assert "doctor_emp_id = %s" in statements[0] and "CID_no = %s" in statements[1]
+    assert "INSERT INTO Appointment " in statements[2]
+    assert "INSERT INTO Appointment_Slot" in statements[3] and cur.execute.call_args[0][1][3] == 77
+    conn.commit.assert_not_called()
+
+
+def test_book_rejects_off_grid_and_taken_slots(make_conn):
+    conn, cur = make_conn(lastrowid=77)
+    with pytest.raises(ap.InvalidSlot):
+        ap.book(conn, 100, 1, datetime(2025, 1, 6, 9, 5), make_book())
+    cur.execute.assert_not_called()
+
+    conn, cur = make_conn(fetchone=(1,))
+    with pytest.raises(ap.SlotTaken, match="Doctor 1"):
+        ap.book(conn, 100, 1, datetime(2025, 1, 6, 9), make_book())
+
+    conn, cur = make_conn(lastrowid=77)
+    duplicate = mysql.connector.IntegrityError(msg="Duplicate entry", errno=errorcode.ER_DUP_ENTRY)
+    cur.execute.side_effect = [None, None, None, duplicate]
+    with pytest.raises(ap.SlotTaken):
+        ap.book(conn, 100, 1, datetime(2025, 1, 6, 9), make_book())
+
+
+def test_cancel_frees_claim_and_returns_booking(make_conn):
+    conn, cur = make_conn(fetchone=(100, 1, MONDAY, timedelta(hours=9, minutes=15), 15))
+    assert ap.cancel(conn, 5) == ap.Booking(5, 100, 1, datetime(2025, 1, 6, 9, 15), 15)
+    assert "DELETE FROM Appointment_Slot" in cur.execute.call_args[0][0]
+    conn, cur = make_conn(fetchone=None)
+    assert ap.cancel(conn, 5) is None and cur.execute.call_count == 1
+
+
+def test_set_availability_validates_and_replaces_future_sessions(make_conn):
+    conn, cur = make_conn(lastrowid=77)
+    with pytest.raises(ap.InvalidSlot):
+        ap.set_availability(conn, 1, [(0, time(9), time(9, 10), 15)])
+    with pytest.raises(ap.InvalidSlot):
+        ap.set_availability(conn, 1, [(7, time(9), time(10), 15)])
+    cur.execute.assert_not_called()
+
+    assert ap.set_availability(conn, 1, [(0, time(9), time(12), 15), (2, time(14), time(16), 20)], MONDAY) == 2
+    assert "DELETE" in cur.execute.call_args_list[0][0][0]
+    assert cur.execute.call_args_list[1][0][1] == (date(2025, 1, 5), 1, MONDAY)
+    assert cur.executemany.call_args[0][1][1] == (1, 2, time(14), time(16), 20, MONDAY)
+
+
+def test_book_reloads_when_stale():
+    now = [0.0]
+    book = ap.AppointmentBook(horizon_days=7, ttl=60, clock=lambda: now[0])
+    assert book.is_stale(MONDAY)
+    book.replace(SESSIONS, [], MONDAY)
+    assert not book.is_stale(MONDAY)
+    now[0] = 61.0
+    assert book.is_stale(MONDAY)
+    assert book.doctors() == [1, 2]
@@ -1,42 +1,12 @@
 # tests/test_auth_unit.py
 import pytest
-import sys
-import os
-from unittest.mock import MagicMock
 
-# Ensure project root is on sys.path
-ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-if ROOT not in sys.path:
-    sys.path.insert(0, ROOT)
+from auth import user_model as um
 
-# Robust import for different project layouts
-try:
-    import user_model as um
-except ModuleNotFoundError:
-    try:
-        import ePIS.user_model as um  # if in a package folder
-    except Exception as exc:
-        raise ModuleNotFoundError("Could not import user_model. Place user_model.py in project root.") from exc
 
-
-def make_mock_conn_fetchone(return_val):
-    """Return a mock connection whose cursor() acts as a context manager and fetchone() returns return_val."""
-    mock_cur = MagicMock()
-    mock_cur.fetchone.return_value = return_val
-
-    # context manager wrapper
-    cm = MagicMock()
-    cm.__enter__.return_value = mock_cur
-    cm.__exit__.return_value = False
-
-    mock_conn = MagicMock()
-    mock_conn.cursor.return_value = cm
-    return mock_conn, mock_cur
-
-
-def test_get_user_by_email_calls_cursor_correctly():
+def test_get_user_by_email_calls_cursor_correctly(make_conn):
     expected = {"user_id": 1, "email": "test@example.com", "role": "doctor", "password_hash": "abc"}
-    mock_conn, mock_cur = make_mock_conn_fetchone(expected)
+    mock_conn, mock_cur = make_conn(fetchone=expected)
 
     user = um.get_user_by_email(mock_conn, "test@example.com", "doctor")
 
@@ -45,15 +15,8 @@ def test_get_user_by_email_calls_cursor_correctly():
     assert user == expected
 
 
-def test_create_user_executes_insert():
-    # Use a real connection mock and inspect calls
-    mock_conn = MagicMock()
-    mock_cur = MagicMock()
-
-    cm = MagicMock()
-    cm.__enter__.return_value = mock_cur
-    cm.__exit__.return_value = False
-    mock_conn.cursor.return_value = cm
+def test_create_user_executes_insert(make_conn):
+    mock_conn, mock_cur = make_conn()
 
     um.create_user(
         mock_conn,
@@ -68,3 +31,10 @@ def test_create_user_executes_insert():
     mock_conn.cursor.assert_called()
     assert mock_cur.execute.called, "Expected cursor.execute to be called during create_user"
     assert mock_conn.commit.called, "Expected connection.commit to be called during create_user"
+
+
+def test_create_user_hashes_with_the_given_hasher(make_conn):
+    mock_conn, mock_cur = make_conn()
+    um.create_user(mock_conn, "Alice", "alice@example.com", "pass1", "nurse",
+                   linked_emp_id=7, hasher=lambda password: f"hashed:{password}")
+    assert mock_cur.execute.call_args[0][1][2] == "hashed:pass1"
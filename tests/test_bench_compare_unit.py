@@ -0,0 +1,36 @@
+# tests/test_bench_compare_unit.py
+import json
+
+from benchmarks import compare as bc
+
+
+def write_run(path, medians):
+    path.write_text(json.dumps({
+        "machine_info": {"python_version": "3.11", "cpu": {"brand_raw": "Test CPU", "count": 4}},
+        "benchmarks": [{"fullname": name, "stats": {"median": m, "mean": m, "rounds": 5}}
+                       for name, m in medians.items()],
+    }))
+    return str(path)
+
+
+def test_compare_flags_only_growth_beyond_threshold():
+    baseline = {"a": {"median": 1.0}, "b": {"median": 1.0}, "gone": {"median": 1.0}}
+    run = {"a": {"median": 1.29}, "b": {"median": 1.31}, "new": {"median": 5.0}}
+    regressions, rows = bc.compare(run, baseline, threshold=0.3)
+    assert regressions == ["b"]
+    by_name = {name: ratio for name, _, _, ratio in rows}
+    assert by_name["gone"] is None and by_name["new"] is None
+
+
+def test_update_then_compare_round_trip(tmp_path):
+    baseline = str(tmp_path / "baseline.json")
+    first = write_run(tmp_path / "run1.json", {"t::x": 0.010, "t::y": 0.020})
+    assert bc.main([first, "--baseline", baseline, "--update"]) == 0
+    saved = json.load(open(baseline))
+    assert saved["machine"] == {"python": "3.11", "cpu": "Test CPU", "cores": 4}
+    assert saved["benchmarks"]["t::x"]["median"] == 0.010
+
+    faster = write_run(tmp_path / "run2.json", {"t::x": 0.009, "t::y": 0.021})
+    assert bc.main([faster, "--baseline", baseline]) == 0
+    slower = write_run(tmp_path / "run3.json", {"t::x": 0.020, "t::y": 0.020})
+    assert bc.main([slower, "--baseline", baseline, "--threshold", "0.5"]) == 1
@@ -0,0 +1,90 @@
+# tests/test_connection_pool_unit.py
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from db.connection import ConnectionPool, PoolExhausted
+
+
+def make_pool(size=2, **kwargs):
+    made = []
+
+    def connect():
+        conn = MagicMock()
+        conn.in_transaction = False
+        made.append(conn)
+        return conn
+
+    return ConnectionPool(connect, size=size, **kwargs), made
+
+
+def test_connections_are_reused_after_checkin():
+    pool, made = make_pool()
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+    assert first is second
+    assert len(made) == 1
+    assert pool.stats()["in_use"] == 0
+
+
+def test_pool_is_bounded_and_times_out():
+    pool, _ = make_pool(size=1, checkout_timeout=0.05)
+    held = pool.acquire()
+    with pytest.raises(PoolExhausted):
+        pool.acquire()
+    assert pool.stats()["timeouts"] == 1
+    pool.release(held)
+    pool.release(pool.acquire())
+
+
+def test_waiter_gets_connection_when_released():
+    pool, _ = make_pool(size=1, checkout_timeout=2)
+    held = pool.acquire()
+    got = []
+    t = threading.Thread(target=lambda: got.append(pool.acquire()))
+    t.start()
+    pool.release(held)
+    t.join(timeout=2)
+    assert got == [held]
+
+
+def test_stale_connection_is_replaced():
+    pool, made = make_pool(health_check_interval=0)
+    with pool.connection() as conn:
+        conn.ping.side_effect = Exception("gone away")
+    with pool.connection() as fresh:
+        pass
+    assert fresh is not made[0]
+    assert pool.stats()["reconnects"] == 1
+    made[0].close.assert_called()
+
+
+def test_open_transaction_is_rolled_back_on_checkin():
+    pool, _ = make_pool()
+    with pool.connection() as conn:
+        conn.in_transaction = True
+    conn.rollback.assert_called_once()
+
+
+def test_connection_dropped_when_reset_fails():
+    pool, made = make_pool()
+    with pool.connection() as conn:
+        conn.in_transaction = True
+        conn.rollback.side_effect = Exception("Unread result found")
+    with pool.connection() as other:
+        pass
+    assert other is not conn
+    assert len(made) == 2
+
+
+def test_stats_track_checkout_latency():
+    pool, _ = make_pool()
+    for _ in range(3):
+        with pool.connection():
+            pass
+    stats = pool.stats()
+    assert stats["checkout_latency"]["count"] == 3
+    assert stats["created"] == 1
@@ -0,0 +1,91 @@
+# tests/test_dashboard_registry_unit.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+
+from dashboard import registry
+from db.instrument import query_metrics
+
+
+class FakePool:
+    def __init__(self, free):
+        self.free = free
+        self.released = []
+
+    def try_acquire(self):
+        if self.free <= 0:
+            return None
+        self.free -= 1
+        return MagicMock(name="borrowed")
+
+    def release(self, conn):
+        self.released.append(conn)
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(4) as ex:
+        yield ex
+
+
+def test_every_role_registers_a_dashboard_on_first_use():
+    assert registry.get_dashboard("janitor") is None
+    for role in registry.MODULES:
+        dashboard = registry.get_dashboard(role)
+        assert dashboard.role == role
+        assert set(dashboard.needs()) <= set(dashboard.loaders)
+    assert registry.get_dashboard("lab_tech").needs() == ["metrics", "pending"]
+
+
+def test_dashboard_rejects_views_needing_undeclared_data():
+    with pytest.raises(ValueError, match="ward"):
+        registry.Dashboard("x", "X", [registry.view(lambda *a: None, "ward")])
+
+
+def test_prefetch_runs_loaders_concurrently_on_borrowed_connections(executor):
+    barrier = threading.Barrier(3, timeout=5)  # deadlocks unless all three run at once
+    conn, pool = MagicMock(name="rerun"), FakePool(free=5)
+    seen = {}
+
+    def loader(name):
+        def load(c, principal):
+            seen[name] = c
+            barrier.wait()
+            return name.upper()
+        return load
+
+    data = registry.prefetch(conn, "principal", {n: loader(n) for n in ("a", "b", "c")}, pool, executor)
+    assert dict(data) == {"a": "A", "b": "B", "c": "C"}
+    assert seen["a"] is conn and seen["b"] is not conn and seen["c"] is not conn
+    assert len(pool.released) == 2
+
+
+def test_prefetch_falls_back_to_the_rerun_connection_when_pool_is_busy(executor):
+    conn, pool = MagicMock(name="rerun"), FakePool(free=0)
+    used = []
+    loaders = {n: (lambda c, p, n=n: used.append((n, c)) or n) for n in ("a", "b")}
+    data = registry.prefetch(conn, None, loaders, pool, executor)
+    assert dict(data) == {"a": "a", "b": "b"}
+    assert used == [("a", conn), ("b", conn)]
+
+
+def test_loader_errors_surface_when_the_view_reads_them(executor):
+    def boom(conn, principal):
+        raise RuntimeError("db down")
+
+    data = registry.prefetch(MagicMock(), None, {"ok": lambda c, p: 1, "bad": boom}, FakePool(1), executor)
+    assert data["ok"] == 1
+    with pytest.raises(RuntimeError, match="db down"):
+        data["bad"]
+    assert set(data) == {"ok", "bad"}
+
+
+def test_borrowed_statements_count_towards_the_rerun(executor):
+    def query(conn, principal):
+        query_metrics.record("SELECT 1", 0.01, rows=2)
+
+    with query_metrics.rerun() as rerun:
+        registry.prefetch(MagicMock(), None, {"a": query, "b": query}, FakePool(1), executor)
+    assert rerun.statements == 2 and rerun.rows == 4
@@ -0,0 +1,29 @@
+# tests/test_explain_check_unit.py
+from unittest.mock import MagicMock
+
+from db import explain_check
+from services import med_admin
+
+
+def test_every_query_has_a_parameter_per_placeholder():
+    labels = [label for label, _, _ in explain_check.DASHBOARD_QUERIES]
+    assert len(labels) == len(set(labels))
+    for label, sql, params in explain_check.DASHBOARD_QUERIES:
+        assert sql.count("%s") == len(params), label
+
+
+def test_queries_are_the_statements_the_code_runs(make_conn):
+    sqls = {sql for _, sql, _ in explain_check.DASHBOARD_QUERIES}
+    conn, cur = make_conn()
+    med_admin.history(conn, 1, None, "Morning")
+    assert cur.execute.call_args[0][0] in sqls
+
+
+def test_full_scans_skip_small_and_derived_tables():
+    plans = {"a": [{"table": "Patient", "type": "ALL", "key": None, "rows": 9}],
+             "b": [{"table": "<derived2>", "type": "ALL"}, {"table": "Doctor", "type": "ALL"}]}
+    conn = MagicMock()
+    cur = conn.cursor.return_value.__enter__.return_value
+    cur.fetchall.side_effect = lambda: plans[cur.execute.call_args[0][1][0]]
+    problems = explain_check.find_full_scans(conn, [("a", "SELECT %s", ("a",)), ("b", "SELECT %s", ("b",))])
+    assert problems == [explain_check.PlanProblem("a", "Patient", None, 9)]
@@ -0,0 +1,47 @@
+# tests/test_hashers_unit.py
+import os
+import binascii
+import hashlib
+
+import pytest
+
+from auth import hashers
+
+FAST = [
+    hashers.BcryptHasher(rounds=4),
+    hashers.Pbkdf2Hasher(iterations=1000),
+    hashers.ScryptHasher(n=2 ** 10),
+]
+
+
+@pytest.mark.parametrize("hasher", FAST, ids=lambda h: h.algorithm)
+def test_round_trip_and_identification(hasher):
+    encoded = hasher.hash("Tashi#Delek1")
+    assert hasher.verify("Tashi#Delek1", encoded)
+    assert not hasher.verify("tashi#delek1", encoded)
+    assert hashers.identify(encoded).algorithm == hasher.algorithm
+    assert not hasher.needs_update(encoded)
+
+
+def test_verify_accepts_legacy_pbkdf2_from_old_user_model():
+    salt = os.urandom(16)
+    dk = hashlib.pbkdf2_hmac("sha256", b"OldPass1", salt, 100_000)
+    legacy = f"{binascii.hexlify(salt).decode()}${binascii.hexlify(dk).decode()}"
+    assert hashers.verify_password("OldPass1", legacy)
+    assert not hashers.verify_password("wrong", legacy)
+    assert hashers.needs_rehash(legacy)
+
+
+def test_unknown_format_never_verifies():
+    assert not hashers.verify_password("pw", "plaintext-password")
+    assert not hashers.verify_password("pw", "")
+    assert hashers.needs_rehash("plaintext-password")
+
+
+def test_needs_rehash_on_other_algorithm_or_cost(monkeypatch):
+    monkeypatch.setitem(hashers.HASHERS, "bcrypt", hashers.BcryptHasher(rounds=5))
+    old_cost = hashers.BcryptHasher(rounds=4).hash("pw")
+    pbkdf2 = hashers.Pbkdf2Hasher(iterations=1000).hash("pw")
+    assert hashers.needs_rehash(old_cost, "bcrypt")
+    assert hashers.needs_rehash(pbkdf2, "bcrypt")
+    assert not hashers.needs_rehash(hashers.hash_password("pw", "bcrypt"), "bcrypt")
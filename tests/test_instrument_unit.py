@@ -0,0 +1,157 @@
+# tests/test_instrument_unit.py
+from unittest.mock import MagicMock
+
+import pytest
+
+from db import instrument as ins
+
+
+def make_raw(rows=(), description=("col",), rowcount=0):
+    raw_cur = MagicMock()
+    raw_cur.fetchall.return_value = list(rows)
+    raw_cur.description = description
+    raw_cur.rowcount = rowcount
+    raw_cur.__enter__.return_value = raw_cur
+    raw = MagicMock()
+    raw.cursor.return_value = raw_cur
+    return raw, raw_cur
+
+
+@pytest.mark.parametrize("sql, expected", [
+    ("SELECT * FROM Patient WHERE CID_no = %s", "SELECT * FROM Patient WHERE CID_no = ?"),
+    ("SELECT a FROM t WHERE status='Admitted'  -- hot path\n AND x = 5",
+     "SELECT a FROM t WHERE status=? AND x = ?"),
+    ("SELECT CID_no FROM Patient WHERE CID_no IN (%s, %s, %s)", "SELECT CID_no FROM Patient WHERE CID_no IN (...)"),
+    ("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)", "INSERT INTO t (a, b) VALUES (...)"),
+    ("SELECT name2 FROM t1", "SELECT name2 FROM t1"),
+])
+def test_normalize_sql(sql, expected):
+    assert ins.normalize_sql(sql) == expected
+
+
+def test_cursor_records_latency_rows_and_bytes():
+    metrics = ins.QueryMetrics(slow_ms=10_000)
+    raw, raw_cur = make_raw(rows=[("abc", 1), ("de", None)])
+    conn = ins.InstrumentedConnection(raw, metrics)
+    with conn.cursor() as cur:
+        cur.execute("SELECT name, n FROM t WHERE id = %s", (1,))
+        assert cur.fetchall() == [("abc", 1), ("de", None)]
+        cur.execute("SELECT name, n FROM t WHERE id = %s", (2,))
+        cur.fetchall()
+    (stat,) = metrics.snapshot()
+    assert stat["statement"] == "SELECT name, n FROM t WHERE id = ?"
+    assert (stat["calls"], stat["rows"], stat["bytes"]) == (2, 4, 2 * (3 + 8 + 2))
+    raw_cur.close.assert_called_once()
+
+
+def test_statement_is_recorded_without_waiting_for_close():
+    metrics = ins.QueryMetrics(slow_ms=10_000)
+    raw, raw_cur = make_raw(rows=[("abc",)])
+    cur = ins.InstrumentedConnection(raw, metrics).cursor()
+    cur.execute("SELECT name FROM t")
+    assert metrics.snapshot() == []
+    cur.fetchall()
+    assert [s["rows"] for s in metrics.snapshot()] == [1]
+    raw_cur.description = None
+    raw_cur.rowcount = 2
+    cur.execute("UPDATE t SET name = %s", ("x",))
+    assert sorted(s["rows"] for s in metrics.snapshot()) == [1, 2]
+
+
+def test_rows_fetched_after_the_first_fetch_are_added():
+    metrics = ins.QueryMetrics(slow_ms=10_000)
+    raw, raw_cur = make_raw()
+    raw_cur.fetchone.side_effect = [("a",), ("b",), None]
+    with ins.InstrumentedConnection(raw, metrics).cursor() as cur:
+        cur.execute("SELECT name FROM t")
+        while cur.fetchone():
+            pass
+    (stat,) = metrics.snapshot()
+    assert (stat["calls"], stat["rows"]) == (1, 2)
+
+
+def test_writes_count_affected_rows_and_delegate_attributes():
+    metrics = ins.QueryMetrics(slow_ms=10_000)
+    raw, raw_cur = make_raw(description=None, rowcount=3)
+    raw_cur.lastrowid = 42
+    conn = ins.InstrumentedConnection(raw, metrics)
+    with conn.cursor() as cur:
+        cur.executemany("INSERT INTO t (a) VALUES (%s)", [(1,), (2,), (3,)])
+        assert cur.lastrowid == 42
+    conn.commit()
+    raw.commit.assert_called_once()
+    assert metrics.snapshot()[0]["rows"] == 3
+
+
+def test_errors_are_counted_and_reraised():
+    metrics = ins.QueryMetrics(slow_ms=10_000)
+    raw, raw_cur = make_raw()
+    raw_cur.execute.side_effect = RuntimeError("boom")
+    cur = ins.InstrumentedConnection(raw, metrics).cursor()
+    with pytest.raises(RuntimeError):
+        cur.execute("SELECT 1")
+    cur.close()
+    assert metrics.snapshot()[0]["errors"] == 1
+
+
+def test_slow_select_is_explained_after_results_are_consumed():
+    metrics = ins.QueryMetrics(slow_ms=0)
+    raw, raw_cur = make_raw(rows=[(1,)])
+    conn = ins.InstrumentedConnection(raw, metrics)
+    with conn.cursor() as cur:
+        cur.execute("SELECT a FROM t WHERE b = %s", (7,))
+        cur.fetchall()
+        assert raw_cur.execute.call_count == 1  # no EXPLAIN while the cursor is open
+    explain_sql, params = raw_cur.execute.call_args[0]
+    assert explain_sql == "EXPLAIN SELECT a FROM t WHERE b = %s" and params == (7,)
+    (entry,) = metrics.slow_log
+    assert entry["statement"] == "SELECT a FROM t WHERE b = ?" and entry["plan"] == [(1,)]
+
+
+def test_rerun_scope_counts_statements_for_the_current_thread():
+    metrics = ins.QueryMetrics(slow_ms=10_000)
+    raw, _ = make_raw()
+    conn = ins.InstrumentedConnection(raw, metrics)
+    with metrics.rerun() as rerun:
+        for _ in range(3):
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+        assert metrics.current_rerun() is rerun
+    assert rerun.statements == 3
+    assert metrics.current_rerun() is None
+    assert (metrics.reruns, metrics.rerun_statements.count) == (1, 1)
+
+
+def test_statement_cardinality_is_bounded():
+    metrics = ins.QueryMetrics(max_statements=2)
+    for table in ("a", "b", "c", "d"):
+        metrics.record(f"SELECT * FROM {table}", 0.001)
+    assert [s["statement"] for s in metrics.snapshot()].count("<other>") == 1
+    assert len(metrics.snapshot()) == 3
+
+
+def test_prometheus_text():
+    metrics = ins.QueryMetrics()
+    metrics.record('SELECT "x" FROM t', 0.002, rows=5)
+    text = ins.prometheus_text(metrics, {"epis_db_pool_in_use": 2})
+    assert 'epis_db_statement_seconds_bucket{statement="SELECT ? FROM t",le="0.0025"} 1' in text
+    assert 'epis_db_statement_rows_total{statement="SELECT ? FROM t"} 5' in text
+    assert "epis_reruns_total 0" in text
+    assert "epis_db_pool_in_use 2" in text
+
+
+def test_exporter_binds_loopback_by_default():
+    assert ins.MetricsExporter(lambda: "").host == "127.0.0.1"
+
+
+def test_exporter_dumps_at_most_once_per_interval(tmp_path):
+    now = [0.0]
+    path = str(tmp_path / "metrics.prom")
+    exporter = ins.MetricsExporter(lambda: "x 1\n", port=0, path=path, interval=15, clock=lambda: now[0])
+    assert exporter.maybe_dump() is True
+    now[0] = 5
+    assert exporter.maybe_dump() is False
+    now[0] = 20
+    assert exporter.maybe_dump() is True
+    with open(path) as f:
+        assert f.read() == "x 1\n"
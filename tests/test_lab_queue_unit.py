@@ -0,0 +1,86 @@
+# tests/test_lab_queue_unit.py
+from datetime import date, datetime
+
+import pytest
+
+from services import lab_queue as lq
+from db.cache import query_cache
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    query_cache.clear()
+    yield
+    query_cache.clear()
+
+
+def test_order_test_inserts_as_ordered(make_conn):
+    conn, cur = make_conn(lastrowid=77)
+    assert lq.order_test(conn, 11111111111, "CBC", 1001, date(2025, 5, 1)) == 77
+    assert cur.execute.call_args[0][1] == ("CBC", date(2025, 5, 1), 11111111111, 1001, "Ordered")
+    conn.commit.assert_not_called()
+
+
+def test_pending_tests_reads_status_range_not_anti_join(make_conn):
+    conn, cur = make_conn(results=[[{"test_id": 1}]])
+    assert lq.pending_tests(conn) == [{"test_id": 1}]
+    sql, params = cur.execute.call_args[0]
+    assert "NOT IN" not in sql and "Test_Report" not in sql
+    assert params == ("Ordered", "In Progress", lq.QUEUE_LIMIT)
+
+
+def test_claim_is_conditional_on_ordered_status(make_conn):
+    conn, cur = make_conn(rowcount=1)
+    cur.fetchone.return_value = (11111111111,)
+    assert lq.claim(conn, 5, 3001) == 11111111111  # the patient whose pages change
+    (sql, params), (lookup, _) = [c[0] for c in cur.execute.call_args_list]
+    assert "WHERE test_id = %s AND status = %s" in sql and "SELECT CID_no" in lookup
+    assert params[0] == "In Progress" and params[1] == 3001 and params[-2:] == (5, "Ordered")
+
+    conn, cur = make_conn(rowcount=0)
+    assert lq.claim(conn, 5, 3002) is None
+    assert cur.execute.call_count == 1
+
+
+def test_release_only_by_claimant(make_conn):
+    conn, cur = make_conn(rowcount=0)
+    assert lq.release(conn, 5, 3002) is None
+    assert cur.execute.call_args[0][1] == ("Ordered", 5, "In Progress", 3002)
+
+
+def test_mark_reported_rejects_tests_claimed_by_someone_else(make_conn):
+    conn, cur = make_conn(rowcount=1)
+    cur.fetchone.return_value = (11111111111,)
+    assert lq.mark_reported(conn, 5, 3001) == 11111111111
+    params = cur.execute.call_args_list[0][0][1]
+    assert params[0] == "Reported" and params[-4:] == (5, "Ordered", "In Progress", 3001)
+
+    conn, _ = make_conn(rowcount=0)
+    with pytest.raises(lq.ClaimError):
+        lq.mark_reported(conn, 5, 3001)
+
+
+def test_queue_metrics_throughput_and_turnaround(make_conn):
+    today = date(2025, 5, 10)
+    backlog = [
+        {"status": "Ordered", "tests": 4, "oldest": date(2025, 5, 2)},
+        {"status": "In Progress", "tests": 1, "oldest": date(2025, 5, 8)},
+    ]
+    reported = [
+        {"date_ordered": date(2025, 5, 9), "reported_at": datetime(2025, 5, 10, 12)},   # 36 h
+        {"date_ordered": date(2025, 5, 10), "reported_at": datetime(2025, 5, 10, 6)},   # 6 h
+        {"date_ordered": date(2025, 5, 8), "reported_at": datetime(2025, 5, 9, 0)},     # 24 h
+    ]
+    conn, _ = make_conn(results=[backlog, reported])
+    m = lq.queue_metrics(conn, days=3, today=today)
+    assert (m["ordered"], m["in_progress"], m["oldest_pending"]) == (4, 1, date(2025, 5, 2))
+    assert m["reported_per_day"] == {date(2025, 5, 8): 0, date(2025, 5, 9): 1, date(2025, 5, 10): 2}
+    assert m["reported_total"] == 3
+    assert m["turnaround_p50_h"] == 24.0
+    assert m["turnaround_p95_h"] == 36.0
+
+
+def test_queue_metrics_empty(make_conn):
+    conn, _ = make_conn(results=[[], []])
+    m = lq.queue_metrics(conn, days=1, today=date(2025, 5, 10))
+    assert m["ordered"] == 0 and m["oldest_pending"] is None and m["turnaround_p50_h"] is None
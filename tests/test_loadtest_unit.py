@@ -0,0 +1,106 @@
+# tests/test_loadtest_unit.py
+import random
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+
+import pytest
+
+from loadtest import runner
+from loadtest.workflows import Account, LoadContext
+
+
+def fake_connection(conns):
+    @contextmanager
+    def connection():
+        conn = MagicMock()
+        conns.append(conn)
+        yield conn
+    return connection
+
+
+def test_percentile_nearest_rank():
+    samples = list(range(1, 101))
+    assert runner.percentile(samples, 50) == 50
+    assert runner.percentile(samples, 95) == 95
+    assert runner.percentile(samples, 99) == 99
+    assert runner.percentile([7], 99) == 7
+    assert runner.percentile([], 50) == 0.0
+
+
+def test_run_records_every_iteration_and_rolls_back_errors():
+    calls = []
+
+    def ok(conn, ctx, rng):
+        calls.append("ok")
+
+    def boom(conn, ctx, rng):
+        raise RuntimeError("deadlock")
+
+    conns = []
+    stats, elapsed = runner.run(fake_connection(conns), ctx=None, mix={"ok": 1, "boom": 1}, users=3,
+                                iterations=20, workflows={"ok": ok, "boom": boom})
+    total = sum(len(s.samples) for s in stats.values())
+    assert total == 60 == len(conns)
+    assert stats["boom"].errors == len(stats["boom"].samples) > 0
+    assert stats["boom"].error_samples[0] == "RuntimeError: deadlock"
+    assert stats["ok"].errors == 0 and len(calls) == len(stats["ok"].samples)
+    assert sum(c.rollback.called for c in conns) == stats["boom"].errors
+
+    summary = runner.summarize(stats, elapsed)
+    assert summary["boom"]["error_rate"] == 1.0
+    assert set(summary["ok"]) >= {"count", "ops_per_sec", "p50_ms", "p95_ms", "p99_ms"}
+
+
+def test_run_stops_at_duration():
+    ticks = iter(range(1000))
+    stats, elapsed = runner.run(fake_connection([]), None, mix={"ok": 1}, users=1, duration=10,
+                                workflows={"ok": lambda *a: None}, clock=lambda: next(ticks))
+    # each iteration reads the clock three times: loop check, start, end
+    assert len(stats["ok"].samples) == 3
+    assert elapsed == 11  # the final clock read
+
+
+def test_unknown_or_empty_mix_rejected():
+    with pytest.raises(ValueError):
+        runner.weighted_picker({"nope": 1}, {"ok": None})
+    with pytest.raises(ValueError):
+        runner.weighted_picker({"ok": 0}, {"ok": None})
+    with pytest.raises(ValueError):
+        runner.run(fake_connection([]), None, mix={"ok": 1}, workflows={"ok": None})
+
+
+def test_parse_mix():
+    assert runner.parse_mix("") == runner.DEFAULT_MIX
+    assert runner.parse_mix("login=3, patient_fetch") == {"login": 3.0, "patient_fetch": 1.0}
+
+
+def test_baseline_round_trip_and_compare(tmp_path):
+    base = {
+        "login": {"p95_ms": 100.0, "error_rate": 0.0},
+        "patient_fetch": {"p95_ms": 10.0, "error_rate": 0.0},
+    }
+    path = tmp_path / "baseline.json"
+    runner.save_baseline(path, base, users=5)
+    assert runner.load_baseline(path) == base
+
+    now = {
+        "login": {"p95_ms": 119.0, "error_rate": 0.0},          # within 20%
+        "patient_fetch": {"p95_ms": 15.0, "error_rate": 0.05},  # slower and failing
+        "lab_upload": {"p95_ms": 500.0, "error_rate": 0.0},     # not in the baseline
+    }
+    regressions = runner.compare(now, base, tolerance=0.2)
+    assert len(regressions) == 2
+    assert all(r.startswith("patient_fetch:") for r in regressions)
+    table = runner.format_table({"patient_fetch": dict(
+        now["patient_fetch"], count=20, errors=1, ops_per_sec=2.0, p50_ms=5.0, p99_ms=20.0)}, base)
+    assert "+50%" in table
+
+
+def test_load_context_groups_accounts_by_role():
+    ctx = LoadContext([Account("nurse.2001@epis.test", "nurse", 2001),
+                       Account("nurse.2002@epis.test", "nurse", 2002),
+                       Account("doctor.1001@epis.test", "doctor", 1001)])
+    assert len(ctx.by_role["nurse"]) == 2
+    assert ctx.pick(random.Random(0), "doctor").key == 1001
+    with pytest.raises(RuntimeError):
+        ctx.pick(random.Random(0), "lab_tech")
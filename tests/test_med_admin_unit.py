@@ -0,0 +1,51 @@
+# tests/test_med_admin_unit.py
+from datetime import date, datetime
+
+import pytest
+
+from services import med_admin as ma
+from services.med_admin import Dose
+
+DAY = date(2025, 1, 2)
+AT = datetime(2025, 1, 2, 8)
+
+
+def test_invalid_slot_or_status_rejected_before_any_write(make_conn):
+    conn, cur = make_conn()
+    with pytest.raises(ma.InvalidDose):
+        ma.record(conn, 2001, Dose(7, DAY, "Night", "Given"))
+    with pytest.raises(ma.InvalidDose):
+        ma.record_round(conn, 2001, [Dose(7, DAY, "Morning", "Given"), Dose(8, DAY, "Morning", "Lost")])
+    cur.execute.assert_not_called()
+    cur.executemany.assert_not_called()
+
+
+def test_record_round_uses_fixed_statements_in_key_order(make_conn):
+    doses = [
+        Dose(9, DAY, "Morning", "Given"),
+        Dose(7, DAY, "Evening", "Skipped", "refused"),
+        Dose(7, DAY, "Morning", "Skipped"),
+        Dose(7, DAY, "Morning", "Given"),  # later entry for the same dose wins
+    ]
+    conn, cur = make_conn(fetchall=[(7, DAY, "Morning", 50), (7, DAY, "Evening", 51), (9, DAY, "Morning", 60)])
+    ids = ma.record_round(conn, 2001, doses, at=AT)
+
+    assert ids == {(7, DAY, "Morning"): 50, (7, DAY, "Evening"): 51, (9, DAY, "Morning"): 60}
+    assert cur.executemany.call_count == 2 and cur.execute.call_count == 2
+    (upsert, rows), (audit, audit_rows) = (c[0] for c in cur.executemany.call_args_list)
+    assert "ON DUPLICATE KEY UPDATE" in upsert and "Medicine_Administration_Audit" in audit
+    assert [(r[0], r[6], r[4]) for r in rows] == [(7, "Morning", "Given"), (7, "Evening", "Skipped"),
+                                                   (9, "Morning", "Given")]
+    assert rows[1][5] == "refused"
+    assert [r[0] for r in audit_rows] == [50, 51, 60]
+
+    lookup, mirror = (c[0] for c in cur.execute.call_args_list)
+    assert lookup[1] == (7, "Morning", DAY, 7, "Evening", DAY, 9, "Morning", DAY)
+    assert "UPDATE Medication_Schedule" in mirror[0] and mirror[1] == (50, 51, 60)
+    conn.commit.assert_not_called()
+
+
+def test_record_round_empty_is_a_no_op(make_conn):
+    conn, cur = make_conn()
+    assert ma.record_round(conn, 2001, []) == {}
+    conn.cursor.assert_not_called()
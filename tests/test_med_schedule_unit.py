@@ -0,0 +1,53 @@
+# tests/test_med_schedule_unit.py
+from datetime import date
+
+from services import med_schedule as ms
+
+
+def test_expand_doses_one_row_per_day():
+    doses = ms.expand_doses(7, 11111111111, "Evening", date(2025, 3, 30), date(2025, 4, 2), 3, 1)
+    assert [d[1] for d in doses] == [date(2025, 3, 30), date(2025, 3, 31), date(2025, 4, 1), date(2025, 4, 2)]
+    assert doses[0] == (7, date(2025, 3, 30), "Evening", 11111111111, 3, 1)
+
+
+def test_expand_doses_clips_to_since():
+    doses = ms.expand_doses(7, 1, "Morning", date(2025, 1, 1), date(2025, 1, 10), since=date(2025, 1, 9))
+    assert [d[1] for d in doses] == [date(2025, 1, 9), date(2025, 1, 10)]
+    assert ms.expand_doses(7, 1, "Morning", date(2025, 1, 1), date(2025, 1, 2), since=date(2025, 2, 1)) == []
+
+
+def test_generate_writes_all_doses_in_one_executemany(make_conn):
+    rows = [
+        (1, 11111111111, "Morning", date(2025, 1, 1), date(2025, 1, 3), 5, 2),
+        (2, 11111111111, "Evening", date(2025, 1, 1), date(2025, 1, 3), 5, 2),
+    ]
+    conn, cur = make_conn(fetchall=rows)
+    assert ms.generate_for_prescriptions(conn, [1, 2]) == 6
+    cur.executemany.assert_called_once()
+    assert len(cur.executemany.call_args[0][1]) == 6
+    conn.commit.assert_not_called()
+
+
+def test_attach_admission_repoints_pending_doses_and_fills_gaps(make_conn):
+    conn, cur = make_conn(fetchall=[(1, 11111111111, "Morning", date(2025, 1, 1), date(2025, 1, 5), 9, 3)])
+    cur.rowcount = 4
+    assert ms.attach_admission(conn, 11111111111, 9, 3, date(2025, 1, 4)) == 4
+    (repoint, params), _ = [c[0] for c in cur.execute.call_args_list]
+    assert "status = 'Pending'" in repoint and params == (9, 3, 11111111111, date(2025, 1, 4))
+    assert [d[1] for d in cur.executemany.call_args[0][1]] == [date(2025, 1, 4), date(2025, 1, 5)]
+
+
+def test_refresh_repoints_doses_whose_nurse_changed(make_conn):
+    conn, cur = make_conn()
+    ms.refresh(conn, date(2025, 1, 1))
+    repoint = cur.execute.call_args_list[0][0][0]
+    assert "JOIN Admission_to_Ward" in repoint and "<=>" in repoint
+
+
+def test_ward_schedule_reads_nurse_date_range(make_conn):
+    conn, cur = make_conn()
+    ms.ward_schedule(conn, 2, date(2025, 1, 1), name_prefix="Pe_")
+    sql, params = cur.execute.call_args[0]
+    assert "s.nurse_emp_id = %s" in sql and "s.dose_date BETWEEN %s AND %s" in sql
+    assert "DATE(" not in sql
+    assert params == (2, date(2025, 1, 1), date(2025, 1, 1), "Pe\\_%")
@@ -0,0 +1,43 @@
+# tests/test_migrate_unit.py
+
+from db import migrate
+
+
+def executed(cur):
+    return [c.args[0].strip() for c in cur.execute.call_args_list]
+
+
+def test_shipped_migrations_are_paired_and_ordered():
+    migrations = migrate.discover()
+    versions = [m.version for m in migrations]
+    assert versions == sorted(versions) and versions[0] == 1
+    for m in migrations:
+        assert migrate.split_statements(m.up_sql) and migrate.split_statements(m.down_sql)
+
+
+def test_split_statements_drops_comments():
+    sql = "-- note; with semicolon\nCREATE INDEX a ON T (x);\n\nDROP INDEX b ON T;\n"
+    assert migrate.split_statements(sql) == ["CREATE INDEX a ON T (x)", "DROP INDEX b ON T"]
+
+
+def test_up_applies_only_pending_migrations(make_conn):
+    migrations = [
+        migrate.Migration(1, "one", "CREATE INDEX a ON T (x);", "DROP INDEX a ON T;"),
+        migrate.Migration(2, "two", "CREATE INDEX b ON T (y);", "DROP INDEX b ON T;"),
+    ]
+    conn, cur = make_conn(fetchall=[(1,)])
+    assert migrate.migrate_up(conn, migrations=migrations, log=lambda msg: None) == [2]
+    statements = executed(cur)
+    assert "CREATE INDEX b ON T (y)" in statements
+    assert "CREATE INDEX a ON T (x)" not in statements
+
+
+def test_down_reverts_newest_first(make_conn):
+    migrations = [
+        migrate.Migration(1, "one", "CREATE INDEX a ON T (x);", "DROP INDEX a ON T;"),
+        migrate.Migration(2, "two", "CREATE INDEX b ON T (y);", "DROP INDEX b ON T;"),
+    ]
+    conn, cur = make_conn(fetchall=[(1,), (2,)])
+    assert migrate.migrate_down(conn, 0, migrations=migrations, log=lambda msg: None) == [2, 1]
+    statements = executed(cur)
+    assert statements.index("DROP INDEX b ON T") < statements.index("DROP INDEX a ON T")
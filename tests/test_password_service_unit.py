@@ -0,0 +1,49 @@
+# tests/test_password_service_unit.py
+import threading
+
+import pytest
+
+from auth.hashers import BcryptHasher
+from auth.password_service import PasswordService, PasswordServiceBusy, authenticate
+
+FAST_BCRYPT = BcryptHasher(rounds=4)
+
+
+def test_verify_in_worker_pool():
+    service = PasswordService(workers=2, max_pending=4)
+    hashed = FAST_BCRYPT.hash("Secret!1")
+    assert service.verify("Secret!1", hashed)
+    assert not service.verify("wrong", hashed)
+    assert not service.verify("Secret!1", "not-a-bcrypt-hash")
+    assert service.stats()["verify_latency"]["count"] == 3
+
+
+def test_saturated_service_fails_fast():
+    service = PasswordService(workers=1, max_pending=1)
+    started, release = threading.Event(), threading.Event()
+
+    def slow_job():
+        started.set()
+        release.wait()
+
+    blocker = threading.Thread(target=lambda: service._run(service.hash_latency, slow_job))
+    blocker.start()
+    started.wait()
+    with pytest.raises(PasswordServiceBusy):
+        service.verify("pw", FAST_BCRYPT.hash("pw"))
+    release.set()
+    blocker.join()
+    assert service.stats()["rejected"] == 1
+
+
+
+def test_authenticate_verifies_in_the_pool_and_upgrades_old_hashes(make_conn):
+    old = FAST_BCRYPT.hash("Secret!1")  # below the current cost factor
+    conn, cur = make_conn(fetchone={"user_id": 7, "password_hash": old})
+    service = PasswordService(workers=1, max_pending=2)
+    service.hash = lambda password: "new-hash"
+    assert authenticate(conn, "a@x", "wrong", "nurse", service) is None
+    cur.execute.assert_called_once()  # a failed login never rewrites the hash
+    assert authenticate(conn, "a@x", "Secret!1", "nurse", service)["user_id"] == 7
+    assert cur.execute.call_args[0][1] == ("new-hash", 7)
+    assert service.stats()["verify_latency"]["count"] == 2
@@ -0,0 +1,164 @@
+# tests/test_patient_import_unit.py
+import csv
+from datetime import date
+from unittest.mock import MagicMock
+
+import mysql.connector
+import pytest
+
+from services import patient_import as pi
+
+TODAY = date(2025, 6, 1)
+HEADER = ["CID_no", "name", "DOB", "gender", "contact", "address"]
+
+
+def write_csv(path, n, bad_every=0):
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(HEADER)
+        for i in range(n):
+            contact = "123" if bad_every and i % bad_every == 0 else "17000000"
+            w.writerow([10000000000 + i, f"Patient {i}", "1990-01-01", "Male", contact, "Paro"])
+    return str(path)
+
+
+def recording_conn(existing=()):
+    """Mock connection that records inserted rows and knows ``existing`` CIDs."""
+    cur = MagicMock()
+    inserted = []
+
+    def execute(sql, params=()):
+        cur._last = [(c,) for c in params if c in existing] if "SELECT CID_no" in sql else []
+
+    cur.execute.side_effect = execute
+    cur.fetchall.side_effect = lambda: cur._last
+    cur.executemany.side_effect = lambda sql, rows: inserted.extend(rows)
+    cm = MagicMock()
+    cm.__enter__.return_value = cur
+    conn = MagicMock()
+    conn.cursor.return_value = cm
+    return conn, cur, inserted
+
+
+def test_read_chunks_is_bounded_and_numbered(tmp_path):
+    path = write_csv(tmp_path / "p.csv", 10)
+    chunks = list(pi.read_chunks(path, chunk_size=4))
+    assert [len(c) for c in chunks] == [4, 4, 2]
+    assert chunks[0][0][0] == 1 and chunks[-1][-1][0] == 10
+    assert [n for n, _ in next(pi.read_chunks(path, chunk_size=4, skip=7))] == [8, 9, 10]
+
+
+def test_read_chunks_parquet(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+    path = str(tmp_path / "p.parquet")
+    pq.write_table(pa.table({"CID_no": [10000000001, 10000000002], "name": ["A", "B"]}), path)
+    chunks = list(pi.read_chunks(path, chunk_size=1))
+    assert chunks == [[(1, {"CID_no": 10000000001, "name": "A"})], [(2, {"CID_no": 10000000002, "name": "B"})]]
+
+
+def test_read_chunks_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        list(pi.read_chunks("patients.xlsx"))
+
+
+def test_import_reports_invalid_and_duplicate_rows(tmp_path):
+    path = write_csv(tmp_path / "p.csv", 10, bad_every=5)  # rows 1 and 6 have bad contacts
+    conn, cur, inserted = recording_conn(existing={10000000002})
+    rejects_path = str(tmp_path / "rejects.csv")
+    stats = pi.import_patients(conn, path, chunk_size=4, rejects_path=rejects_path, log=lambda m: None, today=TODAY)
+
+    assert (stats.read, stats.inserted, stats.invalid, stats.duplicates) == (10, 7, 2, 1)
+    assert len(inserted) == 7 and all(row[4] == 17000000 for row in inserted)
+    assert cur.executemany.call_count == 3  # one multi-row INSERT per chunk
+    assert conn.commit.call_count == 3
+    with open(rejects_path) as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["row", "cid", "reason"]
+    assert [r[0] for r in rows[1:]] == ["1", "3", "6"]
+    assert rows[2][2] == "CID already registered"
+
+
+def test_import_resumes_from_checkpoint(tmp_path):
+    path = write_csv(tmp_path / "p.csv", 10)
+    conn, _, inserted = recording_conn()
+    pi.save_checkpoint(path, 8, pi.ImportStats())
+    stats = pi.import_patients(conn, path, chunk_size=4, log=lambda m: None, today=TODAY)
+    assert stats.resumed_from == 8
+    assert [row[0] for row in inserted] == [10000000008, 10000000009]
+    assert pi.load_checkpoint(path) == 10
+
+
+def test_checkpoint_ignored_when_file_changes(tmp_path):
+    path = write_csv(tmp_path / "p.csv", 10)
+    pi.save_checkpoint(path, 8, pi.ImportStats())
+    write_csv(tmp_path / "p.csv", 12)
+    assert pi.load_checkpoint(path) == 0
+
+
+def test_batch_conflict_falls_back_to_row_inserts(tmp_path):
+    path = write_csv(tmp_path / "p.csv", 3)
+    conn, cur, _ = recording_conn()
+    dup = mysql.connector.IntegrityError(msg="Duplicate entry", errno=1062)
+    cur.executemany.side_effect = dup
+    cur.execute.side_effect = [None, None, dup, None]  # existing-CID lookup, then 3 single inserts
+    cur.fetchall.side_effect = lambda: []
+    stats = pi.import_patients(conn, path, log=lambda m: None, today=TODAY)
+    conn.rollback.assert_called_once()
+    assert (stats.inserted, stats.duplicates) == (2, 1)
+    assert stats.rejects[0].reason == "CID already registered"
+
+
+def test_row_refused_by_the_server_is_rejected_not_fatal(tmp_path):
+    path = write_csv(tmp_path / "p.csv", 2)
+    conn, cur, _ = recording_conn()
+    check = mysql.connector.DatabaseError(msg="Check constraint 'chk_cid_length' is violated.", errno=3819)
+    cur.executemany.side_effect = check
+    cur.execute.side_effect = [None, check, None]
+    cur.fetchall.side_effect = lambda: []
+    stats = pi.import_patients(conn, path, rejects_path=str(tmp_path / "rejects.csv"),
+                               log=lambda m: None, today=TODAY)
+    assert (stats.inserted, stats.invalid) == (1, 1)
+    assert "chk_cid_length" in (tmp_path / "rejects.csv").read_text()
+    assert pi.load_checkpoint(path) == 2
+
+
+def test_lost_connection_aborts_without_rejecting_or_checkpointing(tmp_path):
+    path = write_csv(tmp_path / "p.csv", 2)
+    conn, cur, _ = recording_conn()
+    cur.executemany.side_effect = mysql.connector.OperationalError(msg="Lost connection", errno=2013)
+    with pytest.raises(mysql.connector.OperationalError):
+        pi.import_patients(conn, path, rejects_path=str(tmp_path / "rejects.csv"),
+                           log=lambda m: None, today=TODAY)
+    conn.rollback.assert_called_once()
+    assert (tmp_path / "rejects.csv").read_text().splitlines() == ["row,cid,reason"]
+    assert pi.load_checkpoint(path) == 0
+
+
+def test_deadlock_in_row_fallback_rolls_back_the_whole_chunk(tmp_path):
+    path = write_csv(tmp_path / "p.csv", 3)
+    conn, cur, _ = recording_conn()
+    stats = pi.ImportStats()
+    cur.executemany.side_effect = mysql.connector.IntegrityError(msg="Duplicate entry", errno=1062)
+    cur.execute.side_effect = [None, None, mysql.connector.InternalError(msg="Deadlock", errno=1213)]
+    cur.fetchall.side_effect = lambda: []
+    chunk = next(pi.read_chunks(path))
+    with pytest.raises(mysql.connector.InternalError):
+        pi.import_chunk(conn, chunk, stats, lambda reject, duplicate: None, TODAY)
+    conn.commit.assert_not_called()
+    assert (stats.read, stats.inserted) == (0, 0)
+
+
+def test_export_streams_keyset_pages(tmp_path, make_conn):
+    pages = [[(10000000001, "A", date(1990, 1, 1), "Male", 17000000, "Paro"),
+              (10000000002, "B", date(1991, 1, 1), "Female", 17000001, "Haa")],
+             [(10000000003, "C", date(1992, 1, 1), "Other", 17000002, "Gasa")]]
+    conn, cur = make_conn(results=pages)
+
+    path = str(tmp_path / "out.csv")
+    stats = pi.export_patients(conn, path, chunk_size=2, log=lambda m: None)
+    assert stats.read == 3
+    assert [c[0][1] for c in cur.execute.call_args_list] == [(0, 2), (10000000002, 2)]
+    with open(path) as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == HEADER and rows[3][0] == "10000000003"
@@ -0,0 +1,43 @@
+# tests/test_patient_registry_unit.py
+
+import pytest
+
+from db.cache import query_cache
+from dashboard import patient_registry as reg
+
+
+def test_cid_prefix_becomes_index_range():
+    assert reg.cid_prefix_range("101") == (10100000000, 10199999999)
+    assert reg.cid_prefix_range("11512000123") == (11512000123, 11512000123)
+
+
+@pytest.mark.parametrize("bad", ["", "12a", "123456789012"])
+def test_cid_prefix_rejects_bad_input(bad):
+    with pytest.raises(ValueError):
+        reg.cid_prefix_range(bad)
+
+
+def test_build_filters_uses_prefix_like_and_escapes_wildcards():
+    clauses, params = reg.build_filters(name="50%_off", dzongkhag="Paro", gender="Female")
+    assert clauses == ["name LIKE %s", "address = %s", "gender = %s"]
+    assert params == ["50\\%\\_off%", "Paro", "Female"]
+
+
+def test_fetch_page_is_keyset_paginated(make_conn):
+    query_cache.clear()
+    rows = [{"CID_no": n} for n in range(1, reg.PAGE_SIZE + 2)]
+    conn, cur = make_conn(fetchall=rows)
+
+    page, has_next = reg.fetch_patient_page(conn, reg.build_filters(cid_prefix="1"), after_cid=10000000050)
+
+    sql, params = cur.execute.call_args[0]
+    assert "CID_no > %s" in sql and "ORDER BY CID_no LIMIT %s" in sql
+    assert "OFFSET" not in sql
+    assert params == [10000000000, 19999999999, 10000000050, reg.PAGE_SIZE + 1]
+    assert len(page) == reg.PAGE_SIZE and has_next
+
+
+def test_filtered_count_is_capped(make_conn):
+    query_cache.clear()
+    conn, _ = make_conn(fetchall=[{"n": reg.COUNT_CAP + 1}])
+    assert reg.estimate_patient_count(conn, reg.build_filters(gender="Male")) == (reg.COUNT_CAP, False)
@@ -0,0 +1,44 @@
+# tests/test_patient_rules_unit.py
+from datetime import date
+
+import pytest
+
+from services.patient_rules import validate_patient
+
+TODAY = date(2025, 6, 1)
+GOOD = {"CID_no": "11111111111", "name": " Pema Wangmo ", "DOB": "1990-02-03",
+        "gender": "female", "contact": "17123456", "address": "paro"}
+
+
+def test_valid_record_is_cleaned():
+    row, errors = validate_patient(GOOD, TODAY)
+    assert errors == []
+    assert row == (11111111111, "Pema Wangmo", date(1990, 2, 3), "Female", 17123456, "Paro")
+
+
+def test_numeric_columns_read_as_floats_are_accepted():
+    row, _ = validate_patient(dict(GOOD, CID_no=11111111111.0, contact=17123456.0), TODAY)
+    assert row[0] == 11111111111 and row[4] == 17123456
+
+
+@pytest.mark.parametrize("field, value, message", [
+    ("CID_no", "1111111111a", "CID must be numeric."),
+    ("CID_no", "1111", "CID must be exactly 11 digits."),
+    ("name", "  ", "Name cannot be empty."),
+    ("DOB", "03/02/1990", "Date of birth must be YYYY-MM-DD."),
+    ("DOB", "2030-01-01", "Date of birth must be between 1900-01-01 and today."),
+    ("gender", "X", "Gender must be one of Male, Female, Other."),
+    ("CID_no", "01234567890", "CID cannot start with 0."),
+    ("contact", "1712345", "Contact must be exactly 8 digits."),
+    ("contact", "01712345", "Contact cannot start with 0."),
+    ("address", "Atlantis", "Please select a Dzongkhag."),
+    ("address", "", "Please select a Dzongkhag."),
+])
+def test_invalid_fields(field, value, message):
+    row, errors = validate_patient(dict(GOOD, **{field: value}), TODAY)
+    assert row is None and errors == [message]
+
+
+def test_all_errors_are_reported():
+    _, errors = validate_patient({}, TODAY)
+    assert len(errors) == 6
@@ -0,0 +1,75 @@
+# tests/test_patient_timeline_unit.py
+from datetime import date
+
+import pytest
+
+from db.cache import invalidate, patient_tag, query_cache
+from services import patient_timeline as pt
+
+DAY = date(2025, 3, 1)
+
+
+def event(kind, at, ref_id, given=None, due=None, report_id=None):
+    return pt.TimelineEvent(kind, at, ref_id, "t", None, None, None, "Dr X", given, due, report_id)
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    query_cache.clear()
+    yield
+    query_cache.clear()
+
+
+def test_query_is_one_union_with_an_indexed_branch_per_kind():
+    sql, params = pt.timeline_query(11111111111, limit=21)
+    assert sql.count("UNION ALL") == 4
+    for table in ("Admission_to_Ward", "Appointment", "Diagnosis", "Lab_Test", "Prescription"):
+        assert f"FROM {table}\n" in sql
+    assert params == (11111111111, 21) * 5 + (21,)
+    assert sql.count("%s") == len(params)
+
+
+def test_cursor_predicate_depends_on_kind_order():
+    cursor = pt.Cursor(DAY, pt.DIAGNOSIS, 9)
+    sql, params = pt.timeline_query(1, cursor, 11)
+    assert "admit_date < %s" in sql                                                   # sorts before
+    assert "(date < %s OR (date = %s AND diagnosis_id < %s))" in sql                  # same kind
+    assert "date_ordered <= %s" in sql and "start_date <= %s" in sql                 # sort after
+    assert params[:3] == (1, DAY, 11) and params[6:11] == (1, DAY, DAY, 9, 11)
+    assert sql.count("%s") == len(params)
+
+
+def test_load_page_returns_cursor_only_when_more_rows(make_conn):
+    rows = [event(pt.PRESCRIPTION, DAY, 3), event(pt.LAB_TEST, DAY, 8), event(pt.ADMISSION, date(2025, 2, 1), 1)]
+    conn, cur = make_conn(fetchall=rows)
+    page = pt.load_page(conn, 1, limit=2)
+    assert [e.ref_id for e in page.events] == [3, 8]
+    assert page.next_cursor == pt.Cursor(DAY, pt.LAB_TEST, 8)
+    assert cur.execute.call_count == 1 and cur.execute.call_args[0][1][-1] == 3
+
+    conn, _ = make_conn(fetchall=rows[:2])
+    assert pt.load_page(conn, 1, limit=2).next_cursor is None
+
+
+def test_page_cache_is_invalidated_per_patient(make_conn):
+    conn, cur = make_conn(fetchall=[event(pt.DIAGNOSIS, DAY, 1)])
+    pt.page(conn, 1)
+    pt.page(conn, 1)
+    assert cur.execute.call_count == 1
+    invalidate("Prescription", patient_tag(2))
+    pt.page(conn, 1)
+    assert cur.execute.call_count == 1
+    invalidate(patient_tag(1))
+    pt.page(conn, 1)
+    assert cur.execute.call_count == 2
+
+
+def test_timeline_frame_shows_adherence_for_prescriptions_only():
+    frame = pt.timeline_frame([
+        event(pt.PRESCRIPTION, DAY, 1, given=3, due=4),
+        event(pt.PRESCRIPTION, DAY, 2, given=0, due=0),
+        event(pt.LAB_TEST, DAY, 3, report_id=5),
+    ])
+    doses = frame["Doses Given"]
+    assert doses[0] == "75%" and doses.isna()[1] and doses.isna()[2]
+    assert list(frame["Record"]) == [pt.PRESCRIPTION, pt.PRESCRIPTION, pt.LAB_TEST]
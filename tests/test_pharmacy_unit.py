@@ -0,0 +1,97 @@
+# tests/test_pharmacy_unit.py
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+
+from services import pharmacy as ph
+
+DAY = date(2025, 3, 1)
+AT = datetime(2025, 3, 1, 10)
+
+
+def test_allocate_takes_earliest_expiry_first_and_tracks_balance():
+    lines = [(1, "Amox", 4), (2, "Amox", 3), (3, "Para", 1)]
+    batches = [(7, "Amox", 5), (8, "Amox", 5), (9, "Para", 5)]
+    assert ph.allocate(lines, {"Amox": 12, "Para": 5}, batches) == [
+        ph.Allocation(1, "Amox", 7, 4, 8),
+        ph.Allocation(2, "Amox", 7, 1, 7),
+        ph.Allocation(2, "Amox", 8, 2, 5),
+        ph.Allocation(3, "Para", 9, 1, 4),
+    ]
+
+
+def test_allocate_names_every_short_medicine():
+    with pytest.raises(ph.InsufficientStock) as err:
+        ph.allocate([(1, "Amox", 9), (2, "Para", 2), (3, "Ibu", 1)], {}, [(7, "Amox", 5), (9, "Para", 5)])
+    assert err.value.short == {"Amox": 4, "Ibu": 1}
+
+
+def test_dispense_locks_in_order_and_uses_a_fixed_number_of_statements(make_conn):
+    conn, cur = make_conn(results=[
+        [(3, "Para", 10), (5, "Amox", 7)],      # prescriptions, locked by id
+        [("Amox", 20), ("Para", 30)],           # stock, locked by name
+        [(7, "Amox", 2), (8, "Amox", 18), (9, "Para", 30)],
+        [(3, 9, 100), (5, 7, 103), (5, 8, 105)],  # new dispense ids, stepped by 2 or more
+    ], lastrowid=100)
+    items = [ph.DispenseItem(5, 3), ph.DispenseItem(3, 2), ph.DispenseItem(5, 1)]
+    allocations = ph.dispense(conn, 4001, items, DAY, AT)
+
+    assert [(a.prescription_id, a.batch_id, a.quantity, a.balance_after) for a in allocations] == [
+        (3, 9, 2, 28), (5, 7, 2, 18), (5, 8, 2, 16),
+    ]
+    executed = [c[0] for c in cur.execute.call_args_list]
+    assert "FROM Prescription" in executed[0][0] and executed[0][1] == (3, 5)
+    assert "FROM Medicine_Stock" in executed[1][0] and executed[1][1] == ("Amox", "Para")
+    assert "FROM Stock_Batch" in executed[2][0] and executed[2][1] == ("Amox", "Para", DAY)
+    # Counters come down by the allocated quantities, not by an id range.
+    assert "UPDATE Stock_Batch" in executed[3][0] and executed[3][1] == (9, 2, 7, 2, 8, 2, 9, 7, 8)
+    assert "UPDATE Medicine_Stock" in executed[4][0] and executed[4][1] == ("Para", 2, "Amox", 4, "Para", "Amox")
+    assert "BETWEEN" not in executed[3][0] + executed[4][0]
+    assert executed[5][1] == (3, 5, DAY, 100)
+    assert cur.execute.call_count + cur.executemany.call_count == 8
+
+    (_, dispenses), (_, ledger) = [c[0] for c in cur.executemany.call_args_list]
+    assert dispenses[0] == ("Para", 2, DAY, 3, 4001, 9)
+    assert [row[5] for row in ledger] == [100, 103, 105]
+    assert ledger[1] == ("Amox", 7, -2, 18, ph.DISPENSE, 103, 4001, AT)
+
+
+def test_dispense_refuses_more_than_the_prescription_has_left(make_conn):
+    conn, cur = make_conn(results=[[(5, "Amox", 2)]])
+    with pytest.raises(ph.InvalidStockMovement, match="2 unit"):
+        ph.dispense(conn, 4001, [ph.DispenseItem(5, 3)], DAY)
+    conn, cur = make_conn(results=[[]])
+    with pytest.raises(ph.InvalidStockMovement, match="does not exist"):
+        ph.dispense(conn, 4001, [ph.DispenseItem(6, 1)], DAY)
+    assert cur.execute.call_count == 1 and not cur.executemany.called
+
+
+def test_receive_records_the_new_balance_in_the_ledger(make_conn):
+    conn, cur = make_conn(fetchone=(250,), lastrowid=12)
+    assert ph.receive(conn, 4001, " Amox ", "B-1", date(2026, 1, 1), 50, AT) == 250
+    assert cur.execute.call_args_list[-1][0][1] == ("Amox", 12, 50, 250, ph.RECEIPT, None, 4001, AT)
+    with pytest.raises(ph.InvalidStockMovement):
+        ph.receive(conn, 4001, "Amox", "B-1", date(2026, 1, 1), 0)
+
+
+def test_write_off_expired_empties_batches_and_logs_each(make_conn):
+    conn, cur = make_conn(results=[[("Amox",)], [("Amox", 40)], [(7, "Amox", 5), (8, "Amox", 10)]])
+    assert ph.write_off_expired(conn, 4001, DAY, AT) == 15
+    assert [row[2:4] for row in cur.executemany.call_args[0][1]] == [(-5, 35), (-10, 25)]
+
+
+def test_forecast_finds_the_first_day_stock_does_not_cover():
+    prescriptions = ph.demand_frame([
+        ("Amox", date(2025, 2, 20), date(2025, 3, 10)),
+        ("Amox", date(2025, 3, 3), date(2025, 3, 4)),
+        ("Para", date(2025, 1, 1), date(2025, 12, 31)),
+    ])
+    demand = ph.daily_demand(prescriptions, DAY, date(2025, 3, 7))
+    assert demand["Amox"].tolist() == [1, 1, 2, 2, 1, 1, 1]
+    out = ph.forecast(demand, {"Amox": 5, "Para": 100, "Ibu": 3})
+    assert out.loc["Amox", "days_of_cover"] == 3
+    assert out.loc["Amox", "stockout_date"] == pd.Timestamp(2025, 3, 4)
+    assert out.loc["Amox", "shortfall"] == 4
+    assert pd.isna(out.loc["Para", "days_of_cover"]) and out.loc["Ibu", "due"] == 0
+    assert list(out.index[:1]) == ["Amox"]
@@ -0,0 +1,80 @@
+# tests/test_prescriptions_unit.py
+from datetime import date
+
+import pytest
+
+from services import prescriptions as rx
+
+START, END = date(2025, 6, 1), date(2025, 6, 3)
+ADMISSION = (42, 2001, 1)  # admission_id, nurse_emp_id, @@auto_increment_increment
+
+
+def test_order_rows_one_row_per_timing_and_dedupes():
+    items = [
+        rx.OrderItem(" Paracetamol ", "500mg", START, END, ("morning", "Evening")),
+        rx.OrderItem("Paracetamol", "500mg", START, END, ("Morning",)),
+    ]
+    assert rx.order_rows(items) == [
+        ("Paracetamol", "500mg", START, END, "Morning"),
+        ("Paracetamol", "500mg", START, END, "Evening"),
+    ]
+
+
+@pytest.mark.parametrize("item", [
+    rx.OrderItem("", "1", START, END, ("Morning",)),
+    rx.OrderItem("A", "1", START, END, ()),
+    rx.OrderItem("A", "1", END, START, ("Morning",)),
+    rx.OrderItem("A", "1", START, END, ("Midnight",)),
+])
+def test_order_rows_rejects_bad_lines(item):
+    with pytest.raises(rx.InvalidOrder):
+        rx.order_rows([item])
+
+
+def test_place_order_writes_whole_order_in_one_executemany(make_conn):
+    conn, cur = make_conn(fetchone=ADMISSION, lastrowid=100)
+    items = [rx.OrderItem(f"Med{i}", "10mg", START, END, ("Morning", "Evening")) for i in range(10)]
+    result = rx.place_order(conn, 11111111111, 1001, items)
+
+    assert result.prescription_ids == list(range(100, 120))
+    assert result.admission_id == 42
+    assert result.doses == 20 * 3
+
+    assert cur.execute.call_count == 1  # the admission check
+    assert "LOCK IN SHARE MODE" in cur.execute.call_args[0][0]
+    sql_calls = [c[0][0] for c in cur.executemany.call_args_list]
+    assert len(sql_calls) == 2  # prescriptions, then schedule doses
+    assert "INSERT INTO Prescription" in sql_calls[0]
+    rows = cur.executemany.call_args_list[0][0][1]
+    assert rows[0] == ("Med0", "10mg", START, END, "Morning", 1001, 11111111111)
+    doses = cur.executemany.call_args_list[1][0][1]
+    assert doses[0] == (100, START, "Morning", 11111111111, 42, 2001)
+    conn.commit.assert_not_called()
+
+
+def test_place_order_inserts_row_by_row_when_ids_are_not_consecutive(make_conn):
+    conn, cur = make_conn(fetchone=(42, 2001, 2))
+    ids = iter([101, 103])
+
+    def execute(sql, params=()):
+        if "INSERT INTO Prescription" in sql:
+            cur.lastrowid = next(ids)
+
+    cur.execute.side_effect = execute
+    result = rx.place_order(conn, 11111111111, 1001, [rx.OrderItem("A", "1", START, END, ("Morning", "Evening"))])
+    assert result.prescription_ids == [101, 103]
+    assert cur.executemany.call_args[0][1][0][0] == 101  # the schedule uses the real ids
+
+
+def test_place_order_requires_admission(make_conn):
+    conn, cur = make_conn(fetchone=None)
+    with pytest.raises(rx.NotAdmitted):
+        rx.place_order(conn, 11111111111, 1001, [rx.OrderItem("A", "1", START, END, ("Morning",))])
+    cur.executemany.assert_not_called()
+
+
+def test_place_order_validates_before_touching_the_db(make_conn):
+    conn, cur = make_conn()
+    with pytest.raises(rx.InvalidOrder):
+        rx.place_order(conn, 11111111111, 1001, [])
+    cur.execute.assert_not_called()
@@ -0,0 +1,79 @@
+# tests/test_query_cache_unit.py
+from unittest.mock import MagicMock
+
+from db.cache import QueryCache, cached_query, query_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_hit_after_first_load():
+    cache = QueryCache(ttl=10)
+    loader = MagicMock(return_value=[{"CID_no": 1}])
+    assert cache.get_or_load("q", ("Patient",), loader) == [{"CID_no": 1}]
+    assert cache.get_or_load("q", ("Patient",), loader) == [{"CID_no": 1}]
+    assert loader.call_count == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = QueryCache(ttl=5, clock=clock)
+    loader = MagicMock(return_value=[])
+    cache.get_or_load("q", ("Patient",), loader)
+    clock.now = 6
+    cache.get_or_load("q", ("Patient",), loader)
+    assert loader.call_count == 2
+
+
+def test_write_to_table_evicts_only_dependent_entries():
+    cache = QueryCache(ttl=60)
+    patients = MagicMock(return_value=["p"])
+    tests = MagicMock(return_value=["t"])
+    cache.get_or_load("patients", ("Patient",), patients)
+    cache.get_or_load("pending", ("Lab_Test", "Test_Report"), tests)
+
+    cache.invalidate("Test_Report")
+
+    cache.get_or_load("patients", ("Patient",), patients)
+    cache.get_or_load("pending", ("Lab_Test", "Test_Report"), tests)
+    assert patients.call_count == 1
+    assert tests.call_count == 2
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_result_loaded_across_a_write_is_not_cached():
+    cache = QueryCache(ttl=60)
+
+    def racing_loader():
+        cache.invalidate("Patient")  # a write commits while the SELECT is running
+        return ["stale"]
+
+    assert cache.get_or_load("q", ("Patient",), racing_loader) == ["stale"]
+    assert cache.stats()["entries"] == 0
+
+
+def test_lru_bound():
+    cache = QueryCache(ttl=60, max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.get_or_load(key, ("Patient",), lambda: key)
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cached_query_uses_dictionary_cursor(make_conn):
+    query_cache.clear()
+    conn, cur = make_conn(fetchall=[{"CID_no": 1}])
+
+    rows = cached_query(conn, "SELECT CID_no FROM Patient WHERE CID_no=%s", (1,), tables=("Patient",))
+    again = cached_query(conn, "SELECT CID_no FROM Patient WHERE CID_no=%s", (1,), tables=("Patient",))
+
+    assert rows == again == [{"CID_no": 1}]
+    conn.cursor.assert_called_once_with(dictionary=True)
+    cur.execute.assert_called_once()
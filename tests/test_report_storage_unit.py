@@ -0,0 +1,85 @@
+# tests/test_report_storage_unit.py
+import os
+import hashlib
+import io
+
+import pytest
+
+from services import report_storage as rs
+
+
+PDF = b"%PDF-1.4\n" + b"x" * 5000
+
+
+def test_iter_chunks_reads_in_fixed_sizes():
+    assert [len(c) for c in rs.iter_chunks(io.BytesIO(b"a" * 10), chunk_size=4)] == [4, 4, 2]
+
+
+def test_local_storage_is_content_addressed(tmp_path):
+    storage = rs.LocalFileStorage(str(tmp_path))
+    stored = storage.put(rs.iter_chunks(io.BytesIO(PDF), chunk_size=1024), suffix=".pdf")
+    sha = hashlib.sha256(PDF).hexdigest()
+    assert stored == rs.StoredObject(f"{sha[:2]}/{sha[2:4]}/{sha}.pdf", len(PDF), sha, True)
+    with storage.open(stored.key) as f:
+        assert f.read() == PDF
+    assert not [p for p in os.listdir(tmp_path) if p.startswith(".upload-")]
+
+
+def test_local_storage_dedupes_identical_uploads(tmp_path):
+    storage = rs.LocalFileStorage(str(tmp_path))
+    first = storage.put([PDF], suffix=".pdf")
+    second = storage.put([PDF[:100], PDF[100:]], suffix=".pdf")
+    assert second.key == first.key and second.created is False
+    other = storage.put([b"different"], suffix=".pdf")
+    assert other.key != first.key
+
+
+def test_local_storage_removes_partial_upload_on_error(tmp_path):
+    def broken():
+        yield b"partial"
+        raise IOError("client went away")
+
+    storage = rs.LocalFileStorage(str(tmp_path))
+    with pytest.raises(IOError):
+        storage.put(broken())
+    assert os.listdir(tmp_path) == []
+
+
+def test_local_storage_rejects_keys_outside_root(tmp_path):
+    with pytest.raises(ValueError):
+        rs.LocalFileStorage(str(tmp_path)).open("../../etc/passwd")
+
+
+def test_in_memory_storage_matches_local_keys(tmp_path):
+    mem = rs.InMemoryStorage()
+    stored = mem.put([PDF], suffix=".pdf")
+    assert stored.key == rs.LocalFileStorage(str(tmp_path)).put([PDF], suffix=".pdf").key
+    assert b"".join(mem.read_chunks(stored.key, chunk_size=1000)) == PDF
+
+
+def test_store_report_inserts_metadata_without_commit(make_conn):
+    conn, cur = make_conn(lastrowid=41)
+    mem = rs.InMemoryStorage()
+    report_id = rs.store_report(conn, 7, 3001, io.BytesIO(PDF), "CBC Result.PDF", storage=mem)
+    assert report_id == 41
+    sql, params = cur.execute.call_args[0]
+    assert "content_sha256" in sql
+    sha = hashlib.sha256(PDF).hexdigest()
+    assert params == (rs.object_key(sha, ".pdf"), 7, 3001, sha, len(PDF), "CBC Result.PDF")
+    conn.commit.assert_not_called()
+
+
+def test_open_report_falls_back_to_legacy_path(tmp_path):
+    legacy = tmp_path / "old.pdf"
+    legacy.write_bytes(b"old")
+    row = {"file_path": str(legacy), "content_sha256": None}
+    assert rs.report_available(row)
+    with rs.open_report(row) as f:
+        assert f.read() == b"old"
+    assert rs.download_name(row) == "old.pdf"
+
+    mem = rs.InMemoryStorage()
+    stored = mem.put([PDF], suffix=".pdf")
+    row = {"file_path": stored.key, "content_sha256": stored.sha256, "original_name": "cbc.pdf"}
+    assert rs.open_report(row, storage=mem).read() == PDF
+    assert rs.download_name(row) == "cbc.pdf"
@@ -0,0 +1,103 @@
+# tests/test_repositories_unit.py
+import io
+from datetime import date, datetime
+from unittest.mock import patch
+
+import pytest
+
+from db.cache import query_cache, invalidate
+from repositories.adherence import AdherenceRepo
+from repositories.admissions import AdmissionRepo, AdmittedPatient
+from repositories.lab import LabRepo
+from repositories.med_admin import MedAdminRepo
+from repositories.patients import Patient, PatientRepo
+from services.report_storage import InMemoryStorage
+from services.ward_census import AlreadyAdmitted
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    query_cache.clear()
+    yield
+    query_cache.clear()
+
+
+def test_rows_come_back_as_namedtuples(make_conn):
+    row = (11111111111, "Pema", date(1990, 1, 1), "Female", 17000000, "Paro")
+    conn, cur = make_conn(fetchone=row)
+    patient = PatientRepo(conn).get(11111111111)
+    assert isinstance(patient, Patient) and patient.name == "Pema"
+    conn.cursor.assert_called_with()  # tuple cursor, not dictionary
+
+
+def test_missing_row_is_none(make_conn):
+    conn, _ = make_conn(fetchone=None)
+    assert PatientRepo(conn).get(1) is None
+    assert PatientRepo(conn).exists(1) is False
+
+
+def test_cached_reads_hit_the_database_once_until_invalidated(make_conn):
+    conn, cur = make_conn(fetchall=[(11111111111, "3", 2001)])
+    repo = AdmissionRepo(conn)
+    assert repo.admitted() == [AdmittedPatient(11111111111, "3", 2001)]
+    repo.admitted()
+    assert cur.execute.call_count == 1
+    invalidate("Admission_to_Ward")
+    repo.admitted()
+    assert cur.execute.call_count == 2
+
+
+def test_admit_returns_new_id(make_conn):
+    conn, cur = make_conn(lastrowid=12)
+    assert AdmissionRepo(conn).admit(11111111111, "3", 1001, admit_date=date(2025, 1, 1)) == 12
+    active, insert, occupancy, repoint, _ = cur.execute.call_args_list
+    assert "FOR UPDATE" in active[0][0] and active[0][1] == (11111111111,)
+    assert insert[0][1] == (date(2025, 1, 1), "3", 11111111111, 1001, None)
+    assert "Ward_Occupancy" in occupancy[0][0] and occupancy[0][1] == ("3", 1, 1)
+    assert "UPDATE Medication_Schedule" in repoint[0][0]
+    assert repoint[0][1] == (12, None, 11111111111, date(2025, 1, 1))
+    conn.commit.assert_not_called()
+
+
+def test_admit_refuses_a_patient_already_admitted(make_conn):
+    conn, cur = make_conn(fetchall=[(12, "3")], lastrowid=13)
+    with pytest.raises(AlreadyAdmitted, match="ward 3"):
+        AdmissionRepo(conn).admit(11111111111, "5", 1001)
+    assert cur.execute.call_count == 1      # no second stay, no occupancy change
+
+
+def test_med_admin_record_upserts_on_dose_key(make_conn):
+    conn, cur = make_conn(lastrowid=55, rowcount=1)
+    with patch("services.med_admin.record_status") as mirror:
+        admin_id, created = MedAdminRepo(conn).record(7, 2001, date(2025, 1, 2), "Morning", "Given",
+                                                      at=datetime(2025, 1, 2, 8))
+    assert (admin_id, created) == (55, True)
+    upsert, audit = cur.execute.call_args_list
+    assert "ON DUPLICATE KEY UPDATE" in upsert[0][0]
+    assert upsert[0][1] == (7, 2001, datetime(2025, 1, 2, 8), date(2025, 1, 2), "Given", "", "Morning")
+    assert "Medicine_Administration_Audit" in audit[0][0] and audit[0][1][0] == 55
+    mirror.assert_called_once_with(conn, 7, date(2025, 1, 2), "Morning", "Given", 55)
+
+    conn, cur = make_conn(lastrowid=55, rowcount=2)  # the row already existed
+    with patch("services.med_admin.record_status"):
+        assert MedAdminRepo(conn).record(7, 2001, date(2025, 1, 2), "Morning", "Skipped") == (55, False)
+    conn.commit.assert_not_called()
+
+
+def test_acknowledge_closes_only_open_alerts_in_one_statement(make_conn):
+    conn, cur = make_conn(rowcount=2)
+    at = datetime(2025, 1, 2, 9)
+    assert AdherenceRepo(conn).acknowledge([5, 9], 2001, at) == 2
+    sql, params = cur.execute.call_args[0]
+    assert "alert_id IN (%s, %s) AND status = %s" in sql
+    assert params == ("Acknowledged", at, 2001, 5, 9, "Open")
+    assert AdherenceRepo(conn).acknowledge([], 2001) == 0 and cur.execute.call_count == 1
+
+
+def test_lab_upload_marks_reported_before_storing(make_conn):
+    conn, cur = make_conn(fetchone=(11111111111,), lastrowid=9, rowcount=1)
+    uploaded = LabRepo(conn).upload_report(4, 3001, io.BytesIO(b"%PDF"), "a.pdf", storage=InMemoryStorage())
+    assert uploaded == (9, 11111111111)     # the patient's tag is invalidated whatever the queue held
+    statements = [c[0][0] for c in cur.execute.call_args_list]
+    assert "UPDATE Lab_Test" in statements[0] and "INSERT INTO Test_Report" in statements[-1]
+
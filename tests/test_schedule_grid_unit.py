@@ -0,0 +1,39 @@
+# tests/test_schedule_grid_unit.py
+import pandas as pd
+
+from services.schedule_grid import build_schedule_grid
+
+
+def record(pid, med, slot, status, name="Pema", dosage="500mg"):
+    return {"patient_id": pid, "patient_name": name, "medication_name": med,
+            "dosage": dosage, "frequency": slot, "status": status}
+
+
+def test_grid_has_one_row_per_patient_medication():
+    grid = build_schedule_grid([
+        record(1, "Paracetamol", "Morning", "Given"),
+        record(1, "Paracetamol", "Evening", None),
+        record(1, "Metformin", "Afternoon", "Skipped"),
+        record(2, "Paracetamol", "Morning", "Pending", name="Dorji"),
+    ])
+    assert list(grid.columns) == ["patient_id", "patient_name", "medication_name", "dosage",
+                                  "Morning", "Afternoon", "Evening"]
+    by_key = grid.set_index(["patient_id", "medication_name"])
+    assert by_key.loc[(1, "Paracetamol"), ["Morning", "Afternoon", "Evening"]].tolist() == ["Given", "", "Pending"]
+    assert by_key.loc[(1, "Metformin"), ["Morning", "Afternoon", "Evening"]].tolist() == ["", "Skipped", ""]
+    assert by_key.loc[(2, "Paracetamol"), "Morning"] == "Pending"
+    assert len(grid) == 3
+
+
+def test_duplicate_slot_records_keep_first_status():
+    grid = build_schedule_grid([
+        record(1, "Paracetamol", "Morning", "Given"),
+        record(1, "Paracetamol", "Morning", "Skipped"),
+    ])
+    assert grid.loc[0, "Morning"] == "Given"
+
+
+def test_empty_input_gives_empty_grid_with_slot_columns():
+    grid = build_schedule_grid(pd.DataFrame())
+    assert grid.empty
+    assert {"Morning", "Afternoon", "Evening"} <= set(grid.columns)
@@ -0,0 +1,67 @@
+# tests/test_session_unit.py
+import pytest
+
+from auth.session import Principal, SessionStore, resolve_principal
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_principal(user_id=1, role="nurse"):
+    return Principal(user_id, "Dawa", "dawa@example.com", role, linked_emp_id=1)
+
+
+def test_principal_is_slotted():
+    p = make_principal()
+    with pytest.raises(AttributeError):
+        p.password_hash = "x"
+
+
+def test_resolve_principal_loads_linked_record_and_drops_hash(make_conn):
+    record = {"nurse_emp_id": 1, "name": "Dawa Lhamo"}
+    conn, cur = make_conn(fetchone=record)
+    user = {"user_id": 7, "name": "Dawa", "email": "dawa@example.com", "role": "nurse",
+            "password_hash": "$2b$12$secret", "linked_cid": None, "linked_emp_id": 1}
+
+    p = resolve_principal(conn, user)
+
+    assert cur.execute.call_args[0][1] == (1,)
+    assert "FROM Nurse" in cur.execute.call_args[0][0]
+    assert p.record == record and p.display_name == "Dawa Lhamo"
+    assert not hasattr(p, "password_hash")
+
+
+def test_sessions_expire_when_idle():
+    clock = FakeClock()
+    store = SessionStore(idle_timeout=60, clock=clock)
+    token = store.create(make_principal())
+    clock.now = 50
+    assert store.get(token) is not None  # touching the session resets the idle timer
+    clock.now = 100
+    assert store.get(token) is not None
+    clock.now = 161
+    assert store.get(token) is None
+    assert len(store) == 0
+
+
+def test_least_recently_used_session_is_evicted():
+    store = SessionStore(max_sessions=2)
+    first = store.create(make_principal(1))
+    second = store.create(make_principal(2))
+    store.get(first)
+    store.create(make_principal(3))
+    assert store.get(second) is None
+    assert store.get(first).user_id == 1
+
+
+def test_unknown_or_dropped_token():
+    store = SessionStore()
+    token = store.create(make_principal())
+    store.drop(token)
+    assert store.get(token) is None
+    assert store.get(None) is None
@@ -0,0 +1,33 @@
+# tests/test_startup_unit.py
+from benchmarks import startup
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |   _io
+2024-01-01 WARNING streamlit: missing ScriptRunContext!
+import time:      2000 |       5000 |     pandas.core
+import time:      1000 |       6000 |   pandas
+import time:       500 |       6600 | app
+import time:       300 |        300 | site
+"""
+
+
+def test_parse_importtime_reads_depth_and_ignores_noise():
+    imports = startup.parse_importtime(SAMPLE)
+    assert [i.module for i in imports] == ["_io", "pandas.core", "pandas", "app", "site"]
+    assert [i.depth for i in imports] == [1, 2, 1, 0, 0]
+    assert startup.total_ms(imports) == 6.9
+
+
+def test_check_reports_forbidden_modules_and_budget():
+    imports = startup.parse_importtime(SAMPLE)
+    scenario = startup.Scenario("role_selection", "import app", ("pandas", "mysql.connector"))
+    assert startup.check(scenario, imports, budget_ms=10) == ["role_selection: imports pandas"]
+    assert startup.check(scenario, imports, budget_ms=5)[-1] == "role_selection: 7 ms > budget 5 ms"
+
+
+def test_role_selection_page_does_not_load_pandas_or_the_db_driver():
+    scenario = startup.SCENARIOS[0]
+    imports = startup.parse_importtime(startup.profile(scenario.code))
+    assert startup.check(scenario, imports, budget_ms=float("inf")) == []
+
@@ -1,19 +1,7 @@
 # tests/test_user_model_unit.py
 import pytest
-import sys
-import os
 
-ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-if ROOT not in sys.path:
-    sys.path.insert(0, ROOT)
-
-try:
-    import user_model as um
-except ModuleNotFoundError:
-    try:
-        import ePIS.user_model as um
-    except Exception as exc:
-        raise ModuleNotFoundError("Could not import user_model. Place user_model.py in project root.") from exc
+from auth import user_model as um
 
 
 def test_hash_and_check_password():
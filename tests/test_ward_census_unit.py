@@ -0,0 +1,76 @@
+# tests/test_ward_census_unit.py
+from datetime import date
+
+import numpy as np
+import pytest
+
+from services import ward_census as wc
+from services.prescriptions import NotAdmitted
+
+START, END = date(2025, 1, 1), date(2025, 1, 5)
+STAYS = [
+    (1, 3, date(2025, 1, 1), date(2025, 1, 4)),
+    (2, 3, date(2024, 12, 20), None),            # admitted before the range, still in
+    (3, 5, date(2025, 1, 2), date(2025, 1, 2)),  # same-day discharge never counts overnight
+    (4, 5, date(2025, 1, 3), date(2025, 1, 10)),
+]
+
+
+def test_occupancy_series_counts_days_admitted_to_before_discharge():
+    series = wc.occupancy_series(wc.stays_frame(STAYS), START, END)
+    assert list(series.columns) == [3, 5]
+    assert series[3].tolist() == [2, 2, 2, 1, 1]
+    assert series[5].tolist() == [0, 0, 1, 1, 1]
+
+
+def test_census_frame_matches_day_by_day_recount():
+    stays = wc.stays_frame(STAYS)
+    frame = wc.census_frame(stays, START, END)
+    for row in frame.itertuples():
+        day = row.census_date
+        in_ward = stays[stays["ward_no"] == row.ward_no]
+        expected = ((in_ward["admit_date"] <= day)
+                    & (in_ward["discharge_date"].isna() | (in_ward["discharge_date"] > day))).sum()
+        assert row.occupied == expected
+        assert row.admissions == (in_ward["admit_date"] == day).sum()
+        assert row.discharges == (in_ward["discharge_date"] == day).sum()
+    assert len(frame) == 10
+
+
+def test_length_of_stay_only_completed_stays_in_range():
+    los = wc.length_of_stay(wc.stays_frame(STAYS))
+    assert los.loc["All", "stays"] == 3
+    assert los.loc[5, "max"] == 7 and los.loc[5, "p50"] == 3.5
+    assert wc.length_of_stay(wc.stays_frame(STAYS), end=date(2025, 1, 3)).loc["All", "stays"] == 1
+    assert wc.length_of_stay(wc.stays_frame([])).empty
+    np.testing.assert_array_equal(wc.los_histogram(wc.stays_frame(STAYS), max_days=5), [1, 0, 0, 1, 0, 1])
+
+
+def test_discharge_locks_updates_and_decrements_occupancy(make_conn):
+    conn, cur = make_conn(fetchone=(3, date(2025, 1, 1), "Admitted"))
+    assert wc.discharge(conn, 42, date(2025, 1, 4)) == 3
+    statements = [c[0][0] for c in cur.execute.call_args_list]
+    assert "FOR UPDATE" in statements[0]
+    assert "status = 'Discharged'" in statements[1]
+    assert "DELETE FROM Medication_Schedule" in statements[2]
+    assert "Ward_Occupancy" in statements[3] and cur.execute.call_args[0][1] == (3, -1, -1)
+    conn.commit.assert_not_called()
+
+
+def test_discharge_rejects_inactive_or_early_dates(make_conn):
+    conn, cur = make_conn(fetchone=(3, date(2025, 1, 1), "Discharged"))
+    with pytest.raises(NotAdmitted):
+        wc.discharge(conn, 42)
+    conn, cur = make_conn(fetchone=(3, date(2025, 1, 5), "Admitted"))
+    with pytest.raises(wc.InvalidDischarge):
+        wc.discharge(conn, 42, date(2025, 1, 4))
+    assert cur.execute.call_count == 1
+
+
+def test_snapshot_rolls_previous_day_forward(make_conn):
+    conn, cur = make_conn()
+    cur.fetchall.side_effect = [[(3, 10), (5, 2)], [(3, 1), (7, 2)], [(5, 2)]]
+    assert wc.snapshot(conn, date(2025, 1, 2)) == 3
+    rows = cur.executemany.call_args[0][1]
+    assert rows == [(date(2025, 1, 2), 3, 11, 1, 0), (date(2025, 1, 2), 5, 0, 0, 2),
+                    (date(2025, 1, 2), 7, 2, 2, 0)]